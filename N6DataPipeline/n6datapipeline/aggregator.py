@@ -988,7 +988,8 @@ class Aggregator(ConfigMixin, LegacyQueuedBase):
 
     @AggregatorStateIntegrityError.causing_fatal_exit()
     def input_callback(self, routing_key, body, properties):
-        record_dict = RecordDict.from_json(body)
+        record_dict = RecordDict.from_json(
+            body, **self.get_record_dict_from_json_kwargs(properties))
         with self.setting_error_event_info(record_dict):
             data = dict(record_dict)
             if '_group' not in data:
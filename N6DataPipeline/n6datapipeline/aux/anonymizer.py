@@ -5,7 +5,6 @@ Anonymizer -- performs validation and anonymization of event data
 before publishing them using the (STOMP-based) Stream API.
 """
 
-import json
 
 from n6datapipeline.base import LegacyQueuedBase
 from n6lib.auth_api import AuthAPI
@@ -13,7 +12,10 @@ from n6lib.const import EVENT_TYPE_ENUMS
 from n6lib.context_helpers import force_exit_on_any_remaining_entered_contexts
 from n6lib.db_filtering_abstractions import RecordFacadeForPredicates
 from n6lib.log_helpers import get_logger, logging_configured
-from n6lib.record_dict import N6DataSpecWithOptionalModified
+from n6lib.record_dict import (
+    N6DataSpecWithOptionalModified,
+    load_record_dict_data,
+)
 from n6sdk.pyramid_commons.renderers import data_dict_to_json
 
 
@@ -59,7 +61,7 @@ class Anonymizer(LegacyQueuedBase):
         # * in this component we are doing the final validation anyway
         #   using `N6DataSpecWithOptionalModified.clean_result_dict()`
         #   (below -- in `_get_result_dicts_and_output_body()`).
-        event_data = json.loads(body)
+        event_data = load_record_dict_data(body, getattr(properties, 'content_type', None))
 
         ####################################################################
         # This is a *temporary hack* to clean data already put into queues #
@@ -0,0 +1,173 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+The *fused pipeline* runner -- a tool to process raw data with the
+given parser, the Enricher, the Filter and the Recorder, all within
+one process (intended to be used, e.g., for backfills or replays of
+archived raw data).
+
+The parser consumes raw data from its input queue (as usual), but the
+resultant record dicts, instead of being published (serialized to
+JSON), are passed directly -- as objects -- to the `enrich()` method
+of an `Enricher` instance, then to the `filter_record_dict()` method
+of a `Filter` instance, and, finally, they are recorded in batches
+using the `record_new_events()` method of a `Recorder` instance. The
+business logic of each component is the same as when the components
+run separately, but there are no intermediate AMQP hops and no
+intermediate JSON serializations/deserializations.
+
+Only parsers whose `event_type` is `'event'` are supported (the data
+from *blacklist* and *high-frequency* sources need to be processed also
+by the stateful Comparator or Aggregator components -- which are not
+part of the *fused pipeline*).
+
+Example command:
+
+    n6fused_pipeline n6datasources.parsers.abuse_ch.AbuseChUrlhausUrls202001Parser --n6recovery
+"""
+
+import argparse
+
+from n6datapipeline.base import LegacyQueuedBase
+from n6lib.auth_api import AuthAPICommunicationError
+from n6lib.common_helpers import (
+    FilePagedSequence,
+    import_by_dotted_name,
+    make_exc_ascii_str,
+    replace_segment,
+)
+from n6lib.log_helpers import get_logger, logging_configured
+
+
+LOGGER = get_logger(__name__)
+
+
+class FusedPipelineParserMixin:
+
+    """
+    A mixin for a parser class (see: `make_fused_pipeline_parser_class()`).
+
+    The constructor requires the following keyword arguments (apart
+    from any other ones accepted by the parser class):
+
+    * `enricher` -- an `n6datapipeline.enrich.Enricher` instance,
+    * `event_filter` -- an `n6datapipeline.filter.Filter` instance,
+    * `recorder` -- an `n6datapipeline.recorder.Recorder` instance.
+
+    (Those instances are not connected to AMQP on their own.)
+    """
+
+    # the maximum number of events recorded in one Event DB transaction
+    recorder_batch_size: int = 1000
+
+    def __init__(self, /, *, enricher, event_filter, recorder, **kwargs):
+        self._enricher = enricher
+        self._event_filter = event_filter
+        self._recorder = recorder
+        # (whatever the recorder publishes -- i.e., the events marked as
+        # *recorded* -- goes through the AMQP connection of this object)
+        self._recorder.publish_output = self.publish_output
+        super().__init__(**kwargs)
+
+    def input_callback(self, routing_key, body, properties):
+        data = self.prepare_data(routing_key, body, properties)
+        rid = data.get('properties.message_id')
+        with self.setting_error_event_info(rid):
+            parsed_rk = self.get_output_rk(data)
+            filtered_rk = replace_segment(parsed_rk, 1, 'filtered')
+            with FilePagedSequence(page_size=1000) as working_seq:
+                batch = []
+                for record_dict in self.get_output_record_dicts(data, working_seq):
+                    record_dict = self._enrich_and_filter(record_dict)
+                    if record_dict is None:
+                        continue
+                    batch.append((filtered_rk, record_dict))
+                    if len(batch) >= self.recorder_batch_size:
+                        self._recorder.record_new_events(batch)
+                        batch = []
+                if batch:
+                    self._recorder.record_new_events(batch)
+
+    def _enrich_and_filter(self, record_dict):
+        # Note: a failure concerning a particular event causes that just
+        # that event is skipped (the behavior is analogous to the case
+        # of separate components, when such an event would be nack-ed
+        # by the component whose processing failed).
+        for component, process in [
+            (self._enricher, self._enricher.enrich),
+            (self._event_filter, self._event_filter.filter_record_dict),
+        ]:
+            try:
+                with component.setting_error_event_info(record_dict):
+                    record_dict = process(record_dict)
+            except AuthAPICommunicationError:
+                raise
+            except Exception as exc:
+                LOGGER.error('%s could not process event %a: %s -- so the event '
+                             'is skipped', component.__class__.__qualname__,
+                             record_dict.get('id'), make_exc_ascii_str(exc),
+                             exc_info=True)
+                return None
+        return record_dict
+
+
+def make_fused_pipeline_parser_class(parser_class):
+    """
+    Make a subclass of the given parser class, with the
+    `FusedPipelineParserMixin` mixed in.
+
+    The resultant class has the same `__name__` as the parser class
+    (thanks to that, e.g., the parser-specific config section and the
+    name of the input queue are the same).
+    """
+    if not issubclass(parser_class, LegacyQueuedBase):
+        raise TypeError(f'{parser_class!a} is not a parser class')
+    if getattr(parser_class, 'event_type', None) != 'event':
+        raise ValueError(
+            f'{parser_class.__qualname__} is not supported by the fused '
+            f'pipeline (only parsers whose event type is "event" are)')
+    return type(parser_class.__name__,
+                (FusedPipelineParserMixin, parser_class),
+                {'__qualname__': parser_class.__qualname__})
+
+
+def parse_parser_class_arg():
+    arg_parser = argparse.ArgumentParser(
+        description=(
+            'Run the given parser, the Enricher, the Filter and '
+            'the Recorder -- all in one process. Any --n6... options '
+            '(e.g., --n6recovery) are passed to all of them.'))
+    arg_parser.add_argument(
+        'parser_class',
+        metavar='PARSER_CLASS',
+        help=('the dotted name of a parser class (e.g., '
+              '"n6datasources.parsers.abuse_ch.AbuseChUrlhausUrls202001Parser")'))
+    known_args, _ = arg_parser.parse_known_args()
+    return import_by_dotted_name(known_args.parser_class)
+
+
+def main():
+    with logging_configured():
+        parser_class = parse_parser_class_arg()
+        fused_parser_class = make_fused_pipeline_parser_class(parser_class)
+
+        # (imported here, so that this module can be imported also
+        # where the stuff required by `Recorder` is not installed)
+        from n6datapipeline.enrich import Enricher
+        from n6datapipeline.filter import Filter
+        from n6datapipeline.recorder import Recorder
+
+        fused_parser = fused_parser_class(
+            enricher=Enricher(),
+            event_filter=Filter(),
+            recorder=Recorder(),
+            **parser_class.get_script_init_kwargs())
+        try:
+            fused_parser.run()
+        except KeyboardInterrupt:
+            fused_parser.stop()
+            raise
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,14 @@ import argparse
 import collections
 import contextlib
 import copy
+import dataclasses
 import functools
 import inspect
+import logging
+import os
 import pprint
 import re
+import signal
 import sys
 import time
 from collections.abc import (
@@ -21,6 +25,7 @@ from collections.abc import (
     Generator,
 )
 from typing import (
+    NamedTuple,
     Optional,
     SupportsBytes,
     Union,
@@ -28,12 +33,15 @@ from typing import (
 
 import pika
 import pika.credentials
+import pika.spec
 
 from n6lib.amqp_helpers import (
     PIPELINE_OPTIONAL_COMPONENTS,
     PIPELINE_OPTIONAL_GROUPS,
     get_amqp_connection_params_dict,
     get_pipeline_binding_states,
+    get_record_dict_trust_key,
+    get_record_dict_wire_format,
 )
 from n6lib.argument_parser import N6ArgumentParser
 from n6lib.auth_api import AuthAPICommunicationError
@@ -44,7 +52,23 @@ from n6lib.common_helpers import (
     exiting_on_exception,
     make_exc_ascii_str,
 )
-from n6lib.log_helpers import get_logger
+from n6lib.config import ConfigError
+from n6lib.log_helpers import (
+    get_logger,
+    restart_amqp_logging_after_fork,
+)
+from n6lib.profiling_helpers import OnDemandProfiler
+from n6lib.record_dict import (
+    RECORD_DICT_WIRE_FORMATS,
+    TRUST_TAG_HEADER,
+    RecordDict,
+    RecordDictTrust,
+)
+from n6lib.stats_helpers import (
+    TRACE_HEADER,
+    ComponentStats,
+    make_trace_entry,
+)
 from n6lib.typing_helpers import KwargsDict
 
 
@@ -59,6 +83,146 @@ class n6AMQPCommunicationError(Exception):
     pass
 
 
+class InputMessage(NamedTuple):
+
+    """
+    An input message, as collected by the *micro-batched consumption*
+    machinery (see: `LegacyQueuedBase.input_batch_callback()`).
+    """
+
+    delivery_tag: int
+    routing_key: str
+    body: bytes
+    properties: pika.BasicProperties
+
+
+class InputBatchInterrupted(BaseException):
+
+    """
+    Raised by `LegacyQueuedBase.input_batch_callback()` when processing
+    of a batch has to be stopped in the midst -- because of an exception
+    which is not just a failure of a particular message (such as
+    `AuthAPICommunicationError`, `KeyboardInterrupt`, etc.).
+
+    It carries: the original exception (`cause`), the number of batch
+    messages that have been processed (`processed_count`; these are
+    the first messages of the batch) and the dict of failures among
+    those messages (`failures`) -- so that the processed messages can
+    be acknowledged (or nack-ed, if failed) as usual, and only the rest
+    of the batch is requeued. Then the original exception is re-raised
+    (or, if it is `AuthAPICommunicationError`, the component exits --
+    as in the case of the per-message consumption).
+    """
+
+    def __init__(self, cause: BaseException, processed_count: int, failures: dict[int, Exception]):
+        super().__init__(cause, processed_count, failures)
+        self.cause = cause
+        self.processed_count = processed_count
+        self.failures = failures
+
+
+@dataclasses.dataclass
+class _PendingAck:
+
+    # (used by the *publisher confirms* machinery -- see the
+    # `LegacyQueuedBase`'s attribute `publisher_confirms`)
+
+    delivery_tag: int
+    multiple: bool
+    last_publish_seq_no: int
+    publish_nacked: bool = False
+
+
+class AdaptivePrefetchController:
+
+    """
+    The logic of adjusting the prefetch count (used by the *adaptive
+    flow control* machinery -- see the `LegacyQueuedBase`'s attribute
+    `adaptive_flow_control`).
+
+    The goal is that the prefetched messages correspond to (roughly)
+    `target_buffering_time` seconds of processing -- based on the mean
+    processing time of a message measured since the previous adjustment.
+    To keep the adjustments smooth, the prefetch count is changed at
+    most by the factor of 2 at a time, and not at all if the change
+    would be smaller than 10%.
+
+    >>> controller = AdaptivePrefetchController(
+    ...     initial_prefetch_count=20,
+    ...     min_prefetch_count=1,
+    ...     max_prefetch_count=1000,
+    ...     target_buffering_time=0.5)
+    >>> for _ in range(100):
+    ...     controller.record_processing(0.001)   # 1 ms per message
+    >>> controller.get_adjusted_prefetch_count()  # (at most doubled)
+    40
+    >>> controller.get_adjusted_prefetch_count() is None   # (no new data)
+    True
+    >>> for _ in range(100):
+    ...     controller.record_processing(0.001)
+    >>> controller.get_adjusted_prefetch_count(allow_increase=False) is None
+    True
+    >>> for _ in range(100):
+    ...     controller.record_processing(0.1)   # 100 ms per message
+    >>> controller.get_adjusted_prefetch_count()  # (at most halved)
+    20
+    >>> controller.get_adjusted_prefetch_count() is None
+    True
+    >>> for _ in range(100):
+    ...     controller.record_processing(0.1)
+    >>> controller.get_adjusted_prefetch_count()
+    10
+    >>> controller.get_adjusted_prefetch_count() is None
+    True
+    >>> controller.prefetch_count
+    10
+    """
+
+    def __init__(self,
+                 initial_prefetch_count: int,
+                 min_prefetch_count: int,
+                 max_prefetch_count: int,
+                 target_buffering_time: float):
+        self._min_prefetch_count = min_prefetch_count
+        self._max_prefetch_count = max(max_prefetch_count, min_prefetch_count)
+        self._target_buffering_time = target_buffering_time
+        self.prefetch_count = self._clamp(initial_prefetch_count)
+        self._processing_time_total = 0.0
+        self._processed_count = 0
+
+    def record_processing(self, duration: float) -> None:
+        self._processing_time_total += duration
+        self._processed_count += 1
+
+    def get_adjusted_prefetch_count(self, allow_increase: bool = True) -> Optional[int]:
+        """
+        Compute the new prefetch count based on the processing times
+        recorded since the previous call. Return it if it differs from
+        the current one (then it also becomes the current one); return
+        None if no change is needed.
+        """
+        processing_time_total = self._processing_time_total
+        processed_count = self._processed_count
+        self._processing_time_total = 0.0
+        self._processed_count = 0
+        if not processed_count:
+            return None
+        current = self.prefetch_count
+        mean_processing_time = processing_time_total / processed_count
+        if mean_processing_time > 0:
+            ideal = self._target_buffering_time / mean_processing_time
+        else:
+            ideal = self._max_prefetch_count
+        new = self._clamp(round(min(max(ideal, current / 2), current * 2)))
+        if (new > current and not allow_increase) or abs(new - current) < current * 0.1:
+            return None
+        self.prefetch_count = new
+        return new
+
+    def _clamp(self, prefetch_count):
+        return min(max(prefetch_count, self._min_prefetch_count), self._max_prefetch_count)
+
+
 class LegacyQueuedBase(object):
 
     """
@@ -128,6 +292,87 @@ class LegacyQueuedBase(object):
     # https://www.rabbitmq.com/docs/confirms#channel-qos-prefetch)
     prefetch_count: int = 20
 
+    # if set to an integer greater than 1, *micro-batched consumption*
+    # is enabled: up to that many input messages are collected and then
+    # passed, together, to `input_batch_callback()` and acknowledged
+    # with one `basic_ack(..., multiple=True)` (note: the value should
+    # not be greater than `prefetch_count`, otherwise batches will be
+    # completed only because of `input_batch_max_wait`...)
+    input_batch_size: int = 1
+
+    # the maximum time (in seconds) the first message of an incomplete
+    # batch can wait before the batch is processed anyway (relevant only
+    # if *micro-batched consumption* is enabled -- see above)
+    input_batch_max_wait: float = 0.05
+
+    # if true, the output channel is put into the *publisher confirms*
+    # mode (see: https://www.rabbitmq.com/docs/confirms#publisher-confirms),
+    # and then each input message is acknowledged only after all output
+    # messages published while processing it have been confirmed by
+    # the broker (publishing itself does not wait for confirmations,
+    # so the number of not yet acknowledged input messages is bounded
+    # only by `prefetch_count`); if any of those output messages is
+    # nack-ed by the broker, the input message is requeued
+    publisher_confirms: bool = False
+
+    # the maximum number of published but not yet confirmed messages
+    # (relevant only if `publisher_confirms` is true); when it is
+    # reached, consuming is paused (with `basic_cancel`, as in the case
+    # of *adaptive flow control* -- see below) until the number drops
+    # to half of this value; the *iterative publishing* machinery (see:
+    # the `start_iterative_publishing()` method) also suspends
+    # publishing until some of the messages are confirmed
+    publisher_confirms_window: int = 1000
+
+    # if true, *adaptive flow control* is enabled: (1) every
+    # `flow_control_interval` seconds the prefetch count is adjusted
+    # (starting with `prefetch_count`, within the range from
+    # `min_prefetch_count` to `max_prefetch_count`) so that the
+    # prefetched messages correspond to (roughly)
+    # `prefetch_target_buffering_time` seconds of processing (see:
+    # `AdaptivePrefetchController`), but it is never increased while
+    # the size of pika's outbound buffer is not below
+    # `output_buffer_resume_threshold` (in bytes); (2) consuming is
+    # paused (with `basic_cancel`) when the size of the outbound buffer
+    # exceeds `output_buffer_pause_threshold` (i.e., when the broker
+    # does not keep up with receiving our output), and resumed when it
+    # drops below `output_buffer_resume_threshold`; note: in this mode
+    # the prefetch limit is set with the `global` flag (which RabbitMQ
+    # applies per channel), as only then changing it takes effect also
+    # for the already active consumer
+    adaptive_flow_control: bool = False
+    flow_control_interval: float = 1.0
+    min_prefetch_count: int = 1
+    max_prefetch_count: int = 1000
+    prefetch_target_buffering_time: float = 0.5
+    output_buffer_pause_threshold: int = 10 ** 7
+    output_buffer_resume_threshold: int = 10 ** 6
+
+    # the delay (in seconds) before a worker process that has exited
+    # unexpectedly is replaced with a new one (relevant only if the
+    # component has been started with the "--n6workers N" command line
+    # option, N > 1 -- see: the `run_with_optional_workers()` method)
+    worker_restart_delay: float = 5.0
+
+    # the interval (in seconds) between consecutive savings of the
+    # component's statistics (relevant only if the component has been
+    # started with the "--n6stats-file PATH" command line option)
+    stats_file_interval: float = 10.0
+
+    # if true, the bodies of all output messages are expected to be
+    # serialized record dicts (produced with `serialize_record_dict()`),
+    # and:
+    # * if the `record_dict_trust_key` option is set in the `[rabbitmq]`
+    #   config section -- they are tagged as *trusted* (see:
+    #   `n6lib.record_dict.RecordDictTrust`), so that the components
+    #   that receive them can skip re-adjusting the data (see:
+    #   `get_record_dict_from_json_kwargs()`);
+    # * if the `record_dict_wire_format` option in that section is set
+    #   to a binary format (`msgpack`) -- they have the `content_type`
+    #   AMQP property set appropriately (see:
+    #   `n6lib.record_dict.RECORD_DICT_WIRE_FORMATS`)
+    tags_output_as_trusted_record_dicts: bool = False
+
     # basic kwargs for `pika.BasicProperties` (message-publishing-related)
     basic_prop_kwargs: KwargsDict = {'delivery_mode': 2}
 
@@ -135,6 +380,32 @@ class LegacyQueuedBase(object):
     # always called on instantiation, before __init__())
     cmdline_args: argparse.Namespace = None
 
+    # it is set to a `ComponentStats` instance by __init__() if the
+    # "--n6stats-file PATH" command line option has been given
+    _stats: Optional[ComponentStats] = None
+
+    # it is set to a `RecordDictTrust` instance by run() if the
+    # `record_dict_trust_key` config option is set (see above:
+    # `tags_output_as_trusted_record_dicts`)
+    _record_dict_trust: Optional[RecordDictTrust] = None
+
+    # it is set by run() to the value of the `record_dict_wire_format`
+    # config option (see above: `tags_output_as_trusted_record_dicts`)
+    _record_dict_wire_format: str = 'json'
+
+    # it is set to an `AdaptivePrefetchController` instance by __init__()
+    # if *adaptive flow control* is enabled (see: `adaptive_flow_control`)
+    _prefetch_controller: Optional[AdaptivePrefetchController] = None
+
+    # during the processing of an input message carrying a trace (see:
+    # `n6lib.stats_helpers.TRACE_HEADER`), it is a list of the entries
+    # of that trace (see: `publish_output()`, `record_trace_latency()`)
+    _current_trace: Optional[list] = None
+
+    # it is set to True by __init__() if the "--n6trace" command
+    # line option has been given (see: `publish_output()`)
+    _starting_traces: bool = False
+
 
     #
     # Instance initialization/configuration
@@ -286,6 +557,41 @@ class LegacyQueuedBase(object):
           (that is needed to perform data recovery from MongoDB...); to
           prevent this method from providing the "--n6recovery" option,
           set the `supports_n6recovery` class attribute to False.
+
+        * *only* if the `single_instance` class attribute is false --
+          the possibility to run (from the command line) the component
+          with the "--n6workers N" command line option; that will cause
+          that the `run_with_optional_workers()` method will fork N
+          worker processes (see the docs of that method);
+
+        * the possibility to run (from the command line) the component
+          with the "--n6stats-file PATH" command line option; that will
+          cause that per-routing-key statistics of message processing
+          and publishing (numbers of messages, events per second, nack
+          rates, p50/p99 processing/publishing times...) will be
+          collected and saved, as JSON, to the specified file -- every
+          `stats_file_interval` seconds and when the component stops
+          (if PATH contains "{pid}", it is replaced with the process id,
+          which is useful when "--n6workers N" is also given);
+
+        * the possibility to run (from the command line) the component
+          with the "--n6trace" command line option; that will cause
+          that a latency trace will be started for each output message
+          that is not derived from an already traced input message
+          (typically, the option is given to collectors; then the
+          subsequent components extend the traces automatically, and
+          the Recorder -- if started with "--n6stats-file PATH" --
+          aggregates the latencies; see: `publish_output()` and
+          `record_trace_latency()`);
+
+        * the possibility to run (from the command line) the component
+          with the "--n6profiling-dir DIR" command line option; that
+          will cause that an on-demand profiler will be installed (see:
+          `n6lib.profiling_helpers.OnDemandProfiler`): then sending
+          SIGUSR1 to the component's process makes it sample its stacks
+          for a while, and sending SIGUSR2 makes it start tracemalloc or
+          (if already started) take a tracemalloc snapshot; the results
+          are written to files in the specified directory.
         """
         arg_parser = N6ArgumentParser()
         arg_parser.add_argument('--n6input-suffix',
@@ -301,6 +607,25 @@ class LegacyQueuedBase(object):
                                     action='store_true',
                                     help=('add the "_recovery" suffix to '
                                           'all AMQP exchange/queue names'))
+        if not cls.single_instance:
+            arg_parser.add_argument('--n6workers',
+                                    metavar='N',
+                                    type=int,
+                                    default=1,
+                                    help=('run N worker processes (forked from '
+                                          'and supervised by the main process)'))
+        arg_parser.add_argument('--n6stats-file',
+                                metavar='PATH',
+                                help=('periodically save message processing '
+                                      'statistics to the specified file'))
+        arg_parser.add_argument('--n6trace',
+                                action='store_true',
+                                help=('start latency tracing of the '
+                                      'published messages'))
+        arg_parser.add_argument('--n6profiling-dir',
+                                metavar='DIR',
+                                help=('enable on-demand (SIGUSR1/SIGUSR2-triggered) '
+                                      'profiling, writing the results to DIR'))
         return arg_parser
 
     def preinit_hook(self):
@@ -370,6 +695,19 @@ class LegacyQueuedBase(object):
         self._conn_params_dict = self.get_connection_params_dict()
         self._amqp_setup_timeout_callback_manager = \
             self._make_timeout_callback_manager('AMQP_SETUP_TIMEOUT')
+        if getattr(self.cmdline_args, 'n6stats_file', None):
+            self._stats = ComponentStats(self.__class__.__qualname__)
+        if self.adaptive_flow_control:
+            self._prefetch_controller = AdaptivePrefetchController(
+                initial_prefetch_count=self.prefetch_count,
+                min_prefetch_count=max(self.min_prefetch_count, self.input_batch_size),
+                max_prefetch_count=self.max_prefetch_count,
+                target_buffering_time=self.prefetch_target_buffering_time)
+        if getattr(self.cmdline_args, 'n6trace', False):
+            self._starting_traces = True
+        if getattr(self.cmdline_args, 'n6profiling_dir', None):
+            OnDemandProfiler(self.cmdline_args.n6profiling_dir,
+                             file_name_prefix=self.__class__.__name__).install()
 
     def clear_amqp_communication_state_attributes(self):
         self._connection = None
@@ -381,6 +719,16 @@ class LegacyQueuedBase(object):
         self._graceful_shutdown_phase = 0
         self._closing = False
         self._consumer_tag = None
+        self._input_batch = []
+        self._input_batch_timeout_id = None
+        self._publish_seq_no = 0
+        self._unconfirmed_publish_seq_nos = {}
+        self._pending_acks = collections.deque()
+        self._publish_nacked_by_broker = False
+        self._publisher_confirms_window_full = False
+        self._consuming_paused = False
+        self._flow_control_timeout_id = None
+        self._connection_blocked = False
         LOGGER.debug('AMQP communication state attributes cleared')
 
 
@@ -560,6 +908,38 @@ class LegacyQueuedBase(object):
         )
         return conn_params_dict
 
+    @classmethod
+    def get_record_dict_trust(cls) -> Optional[RecordDictTrust]:
+        """
+        Get the `RecordDictTrust` object, made with the key from the
+        `record_dict_trust_key` config option (or None if that option
+        is not set).
+        """
+        key = get_record_dict_trust_key(cls.rabbitmq_config_section)
+        if key is None:
+            return None
+        try:
+            return RecordDictTrust(key)
+        except ValueError as exc:
+            raise ConfigError(f'in section {ascii_str(cls.rabbitmq_config_section)}: '
+                              f'record_dict_trust_key: {ascii_str(exc)}') from exc
+
+    @classmethod
+    def get_record_dict_wire_format(cls) -> str:
+        """
+        Get the name of the wire format of the output record dicts (see:
+        `serialize_record_dict()`), from the `record_dict_wire_format`
+        config option.
+        """
+        wire_format = get_record_dict_wire_format(cls.rabbitmq_config_section)
+        if wire_format not in RECORD_DICT_WIRE_FORMATS:
+            raise ConfigError(
+                f'in section {ascii_str(cls.rabbitmq_config_section)}: '
+                f'record_dict_wire_format: unknown (or unavailable) format '
+                f'{wire_format!a} (available ones: '
+                f'{", ".join(map(ascii, sorted(RECORD_DICT_WIRE_FORMATS)))})')
+        return wire_format
+
 
     #
     # AMQP communication
@@ -569,6 +949,8 @@ class LegacyQueuedBase(object):
     def run(self):
         """Connecting to RabbitMQ and start the IOLoop (blocking on it)."""
         self.update_connection_params_dict_before_run(self._conn_params_dict)
+        self._record_dict_trust = self.get_record_dict_trust()
+        self._record_dict_wire_format = self.get_record_dict_wire_format()
         try:
             try:
                 self._connection = self.connect()
@@ -580,6 +962,139 @@ class LegacyQueuedBase(object):
             # important that `self._publishing_generator` is closed
             # *before* the pika IO loop is re-started by `stop()` [sic].
             self._ensure_publishing_generator_closed()
+            self._save_stats_file()
+
+    def run_with_optional_workers(self):
+        """
+        Run the component (typically, called in a script's `main()`).
+
+        If the "--n6workers N" command line option has *not* been given
+        (or N is 1), the `run()` method is invoked; if it raises
+        `KeyboardInterrupt`, `stop()` is invoked and the exception is
+        re-raised.
+
+        If the option has been given with N > 1 (it is available only
+        for components whose `single_instance` attribute is false),
+        then, after invoking the `prepare_for_forking_workers()` hook,
+        N worker processes are forked; each of them does the same as
+        described above, i.e., connects to RabbitMQ and consumes from
+        the (shared) input queue. Thanks to forking, any state already
+        loaded by the component's constructor (configuration, Auth API
+        data, GeoIP databases, etc.) is shared between the processes
+        (in the copy-on-write manner). The main process just supervises
+        the workers: any worker that exits unexpectedly is replaced
+        with a new one (after `worker_restart_delay` seconds). When the
+        main process receives SIGTERM or SIGINT, it passes SIGTERM to
+        all workers (each of them stops as on `KeyboardInterrupt`) and
+        then waits until all of them exit.
+        """
+        workers_num = getattr(self.cmdline_args, 'n6workers', 1)
+        if workers_num < 1:
+            raise ValueError(f'the number of workers must be '
+                             f'a positive integer (got: {workers_num!a})')
+        if workers_num == 1:
+            try:
+                self.run()
+            except KeyboardInterrupt:
+                self.stop()
+                raise
+        else:
+            self._run_worker_pool(workers_num)
+
+    def prepare_for_forking_workers(self):
+        """
+        A hook that can be extended in subclasses.
+
+        It is invoked in the main process just before forking worker
+        processes (see: `run_with_optional_workers()`). Extended
+        implementations can load data that should be shared by the
+        workers, and release any resources that must *not* be shared
+        between processes (such as pooled database connections).
+        """
+
+    def _run_worker_pool(self, workers_num):
+        self.prepare_for_forking_workers()
+        worker_pids = set()
+        stopping = False
+
+        def on_stop_signal(signum, frame):
+            nonlocal stopping
+            if not stopping:
+                stopping = True
+                for pid in worker_pids:
+                    self._kill_worker_if_alive(pid, signal.SIGTERM)
+
+        prev_sigterm_handler = signal.signal(signal.SIGTERM, on_stop_signal)
+        prev_sigint_handler = signal.signal(signal.SIGINT, on_stop_signal)
+        try:
+            LOGGER.info('Starting %d worker processes...', workers_num)
+            while True:
+                while not stopping and len(worker_pids) < workers_num:
+                    worker_pids.add(self._fork_worker())
+                if not worker_pids:
+                    break
+                pid, status = os.wait()
+                if pid not in worker_pids:
+                    continue
+                worker_pids.discard(pid)
+                exit_code = os.waitstatus_to_exitcode(status)
+                if stopping:
+                    LOGGER.info('Worker process (pid: %a) exited with code: %a',
+                                pid, exit_code)
+                else:
+                    LOGGER.error('Worker process (pid: %a) exited unexpectedly with '
+                                 'code: %a (it will be replaced with a new one in %s s)',
+                                 pid, exit_code, self.worker_restart_delay)
+                    time.sleep(self.worker_restart_delay)
+        finally:
+            signal.signal(signal.SIGTERM, prev_sigterm_handler)
+            signal.signal(signal.SIGINT, prev_sigint_handler)
+            for pid in worker_pids:
+                self._kill_worker_if_alive(pid, signal.SIGTERM)
+        LOGGER.info('All worker processes have exited')
+
+    def _fork_worker(self):
+        pid = os.fork()
+        if pid:
+            LOGGER.info('Worker process (pid: %a) started', pid)
+            return pid
+        exit_code = 1
+        try:
+            restart_amqp_logging_after_fork()
+            signal.signal(signal.SIGTERM, self._on_worker_stop_signal)
+            signal.signal(signal.SIGINT, self._on_worker_stop_signal)
+            try:
+                self.run()
+            except KeyboardInterrupt:
+                self.stop()
+            exit_code = 0
+        except SystemExit as exc:
+            exit_code = (0 if exc.code is None
+                         else exc.code if isinstance(exc.code, int)
+                         else 1)
+        except BaseException:
+            LOGGER.critical('Worker process (pid: %a) has crashed!',
+                            os.getpid(), exc_info=True)
+        finally:
+            try:
+                logging.shutdown()
+            finally:
+                os._exit(exit_code)
+
+    @staticmethod
+    def _on_worker_stop_signal(signum, frame):
+        # (any further stop signals are ignored, so that
+        # stop() will not be interrupted)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        raise KeyboardInterrupt
+
+    @staticmethod
+    def _kill_worker_if_alive(pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
 
     def update_connection_params_dict_before_run(self, params_dict):
         """
@@ -618,6 +1133,7 @@ class LegacyQueuedBase(object):
         graceful_shutdown_phase_before = self._graceful_shutdown_phase
         self._graceful_shutdown_phase = 0
         self._closing = True
+        self._discard_input_batch()
         if graceful_shutdown_phase_before <= 2:
             self.stop_consuming()
         self.close_channels()
@@ -640,6 +1156,8 @@ class LegacyQueuedBase(object):
             self.inner_stop()
             return
 
+        if self._input_batch:
+            self._process_input_batch()
         self._graceful_shutdown_phase = 2
         self.stop_consuming()
         self._graceful_shutdown_phase = 3
@@ -694,6 +1212,35 @@ class LegacyQueuedBase(object):
                 self.output_queue is None)
 
 
+    # * Statistics-related stuff:
+
+    def _record_processing_stats(self, routing_key, start_time, outcome):
+        if self._stats is not None or self._prefetch_controller is not None:
+            duration = time.monotonic() - start_time
+            if self._stats is not None:
+                self._stats.record_processing(routing_key, duration, outcome)
+            if self._prefetch_controller is not None:
+                self._prefetch_controller.record_processing(duration)
+
+    def _on_stats_file_interval_expired(self):
+        self._save_stats_file()
+        if not self._closing:
+            self._connection.add_timeout(self.stats_file_interval,
+                                         self._on_stats_file_interval_expired)
+
+    def _save_stats_file(self):
+        if self._stats is None:
+            return
+        try:
+            self._stats.save_report(self.cmdline_args.n6stats_file)
+        except Exception as exc:
+            # (a failure to save statistics should never
+            # break the component's actual work)
+            LOGGER.warning('Could not save statistics to the file %a (%s)',
+                           self.cmdline_args.n6stats_file,
+                           make_exc_ascii_str(exc))
+
+
     # * Connection-related stuff:
 
     def connect(self):
@@ -742,6 +1289,11 @@ class LegacyQueuedBase(object):
         """
         LOGGER.info('Connection opened')
         self._connection.add_on_close_callback(self.on_connection_closed)
+        self._connection.add_on_connection_blocked_callback(self.on_connection_blocked)
+        self._connection.add_on_connection_unblocked_callback(self.on_connection_unblocked)
+        if self._stats is not None:
+            self._connection.add_timeout(self.stats_file_interval,
+                                         self._on_stats_file_interval_expired)
         self.open_channels()
 
     def on_connection_closed(self, connection, reply_code, reply_text):
@@ -762,6 +1314,13 @@ class LegacyQueuedBase(object):
         self._channel_in = None
         self._channel_out = None
         self._consumer_tag = None
+        self._input_batch = []
+        self._input_batch_timeout_id = None
+        self._pending_acks.clear()
+        self._publisher_confirms_window_full = False
+        self._consuming_paused = False
+        self._flow_control_timeout_id = None
+        self._connection_blocked = False
         self.output_ready = False
         if reply_code in (0, 200):
             LOGGER.info('AMQP connection has been closed with code: %s. Reason: %s',
@@ -779,6 +1338,29 @@ class LegacyQueuedBase(object):
 
     # * Channels-related stuff:
 
+    def on_connection_blocked(self, method_frame):
+        """
+        Called by pika when the broker has blocked the connection (see:
+        https://www.rabbitmq.com/docs/connection-blocked), i.e., when
+        it is low on resources and stops reading from publishers.
+
+        Args:
+            `method_frame`: pika.frame.Method (with `Connection.Blocked`).
+        """
+        LOGGER.warning('The AMQP connection has been blocked by the broker '
+                       '(reason: %a)', getattr(method_frame.method, 'reason', None))
+        self._connection_blocked = True
+
+    def on_connection_unblocked(self, method_frame):
+        """
+        Called by pika when the broker has unblocked the connection.
+
+        Args:
+            `method_frame`: pika.frame.Method (with `Connection.Unblocked`).
+        """
+        LOGGER.info('The AMQP connection has been unblocked by the broker')
+        self._connection_blocked = False
+
     def open_channels(self):
         """
         From pika docs (about <channel>.channel():
@@ -853,6 +1435,8 @@ class LegacyQueuedBase(object):
         self._channel_out = channel
         self._channel_out.add_on_close_callback(self.on_channel_closed)
         self._declared_output_exchanges.clear()
+        if self.publisher_confirms:
+            self.enable_publisher_confirms()
         self.setup_output_exchanges()
 
     def on_channel_closed(self, channel, reply_code, reply_text,
@@ -1028,7 +1612,12 @@ class LegacyQueuedBase(object):
         if self._num_queues_bound == len(self.input_queue["binding_keys"]) + 1:
             LOGGER.debug('All queues bound (including the dead-letter queue)')
             LOGGER.debug('Setting prefetch count')
-            self._channel_in.basic_qos(prefetch_count=self.prefetch_count)
+            if self._prefetch_controller is not None:
+                self._channel_in.basic_qos(
+                    prefetch_count=self._prefetch_controller.prefetch_count,
+                    all_channels=True)
+            else:
+                self._channel_in.basic_qos(prefetch_count=self.prefetch_count)
             self.start_consuming()
             self.complete_input_setup()
 
@@ -1047,6 +1636,13 @@ class LegacyQueuedBase(object):
         """
         LOGGER.debug('Issuing consumer related RPC commands')
         self._channel_in.add_on_cancel_callback(self.on_consumer_cancelled)
+        self._basic_consume()
+        if self._prefetch_controller is not None and self._flow_control_timeout_id is None:
+            self._flow_control_timeout_id = self._connection.add_timeout(
+                self.flow_control_interval,
+                self._on_flow_control_interval_expired)
+
+    def _basic_consume(self):
         self._consumer_tag = self._channel_in.basic_consume(
                 self.on_message,
                 self.input_queue["queue_name"],
@@ -1063,7 +1659,12 @@ class LegacyQueuedBase(object):
         Tell RabbitMQ that you would like to stop consuming by sending the
         Basic.Cancel RPC command.
         """
-        if self._channel_in is not None:
+        if self._consuming_paused and self._channel_in is not None:
+            # (the consumer has already been cancelled by the *adaptive
+            # flow control* machinery, so we do what `on_cancelok()` does)
+            self._consuming_paused = False
+            self.close_channel("in")
+        elif self._channel_in is not None:
             LOGGER.debug('Sending a Basic.Cancel RPC command to RabbitMQ')
             self._channel_in.basic_cancel(self.on_cancelok, self._consumer_tag)
         else:
@@ -1106,6 +1707,58 @@ class LegacyQueuedBase(object):
             LOGGER.warning('input channel cannot be closed because it is already None')
             ## XXX: restart or what?
 
+    # * Adaptive flow control:
+
+    def _on_flow_control_interval_expired(self):
+        self._flow_control_timeout_id = None
+        if (self._closing
+              or self._graceful_shutdown_phase
+              or self._channel_in is None
+              or not self._channel_in.is_open):
+            return
+        output_buffer_size = sum(map(len, self._connection.outbound_buffer))
+        if self._consuming_paused:
+            if (output_buffer_size < self.output_buffer_resume_threshold
+                  and not self._publisher_confirms_window_full):
+                self.resume_consuming()
+        elif output_buffer_size > self.output_buffer_pause_threshold:
+            self.pause_consuming(output_buffer_size)
+        else:
+            new_prefetch_count = self._prefetch_controller.get_adjusted_prefetch_count(
+                allow_increase=(output_buffer_size < self.output_buffer_resume_threshold))
+            if new_prefetch_count is not None:
+                LOGGER.info('Adjusting prefetch count to %d', new_prefetch_count)
+                self._channel_in.basic_qos(prefetch_count=new_prefetch_count,
+                                           all_channels=True)
+        self._flow_control_timeout_id = self._connection.add_timeout(
+            self.flow_control_interval,
+            self._on_flow_control_interval_expired)
+
+    def pause_consuming(self, output_buffer_size):
+        """
+        Pause consuming (used by the *adaptive flow control* machinery
+        -- see the `adaptive_flow_control` attribute).
+
+        Note: messages that have already been delivered are still being
+        processed and acknowledged as usual.
+        """
+        LOGGER.warning('Output is backed up (outbound buffer size: %d bytes) '
+                       '-- pausing consuming', output_buffer_size)
+        self._consuming_paused = True
+        self._channel_in.basic_cancel(self._on_consuming_paused, self._consumer_tag)
+
+    def _on_consuming_paused(self, unused_frame):
+        LOGGER.debug('RabbitMQ acknowledged the cancellation of the consumer '
+                     '(consuming paused)')
+
+    def resume_consuming(self):
+        """
+        Resume consuming paused with `pause_consuming()`.
+        """
+        LOGGER.info('Output is no longer backed up -- resuming consuming')
+        self._consuming_paused = False
+        self._basic_consume()
+
     def acknowledge_message(self, delivery_tag):
         """
         From pika docs:
@@ -1119,6 +1772,18 @@ class LegacyQueuedBase(object):
         LOGGER.debug('Acknowledging message %a', delivery_tag)
         self._channel_in.basic_ack(delivery_tag)
 
+    def acknowledge_messages_up_to(self, delivery_tag):
+        """
+        Acknowledge -- with one Basic.Ack RPC method (with the `multiple`
+        flag set) -- all not yet acknowledged message deliveries up to
+        (and including) the one specified by the delivery tag.
+
+        Args:
+            `delivery_tag`: The delivery tag from the Basic.Deliver frame.
+        """
+        LOGGER.debug('Acknowledging messages up to %a', delivery_tag)
+        self._channel_in.basic_ack(delivery_tag, multiple=True)
+
     def nacknowledge_message(self, delivery_tag, reason, requeue=False):
         """
         Dis-acknowledge the message delivery by sending a Nack
@@ -1148,6 +1813,11 @@ class LegacyQueuedBase(object):
             `basic_deliver`: A pika.Spec.Basic.Deliver object.
             `properties`: A pika.Spec.BasicProperties object.
             `body`: The message body.
+
+        Note: if *micro-batched consumption* is enabled (see the
+        `input_batch_size` attribute), the message is not processed
+        immediately but appended to the current batch (see:
+        `input_batch_callback()`).
         """
         # Note: here we coerce `body` to bytes *just in case*; generally,
         # that coercion should not be necessary, as we expect that `pika`
@@ -1163,49 +1833,236 @@ class LegacyQueuedBase(object):
                         delivery_tag,
                         routing_key)
 
+        if self.input_batch_size > 1:
+            self._append_to_input_batch(
+                InputMessage(delivery_tag, routing_key, body, properties))
+            self._handle_graceful_shutdown_phase_if_any()
+            return
+
+        start_time = time.monotonic()
         try:
             LOGGER.debug('Received message #%a routed with key %a)',
                          delivery_tag, routing_key)
             try:
-                self.input_callback(routing_key, body, properties)
+                with self._setting_current_trace(properties):
+                    self.input_callback(routing_key, body, properties)
             except AuthAPICommunicationError as exc:
                 sys.exit(exc)
         except Exception as exc:
             # Note: catching Exception is OK here.  We *do* want to
             # catch any exception, except SystemExit, KeyboardInterrupt etc.
-            event_info_msg = self._get_error_event_info_msg(exc, properties)
-            LOGGER.error('Exception occured while processing message #%a%s '
-                         '[%s: %a]. The message will be nack-ed...',
-                         delivery_tag,
-                         (' ({0})'.format(event_info_msg) if event_info_msg
-                          else ''),
-                         type(exc).__name__,
-                         getattr(exc, 'args', exc),
-                         exc_info=True)
-            LOGGER.debug('Metadata of message '  ## FIXME?: maybe it should be INFO?
-                         '#%a:\nrouting key: %a\nproperties: %a',
-                         delivery_tag, routing_key, properties)
-            LOGGER.debug('Body of message #%a:\n%a', delivery_tag, body)
+            self._record_processing_stats(routing_key, start_time, 'nacked')
+            self._log_message_processing_error(exc, delivery_tag, routing_key, body, properties)
             self.nacknowledge_message(delivery_tag, '{0!a} in {1!a}'.format(type(exc), self))
         except BaseException as exc:
             # we do want to nack and requeue event on SystemExit, KeyboardInterrupt etc.
+            self._record_processing_stats(routing_key, start_time, 'requeued')
             LOGGER.info('%a occured while processing message #%a. '
                         'The message will be requeued...',
                         exc,
                         delivery_tag)
-            if self._channel_in is not None and self._channel_in.is_open:
+            self._requeue_messages_if_possible([delivery_tag], exc)
+            raise
+        else:
+            self._record_processing_stats(routing_key, start_time, 'acked')
+            self._acknowledge_when_confirmed(delivery_tag, multiple=False)
+        self._handle_graceful_shutdown_phase_if_any()
+
+    def _log_message_processing_error(self, exc, delivery_tag, routing_key, body, properties):
+        event_info_msg = self._get_error_event_info_msg(exc, properties)
+        LOGGER.error('Exception occured while processing message #%a%s '
+                     '[%s: %a]. The message will be nack-ed...',
+                     delivery_tag,
+                     (' ({0})'.format(event_info_msg) if event_info_msg
+                      else ''),
+                     type(exc).__name__,
+                     getattr(exc, 'args', exc),
+                     exc_info=exc)
+        LOGGER.debug('Metadata of message '  ## FIXME?: maybe it should be INFO?
+                     '#%a:\nrouting key: %a\nproperties: %a',
+                     delivery_tag, routing_key, properties)
+        LOGGER.debug('Body of message #%a:\n%a', delivery_tag, body)
+
+    def _requeue_messages_if_possible(self, delivery_tags, exc):
+        if self._channel_in is not None and self._channel_in.is_open:
+            for delivery_tag in delivery_tags:
                 self.nacknowledge_message(delivery_tag, f'{exc!a} in {self!a}',
                                           requeue=True)
-            else:
-                LOGGER.error('Cannot requeue message #%a, because '
-                             'input channel (%a) is not open!',
-                             delivery_tag,
-                             self._channel_in)
-            raise
         else:
-            self.acknowledge_message(delivery_tag)
+            LOGGER.error('Cannot requeue message(s) %s, because '
+                         'input channel (%a) is not open!',
+                         ', '.join(f'#{tag!a}' for tag in delivery_tags),
+                         self._channel_in)
+
+    # * Micro-batched consumption:
+
+    def _append_to_input_batch(self, message):
+        LOGGER.debug('Received message #%a routed with key %a) '
+                     '-- appending it to the current input batch',
+                     message.delivery_tag, message.routing_key)
+        self._input_batch.append(message)
+        if (len(self._input_batch) >= self.input_batch_size
+              or self._graceful_shutdown_phase):
+            self._process_input_batch()
+        elif self._input_batch_timeout_id is None:
+            self._input_batch_timeout_id = self._connection.add_timeout(
+                self.input_batch_max_wait,
+                self._on_input_batch_max_wait_expired)
+
+    def _on_input_batch_max_wait_expired(self):
+        self._input_batch_timeout_id = None
+        if not self._input_batch:
+            return
+        if self._channel_in is None or not self._channel_in.is_open:
+            self._discard_input_batch()
+            return
+        self._process_input_batch()
         self._handle_graceful_shutdown_phase_if_any()
 
+    def _discard_input_batch(self):
+        if self._input_batch_timeout_id is not None:
+            self._connection.remove_timeout(self._input_batch_timeout_id)
+            self._input_batch_timeout_id = None
+        if self._input_batch:
+            LOGGER.info('Discarding %d not yet processed messages of the current '
+                        'input batch (they will be redelivered by the broker)',
+                        len(self._input_batch))
+            self._input_batch = []
+
+    def _process_input_batch(self):
+        if self._input_batch_timeout_id is not None:
+            self._connection.remove_timeout(self._input_batch_timeout_id)
+            self._input_batch_timeout_id = None
+        batch = self._input_batch
+        self._input_batch = []
+        LOGGER.debug('Processing an input batch of %d messages', len(batch))
+        start_time = time.monotonic()
+        try:
+            try:
+                failures = self.input_batch_callback(batch)
+            except AuthAPICommunicationError as exc:
+                sys.exit(exc)
+        except InputBatchInterrupted as interrupted:
+            self._settle_interrupted_input_batch(batch, start_time, interrupted)
+            if isinstance(interrupted.cause, AuthAPICommunicationError):
+                sys.exit(interrupted.cause)
+            raise interrupted.cause from None
+        except Exception as exc:
+            # Note: catching Exception is OK here (see `on_message()`).
+            # The whole batch failed, so each of its messages is nack-ed.
+            failures = dict.fromkeys((message.delivery_tag for message in batch), exc)
+        except BaseException as exc:
+            LOGGER.info('%a occured while processing a batch of %d messages. '
+                        'The messages will be requeued...',
+                        exc,
+                        len(batch))
+            self._record_batch_processing_stats(batch, start_time, {}, 'requeued')
+            self._requeue_messages_if_possible(
+                [message.delivery_tag for message in batch],
+                exc)
+            raise
+        self._record_batch_processing_stats(batch, start_time, failures)
+        self._settle_input_batch(batch, failures)
+
+    def _settle_interrupted_input_batch(self, batch, start_time, interrupted):
+        processed = batch[:interrupted.processed_count]
+        remaining = batch[interrupted.processed_count:]
+        LOGGER.info('%a occured while processing a batch of %d messages '
+                    '(%d of them have already been processed). The '
+                    'remaining messages will be requeued...',
+                    interrupted.cause,
+                    len(batch),
+                    len(processed))
+        if processed:
+            self._record_batch_processing_stats(processed, start_time, interrupted.failures)
+            self._settle_input_batch(processed, interrupted.failures)
+        if remaining:
+            self._record_batch_processing_stats(remaining, start_time, {}, 'requeued')
+            self._requeue_messages_if_possible(
+                [message.delivery_tag for message in remaining],
+                interrupted.cause)
+
+    def _settle_input_batch(self, batch, failures):
+        last_succeeded_delivery_tag = None
+        for message in batch:
+            exc = failures.get(message.delivery_tag)
+            if exc is None:
+                last_succeeded_delivery_tag = message.delivery_tag
+            else:
+                self._log_message_processing_error(exc, *message)
+                self.nacknowledge_message(message.delivery_tag,
+                                          '{0!a} in {1!a}'.format(type(exc), self))
+        if last_succeeded_delivery_tag is not None:
+            # (the failed messages have already been nack-ed, so
+            # here all the other ones are acknowledged at once)
+            self._acknowledge_when_confirmed(last_succeeded_delivery_tag, multiple=True)
+
+    def _record_batch_processing_stats(self, batch, start_time, failures,
+                                       default_outcome='acked'):
+        if self._stats is not None or self._prefetch_controller is not None:
+            # (the processing time of a batch is spread evenly
+            # across all its messages)
+            duration_per_message = (time.monotonic() - start_time) / len(batch)
+            for message in batch:
+                if self._stats is not None:
+                    self._stats.record_processing(
+                        message.routing_key,
+                        duration_per_message,
+                        ('nacked' if message.delivery_tag in failures
+                         else default_outcome))
+                if self._prefetch_controller is not None:
+                    self._prefetch_controller.record_processing(duration_per_message)
+
+    def input_batch_callback(self, batch: list[InputMessage]) -> dict[int, Exception]:
+        """
+        Process a batch of input messages (called only if *micro-batched
+        consumption* is enabled -- see the `input_batch_size` attribute).
+
+        Args:
+            `batch`:
+                A list of `InputMessage` named tuples (each consisting
+                of: `delivery_tag`, `routing_key`, `body`, `properties`),
+                in the order of delivery.
+
+        Returns:
+            A dict that maps delivery tags of those messages whose
+            processing failed to the respective exceptions. Those
+            messages will be nack-ed, whereas all the other messages
+            of the batch will be acknowledged (at once).
+
+        If this method raises an exception (an instance of `Exception`),
+        processing of all messages of the batch is considered failed.
+        If it raises `InputBatchInterrupted`, the messages processed
+        before the interruption are acknowledged (or nack-ed, if failed),
+        and the remaining ones are requeued (see the docs of that
+        exception class); any other `BaseException` (e.g., `SystemExit`)
+        causes that all messages of the batch are requeued.
+
+        The default implementation just calls `input_callback()` for
+        each message -- so that components can adopt *micro-batched
+        consumption* without any changes, and then (if needed) extend
+        or override this method to process batches more efficiently.
+        If `input_callback()` raises `AuthAPICommunicationError` or
+        a `BaseException` which is not an `Exception` (e.g.,
+        `KeyboardInterrupt`), `InputBatchInterrupted` is raised (so
+        that the output of the already processed messages is not
+        duplicated by redelivering them).
+        """
+        failures = {}
+        for i, message in enumerate(batch):
+            try:
+                with self._setting_current_trace(message.properties):
+                    self.input_callback(message.routing_key,
+                                        message.body,
+                                        message.properties)
+            except AuthAPICommunicationError as exc:
+                raise InputBatchInterrupted(exc, i, failures) from exc
+            except Exception as exc:
+                failures[message.delivery_tag] = exc
+            except BaseException as exc:
+                raise InputBatchInterrupted(exc, i, failures) from exc
+        return failures
+
     def input_callback(self,
                        routing_key: str,
                        body: bytes,
@@ -1225,6 +2082,76 @@ class LegacyQueuedBase(object):
         """
         raise NotImplementedError
 
+    @contextlib.contextmanager
+    def _setting_current_trace(self, properties):
+        headers = getattr(properties, 'headers', None)
+        if headers and TRACE_HEADER in headers:
+            self._current_trace = list(headers[TRACE_HEADER])
+        try:
+            yield
+        finally:
+            self._current_trace = None
+
+    def record_trace_latency(self, source: str) -> None:
+        """
+        Record the latencies of the hops of the currently processed
+        input message's trace (if any), finished with this component's
+        entry (to be called in `input_callback()` -- typically, only by
+        the final component of the pipeline, i.e., the Recorder).
+
+        Args:
+            `source`:
+                The source the message concerns; the latencies are
+                aggregated per source.
+
+        The latencies are recorded only if the component has been
+        started with the "--n6stats-file PATH" command line option
+        (the latency histograms are then included in the saved
+        statistics).
+        """
+        if self._stats is not None and self._current_trace:
+            self._stats.record_trace(source, self._current_trace, self.__class__.__name__)
+
+    def serialize_record_dict(self, record_dict: RecordDict) -> bytes:
+        """
+        Serialize the given record dict to be published as an output
+        message body -- to JSON (by default) or to MessagePack (if the
+        `record_dict_wire_format` config option is set to `msgpack`).
+
+        The content type is then set by `publish_output()` -- provided
+        that `tags_output_as_trusted_record_dicts` is true.
+        """
+        if self._record_dict_wire_format == 'msgpack':
+            return record_dict.get_ready_msgpack()
+        return record_dict.get_ready_json().encode('utf-8')
+
+    def get_record_dict_from_json_kwargs(self, properties: pika.BasicProperties) -> KwargsDict:
+        """
+        Get the keyword arguments to be passed to `RecordDict.from_json()`
+        (or `BLRecordDict.from_json()`...), so that:
+
+        * the body is deserialized according to the `content_type`
+          property of the input message (see: `serialize_record_dict()`);
+
+        * the data are trusted -- i.e., not re-adjusted -- if the input
+          message has a valid *trust tag* (see:
+          `tags_output_as_trusted_record_dicts`).
+
+        To be used in `input_callback()`, e.g.:
+
+            record_dict = RecordDict.from_json(
+                body, **self.get_record_dict_from_json_kwargs(properties))
+        """
+        kwargs = {}
+        content_type = getattr(properties, 'content_type', None)
+        if content_type:
+            kwargs['content_type'] = content_type
+        if self._record_dict_trust is not None:
+            headers = getattr(properties, 'headers', None) or {}
+            kwargs['trust'] = self._record_dict_trust
+            kwargs['trust_tag'] = headers.get(TRUST_TAG_HEADER)
+        return kwargs
+
     @staticmethod
     @contextlib.contextmanager
     def setting_error_event_info(rid_or_record_dict):
@@ -1361,6 +2288,20 @@ class LegacyQueuedBase(object):
                 The exchange name.  If omitted, the 'exchange' value of
                 the first item of the `output_queue` instance attribute
                 will be used.
+
+        If this method is called during the processing of an input
+        message carrying a trace (see: `n6lib.stats_helpers.TRACE_HEADER`),
+        the trace -- extended with this component's entry -- is added to
+        the headers of the output message (unless `prop_kwargs` already
+        contain that header). Otherwise, if the component has been
+        started with the "--n6trace" command line option, a new trace
+        (consisting only of this component's entry) is added.
+
+        If `tags_output_as_trusted_record_dicts` is true (and a trust
+        key is configured), the *trust tag* of the body is added to the
+        headers (see: `n6lib.record_dict.TRUST_TAG_HEADER`). Also, if
+        that attribute is true and a binary wire format is configured,
+        the `content_type` property is set (see: `serialize_record_dict()`).
         """
         body = as_bytes(body, encode_error_handling='strict')
 
@@ -1381,16 +2322,40 @@ class LegacyQueuedBase(object):
         kwargs_for_properties = self.basic_prop_kwargs.copy()
         if prop_kwargs is not None:
             kwargs_for_properties.update(prop_kwargs)
+        trace = self._current_trace
+        if trace is None and self._starting_traces:
+            trace = []
+        if trace is not None:
+            headers = dict(kwargs_for_properties.get('headers') or {})
+            if TRACE_HEADER not in headers:
+                headers[TRACE_HEADER] = trace + [make_trace_entry(self.__class__.__name__)]
+            kwargs_for_properties['headers'] = headers
+        if self.tags_output_as_trusted_record_dicts and self._record_dict_trust is not None:
+            headers = dict(kwargs_for_properties.get('headers') or {})
+            headers[TRUST_TAG_HEADER] = self._record_dict_trust.make_tag(body)
+            kwargs_for_properties['headers'] = headers
+        if self.tags_output_as_trusted_record_dicts:
+            content_type = RECORD_DICT_WIRE_FORMATS[self._record_dict_wire_format]
+            if content_type is not None:
+                kwargs_for_properties['content_type'] = content_type
         if 'headers' in kwargs_for_properties and (
               not kwargs_for_properties['headers']):
             # delete empty `headers` dict
             del kwargs_for_properties['headers']
         properties = pika.BasicProperties(**kwargs_for_properties)
 
+        start_time = time.monotonic()
         self.basic_publish(exchange=exchange,
                            routing_key=routing_key,
                            body=body,
                            properties=properties)
+        if self._stats is not None:
+            self._stats.record_publishing(routing_key, time.monotonic() - start_time)
+        if self.publisher_confirms:
+            self._publish_seq_no += 1
+            self._unconfirmed_publish_seq_nos[self._publish_seq_no] = None
+            if len(self._unconfirmed_publish_seq_nos) >= self.publisher_confirms_window:
+                self._pause_consuming_while_confirms_window_full()
 
         # basic_publish() might trigger the on_connection_closed() callback
         if self._closing or not self.output_ready:
@@ -1425,6 +2390,141 @@ class LegacyQueuedBase(object):
                                         properties=properties)
 
 
+    # * Publisher-confirms-related stuff:
+
+    def enable_publisher_confirms(self):
+        """
+        Put the output channel into the *publisher confirms* mode (by
+        issuing the Confirm.Select RPC command), registering the
+        on_delivery_confirmation() method as the confirmation callback.
+
+        Called automatically when the output channel is opened -- if
+        the `publisher_confirms` attribute is true.
+        """
+        LOGGER.debug('Enabling publisher confirms')
+        self._publish_seq_no = 0
+        self._unconfirmed_publish_seq_nos.clear()
+        self._publisher_confirms_window_full = False
+        self._channel_out.confirm_delivery(self.on_delivery_confirmation)
+
+    def on_delivery_confirmation(self, method_frame):
+        """
+        Invoked by pika when RabbitMQ confirms (with Basic.Ack) or
+        rejects (with Basic.Nack) one or more published messages.
+
+        Args:
+            `method_frame`: The Basic.Ack or Basic.Nack frame.
+        """
+        method = method_frame.method
+        confirmed_seq_nos = self._pop_unconfirmed_publish_seq_nos(method.delivery_tag,
+                                                                  method.multiple)
+        if isinstance(method, pika.spec.Basic.Nack):
+            LOGGER.warning('RabbitMQ nack-ed published message(s) up to #%a (multiple: %a)',
+                           method.delivery_tag, method.multiple)
+            self._publish_nacked_by_broker = True
+            self._mark_pending_acks_as_publish_nacked(confirmed_seq_nos)
+        self._release_confirmed_acks()
+        if (self._publisher_confirms_window_full
+              and len(self._unconfirmed_publish_seq_nos) <= self.publisher_confirms_window // 2):
+            self._resume_consuming_as_confirms_window_freed()
+
+    def _pause_consuming_while_confirms_window_full(self):
+        if self._publisher_confirms_window_full:
+            return
+        self._publisher_confirms_window_full = True
+        if (self._consumer_tag is None
+              or self._consuming_paused
+              or self._closing
+              or self._graceful_shutdown_phase
+              or self._channel_in is None
+              or not self._channel_in.is_open):
+            return
+        LOGGER.warning('%d published messages have not been confirmed yet '
+                       '(publisher confirms window is full) -- pausing consuming',
+                       len(self._unconfirmed_publish_seq_nos))
+        self._consuming_paused = True
+        self._channel_in.basic_cancel(self._on_consuming_paused, self._consumer_tag)
+
+    def _resume_consuming_as_confirms_window_freed(self):
+        self._publisher_confirms_window_full = False
+        if (not self._consuming_paused
+              or self._closing
+              or self._graceful_shutdown_phase
+              or self._channel_in is None
+              or not self._channel_in.is_open):
+            return
+        if (self._prefetch_controller is not None
+              and (sum(map(len, self._connection.outbound_buffer))
+                   >= self.output_buffer_resume_threshold)):
+            # (still paused by the *adaptive flow control* machinery,
+            # which will resume consuming when the output is no longer
+            # backed up)
+            return
+        LOGGER.info('Publisher confirms window is no longer full -- resuming consuming')
+        self._consuming_paused = False
+        self._basic_consume()
+
+    def _pop_unconfirmed_publish_seq_nos(self, seq_no, multiple):
+        unconfirmed = self._unconfirmed_publish_seq_nos
+        if multiple:
+            popped = []
+            for unconfirmed_seq_no in unconfirmed:
+                if unconfirmed_seq_no > seq_no:
+                    break
+                popped.append(unconfirmed_seq_no)
+            for unconfirmed_seq_no in popped:
+                del unconfirmed[unconfirmed_seq_no]
+            return popped
+        if seq_no in unconfirmed:
+            del unconfirmed[seq_no]
+            return [seq_no]
+        return []
+
+    def _mark_pending_acks_as_publish_nacked(self, nacked_seq_nos):
+        pending_acks = iter(self._pending_acks)
+        pending = next(pending_acks, None)
+        for seq_no in sorted(nacked_seq_nos):
+            while pending is not None and pending.last_publish_seq_no < seq_no:
+                pending = next(pending_acks, None)
+            if pending is None:
+                LOGGER.warning('Could not find the input message related to '
+                               'the nack-ed published message #%a', seq_no)
+                break
+            pending.publish_nacked = True
+
+    def _acknowledge_when_confirmed(self, delivery_tag, multiple):
+        if not self.publisher_confirms:
+            if multiple:
+                self.acknowledge_messages_up_to(delivery_tag)
+            else:
+                self.acknowledge_message(delivery_tag)
+            return
+        self._pending_acks.append(_PendingAck(delivery_tag, multiple, self._publish_seq_no))
+        self._release_confirmed_acks()
+
+    def _release_confirmed_acks(self):
+        # Note: pending acks are released strictly in the order of
+        # delivery (that is important when some of them are *multiple*).
+        oldest_unconfirmed_seq_no = next(iter(self._unconfirmed_publish_seq_nos), None)
+        while self._pending_acks:
+            pending = self._pending_acks[0]
+            if (oldest_unconfirmed_seq_no is not None
+                  and oldest_unconfirmed_seq_no <= pending.last_publish_seq_no):
+                break
+            self._pending_acks.popleft()
+            if pending.publish_nacked:
+                LOGGER.warning('Requeueing message(s) up to #%a (multiple: %a), as some '
+                               'related published message(s) were nack-ed by RabbitMQ',
+                               pending.delivery_tag, pending.multiple)
+                self._channel_in.basic_nack(pending.delivery_tag,
+                                            multiple=pending.multiple,
+                                            requeue=True)
+            elif pending.multiple:
+                self.acknowledge_messages_up_to(pending.delivery_tag)
+            else:
+                self.acknowledge_message(pending.delivery_tag)
+
+
     #
     # *Iterative publishing* mechanism
 
@@ -1458,6 +2558,32 @@ class LegacyQueuedBase(object):
     # tenth of a second) should be appropriate in most cases.
     iterative_publishing_schedule_next_delay = 0.1
 
+    # If true, the *iterative publishing* is *backpressure-aware*, i.e.:
+    # (1) while the broker keeps the connection *blocked* (see:
+    # `on_connection_blocked()`), no further items are taken from
+    # `publish_iteratively()`; (2) the pika connection's outbound buffer
+    # is flushed whenever its size reaches the (much smaller) value of
+    # `iterative_publishing_backpressure_buffer_size_threshold`; (3) the
+    # delay mentioned above is adaptive: after each moment given to the
+    # IO loop while waiting for the broker (for the buffer to be flushed,
+    # for publisher confirms -- see `publisher_confirms_window` -- or
+    # for the connection to be unblocked) the delay is doubled (up to
+    # `iterative_publishing_schedule_next_delay`), and after any other
+    # one it is reset to `iterative_publishing_min_schedule_next_delay`
+    # -- so that data are published as fast as the broker accepts them,
+    # without building up a large outbound buffer.
+    iterative_publishing_backpressure_aware: bool = False
+    iterative_publishing_backpressure_buffer_size_threshold: int = 10 ** 6
+    iterative_publishing_min_schedule_next_delay: float = 0.0
+
+    # (the current delay -- relevant only if the *iterative publishing*
+    # is *backpressure-aware*, otherwise it is always None)
+    _publishing_iteration_delay: Optional[float] = None
+
+    # (an internal marker yielded by the *iterative publishing* machinery
+    # when it waits for the broker -- see `_next_publishing_iteration()`)
+    _WAITING_FOR_BROKER = '_WAITING_FOR_BROKER'
+
     # These two attributes can be used in subclasses to customize
     # exception handling by the *iterative publishing* machinery
     # -- see:
@@ -1498,7 +2624,13 @@ class LegacyQueuedBase(object):
           been processed and published successfully (to learn more --
           read the paragraphs of the `publish_iteratively()` docstring
           about yielding `self.FLUSH_OUT` and flushing the outbound
-          buffer...).
+          buffer...);
+
+        * if `iterative_publishing_backpressure_aware` is set to true
+          -- to publish data as fast as the broker accepts them (taking
+          into account its *connection blocked* notifications and, if
+          `publisher_confirms` is true, its confirms), see the comment
+          above that attribute.
 
         ***
 
@@ -1545,6 +2677,10 @@ class LegacyQueuedBase(object):
             # input traffic is high...)
             raise NotImplementedError('*iterative publishing* cannot be used '
                                       'when `input_queue` is not None')
+        if self.iterative_publishing_backpressure_aware:
+            self._publishing_iteration_delay = min(
+                self.iterative_publishing_min_schedule_next_delay,
+                self.iterative_publishing_schedule_next_delay)
         self._publishing_generator = self._do_publish_iteratively()
         self._schedule_next(self._next_publishing_iteration)
 
@@ -1638,10 +2774,10 @@ class LegacyQueuedBase(object):
         operation have been sent out (from the point of view of the AMQP
         connection's output socket) that does *not* necessarily mean
         that all those data have arrived at the AMQP broker and been
-        safely stored or handled there. (To ensure that, the mechanism
-        of RabbitMQ delivery confirmations would have to be used...
-        Maybe we will implement its use in the future, but for now we
-        must cope without it.)
+        safely stored or handled there -- *unless* the `publisher_confirms`
+        attribute is true; then a *flush out* operation also waits until
+        all data published before it have been confirmed by the broker
+        (and, if any of them have been nack-ed, an error is raised).
 
         Note that yielding `self.FLUSH_OUT` at the end of the body of
         the `publish_iteratively()` implementation is *not necessary*
@@ -1867,9 +3003,15 @@ class LegacyQueuedBase(object):
     def _do_publish_iteratively(self):
         outbound_buffer = self._connection.outbound_buffer
         assert isinstance(outbound_buffer, collections.deque)
-        outbound_buffer_size_threshold = self.iterative_publishing_outbound_buffer_size_threshold
+        outbound_buffer_size_threshold = (
+            self.iterative_publishing_backpressure_buffer_size_threshold
+            if self.iterative_publishing_backpressure_aware
+            else self.iterative_publishing_outbound_buffer_size_threshold)
         yield_time_interval_threshold = self._get_yield_time_interval_threshold()
         yielding_allowed = True
+        # (any broker nacks concerning earlier publishes, e.g., those
+        # from message consumption, are irrelevant to this run)
+        self._publish_nacked_by_broker = False
         publishing_impl = self.publish_iteratively()
         publishing_impl_generator = (
             self._publishing_impl_generator_from_awaitable(publishing_impl)
@@ -1885,11 +3027,21 @@ class LegacyQueuedBase(object):
                     if marker == self.FLUSH_OUT or (sum(map(bytes.__len__, outbound_buffer))
                                                     >= outbound_buffer_size_threshold):
                         yield from self._iter_until_buffer_flushed(outbound_buffer)
+                        if marker == self.FLUSH_OUT:
+                            yield from self._iter_until_publishes_confirmed()
                         # Once the buffer is empty, let's *yield* one more time
                         # unconditionally -- to make it slightly more probable
                         # that the sent data have actually left the machine.
                         yield
                         yield_time = time.time()
+                    elif (self.publisher_confirms and len(self._unconfirmed_publish_seq_nos)
+                                                      >= self.publisher_confirms_window):
+                        yield from self._iter_until_publishes_confirmed(
+                            max_unconfirmed=self.publisher_confirms_window - 1)
+                        yield_time = time.time()
+                    elif self.iterative_publishing_backpressure_aware and self._connection_blocked:
+                        yield from self._iter_until_connection_unblocked()
+                        yield_time = time.time()
                     elif time.time() - yield_time >= yield_time_interval_threshold:
                         yield
                         yield_time = time.time()
@@ -1903,6 +3055,7 @@ class LegacyQueuedBase(object):
                 finally:
                     if yielding_allowed:
                         yield from self._iter_until_buffer_flushed(outbound_buffer)
+                        yield from self._iter_until_publishes_confirmed()
                         # Once the buffer is empty, let's *yield* one more time
                         # unconditionally -- to make it slightly more probable
                         # that the sent data have actually left the machine.
@@ -1918,6 +3071,11 @@ class LegacyQueuedBase(object):
                 "is still *not* empty (i.e., has not been flushed) -- "
                 "that means some data which were to be published have "
                 "not been (and, probably, will not be) actually sent!")
+        if self.publisher_confirms and self._unconfirmed_publish_seq_nos:
+            raise n6AMQPCommunicationError(
+                "the publishing generator was just to be closed cleanly "
+                "*but* {} published message(s) have not been confirmed "
+                "by the broker".format(len(self._unconfirmed_publish_seq_nos)))
 
     def _get_yield_time_interval_threshold(self):
         """
@@ -1966,7 +3124,30 @@ class LegacyQueuedBase(object):
                 LOGGER.debug("OK, pika's outbound buffer is empty")
                 break
             LOGGER.debug("pika's outbound buffer is not empty yet...")
-            yield
+            yield self._WAITING_FOR_BROKER
+
+    def _iter_until_publishes_confirmed(self, max_unconfirmed=0):
+        if not self.publisher_confirms:
+            return
+        while True:
+            if self._publish_nacked_by_broker:
+                # (the flag concerns only the current publishing run)
+                self._publish_nacked_by_broker = False
+                raise n6AMQPCommunicationError(
+                    "some published messages have been nack-ed by the "
+                    "broker -- that means they have not been (and will "
+                    "not be) delivered!")
+            if len(self._unconfirmed_publish_seq_nos) <= max_unconfirmed:
+                LOGGER.debug("OK, no more than %d published messages are "
+                             "unconfirmed", max_unconfirmed)
+                break
+            LOGGER.debug("waiting for publisher confirms...")
+            yield self._WAITING_FOR_BROKER
+
+    def _iter_until_connection_unblocked(self):
+        while self._connection_blocked:
+            LOGGER.debug("waiting for the connection to be unblocked...")
+            yield self._WAITING_FOR_BROKER
 
     def _is_buffer_empty(self, outbound_buffer):
         if self._connection.outbound_buffer is not outbound_buffer:
@@ -1989,12 +3170,26 @@ class LegacyQueuedBase(object):
             LOGGER.warning('%a is being closed so publishing is not continued', self)
             return
         try:
-            next(self._publishing_generator)
+            marker = next(self._publishing_generator)
         except StopIteration:
             self._schedule_next(self.inner_stop)
         else:
+            if self._publishing_iteration_delay is not None:
+                self._adjust_publishing_iteration_delay(
+                    waiting=(marker == self._WAITING_FOR_BROKER))
             self._schedule_next(self._next_publishing_iteration)
 
+    def _adjust_publishing_iteration_delay(self, waiting):
+        max_delay = self.iterative_publishing_schedule_next_delay
+        if waiting:
+            self._publishing_iteration_delay = min(
+                max(2 * self._publishing_iteration_delay, 0.001),
+                max_delay)
+        else:
+            self._publishing_iteration_delay = min(
+                self.iterative_publishing_min_schedule_next_delay,
+                max_delay)
+
     def _schedule_next(self, callback):
         if self._closing:
             LOGGER.warning('%a is being closed so %a will *not* be scheduled', self, callback)
@@ -2007,5 +3202,7 @@ class LegacyQueuedBase(object):
         def callback_with_error_handling():
             callback()
 
-        self._connection.add_timeout(self.iterative_publishing_schedule_next_delay,
-                                     callback_with_error_handling)
+        delay = (self._publishing_iteration_delay
+                 if self._publishing_iteration_delay is not None
+                 else self.iterative_publishing_schedule_next_delay)
+        self._connection.add_timeout(delay, callback_with_error_handling)
@@ -0,0 +1,12 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+Benchmarks of the *n6* data pipeline components.
+
+The benchmarks run the real component classes in one process, with the
+external services (RabbitMQ, the Auth DB, the Event DB, DNS) replaced
+with in-process stand-ins (see: `n6datapipeline.benchmarks.stand_ins`),
+and save their results as JSON documents (see:
+`n6lib.benchmark_helpers`), so that results obtained for different
+commits can be compared.
+"""
@@ -0,0 +1,360 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+The Enricher throughput benchmark.
+
+Deterministically generated events -- a mix of ones with URLs (with
+FQDNs or IPs in them), ones with just FQDNs and ones with addresses,
+the FQDNs and IPs being drawn from limited pools (so that, as with
+real feeds, the same values recur) -- are delivered to the real
+`n6datapipeline.enrich.Enricher` (connected with in-memory stand-ins
+for AMQP channels -- see: `n6datapipeline.benchmarks.stand_ins`).
+DNS is replaced with `StubDNSResolver` (its latency can be set with
+the `--dns-latency` option), and GeoIP lookups are made against small
+*MaxMind DB* files, generated for each run (see: `stand_ins.\
+write_geoip_database()`; the number of networks in them can be set
+with the `--geoip-networks` option).
+
+The `[enrich]` config options which influence the performance --
+`input_batch_size`, `dns_concurrency`, `dns_cache_size`,
+`geoip_prefix_cache_size` and `geoip_mmap` -- can be set with the
+respective command line options (so that, e.g., the effects of caching
+and batching can be quantified).
+
+The results -- events per second, the number of DNS queries made, the
+stats of the Enricher's caches and the *per-phase* split of the time:
+`url_parsing` (extracting hostnames/IPs from URLs), `resolving` (DNS),
+`asn_lookups` and `cc_lookups` (GeoIP), and `other` (the rest: JSON
+deserialization/serialization, record dict operations, etc.) -- are
+printed (or saved to the specified file) as a JSON document (see:
+`n6lib.benchmark_helpers.make_results_document()`).
+
+Example commands:
+
+    n6benchmark_enricher --events 20000 --dns-latency 0.001
+    n6benchmark_enricher --events 20000 --dns-latency 0.001 \\
+        --input-batch-size 20 --dns-concurrency 10 --dns-cache-size 10000 \\
+        --geoip-prefix-cache-size 10000 --output results.json
+"""
+
+import argparse
+import contextlib
+import functools
+import ipaddress
+import logging
+import os.path
+import random
+import shutil
+import tempfile
+from collections.abc import Iterator
+
+import pika
+
+from n6datapipeline.base import LegacyQueuedBase
+from n6datapipeline.benchmarks.pipeline import (
+    PipelineStage,
+    make_config,
+    make_stages,
+)
+from n6datapipeline.benchmarks.stand_ins import (
+    PublishedMessage,
+    StubDNSResolver,
+    write_geoip_database,
+)
+from n6lib.benchmark_helpers import (
+    Measurement,
+    make_results_document,
+    save_results_document,
+)
+from n6lib.common_helpers import ipv4_to_str
+from n6lib.record_dict import RecordDict
+
+
+ASN_DATABASE_FILENAME = 'benchmark-ASN.mmdb'
+CITY_DATABASE_FILENAME = 'benchmark-City.mmdb'
+
+PHASES = ('url_parsing', 'resolving', 'asn_lookups', 'cc_lookups')
+
+_COUNTRY_CODES = ['PL', 'US', 'DE', 'CN', 'RU', 'FR', 'NL', 'GB', 'BR', 'IN']
+_BASE_DOMAINS = ['example.com', 'example.pl', 'example.net', 'test.org']
+
+
+#
+# Input data
+
+def make_geoip_databases(directory: str, rnd: random.Random, network_count: int) -> None:
+    """
+    Generate the ASN and City GeoIP databases -- each covering (with
+    some gaps) the whole IPv4 space with `network_count` networks of
+    various sizes.
+    """
+    networks = [ipaddress.IPv4Network('0.0.0.0/1'), ipaddress.IPv4Network('128.0.0.0/1')]
+    while len(networks) < network_count:
+        # (splitting a randomly chosen network into halves)
+        network = networks.pop(rnd.randrange(len(networks)))
+        if network.prefixlen >= 28:
+            networks.append(network)
+            continue
+        networks.extend(network.subnets())
+    # (about 5% of networks are not present in the databases)
+    networks = [network for network in networks if rnd.random() >= 0.05]
+    write_geoip_database(
+        os.path.join(directory, ASN_DATABASE_FILENAME),
+        'GeoLite2-ASN',
+        {str(network): {'autonomous_system_number': rnd.randint(1, 400000),
+                        'autonomous_system_organization': f'AS of {network}'}
+         for network in networks})
+    write_geoip_database(
+        os.path.join(directory, CITY_DATABASE_FILENAME),
+        'GeoLite2-City',
+        {str(network): {'country': {'iso_code': rnd.choice(_COUNTRY_CODES)}}
+         for network in networks})
+
+
+class InputGenerator:
+
+    """
+    A deterministic generator of the input messages for the Enricher.
+
+    The FQDNs and IPs are drawn from pools of `fqdn_count` and
+    `ip_count` values; the IPs are concentrated in a limited number of
+    /24 networks (as, e.g., with feeds of scanning hosts).
+    """
+
+    def __init__(self, rnd: random.Random, fqdn_count: int, ip_count: int):
+        self._rnd = rnd
+        self._fqdns = [
+            f'host{i}.{rnd.choice(_BASE_DOMAINS)}'
+            for i in range(fqdn_count)]
+        subnets = [rnd.randint(0x0b0000, 0xdfffff) << 8 for _ in range(max(1, ip_count // 16))]
+        self._ips = [
+            ipv4_to_str(rnd.choice(subnets) + rnd.randint(1, 254))
+            for _ in range(ip_count)]
+
+    def generate(self, event_count: int) -> list[PublishedMessage]:
+        return [
+            PublishedMessage(
+                exchange='event',
+                routing_key=f'event.parsed.{data["source"]}',
+                body=RecordDict(data).get_ready_json().encode('utf-8'),
+                properties=pika.BasicProperties(**LegacyQueuedBase.basic_prop_kwargs))
+            for data in (self._make_event() for _ in range(event_count))]
+
+    def _make_event(self):
+        rnd = self._rnd
+        data = {
+            'id': f'{rnd.getrandbits(128):032x}',
+            'rid': f'{rnd.getrandbits(128):032x}',
+            'source': 'benchmark.enricher',
+            'restriction': 'public',
+            'confidence': 'low',
+            'category': 'other',
+            'time': f'2026-10-{rnd.randint(10, 28)} 12:{rnd.randint(10, 59)}:00',
+        }
+        kind = rnd.choice(['url_fqdn', 'url_ip', 'fqdn', 'address'])
+        if kind == 'url_fqdn':
+            data['url'] = f'http://{rnd.choice(self._fqdns)}/path/{rnd.getrandbits(32)}'
+        elif kind == 'url_ip':
+            data['url'] = f'http://{rnd.choice(self._ips)}:8080/{rnd.getrandbits(32)}'
+        elif kind == 'fqdn':
+            data['fqdn'] = rnd.choice(self._fqdns)
+        else:
+            data['address'] = [{'ip': ip} for ip in rnd.sample(self._ips, rnd.randint(1, 3))]
+        return data
+
+
+#
+# Running the benchmark
+
+@contextlib.contextmanager
+def measuring_phases(enricher) -> Iterator[dict[str, Measurement]]:
+    """
+    Within the context, measure the time spent in the particular
+    phases of the enrichment (by wrapping the relevant methods of the
+    given Enricher instance).
+    """
+    phase_to_method_name = {
+        'url_parsing': '_extract_ip_or_fqdn',
+        # (with micro-batching, FQDNs are resolved using `resolve_fqdns()`
+        # -- possibly calling `fqdn_to_ip()` in multiple threads)
+        'resolving': ('resolve_fqdns' if enricher.input_batch_size > 1 else 'fqdn_to_ip'),
+        'asn_lookups': 'ip_to_asn',
+        'cc_lookups': 'ip_to_cc',
+    }
+    assert phase_to_method_name.keys() == set(PHASES)
+    phase_to_measurement = {}
+    for phase, method_name in phase_to_method_name.items():
+        measurement = phase_to_measurement[phase] = Measurement(phase)
+        setattr(enricher, method_name,
+                _measured(getattr(enricher, method_name), measurement))
+    try:
+        yield phase_to_measurement
+    finally:
+        for method_name in phase_to_method_name.values():
+            delattr(enricher, method_name)
+
+
+def _measured(method, measurement):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with measurement.measuring():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def get_phase_results(phase_to_measurement: dict[str, Measurement],
+                      total_seconds: float) -> dict:
+    results = {}
+    for phase, measurement in phase_to_measurement.items():
+        results[phase] = {
+            'calls': measurement.count,
+            'seconds': measurement.seconds,
+            'fraction': (measurement.seconds / total_seconds if total_seconds > 0 else None),
+        }
+    other_seconds = max(0.0, total_seconds - sum(m.seconds for m in phase_to_measurement.values()))
+    results['other'] = {
+        'seconds': other_seconds,
+        'fraction': (other_seconds / total_seconds if total_seconds > 0 else None),
+    }
+    return results
+
+
+def get_cache_results(enricher) -> dict:
+    return {
+        name: cache.get_stats()
+        for name, cache in [('dns_cache', enricher.dns_cache),
+                            ('asn_prefix_cache', enricher.asn_prefix_cache),
+                            ('cc_prefix_cache', enricher.cc_prefix_cache)]
+        if cache is not None}
+
+
+def run_benchmark(*,
+                  event_count: int = 10000,
+                  fqdn_count: int = 2000,
+                  ip_count: int = 2000,
+                  geoip_network_count: int = 20000,
+                  dns_latency: float = 0.0,
+                  nxdomain_fraction: float = 0.1,
+                  input_batch_size: int = 1,
+                  dns_concurrency: int = 1,
+                  dns_cache_size: int = 0,
+                  geoip_prefix_cache_size: int = 0,
+                  geoip_mmap: bool = False,
+                  seed: int = 0) -> dict:
+    params = dict(locals())
+    rnd = random.Random(seed)
+    dns_resolver = StubDNSResolver(latency=dns_latency, nxdomain_fraction=nxdomain_fraction)
+    state_dir = tempfile.mkdtemp(prefix='n6benchmark-')
+    try:
+        make_geoip_databases(state_dir, rnd, geoip_network_count)
+        config = make_config(
+            ['enricher'],
+            state_dir,
+            geoip_path=state_dir,
+            asn_database_filename=ASN_DATABASE_FILENAME,
+            city_database_filename=CITY_DATABASE_FILENAME)
+        config['enrich'].update({
+            'input_batch_size': str(input_batch_size),
+            'dns_concurrency': str(dns_concurrency),
+            'dns_cache_size': str(dns_cache_size),
+            'geoip_prefix_cache_size': str(geoip_prefix_cache_size),
+            'geoip_mmap': str(geoip_mmap).lower(),
+        })
+        [stage] = make_stages(['enricher'], config, auth_api=None, dns_resolver=dns_resolver)
+        input_messages = InputGenerator(rnd, fqdn_count, ip_count).generate(event_count)
+        enricher = stage.component
+        try:
+            with measuring_phases(enricher) as phase_to_measurement:
+                stage.process(input_messages)
+        finally:
+            if enricher._dns_executor is not None:
+                enricher._dns_executor.shutdown()
+            for reader in (enricher.gi_asn, enricher.gi_cc):
+                reader.close()
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+    results = {
+        'enricher': _get_stage_results(stage),
+        'phases': get_phase_results(phase_to_measurement, stage.timing.seconds),
+        'dns_queries': dns_resolver.query_count,
+        'caches': get_cache_results(enricher),
+    }
+    return make_results_document('enricher', params, results)
+
+
+def _get_stage_results(stage: PipelineStage) -> dict:
+    results = stage.get_results()
+    results.pop('transient_bytes_per_event', None)
+    results.pop('retained_bytes_per_event', None)
+    return results
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description=(
+            'Run the n6 Enricher (with in-memory stand-ins for RabbitMQ and '
+            'DNS, and with generated GeoIP databases) against generated '
+            'events, and report events/s and the per-phase split of the time.'))
+    arg_parser.add_argument(
+        '--events', type=int, default=10000, dest='event_count',
+        help='number of input events (default: %(default)s)')
+    arg_parser.add_argument(
+        '--fqdns', type=int, default=2000, dest='fqdn_count',
+        help='number of distinct FQDNs in the input events (default: %(default)s)')
+    arg_parser.add_argument(
+        '--ips', type=int, default=2000, dest='ip_count',
+        help='number of distinct IPs in the input events (default: %(default)s)')
+    arg_parser.add_argument(
+        '--geoip-networks', type=int, default=20000, dest='geoip_network_count',
+        help='number of networks in the generated GeoIP databases (default: %(default)s)')
+    arg_parser.add_argument(
+        '--dns-latency', type=float, default=0.0,
+        help='latency of each DNS query, in seconds (default: %(default)s)')
+    arg_parser.add_argument(
+        '--nxdomain-fraction', type=float, default=0.1,
+        help='fraction of FQDNs for which NXDOMAIN is returned (default: %(default)s)')
+    arg_parser.add_argument(
+        '--input-batch-size', type=int, default=1,
+        help='the `input_batch_size` config option (default: %(default)s)')
+    arg_parser.add_argument(
+        '--dns-concurrency', type=int, default=1,
+        help='the `dns_concurrency` config option (default: %(default)s)')
+    arg_parser.add_argument(
+        '--dns-cache-size', type=int, default=0,
+        help='the `dns_cache_size` config option (default: %(default)s)')
+    arg_parser.add_argument(
+        '--geoip-prefix-cache-size', type=int, default=0,
+        help='the `geoip_prefix_cache_size` config option (default: %(default)s)')
+    arg_parser.add_argument(
+        '--geoip-mmap', action='store_true',
+        help='set the `geoip_mmap` config option to true')
+    arg_parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed for the generator of input data (default: %(default)s)')
+    arg_parser.add_argument(
+        '--output', default='-',
+        help='path of the results file (default: the standard output)')
+    return arg_parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    document = run_benchmark(
+        event_count=args.event_count,
+        fqdn_count=args.fqdn_count,
+        ip_count=args.ip_count,
+        geoip_network_count=args.geoip_network_count,
+        dns_latency=args.dns_latency,
+        nxdomain_fraction=args.nxdomain_fraction,
+        input_batch_size=args.input_batch_size,
+        dns_concurrency=args.dns_concurrency,
+        dns_cache_size=args.dns_cache_size,
+        geoip_prefix_cache_size=args.geoip_prefix_cache_size,
+        geoip_mmap=args.geoip_mmap,
+        seed=args.seed)
+    save_results_document(document, args.output)
+
+
+if __name__ == '__main__':
+    main()
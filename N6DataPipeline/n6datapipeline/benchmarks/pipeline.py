@@ -0,0 +1,547 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+The pipeline benchmark.
+
+Randomly generated (see: `n6lib.generate_test_events.RandomEvent`),
+*parsed* events -- a mix of ordinary, high-frequency (*hifreq*) and
+blacklist (*bl*) ones -- are processed by the real pipeline components
+(`Aggregator`, `Enricher`, `Comparator`, `Filter`, `Recorder` and
+`Anonymizer`), all within one process. The components are connected
+with in-memory stand-ins for AMQP channels: the messages published by
+a component are delivered (by calling its `on_message()`, just like
+*pika* would do) to the components whose binding keys (determined, as
+usual, by the `[pipeline]` config) match their routing keys. The Auth
+DB, the Event DB and DNS are replaced with in-process stand-ins too
+(see: `n6datapipeline.benchmarks.stand_ins`); in particular, the
+Recorder stores events in an in-memory SQLite database.
+
+The components are run one after another (each one processes all its
+input messages before the next one starts), so that the time of each
+*stage* can be measured separately. The memory allocations are measured
+(with `tracemalloc`) in a separate pass, with a different set of input
+events (as tracing slows down the processing significantly).
+
+The results -- for each stage: the number of processed, nacked
+and published messages, events per second and transient/retained bytes
+per event -- are printed (or saved to the specified file) as a JSON
+document (see: `n6lib.benchmark_helpers.make_results_document()`).
+
+Example command:
+
+    n6benchmark_pipeline --events 20000 --output results.json
+
+Note: the Recorder stage requires the *mysqlclient* library to be
+installed (only because `n6datapipeline.recorder` imports it); it can
+be excluded with the `--stages` option.
+"""
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import itertools
+import logging
+import random
+import re
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from collections.abc import (
+    Iterable,
+    Sequence,
+)
+from unittest.mock import patch
+
+import pika
+
+from n6datapipeline.base import LegacyQueuedBase
+from n6datapipeline.benchmarks.stand_ins import (
+    PublishedMessage,
+    StubAuthAPI,
+    StubDNSResolver,
+    connect_in_memory,
+    deliver,
+    make_sqlite_event_db_session,
+    n6_config_provided,
+)
+from n6lib.benchmark_helpers import (
+    Measurement,
+    make_results_document,
+    save_results_document,
+)
+from n6lib.common_helpers import (
+    import_by_dotted_name,
+    ipv4_to_str,
+)
+from n6lib.config import ConfigSection
+from n6lib.generate_test_events import RandomEvent
+from n6lib.record_dict import (
+    BLRecordDict,
+    RecordDict,
+)
+
+
+# (in the order of the actual pipeline)
+STAGE_TO_COMPONENT_CLASS_NAME = {
+    'aggregator': 'n6datapipeline.aggregator.Aggregator',
+    'enricher': 'n6datapipeline.enrich.Enricher',
+    'comparator': 'n6datapipeline.comparator.Comparator',
+    'filter': 'n6datapipeline.filter.Filter',
+    'recorder': 'n6datapipeline.recorder.Recorder',
+    'anonymizer': 'n6datapipeline.aux.anonymizer.Anonymizer',
+}
+
+# (the same as in the `etc/n6/00_pipeline.conf` config prototype)
+PIPELINE_CONFIG = {
+    'aggregator': 'parsed',
+    'enricher': 'parsed, aggregated',
+    'comparator': 'enriched',
+    'filter': 'enriched, compared',
+    'anonymizer': 'filtered',
+    'recorder': 'filtered',
+}
+
+FQDN_COUNT = 500
+ORG_COUNT = 100
+
+
+class PipelineStage:
+
+    """
+    A pipeline component (already initialized and connected with
+    in-memory channels -- see: `n6datapipeline.benchmarks.stand_ins`),
+    together with its measurements.
+    """
+
+    def __init__(self, name: str, component: LegacyQueuedBase):
+        self.name = name
+        self.component = component
+        self.timing = Measurement(name)
+        self.memory = Measurement(name)
+        self.published_count = 0
+        self.nacked_count = 0
+        self._binding_regexes = [
+            _binding_key_to_regex(binding_key)
+            for binding_key in component.input_queue['binding_keys']]
+        self._delivery_tags = itertools.count(1)
+
+    def accepts(self, routing_key: str) -> bool:
+        return any(regex.fullmatch(routing_key) for regex in self._binding_regexes)
+
+    def process(self,
+                messages: Iterable[PublishedMessage],
+                *,
+                measuring_memory: bool = False) -> list[PublishedMessage]:
+        """
+        Deliver the given messages to the component; return the
+        messages published by it.
+
+        The time (or, if `measuring_memory` is true, the memory
+        allocations) is measured, and -- only if `measuring_memory` is
+        false -- the published and nacked messages are counted.
+        """
+        component = self.component
+        measurement = (self.memory if measuring_memory else self.timing)
+        nacked_before = component._channel_in.nacked + component._channel_in.requeued
+        for message in messages:
+            with measurement.measuring():
+                deliver(component,
+                        next(self._delivery_tags),
+                        message.routing_key,
+                        message.body,
+                        message.properties)
+        if component._input_batch:
+            with measurement.measuring(count=0):
+                component._process_input_batch()
+        published = component._channel_out.pop_published()
+        if not measuring_memory:
+            self.published_count += len(published)
+            self.nacked_count += (component._channel_in.nacked
+                                  + component._channel_in.requeued
+                                  - nacked_before)
+        return published
+
+    def get_results(self) -> dict:
+        results = self.timing.as_dict(unit='event')
+        results.update(
+            (key, value) for key, value in self.memory.as_dict(unit='event').items()
+            if key.endswith('_bytes_per_event'))
+        results.update(
+            nacked=self.nacked_count,
+            published=self.published_count)
+        return results
+
+
+def _binding_key_to_regex(binding_key):
+    """
+    >>> regex = _binding_key_to_regex('event.parsed.*.*')
+    >>> bool(regex.fullmatch('event.parsed.foo.bar'))
+    True
+    >>> bool(regex.fullmatch('event.parsed.foo'))
+    False
+    >>> bool(_binding_key_to_regex('event.#').fullmatch('event.parsed.foo.bar'))
+    True
+    """
+    return re.compile(r'\.'.join(
+        (r'[^.]+' if word == '*' else
+         r'.*' if word == '#' else
+         re.escape(word))
+        for word in binding_key.split('.')))
+
+
+#
+# Input data
+
+def make_generator_config(rnd: random.Random) -> ConfigSection:
+    fqdns = [f'host{i}.example{i % 37}.{rnd.choice(["com", "pl", "net", "org"])}'
+             for i in range(FQDN_COUNT)]
+    urls = ([f'http://{fqdn}/path/{i}/index.php?id={i}' for i, fqdn in enumerate(fqdns)] +
+            [f'https://{_random_ip(rnd)}:8443/login' for _ in range(FQDN_COUNT // 10)])
+    return ConfigSection('generator_rest_api', {
+        'possible_event_attributes': [
+            'name', 'source', 'restriction', 'confidence', 'category', 'time', 'url',
+            'fqdn', 'address', 'proto', 'sport', 'dport', 'dip', 'id', 'rid', 'md5',
+            'origin', 'target', 'expires',
+        ],
+        'required_event_attributes': [
+            'id', 'rid', 'source', 'restriction', 'confidence', 'category', 'time',
+        ],
+        'dip_categories': ['bots', 'cnc', 'dos-attacker', 'scanning', 'other'],
+        'port_attributes': ['sport', 'dport'],
+        'md5_attributes': ['id', 'rid', 'md5'],
+        'possible_cc_in_address': ['PL', 'US', 'DE', 'CA', 'FR'],
+        'possible_client': [],
+        'possible_fqdn': fqdns,
+        'possible_url': urls,
+        'possible_name': ['benchmark event', 'some malware', 'another threat'],
+        'possible_source': ['benchmark.one', 'benchmark.two', 'benchmark.three'],
+        'possible_restriction': ['public', 'need-to-know'],
+        'possible_target': ['Example Ltd.', 'Random Co'],
+        'seconds_max': 180000,
+        'expires_days_max': 8,
+        'random_ips_max': 3,
+    })
+
+
+def make_inside_criteria(generator_config: ConfigSection, rnd: random.Random) -> list[dict]:
+    fqdns = generator_config['possible_fqdn']
+    return [
+        {
+            'org_id': f'org{i}.example.com',
+            'fqdn_seq': sorted({'.'.join(rnd.choice(fqdns).split('.')[-2:]),
+                                rnd.choice(fqdns)}),
+            'asn_seq': [rnd.randint(1000, 5000)],
+            'cc_seq': ([rnd.choice(generator_config['possible_cc_in_address'])]
+                       if i % 10 == 0 else []),
+            'ip_min_max_seq': [_random_ip_range(rnd) for _ in range(rnd.randint(1, 3))],
+        }
+        for i in range(ORG_COUNT)]
+
+
+class InputGenerator:
+
+    """
+    A generator of messages, as if they were published by parsers.
+
+    Note: the times of high-frequency events are made consecutive
+    (across all calls), as the Aggregator rejects events that are
+    out of order.
+    """
+
+    def __init__(self,
+                 generator_config: ConfigSection,
+                 rnd: random.Random,
+                 *,
+                 hifreq_fraction: float,
+                 blacklist_fraction: float):
+        self._generator_config = generator_config
+        self._rnd = rnd
+        self._hifreq_fraction = hifreq_fraction
+        self._blacklist_fraction = blacklist_fraction
+        self._next_hifreq_time = (datetime.datetime.utcnow().replace(microsecond=0)
+                                  - datetime.timedelta(days=30))
+
+    def generate(self, event_count: int) -> list[PublishedMessage]:
+        rnd = self._rnd
+        # (note: `RandomEvent` uses the global generator of the `random` module)
+        random.seed(rnd.random())
+        messages = []
+        hifreq_count = 0
+        source_to_bl_events = {}
+        for _ in range(event_count):
+            event = _make_parsed_event(RandomEvent(ready_config=self._generator_config).event)
+            draw = rnd.random()
+            if draw < self._hifreq_fraction:
+                messages.append(None)  # (<- placeholder, see below)
+                hifreq_count += 1
+            elif draw < self._hifreq_fraction + self._blacklist_fraction:
+                source_to_bl_events.setdefault(event['source'], []).append(event)
+            else:
+                messages.append(_make_message('event', event))
+        messages.extend(self._generate_bl_messages(source_to_bl_events))
+        rnd.shuffle(messages)
+        hifreq_messages = iter(self._generate_hifreq_messages(hifreq_count))
+        return [(next(hifreq_messages) if message is None else message)
+                for message in messages]
+
+    def _generate_hifreq_messages(self, count):
+        for _ in range(count):
+            event = _make_parsed_event(RandomEvent(ready_config=self._generator_config).event)
+            event['time'] = self._next_hifreq_time
+            event['_group'] = f'group{self._rnd.randint(1, 50)}'
+            self._next_hifreq_time += datetime.timedelta(seconds=self._rnd.randint(0, 10))
+            yield _make_message('hifreq', event)
+
+    def _generate_bl_messages(self, source_to_bl_events):
+        rnd = self._rnd
+        bl_time = datetime.datetime.utcnow().replace(microsecond=0)
+        for source, bl_events in sorted(source_to_bl_events.items()):
+            series_id = hashlib.md5(f'{source} {rnd.random()}'.encode('ascii')).hexdigest()
+            for i, event in enumerate(bl_events, 1):
+                if not event.get('address'):
+                    # (the Comparator requires `url`, `fqdn` or `address`)
+                    event['address'] = [{'ip': _random_ip(rnd)}]
+                event.update({
+                    'expires': bl_time + datetime.timedelta(days=2),
+                    '_bl-series-id': series_id,
+                    '_bl-series-total': len(bl_events),
+                    '_bl-series-no': i,
+                    '_bl-time': bl_time,
+                })
+                yield _make_message('bl', event)
+
+
+def _make_parsed_event(event):
+    # (`RandomEvent` makes events as they are *output* by the REST API,
+    # so the items that are added by the pipeline need to be removed)
+    event.pop('expires', None)
+    if event.get('address'):
+        event['address'] = [{'ip': addr['ip']} for addr in event['address']]
+    return event
+
+
+def _make_message(event_type, event):
+    record_dict_class = (BLRecordDict if event_type == 'bl' else RecordDict)
+    event['type'] = event_type
+    record_dict = record_dict_class(event)
+    return PublishedMessage(
+        exchange='event',
+        routing_key=f'{event_type}.parsed.{record_dict["source"]}',
+        body=record_dict.get_ready_json().encode('utf-8'),
+        properties=pika.BasicProperties(**LegacyQueuedBase.basic_prop_kwargs))
+
+
+def _random_ip(rnd):
+    return ipv4_to_str(rnd.randint(0x0b000001, 0xdffffffe))
+
+
+def _random_ip_range(rnd):
+    prefix_len = rnd.choice([16, 20, 24, 28])
+    size = 2 ** (32 - prefix_len)
+    min_ip = rnd.randint(0x0b000000, 0xdf000000) // size * size
+    return min_ip, min_ip + size - 1
+
+
+#
+# Running the benchmark
+
+def make_config(stages: Sequence[str],
+                state_dir: str,
+                *,
+                geoip_path: str = '',
+                asn_database_filename: str = '',
+                city_database_filename: str = '') -> dict:
+    return {
+        'rabbitmq': {
+            'host': 'localhost',
+            'port': '5672',
+            'heartbeat_interval': '30',
+            'ssl': 'false',
+        },
+        'pipeline': {
+            stage: states
+            for stage, states in PIPELINE_CONFIG.items()
+            if stage in stages},
+        'enrich': {
+            'dnshost': '127.0.0.1',
+            'dnsport': '53',
+            'geoippath': geoip_path,
+            'asndatabasefilename': asn_database_filename,
+            'citydatabasefilename': city_database_filename,
+        },
+        'filter': {},
+        'aggregator': {
+            'dbpath': f'{state_dir}/aggregator/aggregator.pickle',
+            'time_tolerance': '600',
+        },
+        'comparator': {
+            'dbpath': f'{state_dir}/comparator/comparator.pickle',
+            'series_timeout': '300',
+            'cleanup_time': '3600',
+        },
+        'recorder': {
+            'uri': 'sqlite://',
+        },
+    }
+
+
+def make_stages(stages: Sequence[str],
+                config: dict,
+                auth_api: StubAuthAPI,
+                dns_resolver: StubDNSResolver) -> list[PipelineStage]:
+    pipeline_stages = []
+    with n6_config_provided(config), \
+         patch.object(sys, 'argv', sys.argv[:1]):
+        for stage in STAGE_TO_COMPONENT_CLASS_NAME:
+            if stage not in stages:
+                continue
+            component_class = import_by_dotted_name(STAGE_TO_COMPONENT_CLASS_NAME[stage])
+            with _patched_for(stage, component_class, auth_api):
+                component = component_class()
+            if stage == 'enricher':
+                component._resolver = dns_resolver
+            connect_in_memory(component)
+            pipeline_stages.append(PipelineStage(stage, component))
+    return pipeline_stages
+
+
+def _patched_for(stage, component_class, auth_api):
+    if stage in ('filter', 'anonymizer'):
+        return patch(f'{component_class.__module__}.AuthAPI', new=(lambda: auth_api))
+    if stage == 'recorder':
+        return patch.object(component_class, '_setup_db',
+                            new=(lambda self: make_sqlite_event_db_session()))
+    return contextlib.nullcontext()
+
+
+def run_pass(pipeline_stages: Sequence[PipelineStage],
+             input_messages: Iterable[PublishedMessage],
+             *,
+             measuring_memory: bool = False) -> None:
+    messages = list(input_messages)
+    for stage in pipeline_stages:
+        stage_input = [message for message in messages if stage.accepts(message.routing_key)]
+        messages.extend(stage.process(stage_input, measuring_memory=measuring_memory))
+
+
+def run_benchmark(*,
+                  stages: Sequence[str] = tuple(STAGE_TO_COMPONENT_CLASS_NAME),
+                  event_count: int = 10000,
+                  memory_event_count: int = 1000,
+                  hifreq_fraction: float = 0.1,
+                  blacklist_fraction: float = 0.1,
+                  dns_latency: float = 0.0,
+                  geoip_path: str = '',
+                  asn_database_filename: str = '',
+                  city_database_filename: str = '',
+                  seed: int = 0) -> dict:
+    params = dict(locals())
+    illegal_stages = set(stages).difference(STAGE_TO_COMPONENT_CLASS_NAME)
+    if illegal_stages:
+        raise ValueError(f'illegal stages: {", ".join(sorted(map(ascii, illegal_stages)))}')
+    rnd = random.Random(seed)
+    generator_config = make_generator_config(rnd)
+    auth_api = StubAuthAPI(
+        make_inside_criteria(generator_config, rnd),
+        stream_api_source_ids=generator_config['possible_source'])
+    dns_resolver = StubDNSResolver(latency=dns_latency)
+    state_dir = tempfile.mkdtemp(prefix='n6benchmark-')
+    try:
+        config = make_config(
+            stages,
+            state_dir,
+            geoip_path=geoip_path,
+            asn_database_filename=asn_database_filename,
+            city_database_filename=city_database_filename)
+        pipeline_stages = make_stages(stages, config, auth_api, dns_resolver)
+        input_generator = InputGenerator(
+            generator_config, rnd,
+            hifreq_fraction=hifreq_fraction,
+            blacklist_fraction=blacklist_fraction)
+        run_pass(pipeline_stages, input_generator.generate(event_count))
+        if memory_event_count:
+            input_messages = input_generator.generate(memory_event_count)
+            tracemalloc.start()
+            try:
+                run_pass(pipeline_stages, input_messages, measuring_memory=True)
+            finally:
+                tracemalloc.stop()
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+    total_seconds = sum(stage.timing.seconds for stage in pipeline_stages)
+    results = {
+        'stages': {stage.name: stage.get_results() for stage in pipeline_stages},
+        'total': {
+            'events': event_count,
+            'seconds': total_seconds,
+            'events_per_second': (event_count / total_seconds if total_seconds > 0 else None),
+        },
+        'dns_queries': dns_resolver.query_count,
+    }
+    return make_results_document('pipeline', params, results)
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description=(
+            'Run the n6 pipeline components (in one process, with in-memory '
+            'stand-ins for RabbitMQ, the Auth DB, the Event DB and DNS) '
+            'against randomly generated events, and report events/s and '
+            'memory allocations per component.'))
+    arg_parser.add_argument(
+        '--events', type=int, default=10000, dest='event_count',
+        help='number of input events for the timing pass (default: %(default)s)')
+    arg_parser.add_argument(
+        '--memory-events', type=int, default=1000, dest='memory_event_count',
+        help=('number of input events for the memory-measuring pass; '
+              '0 disables that pass (default: %(default)s)'))
+    arg_parser.add_argument(
+        '--stages', default=','.join(STAGE_TO_COMPONENT_CLASS_NAME),
+        type=(lambda s: [stage.strip() for stage in s.split(',') if stage.strip()]),
+        help='comma-separated names of the components to run (default: %(default)s)')
+    arg_parser.add_argument(
+        '--hifreq-fraction', type=float, default=0.1,
+        help='fraction of high-frequency events (default: %(default)s)')
+    arg_parser.add_argument(
+        '--blacklist-fraction', type=float, default=0.1,
+        help='fraction of blacklist events (default: %(default)s)')
+    arg_parser.add_argument(
+        '--dns-latency', type=float, default=0.0,
+        help='latency of each DNS query, in seconds (default: %(default)s)')
+    arg_parser.add_argument(
+        '--geoip-path', default='',
+        help='directory of GeoIP databases (by default, GeoIP lookups are disabled)')
+    arg_parser.add_argument('--asn-database-filename', default='')
+    arg_parser.add_argument('--city-database-filename', default='')
+    arg_parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed for the generator of input events (default: %(default)s)')
+    arg_parser.add_argument(
+        '--output', default='-',
+        help='path of the results file (default: the standard output)')
+    return arg_parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    # (note: the standard n6 logging configuration is not used, as it
+    # may include handlers that are not suitable for benchmarks)
+    logging.basicConfig(level=logging.WARNING)
+    document = run_benchmark(
+        stages=args.stages,
+        event_count=args.event_count,
+        memory_event_count=args.memory_event_count,
+        hifreq_fraction=args.hifreq_fraction,
+        blacklist_fraction=args.blacklist_fraction,
+        dns_latency=args.dns_latency,
+        geoip_path=args.geoip_path,
+        asn_database_filename=args.asn_database_filename,
+        city_database_filename=args.city_database_filename,
+        seed=args.seed)
+    save_results_document(document, args.output)
+
+
+if __name__ == '__main__':
+    main()
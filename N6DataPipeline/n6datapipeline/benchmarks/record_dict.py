@@ -0,0 +1,406 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+The record dict micro-benchmark.
+
+Representative record dicts of several *scenarios* -- blacklist ones
+(`BLRecordDict`), URL-heavy ones (with obfuscated URLs, `_url_data`
+and IDNA FQDNs) and multi-address ones (with many `address` items and
+`enriched` data) -- are deterministically generated, and the following
+*operations* are measured for each scenario:
+
+* `construct` -- making a record dict from the raw (not yet adjusted)
+  data, as parsers do it (i.e., running all the adjusters);
+
+* `update` -- setting several items of an existing record dict (as
+  parsers and the enricher do it);
+
+* `serialize` -- `get_ready_json()`;
+
+* `iter_db_items` -- consuming all items yielded by `iter_db_items()`
+  (as the recorder does it);
+
+* `iter_db_rows` -- consuming all rows yielded by `iter_db_rows()`
+  and `iter_client_db_rows()` (as the recorder's bulk insert does it).
+
+The timing pass is repeated (see: the `--rounds` option) and the best
+round is reported for each operation (to reduce the influence of noise).
+The memory allocations are measured (with `tracemalloc`) in a separate
+pass.
+
+The results -- for each scenario and operation: operations per second
+and transient/retained bytes per operation -- are printed (or saved to
+the specified file) as a JSON document (see:
+`n6lib.benchmark_helpers.make_results_document()`).
+
+If the `--baseline` option is given, the results are compared with the
+ones from the specified baseline results document (by default, with the
+tracked one: `n6datapipeline/data/benchmarks/record_dict_baseline.json`);
+if any operation is slower than in the baseline by more than the given
+fraction (see: the `--max-slowdown` option), the regressions are listed
+on the standard error and the exit status is 1 -- so that the benchmark
+can be used to flag slowdowns in CI. Note that the baseline should be
+obtained on the same machine (to update the tracked one, just run the
+benchmark with `--output` pointing to that file).
+
+Example commands:
+
+    n6benchmark_record_dict --records 2000 --output results.json
+    n6benchmark_record_dict --baseline --max-slowdown 0.3
+"""
+
+import argparse
+import copy
+import logging
+import os.path
+import random
+import sys
+import tracemalloc
+from collections.abc import (
+    Callable,
+    Sequence,
+)
+
+from n6lib.benchmark_helpers import (
+    Measurement,
+    find_regressions,
+    load_results_document,
+    make_results_document,
+    save_results_document,
+)
+from n6lib.common_helpers import ipv4_to_str
+from n6lib.record_dict import (
+    BLRecordDict,
+    RecordDict,
+)
+
+
+DEFAULT_BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'data', 'benchmarks', 'record_dict_baseline.json')
+
+OPERATIONS = ('construct', 'update', 'serialize', 'iter_db_items', 'iter_db_rows')
+
+_BASE_DOMAINS = ['example.com', 'example.pl', 'przykład.pl', 'bücher.example', 'test.org']
+_NAMES = ['Some Malware', 'virut', 'ZeuS P2P', 'Conficker.B', 'sinkholed botnet']
+_CATEGORIES = ['bots', 'cnc', 'malurl', 'phish', 'scanning', 'spam']
+
+
+#
+# Input data
+
+class RawDataGenerator:
+
+    """
+    A deterministic generator of raw (not yet adjusted) record dict
+    data, for each scenario (see: `SCENARIOS`).
+    """
+
+    def __init__(self, seed: int = 0):
+        self._rnd = random.Random(seed)
+
+    def common(self) -> dict:
+        rnd = self._rnd
+        return {
+            'id': f'{rnd.getrandbits(128):032x}',
+            'rid': f'{rnd.getrandbits(128):032x}',
+            'source': rnd.choice(['benchmark.one', 'benchmark.two']),
+            'restriction': rnd.choice(['public', 'need-to-know']),
+            'confidence': rnd.choice(['low', 'medium', 'high']),
+            'category': rnd.choice(_CATEGORIES),
+            'time': f'2026-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}T'
+                    f'{rnd.randint(10, 23)}:{rnd.randint(10, 59)}:{rnd.randint(10, 59)}Z',
+            'name': rnd.choice(_NAMES),
+        }
+
+    def blacklist(self) -> tuple[type[RecordDict], dict]:
+        rnd = self._rnd
+        data = self.common()
+        data.update({
+            'expires': '2026-12-31 23:59:59',
+            'fqdn': self._fqdn(),
+            'address': [{'ip': self._ip()} for _ in range(rnd.randint(1, 3))],
+            '_bl-series-id': f'{rnd.getrandbits(128):032x}',
+            '_bl-series-no': rnd.randint(1, 1000),
+            '_bl-series-total': 1000,
+            '_bl-time': '2026-10-01 00:00:00',
+        })
+        return BLRecordDict, data
+
+    def url_heavy(self) -> tuple[type[RecordDict], dict]:
+        rnd = self._rnd
+        data = self.common()
+        fqdn = self._fqdn()
+        scheme = rnd.choice(['http', 'https', 'hxxp', 'hxxps'])
+        path = '/'.join(f'seg{rnd.randint(0, 999)}' for _ in range(rnd.randint(1, 6)))
+        url = f'{scheme}://{fqdn}:{rnd.choice([80, 443, 8080])}/{path}?q={rnd.getrandbits(32)}'
+        data.update({
+            'url': url,
+            'fqdn': fqdn,
+            'url_pattern': rf'^https?://[^/]*\.{fqdn.split(".")[-1]}/',
+            '_url_data': {
+                'orig': url.replace('hxxp', 'http', 1),
+                'norm_options': {
+                    'merge_surrogate_pairs': True,
+                    'empty_path_slash': True,
+                    'remove_ipv6_zone': True,
+                },
+            },
+        })
+        return RecordDict, data
+
+    def multi_address(self) -> tuple[type[RecordDict], dict]:
+        rnd = self._rnd
+        data = self.common()
+        address = [{'ip': self._ip(),
+                    'cc': rnd.choice(['PL', 'US', 'DE', 'CA', 'FR']),
+                    'asn': rnd.randint(1000, 65000)}
+                   for _ in range(rnd.randint(4, 12))]
+        data.update({
+            'address': address,
+            'dip': self._ip(),
+            'sport': rnd.randint(1024, 65535),
+            'dport': rnd.choice([22, 23, 80, 443, 445]),
+            'proto': rnd.choice(['tcp', 'udp']),
+            'client': [f'org{rnd.randint(1, 50)}.example.com' for _ in range(rnd.randint(1, 4))],
+            'enriched': ([], {addr['ip']: ['asn', 'cc'] for addr in address}),
+        })
+        return RecordDict, data
+
+    def update_items(self, scenario: str) -> dict:
+        """
+        Get the items to be set (by the `update` operation) on a record
+        dict of the given scenario.
+        """
+        rnd = self._rnd
+        items = {'name': rnd.choice(_NAMES), 'category': rnd.choice(_CATEGORIES)}
+        if scenario == 'url_heavy':
+            items['url'] = f'hxxp://{self._fqdn()}/update/{rnd.getrandbits(32)}'
+            items['fqdn'] = self._fqdn()
+        else:
+            items['address'] = [{'ip': self._ip()} for _ in range(rnd.randint(1, 4))]
+        return items
+
+    def _fqdn(self):
+        rnd = self._rnd
+        return f'host{rnd.randint(0, 9999)}.{rnd.choice(_BASE_DOMAINS)}'
+
+    def _ip(self):
+        return ipv4_to_str(self._rnd.randint(0x0b000001, 0xdffffffe))
+
+
+SCENARIOS = ('blacklist', 'url_heavy', 'multi_address')
+
+
+class ScenarioInput:
+
+    """
+    Input data of a scenario: the record dict class, the raw data of
+    the records and the items to be set on them by the `update`
+    operation.
+    """
+
+    def __init__(self, scenario: str, record_count: int, generator: RawDataGenerator):
+        if scenario not in SCENARIOS:
+            raise ValueError(f'illegal scenario: {scenario!a}')
+        self.scenario = scenario
+        self.record_dict_classes = []
+        self.raw_data = []
+        self.update_items = []
+        make_raw = getattr(generator, scenario)
+        for _ in range(record_count):
+            record_dict_class, data = make_raw()
+            self.record_dict_classes.append(record_dict_class)
+            self.raw_data.append(data)
+            self.update_items.append(generator.update_items(scenario))
+
+    def make_operation_args(self, operation: str) -> list[tuple]:
+        """
+        Prepare the arguments for the given operation (so that the
+        preparation is not measured).
+        """
+        if operation == 'construct':
+            # (deep copies, as some adjusters modify the given data...)
+            return list(zip(self.record_dict_classes, copy.deepcopy(self.raw_data)))
+        record_dicts = self.make_record_dicts()
+        if operation == 'update':
+            return list(zip(record_dicts, copy.deepcopy(self.update_items)))
+        return [(rd,) for rd in record_dicts]
+
+    def make_record_dicts(self) -> list[RecordDict]:
+        return [record_dict_class(data)
+                for record_dict_class, data in zip(self.record_dict_classes,
+                                                   copy.deepcopy(self.raw_data))]
+
+
+def _construct(record_dict_class, data):
+    record_dict_class(data)
+
+def _update(record_dict, items):
+    record_dict.update(items)
+
+def _serialize(record_dict):
+    record_dict.get_ready_json()
+
+def _iter_db_items(record_dict):
+    for _ in record_dict.iter_db_items():
+        pass
+
+def _iter_db_rows(record_dict):
+    for _ in record_dict.iter_db_rows():
+        pass
+    for _ in record_dict.iter_client_db_rows():
+        pass
+
+OPERATION_TO_FUNC: dict[str, Callable] = {
+    'construct': _construct,
+    'update': _update,
+    'serialize': _serialize,
+    'iter_db_items': _iter_db_items,
+    'iter_db_rows': _iter_db_rows,
+}
+assert OPERATION_TO_FUNC.keys() == set(OPERATIONS)
+
+
+#
+# Running the benchmark
+
+def measure_timing(scenario_input: ScenarioInput, operation: str, rounds: int) -> Measurement:
+    """
+    Run the operation on all records `rounds` times; return the
+    measurement of the best (fastest) round.
+    """
+    func = OPERATION_TO_FUNC[operation]
+    best = None
+    for _ in range(rounds):
+        args_seq = scenario_input.make_operation_args(operation)
+        measurement = Measurement(f'{scenario_input.scenario}.{operation}')
+        with measurement.measuring(count=len(args_seq)):
+            for args in args_seq:
+                func(*args)
+        if best is None or measurement.seconds < best.seconds:
+            best = measurement
+    return best
+
+
+def measure_memory(scenario_input: ScenarioInput, operation: str) -> Measurement:
+    func = OPERATION_TO_FUNC[operation]
+    args_seq = scenario_input.make_operation_args(operation)
+    measurement = Measurement(f'{scenario_input.scenario}.{operation}')
+    tracemalloc.start()
+    try:
+        for args in args_seq:
+            with measurement.measuring():
+                func(*args)
+    finally:
+        tracemalloc.stop()
+    return measurement
+
+
+def run_benchmark(*,
+                  scenarios: Sequence[str] = SCENARIOS,
+                  operations: Sequence[str] = OPERATIONS,
+                  record_count: int = 1000,
+                  memory_record_count: int = 200,
+                  rounds: int = 5,
+                  seed: int = 0) -> dict:
+    params = dict(locals())
+    params['scenarios'] = list(scenarios)
+    params['operations'] = list(operations)
+    illegal_operations = set(operations).difference(OPERATIONS)
+    if illegal_operations:
+        raise ValueError(f'illegal operations: '
+                         f'{", ".join(sorted(map(ascii, illegal_operations)))}')
+    generator = RawDataGenerator(seed)
+    results = {}
+    for scenario in scenarios:
+        timing_input = ScenarioInput(scenario, record_count, generator)
+        memory_input = ScenarioInput(scenario, memory_record_count, generator)
+        scenario_results = results[scenario] = {}
+        for operation in operations:
+            operation_results = measure_timing(timing_input, operation, rounds).as_dict()
+            if memory_record_count:
+                operation_results.update(
+                    (key, value)
+                    for key, value in measure_memory(memory_input, operation).as_dict().items()
+                    if key.endswith('_bytes_per_op'))
+            scenario_results[operation] = operation_results
+    return make_results_document('record_dict', params, results)
+
+
+def check_against_baseline(document: dict,
+                           baseline_path: str,
+                           max_slowdown: float) -> list[str]:
+    baseline_document = load_results_document(baseline_path)
+    if baseline_document.get('benchmark') != document['benchmark']:
+        raise ValueError(f'{baseline_path!a} does not contain results '
+                         f'of the {document["benchmark"]!a} benchmark')
+    return find_regressions(document['results'],
+                            baseline_document['results'],
+                            max_slowdown)
+
+
+def parse_args(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description=(
+            'Measure the speed (operations per second) and memory allocations '
+            '(bytes per operation) of constructing, updating, serializing '
+            'and getting the database items of representative record dicts '
+            '(optionally, comparing the results with a baseline).'))
+    arg_parser.add_argument(
+        '--records', type=int, default=1000, dest='record_count',
+        help='number of records per scenario for the timing pass (default: %(default)s)')
+    arg_parser.add_argument(
+        '--memory-records', type=int, default=200, dest='memory_record_count',
+        help=('number of records per scenario for the memory-measuring pass; '
+              '0 disables that pass (default: %(default)s)'))
+    arg_parser.add_argument(
+        '--rounds', type=int, default=5,
+        help='number of rounds of the timing pass (default: %(default)s)')
+    arg_parser.add_argument(
+        '--scenarios', default=','.join(SCENARIOS),
+        type=(lambda s: [item.strip() for item in s.split(',') if item.strip()]),
+        help='comma-separated names of the scenarios (default: %(default)s)')
+    arg_parser.add_argument(
+        '--operations', default=','.join(OPERATIONS),
+        type=(lambda s: [item.strip() for item in s.split(',') if item.strip()]),
+        help='comma-separated names of the operations (default: %(default)s)')
+    arg_parser.add_argument(
+        '--seed', type=int, default=0,
+        help='seed for the generator of records (default: %(default)s)')
+    arg_parser.add_argument(
+        '--output', default='-',
+        help='path of the results file (default: the standard output)')
+    arg_parser.add_argument(
+        '--baseline', nargs='?', const=DEFAULT_BASELINE_PATH, metavar='PATH',
+        help=('compare the results with the baseline results file '
+              '(if PATH is not given: the tracked one, %(const)s)'))
+    arg_parser.add_argument(
+        '--max-slowdown', type=float, default=0.25,
+        help=('maximum acceptable slowdown, as a fraction of the baseline '
+              'operations per second (default: %(default)s)'))
+    return arg_parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    document = run_benchmark(
+        scenarios=args.scenarios,
+        operations=args.operations,
+        record_count=args.record_count,
+        memory_record_count=args.memory_record_count,
+        rounds=args.rounds,
+        seed=args.seed)
+    save_results_document(document, args.output)
+    if args.baseline is not None:
+        regressions = check_against_baseline(document, args.baseline, args.max_slowdown)
+        if regressions:
+            sys.exit('Slowdowns (compared to {}) greater than {:.0%}:\n{}'.format(
+                args.baseline,
+                args.max_slowdown,
+                '\n'.join(f'* {regression}' for regression in regressions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+In-process stand-ins for the external services used by the pipeline
+components -- to be used by benchmarks (*not* in production).
+"""
+
+import collections
+import contextlib
+import copy
+import ipaddress
+import itertools
+import json
+import struct
+import threading
+import time
+import zlib
+from collections.abc import (
+    Iterable,
+    Iterator,
+    Mapping,
+)
+from typing import Optional
+from unittest.mock import patch
+
+import dns.resolver
+import pika
+import sqlalchemy
+import sqlalchemy.event
+from sqlalchemy.dialects.mysql import MEDIUMTEXT
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from n6datapipeline.base import LegacyQueuedBase
+from n6lib.auth_api import (
+    InsideCriteriaResolver,
+    _IgnoreListsCriteriaResolver,
+)
+from n6lib.common_helpers import ipv4_to_str
+from n6lib.config import Config
+from n6lib.context_helpers import NoContextToExitFrom
+
+
+__all__ = [
+    'InMemoryChannel',
+    'InMemoryConnection',
+    'StubDNSResolver',
+    'StubAuthAPI',
+    'n6_config_provided',
+    'connect_in_memory',
+    'deliver',
+    'make_sqlite_event_db_session',
+    'write_geoip_database',
+]
+
+
+PublishedMessage = collections.namedtuple(
+    'PublishedMessage',
+    ['exchange', 'routing_key', 'body', 'properties'])
+
+
+class InMemoryChannel:
+
+    """
+    A stand-in for a *pika* channel: published messages are collected
+    in the `published` list; (n)acks are just counted.
+    """
+
+    def __init__(self):
+        self.published: list[PublishedMessage] = []
+        self.acked = 0
+        self.nacked = 0
+        self.requeued = 0
+        self._last_acked_tag = 0
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        self.published.append(PublishedMessage(exchange, routing_key, body, properties))
+
+    def basic_ack(self, delivery_tag=0, multiple=False):
+        if multiple:
+            self.acked += max(delivery_tag - self._last_acked_tag, 0)
+        else:
+            self.acked += 1
+        self._last_acked_tag = max(self._last_acked_tag, delivery_tag)
+
+    def basic_nack(self, delivery_tag=None, multiple=False, requeue=True):
+        if requeue:
+            self.requeued += 1
+        else:
+            self.nacked += 1
+
+    def pop_published(self) -> list[PublishedMessage]:
+        published = self.published
+        self.published = []
+        return published
+
+
+class InMemoryConnection:
+
+    """
+    A stand-in for a *pika* connection: timeouts are registered but
+    never fired (benchmarks process messages synchronously).
+    """
+
+    def __init__(self):
+        self.outbound_buffer = collections.deque()
+        self.timeouts = {}
+        self._timeout_ids = itertools.count(1)
+
+    def add_timeout(self, deadline, callback_method):
+        timeout_id = next(self._timeout_ids)
+        self.timeouts[timeout_id] = (deadline, callback_method)
+        return timeout_id
+
+    def remove_timeout(self, timeout_id):
+        self.timeouts.pop(timeout_id, None)
+
+
+def connect_in_memory(component: LegacyQueuedBase) -> None:
+    """
+    Make the given component (already initialized, but not run) ready
+    to consume and publish messages using `InMemoryChannel`s (one for
+    the input and one for the output), instead of RabbitMQ.
+
+    Then messages can be delivered by calling the component's
+    `on_message()` (see: `deliver()`), and the published ones can be
+    taken from `component._channel_out.published`.
+    """
+    component._connection = InMemoryConnection()
+    component._channel_in = InMemoryChannel()
+    component._channel_out = InMemoryChannel()
+    component._declared_output_exchanges = {
+        queue_conf['exchange']
+        for queue_conf in (component.output_queue or ())}
+    component.output_ready = True
+
+
+def deliver(component: LegacyQueuedBase,
+            delivery_tag: int,
+            routing_key: str,
+            body: bytes,
+            properties: pika.BasicProperties) -> None:
+    """
+    Deliver a message to a component (see: `connect_in_memory()`),
+    the same way *pika* would do that.
+    """
+    basic_deliver = pika.spec.Basic.Deliver(
+        delivery_tag=delivery_tag,
+        routing_key=routing_key)
+    component.on_message(component._channel_in, basic_deliver, properties, body)
+
+
+class StubDNSResolver:
+
+    """
+    A stand-in for `dns.resolver.Resolver` (only its `resolve()` method
+    is provided), answering deterministically: each FQDN is resolved to
+    1 or 2 pseudo-random IPs (or, for about `nxdomain_fraction` of FQDNs,
+    *NXDOMAIN* is raised); each query takes `latency` seconds. It can
+    be used by multiple threads concurrently.
+    """
+
+    def __init__(self, latency: float = 0.0, nxdomain_fraction: float = 0.1):
+        self.latency = latency
+        self.nxdomain_fraction = nxdomain_fraction
+        self.query_count = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, qname, rdtype='A', search=False, **kwargs):
+        with self._lock:
+            self.query_count += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        checksum = zlib.crc32(str(qname).lower().encode('utf-8'))
+        if (checksum % 1000) < self.nxdomain_fraction * 1000:
+            raise dns.resolver.NXDOMAIN
+        ips = [ipv4_to_str(0x0b000001 + checksum % 0xd0000000)]
+        if checksum % 2:
+            ips.append(ipv4_to_str(0x0b000001 + (checksum // 2) % 0xd0000000))
+        return ips
+
+
+class StubAuthAPI:
+
+    """
+    A stand-in for `n6lib.auth_api.AuthAPI` (so that no Auth DB is
+    needed). It provides -- for the given inside criteria (see:
+    `n6lib.auth_api.InsideCriteriaResolver`) and ignored IP networks --
+    the actual resolver objects used by the Filter, and some simple
+    anonymization/Stream API data used by the Anonymizer (every event
+    from any of `stream_api_source_ids` is sent to all its `client`
+    organizations, and nothing is sent to *threats* subscribers).
+    """
+
+    def __init__(self,
+                 inside_criteria: list[dict],
+                 ignored_ip_networks: Iterable[str] = (),
+                 stream_api_source_ids: Iterable[str] = ()):
+        self._depth = 0
+        self._inside_criteria_resolver = InsideCriteriaResolver(inside_criteria)
+        self._ignore_lists_criteria_resolver = _IgnoreListsCriteriaResolver(ignored_ip_networks)
+        all_org_ids = frozenset(cri['org_id'] for cri in inside_criteria)
+        stream_api_source_ids = sorted(stream_api_source_ids)
+        self._source_ids_to_subs_to_stream_api_access_infos = {
+            source_id: {
+                'benchmark-subsource': (
+                    (lambda record_facade: True),
+                    {'inside': all_org_ids, 'threats': frozenset(), 'search': frozenset()},
+                ),
+            }
+            for source_id in stream_api_source_ids}
+        forward_mapping = {
+            source_id: f'hidden.{i}'
+            for i, source_id in enumerate(stream_api_source_ids, 1)}
+        self._anonymized_source_mapping = {
+            'forward_mapping': forward_mapping,
+            'reverse_mapping': {v: k for k, v in forward_mapping.items()},
+        }
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._depth:
+            raise NoContextToExitFrom
+        self._depth -= 1
+
+    def get_inside_criteria_resolver(self):
+        return self._inside_criteria_resolver
+
+    def get_ignore_lists_criteria_resolver(self):
+        return self._ignore_lists_criteria_resolver
+
+    def get_source_ids_to_subs_to_stream_api_access_infos(self):
+        return self._source_ids_to_subs_to_stream_api_access_infos
+
+    def get_anonymized_source_mapping(self):
+        return copy.deepcopy(self._anonymized_source_mapping)
+
+    def get_dip_anonymization_disabled_source_ids(self):
+        return frozenset()
+
+    def dispose_db_connection_pool(self):
+        pass
+
+
+def write_geoip_database(path: str,
+                         database_type: str,
+                         network_to_record: Mapping[str, dict],
+                         *,
+                         build_epoch: Optional[int] = None) -> None:
+    """
+    Write an IPv4-only GeoIP database file in the *MaxMind DB* format
+    (see: https://maxmind.github.io/MaxMind-DB/), readable with
+    `geoip2.database.Reader` (if `database_type` is appropriate, e.g.,
+    `'GeoLite2-ASN'` or `'GeoLite2-City'`).
+
+    The keys of `network_to_record` should be non-overlapping IPv4
+    networks (in the CIDR notation); the values should be the records
+    (dicts containing str, int, float, bool, list and/or dict values).
+    If `build_epoch` is not given, the current time is used.
+    """
+    if build_epoch is None:
+        build_epoch = int(time.time())
+    encoder = _MMDBDataEncoder()
+    nodes = [[None, None]]  # (each record: None, or a node index, or a `_MMDBDataOffset`)
+    for network, record in network_to_record.items():
+        network = ipaddress.IPv4Network(network)
+        if network.prefixlen == 0:
+            raise ValueError('the 0.0.0.0/0 network is not supported')
+        data_offset = encoder.add_record(record)
+        address = int(network.network_address)
+        node_index = 0
+        for depth in range(network.prefixlen):
+            bit = (address >> (31 - depth)) & 1
+            child = nodes[node_index][bit]
+            if depth == network.prefixlen - 1:
+                if child is not None:
+                    raise ValueError(f'overlapping network: {network}')
+                nodes[node_index][bit] = data_offset
+            else:
+                if child is None:
+                    child = len(nodes)
+                    nodes.append([None, None])
+                    nodes[node_index][bit] = child
+                elif isinstance(child, _MMDBDataOffset):
+                    raise ValueError(f'overlapping network: {network}')
+                node_index = child
+    node_count = len(nodes)
+    data_section = encoder.get_data_section()
+    if node_count + 16 + len(data_section) >= 2 ** 24:
+        raise ValueError('too much data for a database with 24-bit records')
+
+    def get_record_value(child):
+        if child is None:
+            return node_count
+        if isinstance(child, _MMDBDataOffset):
+            return node_count + 16 + child
+        return child
+
+    search_tree = b''.join(
+        get_record_value(left).to_bytes(3, 'big') + get_record_value(right).to_bytes(3, 'big')
+        for left, right in nodes)
+    metadata = _MMDBDataEncoder().encode({
+        # (note: the exact integer types are required by *libmaxminddb*)
+        'node_count': _MMDBUInt(node_count, _MMDBDataEncoder.UINT32),
+        'record_size': _MMDBUInt(24, _MMDBDataEncoder.UINT16),
+        'ip_version': _MMDBUInt(4, _MMDBDataEncoder.UINT16),
+        'database_type': database_type,
+        'languages': ['en'],
+        'binary_format_major_version': _MMDBUInt(2, _MMDBDataEncoder.UINT16),
+        'binary_format_minor_version': _MMDBUInt(0, _MMDBDataEncoder.UINT16),
+        'build_epoch': _MMDBUInt(build_epoch, _MMDBDataEncoder.UINT64),
+        'description': {'en': 'n6 benchmark stand-in'},
+    })
+    with open(path, 'wb') as f:
+        f.write(search_tree)
+        f.write(bytes(16))
+        f.write(data_section)
+        f.write(b'\xab\xcd\xefMaxMind.com')
+        f.write(metadata)
+
+
+class _MMDBDataOffset(int):
+    pass
+
+
+class _MMDBUInt(int):
+
+    def __new__(cls, value, data_type):
+        self = super().__new__(cls, value)
+        self.data_type = data_type
+        return self
+
+
+class _MMDBDataEncoder:
+
+    # (see: https://maxmind.github.io/MaxMind-DB/#output-data-section)
+
+    _UTF8_STRING = 2
+    _DOUBLE = 3
+    UINT16 = 5
+    UINT32 = 6
+    _MAP = 7
+    UINT64 = 9
+    _ARRAY = 11
+    _BOOLEAN = 14
+
+    def __init__(self):
+        self._chunks = []
+        self._size = 0
+        self._record_key_to_offset = {}
+
+    def add_record(self, record: dict) -> _MMDBDataOffset:
+        record_key = json.dumps(record, sort_keys=True)
+        offset = self._record_key_to_offset.get(record_key)
+        if offset is None:
+            offset = self._record_key_to_offset[record_key] = _MMDBDataOffset(self._size)
+            encoded = self.encode(record)
+            self._chunks.append(encoded)
+            self._size += len(encoded)
+        return offset
+
+    def get_data_section(self) -> bytes:
+        return b''.join(self._chunks)
+
+    def encode(self, value) -> bytes:
+        if isinstance(value, dict):
+            return self._control(self._MAP, len(value)) + b''.join(
+                self.encode(str(k)) + self.encode(v)
+                for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return self._control(self._ARRAY, len(value)) + b''.join(map(self.encode, value))
+        if isinstance(value, str):
+            payload = value.encode('utf-8')
+            return self._control(self._UTF8_STRING, len(payload)) + payload
+        if isinstance(value, bool):
+            return self._control(self._BOOLEAN, int(value))
+        if isinstance(value, int):
+            if not 0 <= value < 2 ** 64:
+                raise ValueError(f'unsupported integer: {value!a}')
+            if isinstance(value, _MMDBUInt):
+                data_type = value.data_type
+            else:
+                data_type = (self.UINT32 if value < 2 ** 32 else self.UINT64)
+            payload = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+            return self._control(data_type, len(payload)) + payload
+        if isinstance(value, float):
+            return self._control(self._DOUBLE, 8) + struct.pack('>d', value)
+        raise TypeError(f'unsupported type of value: {value!a}')
+
+    @staticmethod
+    def _control(data_type, size):
+        if size < 29:
+            size_bits, size_bytes = size, b''
+        elif size < 285:
+            size_bits, size_bytes = 29, (size - 29).to_bytes(1, 'big')
+        elif size < 65821:
+            size_bits, size_bytes = 30, (size - 285).to_bytes(2, 'big')
+        else:
+            size_bits, size_bytes = 31, (size - 65821).to_bytes(3, 'big')
+        if data_type <= 7:
+            return bytes([data_type << 5 | size_bits]) + size_bytes
+        # (*extended* type)
+        return bytes([size_bits, data_type - 7]) + size_bytes
+
+
+@contextlib.contextmanager
+def n6_config_provided(sect_name_to_opt_dict: Mapping[str, Mapping[str, str]]) -> Iterator[None]:
+    """
+    Within the context, make all config lookups (of both the legacy and
+    the modern `n6lib.config.Config` interface) use the given sections
+    (option values being strings, as in config files) instead of the
+    config files.
+    """
+    def load_n6_config_files(*filename_regexes):
+        return copy.deepcopy({
+            sect_name: dict(opt_name_to_value)
+            for sect_name, opt_name_to_value in sect_name_to_opt_dict.items()})
+
+    with patch.object(Config, '_load_n6_config_files', staticmethod(load_n6_config_files)):
+        yield
+
+
+#
+# SQLite-based stand-in for the Event DB
+
+# (the MySQL-specific column types and collations need to be
+# translated/registered to make the Event DB schema usable with SQLite)
+
+@compiles(MEDIUMTEXT, 'sqlite')
+def _compile_mediumtext_for_sqlite(type_, compiler, **kwargs):
+    return 'TEXT'
+
+_EVENT_DB_COLLATIONS = ('utf8mb4_bin', 'utf8mb4_unicode_520_ci')
+
+
+def make_sqlite_event_db_session():
+    """
+    Create an in-memory SQLite database with the Event DB schema;
+    configure and return the scoped session (see:
+    `n6lib.data_backend_api.N6DataBackendAPI.configure_db_session()`
+    -- note that it can be called only once per process).
+    """
+    # (imported here, as these modules are somewhat heavy)
+    from n6lib.data_backend_api import N6DataBackendAPI
+    from n6lib.db_events import Base
+
+    engine = sqlalchemy.create_engine(
+        'sqlite://',
+        poolclass=StaticPool,
+        connect_args={'check_same_thread': False})
+
+    @sqlalchemy.event.listens_for(engine, 'connect')
+    def create_collations(dbapi_connection, connection_record):
+        for name in _EVENT_DB_COLLATIONS:
+            dbapi_connection.create_collation(name, _compare_strings)
+
+    Base.metadata.create_all(engine)
+    return N6DataBackendAPI.configure_db_session(engine)
+
+
+def _compare_strings(a, b):
+    return (a > b) - (a < b)
@@ -13,6 +13,7 @@ from n6lib.common_helpers import (
 from n6lib.config import Config
 from n6lib.datetime_helpers import parse_iso_datetime_to_utc
 from n6lib.log_helpers import get_logger, logging_configured
+from n6lib.record_dict import load_record_dict_data
 from n6datapipeline.base import (
     LegacyQueuedBase,
     n6QueueProcessingException,
@@ -442,7 +443,7 @@ class Comparator(LegacyQueuedBase):
             raise n6QueueProcessingException("Invalid expiry date")
 
     def input_callback(self, routing_key, body, properties):
-        data = json.loads(body)
+        data = load_record_dict_data(body, getattr(properties, 'content_type', None))
         ## FIXME:? ^ shouldn't `data` be deserialized to a
         ##         RecordDict (BLRecordDict) instance? (for consistency etc.)
         with self.setting_error_event_info(data):
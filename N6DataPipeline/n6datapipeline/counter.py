@@ -111,7 +111,8 @@ class Counter(LegacyQueuedBase):
 
     def input_callback(self, routing_key, body, properties):
         force_exit_on_any_remaining_entered_contexts(self.auth_api)
-        record_dict = RecordDict.from_json(body)
+        record_dict = RecordDict.from_json(
+            body, **self.get_record_dict_from_json_kwargs(properties))
         with self.setting_error_event_info(record_dict):
             modified = record_dict['modified']
             _time = record_dict['time']
@@ -1,7 +1,12 @@
 # Copyright (c) 2013-2023 NASK. All rights reserved.
 
 import collections
+import concurrent.futures
+import functools
+import ipaddress
 import os
+import threading
+import time
 import urllib.parse
 
 import dns.resolver
@@ -9,7 +14,10 @@ import maxminddb.const
 from dns.exception import DNSException
 from geoip2 import database, errors
 
-from n6datapipeline.base import LegacyQueuedBase
+from n6datapipeline.base import (
+    InputBatchInterrupted,
+    LegacyQueuedBase,
+)
 from n6lib.common_helpers import (
     ipv4_to_int,
     ipv4_to_str,
@@ -25,6 +33,190 @@ from n6sdk.addr_helpers import IPv4Container
 LOGGER = get_logger(__name__)
 
 
+class DNSCache:
+
+    """
+    A bounded (LRU) in-process cache of FQDN resolution results.
+
+    Positive results (lists of IPs) are kept for the TTL of the DNS
+    records, clamped to the range [`min_ttl`, `max_ttl`]; negative
+    results (*NXDOMAIN*, no *A* records, *SERVFAIL*) are kept for
+    `negative_ttl` seconds. The cache can be used by multiple threads
+    concurrently.
+
+    >>> cache = DNSCache(maxsize=2, min_ttl=10, max_ttl=100, negative_ttl=5)
+    >>> cache.get('example.com') is None
+    True
+    >>> cache.put('example.com', ['1.2.3.4'], ttl=1)     # (kept for `min_ttl`)
+    >>> cache.put_negative('no-such-host.example')
+    >>> cache.get('example.com'), cache.get('no-such-host.example')
+    (['1.2.3.4'], [])
+    >>> cache.get_stats() == {
+    ...     'hits': 2, 'negative_hits': 1, 'misses': 1, 'hit_rate': 2/3,
+    ...     'size': 2, 'maxsize': 2}
+    True
+    """
+
+    def __init__(self, maxsize, min_ttl, max_ttl, negative_ttl):
+        if maxsize < 1:
+            raise ValueError(f'maxsize should be a positive integer (got: {maxsize!a})')
+        if not 0 <= min_ttl <= max_ttl:
+            raise ValueError(f'expected 0 <= min_ttl <= max_ttl '
+                             f'(got: {min_ttl=!a}, {max_ttl=!a})')
+        self.maxsize = maxsize
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        # (fqdn -> (<expiration time>, <tuple of IPs>))
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, fqdn):
+        """
+        Get a list of IPs (empty for a negative result), or None if
+        there is no valid entry for the given FQDN.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(fqdn)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[fqdn]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fqdn)
+            self.hits += 1
+            if not entry[1]:
+                self.negative_hits += 1
+            return list(entry[1])
+
+    def put(self, fqdn, ips, ttl=None):
+        if ttl is None:
+            ttl = self.min_ttl
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        self._put(fqdn, tuple(ips), ttl)
+
+    def put_negative(self, fqdn):
+        self._put(fqdn, (), self.negative_ttl)
+
+    def _put(self, fqdn, ips, ttl):
+        expiration = time.monotonic() + ttl
+        with self._lock:
+            self._entries[fqdn] = (expiration, ips)
+            self._entries.move_to_end(fqdn)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups if lookups else None),
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+
+class GeoIPPrefixCache:
+
+    """
+    A cache of results of GeoIP database lookups, kept *per network
+    prefix* (the one the *MaxMind DB* lookup returns along with the
+    result -- the largest network for which the result is the same),
+    so that a single lookup answers for every IP of that network.
+
+    The cache is bound to a database reader: when asked about a reader
+    other than the one the cache has been filled for (i.e., when the
+    database has been reloaded), it is emptied. It is also emptied
+    when it reaches `maxsize` networks.
+
+    >>> cache = GeoIPPrefixCache(maxsize=100)
+    >>> reader = object()
+    >>> cache.get(reader, '10.20.30.40')
+    (False, None)
+    >>> cache.put(reader, ipaddress.IPv4Network('10.20.0.0/16'), 'some result')
+    >>> cache.get(reader, '10.20.255.1')
+    (True, 'some result')
+    >>> cache.get(reader, '10.21.0.1')
+    (False, None)
+    >>> cache.get(object(), '10.20.255.1')    # (another reader)
+    (False, None)
+    >>> cache.get_stats() == {'hits': 1, 'misses': 3, 'hit_rate': 0.25,
+    ...                       'size': 0, 'maxsize': 100, 'invalidations': 1}
+    True
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError(f'maxsize should be a positive integer (got: {maxsize!a})')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._reader = None
+        # ((<prefix length>, <network address as int shifted right
+        # by 32 - <prefix length>>) -> <result>)
+        self._results = {}
+        # (the distinct prefix lengths of the networks being cached,
+        # i.e., usually a handful of them)
+        self._prefix_lens = []
+
+    def get(self, reader, ip):
+        """
+        Get a pair: (<whether the result is cached>, <the result or
+        None>).
+        """
+        if reader is not self._reader:
+            self._reset(reader)
+        ip_int = ipv4_to_int(ip)
+        results = self._results
+        for prefix_len in self._prefix_lens:
+            key = (prefix_len, ip_int >> (32 - prefix_len))
+            if key in results:
+                self.hits += 1
+                return True, results[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, reader, network, result):
+        if not isinstance(network, ipaddress.IPv4Network):
+            # (e.g., no network info provided)
+            return
+        if reader is not self._reader:
+            self._reset(reader)
+        if len(self._results) >= self.maxsize:
+            self._results.clear()
+            self._prefix_lens.clear()
+        prefix_len = network.prefixlen
+        self._results[prefix_len, int(network.network_address) >> (32 - prefix_len)] = result
+        if prefix_len not in self._prefix_lens:
+            self._prefix_lens.append(prefix_len)
+
+    def _reset(self, reader):
+        if self._reader is not None:
+            self.invalidations += 1
+        self._reader = reader
+        self._results.clear()
+        self._prefix_lens.clear()
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups if lookups else None),
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+            'invalidations': self.invalidations,
+        }
+
+
 class Enricher(ConfigMixin, LegacyQueuedBase):
 
     input_queue = {
@@ -51,10 +243,29 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
         asndatabasefilename = ""
         citydatabasefilename = ""
         excluded_ips = "" :: list_of_str
+        input_batch_size = 1 :: int
+        dns_concurrency = 1 :: int
+        dns_cache_size = 0 :: int
+        dns_cache_min_ttl = 30 :: int
+        dns_cache_max_ttl = 3600 :: int
+        dns_cache_negative_ttl = 30 :: int
+        geoip_prefix_cache_size = 0 :: int
+        geoip_mmap = false :: bool
+        geoip_reload_check_interval = 0 :: int
     """
 
+    # (the results which are cached as *negative* ones -- see: `DNSCache`)
+    DNS_NEGATIVE_RESULT_EXCEPTIONS = (
+        dns.resolver.NXDOMAIN,
+        dns.resolver.NoAnswer,
+        dns.resolver.NoNameservers,   # (all nameservers failed, e.g., with SERVFAIL)
+    )
+
     single_instance = False
 
+    # (see: `LegacyQueuedBase`)
+    tags_output_as_trusted_record_dicts = True
+
     #
     # Initialization
 
@@ -62,18 +273,45 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
         self.is_geodb_enabled = False
         self.gi_asn = None
         self.gi_cc = None
+        self.asn_prefix_cache = None
+        self.cc_prefix_cache = None
+        self._geodb_file_signatures = {}
+        self._next_geodb_reload_check = None
         self._resolver = None
+        self._dns_executor = None
         self._enrich_config = self.get_config_section()
         self.excluded_ips = self._get_excluded_ips()
         self._setup_geodb()
         self._setup_dnsresolver(self._enrich_config["dnshost"], self._enrich_config["dnsport"])
+        self.dns_cache = self._get_dns_cache()
+        # (see: `LegacyQueuedBase.input_batch_size` and `input_batch_callback()`)
+        self.input_batch_size = self._enrich_config["input_batch_size"]
+        self.dns_concurrency = self._enrich_config["dns_concurrency"]
         super(Enricher, self).__init__(**kwargs)
+        if self._stats is not None:
+            self._add_cache_stats_report_sections()
 
     def _get_excluded_ips(self):
         if self._enrich_config['excluded_ips']:
             return IPv4Container(*self._enrich_config['excluded_ips'])
         return None
 
+    def _add_cache_stats_report_sections(self):
+        for section_name, cache in [('dns_cache', self.dns_cache),
+                                    ('asn_prefix_cache', self.asn_prefix_cache),
+                                    ('cc_prefix_cache', self.cc_prefix_cache)]:
+            if cache is not None:
+                self._stats.add_report_section(section_name, cache.get_stats)
+
+    def _get_dns_cache(self):
+        if self._enrich_config["dns_cache_size"] > 0:
+            return DNSCache(
+                maxsize=self._enrich_config["dns_cache_size"],
+                min_ttl=self._enrich_config["dns_cache_min_ttl"],
+                max_ttl=self._enrich_config["dns_cache_max_ttl"],
+                negative_ttl=self._enrich_config["dns_cache_negative_ttl"])
+        return None
+
     def _setup_dnsresolver(self, dnshost, dnsport):
         self._resolver = dns.resolver.Resolver(configure=False)
         self._resolver.nameservers = [dnshost]
@@ -85,34 +323,225 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
             geoipdb_asn_file = self._enrich_config["asndatabasefilename"]
             geoipdb_city_file = self._enrich_config["citydatabasefilename"]
             if geoipdb_asn_file:
-                self.gi_asn = database.Reader(fileish=os.path.join(geoipdb_path, geoipdb_asn_file),
-                                              mode=maxminddb.const.MODE_MEMORY)
+                self.gi_asn = self._open_geodb('gi_asn', geoipdb_asn_file)
                 self.is_geodb_enabled = True
             if geoipdb_city_file:
-                self.gi_cc = database.Reader(fileish=os.path.join(geoipdb_path, geoipdb_city_file),
-                                             mode=maxminddb.const.MODE_MEMORY)
+                self.gi_cc = self._open_geodb('gi_cc', geoipdb_city_file)
                 self.is_geodb_enabled = True
+            if self._enrich_config["geoip_reload_check_interval"] > 0:
+                self._next_geodb_reload_check = (
+                    time.monotonic() + self._enrich_config["geoip_reload_check_interval"])
+            prefix_cache_size = self._enrich_config["geoip_prefix_cache_size"]
+            if prefix_cache_size > 0:
+                if self.gi_asn is not None:
+                    self.asn_prefix_cache = GeoIPPrefixCache(prefix_cache_size)
+                if self.gi_cc is not None:
+                    self.cc_prefix_cache = GeoIPPrefixCache(prefix_cache_size)
+
+    def _open_geodb(self, attr_name, filename):
+        # Note: in the *mmap* mode, the database file's content is not
+        # copied into the process's private memory but just mapped, so
+        # it is shared (via the OS page cache) by all processes which
+        # use that file -- in particular, by all worker processes (see:
+        # `LegacyQueuedBase.run_with_optional_workers()`).
+        path = os.path.join(self._enrich_config["geoippath"], filename)
+        # (obtained *before* opening the file, so that any update made
+        # in the meantime will be detected on the next check; but stored
+        # only *after* the file has been opened successfully, so that a
+        # failed reload will be retried on the next check)
+        signature = self._get_geodb_file_signature(path)
+        mode = (maxminddb.const.MODE_MMAP if self._enrich_config["geoip_mmap"]
+                else maxminddb.const.MODE_MEMORY)
+        reader = database.Reader(fileish=path, mode=mode)
+        if self._enrich_config["geoip_reload_check_interval"] > 0:
+            self._geodb_file_signatures[attr_name] = signature
+        return reader
+
+    @staticmethod
+    def _get_geodb_file_signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def maybe_reload_geodb(self):
+        """
+        If the configured `geoip_reload_check_interval` has elapsed
+        since the previous check, reload each GeoIP database whose file
+        has been changed or replaced in the meantime.
+
+        Called between messages, so that the processing of any event
+        uses one version of each database. A database reader is
+        swapped only after the new file has been opened successfully
+        (otherwise, the error is logged and the old reader continues
+        to be used). Note that GeoIP database files are expected to be
+        updated atomically (by renaming a complete new file to the
+        target name -- as, e.g., `geoipupdate` does).
+        """
+        if (self._next_geodb_reload_check is None
+              or time.monotonic() < self._next_geodb_reload_check):
+            return
+        for attr_name, filename in [('gi_asn', self._enrich_config["asndatabasefilename"]),
+                                    ('gi_cc', self._enrich_config["citydatabasefilename"])]:
+            old_reader = getattr(self, attr_name)
+            if old_reader is None:
+                continue
+            path = os.path.join(self._enrich_config["geoippath"], filename)
+            signature = self._get_geodb_file_signature(path)
+            if signature is None or signature == self._geodb_file_signatures[attr_name]:
+                continue
+            try:
+                new_reader = self._open_geodb(attr_name, filename)
+            except Exception:
+                LOGGER.exception('Could not reload the GeoIP database from %a '
+                                 '(still using the previously loaded one)', path)
+                continue
+            setattr(self, attr_name, new_reader)
+            old_reader.close()
+            LOGGER.info('The GeoIP database has been reloaded from %a', path)
+        self._next_geodb_reload_check = (
+            time.monotonic() + self._enrich_config["geoip_reload_check_interval"])
 
     #
     # Main activity
 
     def input_callback(self, routing_key, body, properties):
-        data = RecordDict.from_json(body)
+        self.maybe_reload_geodb()
+        data = RecordDict.from_json(body, **self.get_record_dict_from_json_kwargs(properties))
         with self.setting_error_event_info(data):
             enriched = self.enrich(data)
-            rk = replace_segment(routing_key, 1, 'enriched')
-            body = enriched.get_ready_json()
-            self.publish_output(routing_key=rk, body=body)
+            self._publish_enriched(routing_key, enriched)
+
+    def input_batch_callback(self, batch):
+        """
+        Enrich a batch of events (see: `LegacyQueuedBase.\
+        input_batch_callback()`) using `enrich_batch()`; the output
+        messages are published in the input order.
+
+        If publishing is interrupted with a `BaseException` which is
+        not an `Exception` (e.g., `KeyboardInterrupt`),
+        `InputBatchInterrupted` is raised (so that the output of the
+        messages already published is not duplicated by redelivering
+        them).
+        """
+        self.maybe_reload_geodb()
+        failures = {}
+        prepared = []
+        for i, message in enumerate(batch):
+            try:
+                data = RecordDict.from_json(
+                    message.body,
+                    **self.get_record_dict_from_json_kwargs(message.properties))
+            except Exception as exc:
+                failures[message.delivery_tag] = exc
+            else:
+                prepared.append((i, message, data))
+        results = self.enrich_batch([data for _, _, data in prepared])
+        for (i, message, data), result in zip(prepared, results):
+            if isinstance(result, Exception):
+                failures[message.delivery_tag] = result
+                continue
+            try:
+                with self._setting_current_trace(message.properties), \
+                     self.setting_error_event_info(data):
+                    self._publish_enriched(message.routing_key, result)
+            except Exception as exc:
+                failures[message.delivery_tag] = exc
+            except BaseException as exc:
+                # (`i` is the index of the message in `batch`, i.e., the
+                # number of the batch messages that precede it -- all of
+                # them have already been processed)
+                raise InputBatchInterrupted(exc, i, failures) from exc
+        return failures
+
+    def _publish_enriched(self, routing_key, data):
+        rk = replace_segment(routing_key, 1, 'enriched')
+        body = self.serialize_record_dict(data)
+        self.publish_output(routing_key=rk, body=body)
 
     def enrich(self, data):
+        enriched_keys, ip_from_url = self._enrich_fqdn(data)
+        fqdn = self._get_fqdn_to_resolve(data)
+        fqdn_ips = self.fqdn_to_ip(fqdn) if fqdn is not None else []
+        ip_to_enriched_address_keys = self._enrich_address_ips(data, ip_from_url, fqdn_ips)
+        self._enrich_address_geodata(data, enriched_keys, ip_to_enriched_address_keys)
+        return data
+
+    def enrich_batch(self, data_list):
+        """
+        Enrich the given record dicts -- with the same results as if
+        `enrich()` was called for each of them, but with the work
+        deduplicated across the whole batch: each distinct FQDN is
+        resolved once (see: `resolve_fqdns()`), and each distinct IP
+        is looked up once in each GeoIP database.
+
+        Returns a list whose items correspond to the given record dicts:
+        each is the record dict (enriched in place) or -- if enriching
+        it failed -- the exception.
+        """
+        results = list(data_list)
+        fqdn_enrichments = {}   # (index -> (enriched_keys, ip_from_url))
+        for i, data in enumerate(data_list):
+            try:
+                with self.setting_error_event_info(data):
+                    fqdn_enrichments[i] = self._enrich_fqdn(data)
+            except Exception as exc:
+                results[i] = exc
+        fqdn_to_ips = self.resolve_fqdns(
+            {fqdn for fqdn in (self._get_fqdn_to_resolve(data_list[i]) for i in fqdn_enrichments)
+             if fqdn is not None})
+        address_enrichments = {}   # (index -> ip_to_enriched_address_keys)
+        for i, (_, ip_from_url) in fqdn_enrichments.items():
+            data = data_list[i]
+            try:
+                with self.setting_error_event_info(data):
+                    fqdn = self._get_fqdn_to_resolve(data)
+                    fqdn_ips = fqdn_to_ips[fqdn] if fqdn is not None else []
+                    if isinstance(fqdn_ips, Exception):
+                        raise fqdn_ips
+                    address_enrichments[i] = self._enrich_address_ips(data, ip_from_url, fqdn_ips)
+            except Exception as exc:
+                results[i] = exc
+        ip_to_geodata = self.look_up_geodata(
+            {addr['ip'] for i in address_enrichments for addr in data_list[i].get('address', ())})
+        for i, ip_to_enriched_address_keys in address_enrichments.items():
+            data = data_list[i]
+            enriched_keys, _ = fqdn_enrichments[i]
+            try:
+                with self.setting_error_event_info(data):
+                    self._enrich_address_geodata(data, enriched_keys, ip_to_enriched_address_keys,
+                                                 ip_to_geodata)
+            except Exception as exc:
+                results[i] = exc
+        return results
+
+    def _enrich_fqdn(self, data):
         enriched_keys = []
-        ip_to_enriched_address_keys = collections.defaultdict(list)
         ip_from_url, fqdn_from_url = self._extract_ip_or_fqdn(data)
         self._maybe_set_fqdn(fqdn_from_url, data, enriched_keys)
-        self._maybe_set_address_ips(ip_from_url, data, ip_to_enriched_address_keys)
+        return enriched_keys, ip_from_url
+
+    def _get_fqdn_to_resolve(self, data):
+        # (to be called after `_enrich_fqdn()`)
+        if (not data.get('address')
+              and data.get('fqdn') is not None
+              and not data.get('_do_not_resolve_fqdn_to_ip')):
+            return data['fqdn']
+        return None
+
+    def _enrich_address_ips(self, data, ip_from_url, fqdn_ips):
+        ip_to_enriched_address_keys = collections.defaultdict(list)
+        self._maybe_set_address_ips(ip_from_url, fqdn_ips, data, ip_to_enriched_address_keys)
         if data.get('address'):
             self._filter_out_excluded_ips(data, ip_to_enriched_address_keys)
-            self._maybe_set_other_address_data(data, ip_to_enriched_address_keys)
+        return ip_to_enriched_address_keys
+
+    def _enrich_address_geodata(self, data, enriched_keys, ip_to_enriched_address_keys,
+                                ip_to_geodata=None):
+        # (`ip_to_geodata`, if given, should be a result of `look_up_geodata()`)
+        if data.get('address'):
+            self._maybe_set_other_address_data(data, ip_to_enriched_address_keys, ip_to_geodata)
         # NOTE: the `enriched` item of the record dict is set here to
         # the pair (2-tuple) whose elements are:
         #   0) a list of keys added by Enricher to the record dict
@@ -125,7 +554,6 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
         data['enriched'] = (enriched_keys, ip_to_enriched_address_keys)
         self._ensure_address_is_clean(data)
         self._final_sanity_assertions(data)  # <- can be commented out for efficiency
-        return data
 
     def _extract_ip_or_fqdn(self, data):
         ip_from_url = fqdn_from_url = None
@@ -148,15 +576,15 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
             if 'fqdn' in data:
                 enriched_keys.append('fqdn')
 
-    def _maybe_set_address_ips(self, ip_from_url, data, ip_to_enriched_address_keys):
+    def _maybe_set_address_ips(self, ip_from_url, fqdn_ips, data, ip_to_enriched_address_keys):
         if not data.get('address'):
             if data.get('fqdn') is None:
                 if ip_from_url and not self._is_no_ip_placeholder(ip_from_url):
                     data['address'] = [{'ip': ip_from_url}]
                     ip_to_enriched_address_keys[ip_from_url].append('ip')
-            elif not data.get('_do_not_resolve_fqdn_to_ip'):
+            elif fqdn_ips:
                 _address = []
-                for ip in self.fqdn_to_ip(data.get('fqdn')):
+                for ip in fqdn_ips:
                     if not self._is_no_ip_placeholder(ip):
                         _address.append({'ip': ip})
                         ip_to_enriched_address_keys[ip].append('ip')
@@ -180,16 +608,30 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
                     _address.append(addr)
             data['address'] = _address
 
-    def _maybe_set_other_address_data(self, data, ip_to_enriched_address_keys):
+    def _maybe_set_other_address_data(self, data, ip_to_enriched_address_keys,
+                                      ip_to_geodata=None):
         if self.is_geodb_enabled:
             assert 'address' in data
+            if ip_to_geodata is None:
+                asn_lookup = self.ip_to_asn
+                cc_lookup = self.ip_to_cc
+            else:
+                asn_lookup = functools.partial(self._get_looked_up_geodata, ip_to_geodata, 0)
+                cc_lookup = functools.partial(self._get_looked_up_geodata, ip_to_geodata, 1)
             for addr in data['address']:
                 # ASN
-                self._maybe_set_asn(addr, data, ip_to_enriched_address_keys)
+                self._maybe_set_asn(addr, data, ip_to_enriched_address_keys, asn_lookup)
                 # CC
-                self._maybe_set_cc(addr, data, ip_to_enriched_address_keys)
+                self._maybe_set_cc(addr, data, ip_to_enriched_address_keys, cc_lookup)
 
-    def _maybe_set_asn(self, addr, data, ip_to_enriched_address_keys):
+    @staticmethod
+    def _get_looked_up_geodata(ip_to_geodata, item_index, ip):
+        value = ip_to_geodata[ip][item_index]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def _maybe_set_asn(self, addr, data, ip_to_enriched_address_keys, asn_lookup):
         if self.gi_asn is not None:
             ip = addr['ip']
             existing_asn = addr.pop('asn', None)
@@ -204,12 +646,12 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
                         data['source'],
                         data['id'],
                         data['rid'])
-            asn = self.ip_to_asn(ip)
+            asn = asn_lookup(ip)
             if asn:
                 addr['asn'] = asn
                 ip_to_enriched_address_keys[ip].append('asn')
 
-    def _maybe_set_cc(self, addr, data, ip_to_enriched_address_keys):
+    def _maybe_set_cc(self, addr, data, ip_to_enriched_address_keys, cc_lookup):
         if self.gi_cc is not None:
             ip = addr['ip']
             existing_cc = addr.pop('cc', None)
@@ -224,7 +666,7 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
                         data['source'],
                         data['id'],
                         data['rid'])
-            cc = self.ip_to_cc(ip)
+            cc = cc_lookup(ip)
             if cc:
                 addr['cc'] = cc
                 ip_to_enriched_address_keys[ip].append('cc')
@@ -268,44 +710,130 @@ class Enricher(ConfigMixin, LegacyQueuedBase):
         return hostname
 
     def fqdn_to_ip(self, fqdn):
+        if self.dns_cache is not None:
+            cached_ips = self.dns_cache.get(fqdn)
+            if cached_ips is not None:
+                return cached_ips
         try:
             dns_result = self._resolver.resolve(fqdn, 'A', search=True)
-        except DNSException:
+        except DNSException as exc:
+            if (self.dns_cache is not None
+                  and isinstance(exc, self.DNS_NEGATIVE_RESULT_EXCEPTIONS)):
+                self.dns_cache.put_negative(fqdn)
             return []
         ip_set = set()
         for res in dns_result:
             ip = str(res)
             ip_normalized = ipv4_to_str(ip)  # (typically unnecessary, but does not hurt...)
             ip_set.add(ip_normalized)
-        return sorted(ip_set)
+        ips = sorted(ip_set)
+        if self.dns_cache is not None:
+            rrset = getattr(dns_result, 'rrset', None)
+            self.dns_cache.put(fqdn, ips, ttl=(rrset.ttl if rrset is not None else None))
+        return ips
+
+    def resolve_fqdns(self, fqdns):
+        """
+        Resolve the given FQDNs (see: `fqdn_to_ip()`) -- keeping up to
+        `dns_concurrency` queries in flight at once.
+
+        Returns a dict that maps each of the FQDNs to a list of IPs or
+        -- if the resolution failed unexpectedly (i.e., not because of
+        a `DNSException`) -- to the exception.
+        """
+        fqdns = sorted(fqdns)
+        if self.dns_concurrency > 1 and len(fqdns) > 1:
+            executor = self._get_dns_executor()
+            futures = [executor.submit(self.fqdn_to_ip, fqdn) for fqdn in fqdns]
+            results = [future.exception() or future.result() for future in futures]
+        else:
+            results = []
+            for fqdn in fqdns:
+                try:
+                    results.append(self.fqdn_to_ip(fqdn))
+                except Exception as exc:
+                    results.append(exc)
+        return dict(zip(fqdns, results))
+
+    def _get_dns_executor(self):
+        # (created lazily -- so that, if `--n6workers` is used, the
+        # threads are started in the worker processes, not forked)
+        if self._dns_executor is None:
+            self._dns_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.dns_concurrency,
+                thread_name_prefix='n6enrich-dns')
+        return self._dns_executor
+
+    def look_up_geodata(self, ips):
+        """
+        Look up the given IPs in the GeoIP databases (see: `ip_to_asn()`
+        and `ip_to_cc()`), each IP once.
+
+        Returns a dict that maps each of the IPs to a pair: (<ASN or
+        None>, <CC or None>), where any of the two items may also be
+        the exception raised by the respective lookup.
+        """
+        ip_to_geodata = {}
+        for ip in ips:
+            asn = cc = None
+            if self.gi_asn is not None:
+                try:
+                    asn = self.ip_to_asn(ip)
+                except Exception as exc:
+                    asn = exc
+            if self.gi_cc is not None:
+                try:
+                    cc = self.ip_to_cc(ip)
+                except Exception as exc:
+                    cc = exc
+            ip_to_geodata[ip] = (asn, cc)
+        return ip_to_geodata
 
     def ip_to_asn(self, ip):
         assert self.gi_asn is not None
+        reader = self.gi_asn
+        cache = self.asn_prefix_cache
+        if cache is not None:
+            is_cached, asn = cache.get(reader, ip)
+            if is_cached:
+                return asn
         try:
-            geoip_asn = self.gi_asn.asn(ip)
-        except errors.GeoIP2Error:
+            geoip_asn = reader.asn(ip)
+        except errors.GeoIP2Error as exc:
             LOGGER.info("%a cannot be resolved by GeoIP (to ASN)", ip)
+            if cache is not None and isinstance(exc, errors.AddressNotFoundError):
+                cache.put(reader, exc.network, None)
             return None
-        return geoip_asn.autonomous_system_number
+        asn = geoip_asn.autonomous_system_number
+        if cache is not None:
+            cache.put(reader, geoip_asn.network, asn)
+        return asn
 
     def ip_to_cc(self, ip):
         assert self.gi_cc is not None
+        reader = self.gi_cc
+        cache = self.cc_prefix_cache
+        if cache is not None:
+            is_cached, cc = cache.get(reader, ip)
+            if is_cached:
+                return cc
         try:
-            geoip_city = self.gi_cc.city(ip)
-        except errors.GeoIP2Error:
+            geoip_city = reader.city(ip)
+        except errors.GeoIP2Error as exc:
             LOGGER.info("%a cannot be resolved by GeoIP (to CC)", ip)
+            if cache is not None and isinstance(exc, errors.AddressNotFoundError):
+                cache.put(reader, exc.network, None)
             return None
-        return geoip_city.country.iso_code
+        cc = geoip_city.country.iso_code
+        if cache is not None:
+            cache.put(reader, geoip_city.traits.network, cc)
+        return cc
 
 
 def main():
     with logging_configured():
         enricher = Enricher()
-        try:
-            enricher.run()
-        except KeyboardInterrupt:
-            enricher.stop()
-            raise
+        enricher.run_with_optional_workers()
 
 
 if __name__ == "__main__":
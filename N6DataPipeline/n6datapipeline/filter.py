@@ -46,6 +46,14 @@ class Filter(ConfigMixin, LegacyQueuedBase):
 
     single_instance = False
 
+    # (the processing time of an event varies a lot -- depending on the
+    # Auth API data and the event's content -- so a fixed prefetch
+    # count is either too low or too high; see: `LegacyQueuedBase`)
+    adaptive_flow_control = True
+
+    # (see: `LegacyQueuedBase`)
+    tags_output_as_trusted_record_dicts = True
+
     def __init__(self, **kwargs):
         LOGGER.info("Filter Start")
         self.auth_api = AuthAPI()
@@ -53,18 +61,31 @@ class Filter(ConfigMixin, LegacyQueuedBase):
         self.fqdn_only_categories = frozenset(self.config['categories_filtered_through_fqdn_only'])
         super().__init__(**kwargs)
 
+    def prepare_for_forking_workers(self):
+        super().prepare_for_forking_workers()
+        # (let the worker processes share the already prepared resolvers)
+        with self.auth_api:
+            self.auth_api.get_inside_criteria_resolver()
+            self.auth_api.get_ignore_lists_criteria_resolver()
+        self.auth_api.dispose_db_connection_pool()
+
     def input_callback(self, routing_key, body, properties):
-        record_dict = RecordDict.from_json(body)
+        record_dict = RecordDict.from_json(
+            body, **self.get_record_dict_from_json_kwargs(properties))
         with self.setting_error_event_info(record_dict):
-            client, urls_matched = self.get_client_and_urls_matched(
-                record_dict,
-                self.fqdn_only_categories)
-            record_dict['client'] = client
-            if urls_matched:
-                record_dict['urls_matched'] = urls_matched
-            record_dict['ignored'] = self.should_be_ignored(record_dict)
+            self.filter_record_dict(record_dict)
             self.publish_event(record_dict, routing_key)
 
+    def filter_record_dict(self, record_dict):
+        client, urls_matched = self.get_client_and_urls_matched(
+            record_dict,
+            self.fqdn_only_categories)
+        record_dict['client'] = client
+        if urls_matched:
+            record_dict['urls_matched'] = urls_matched
+        record_dict['ignored'] = self.should_be_ignored(record_dict)
+        return record_dict
+
     def get_client_and_urls_matched(self, record_dict, fqdn_only_categories):
         resolver = self.auth_api.get_inside_criteria_resolver()
         client_org_ids, urls_matched = resolver.get_client_org_ids_and_urls_matched(
@@ -87,18 +108,14 @@ class Filter(ConfigMixin, LegacyQueuedBase):
                 The *input* routing key.
         """
         output_rk = replace_segment(rk, 1, 'filtered')
-        body = data.get_ready_json()
+        body = self.serialize_record_dict(data)
         self.publish_output(routing_key=output_rk, body=body)
 
 
 def main():
     with logging_configured():
         d = Filter()
-        try:
-            d.run()
-        except KeyboardInterrupt:
-            d.stop()
-            raise
+        d.run_with_optional_workers()
 
 
 if __name__ == "__main__":
@@ -61,7 +61,8 @@ class IntelMQAdapter(LegacyQueuedBase):
                        routing_key: str,
                        body: bytes,
                        properties: pika.BasicProperties) -> None:
-        for converted in self.converter(body, routing_key).convert():
+        content_type = getattr(properties, 'content_type', None)
+        for converted in self.converter(body, routing_key, content_type).convert():
             rk = self.get_output_rk(routing_key)
             self.publish_output(routing_key=rk, body=converted)
 
@@ -6,7 +6,8 @@ between N6 and IntelMQ Systems.
 
 Usage:
 n6_to_intel_converter = N6ToIntelConverter
-message <str-JSON> = n6_to_intel_converter(n6_message: bytes, routing_key: str).convert()
+message <str-JSON> = n6_to_intel_converter(n6_message: bytes, routing_key: str,
+                                           content_type: Optional[str]).convert()
 
 intel_to_n6_converter = IntelToN6Converter
 n6_message <str-JSON> = intel_to_n6_converter(intelmq_message: bytes, routing_key: str).convert()
@@ -31,6 +32,7 @@ from typing import (
     Generator,
     MutableMapping,
     MutableSequence,
+    Optional,
     Union,
 )
 from unittest.mock import Mock
@@ -44,7 +46,10 @@ from n6datasources.collectors.base import BaseCollector
 from n6lib.common_helpers import ascii_str
 from n6lib.const import EVENT_TYPE_ENUMS
 from n6lib.data_spec import FieldValueError
-from n6lib.record_dict import RecordDict
+from n6lib.record_dict import (
+    RecordDict,
+    load_record_dict_data,
+)
 from n6lib.unit_test_helpers import MethodProxy
 
 
@@ -298,17 +303,25 @@ class BaseConverter:
 
     webinput_routing_state = 'intelmq-webinput-csv'
 
-    def __init__(self, source_data: bytes, routing_key: str) -> None:
+    def __init__(self,
+                 source_data: bytes,
+                 routing_key: str,
+                 content_type: Optional[str] = None) -> None:
         """
         Args:
-            source_data: bytes (JSON)
+            source_data: bytes (JSON or MessagePack)
                 Input data fetched from the pipeline.
             routing_key: str
                 The "routing key" of incoming message.
+            content_type: str or None
+                The "content type" of incoming message (if it
+                is `n6lib.record_dict.MSGPACK_CONTENT_TYPE`,
+                `source_data` is deserialized from MessagePack,
+                otherwise -- from JSON).
         """
         self._input_routing_key = routing_key
         self._raw_data = source_data
-        self._parsed_data = self._get_parsed_data(source_data)
+        self._parsed_data = self._get_parsed_data(source_data, content_type)
         self._extra_data = {}
         self._output_dict = self._get_output_dict()
         self._address_list = []
@@ -349,8 +362,9 @@ class BaseConverter:
             yield self._dump_output_data(output_data)
 
     @staticmethod
-    def _get_parsed_data(source_data: Union[bytes, str]) -> dict:
-        return json.loads(source_data)
+    def _get_parsed_data(source_data: Union[bytes, str],
+                         content_type: Optional[str] = None) -> dict:
+        return load_record_dict_data(source_data, content_type)
 
     def _get_output_dict(self) -> MutableMapping:
         return dict()
@@ -40,6 +40,8 @@ from n6lib.data_backend_api import (
 from n6lib.data_spec.fields import SourceField
 from n6lib.datetime_helpers import parse_iso_datetime_to_utc
 from n6lib.db_events import (
+    CLIENT_TO_EVENT_BULK_INSERT,
+    EVENT_BULK_INSERT,
     n6ClientToEvent,
     n6NormalizedData,
 )
@@ -144,6 +146,13 @@ class Recorder(LegacyQueuedBase):
         "exchange_type": "topic",
     }
 
+    # (when the database is slow, the prefetch count is decreased --
+    # so that not too many messages wait in memory; see: `LegacyQueuedBase`)
+    adaptive_flow_control = True
+
+    # (see: `LegacyQueuedBase`)
+    tags_output_as_trusted_record_dicts = True
+
     def __init__(self, **kwargs):
         LOGGER.info("Recorder Start")
         config = Config(required={"recorder": ("uri",)})
@@ -465,35 +474,51 @@ class Recorder(LegacyQueuedBase):
         return '.'.join(parts_rk)
 
     def input_callback(self, routing_key, body, properties):
+        self._clear_event_handling_state()
+        try:
+            self._input_callback(routing_key, body, properties)
+        except Exception as exc:
+            self._exit_if_fatal_db_api_error(exc)
+            raise
+
+    def _clear_event_handling_state(self):
         self.record_dict = None
         self.records = None
         self.routing_key = None
         self.integrity_error_occurred = None
         self.inserting = False
-        try:
-            self._input_callback(routing_key, body, properties)
-        except Exception as exc:
-            error_code = self._get_db_api_error_code(exc)
-            if error_code in self._fatal_db_api_error_codes:
-                raise SystemExit(
-                    f'Fatal DB API error code: {error_code!a} '
-                    f'(from {make_exc_ascii_str(exc)})') from exc
-            raise
+
+    def _exit_if_fatal_db_api_error(self, exc):
+        error_code = self._get_db_api_error_code(exc)
+        if error_code in self._fatal_db_api_error_codes:
+            raise SystemExit(
+                f'Fatal DB API error code: {error_code!a} '
+                f'(from {make_exc_ascii_str(exc)})') from exc
 
     def _input_callback(self, routing_key, body, properties):
         """ Channel callback method """
         # first let's try ping mysql server
         self.ping_connection()
-        self.records = {'event': [], 'client': []}
-        self.routing_key = routing_key
 
         # take the first two parts of the routing key
-        truncated_rk = self.get_truncated_rk(self.routing_key, 2)
+        truncated_rk = self.get_truncated_rk(routing_key, 2)
 
         # run BLRecordDict.from_json() or RecordDict.from_json()
         # depending on the routing key
         from_json = self.dict_map_fun[truncated_rk][self.FROM_JSON]
-        self.record_dict = from_json(body)
+        record_dict = from_json(body, **self.get_record_dict_from_json_kwargs(properties))
+        self._handle_record_dict(routing_key, truncated_rk, record_dict)
+
+        assert 'source' in self.record_dict
+        self.record_trace_latency(self.record_dict['source'])
+        LOGGER.debug("source: %a", self.record_dict['source'])
+        LOGGER.debug("properties: %a", properties)
+        #LOGGER.debug("body: %a", body)
+
+    def _handle_record_dict(self, routing_key, truncated_rk, record_dict):
+        self.records = {'event': [], 'client': []}
+        self.routing_key = routing_key
+        self.record_dict = record_dict
         # add modified time, set microseconds to 0, because the database
         #  does not have microseconds, and it is not known if the base is not rounded
         self.record_dict['modified'] = datetime.datetime.utcnow().replace(microsecond=0)
@@ -502,10 +527,69 @@ class Recorder(LegacyQueuedBase):
         with self.setting_error_event_info(self.record_dict):
             handle_event()
 
-        assert 'source' in self.record_dict
-        LOGGER.debug("source: %a", self.record_dict['source'])
-        LOGGER.debug("properties: %a", properties)
-        #LOGGER.debug("body: %a", body)
+    def record_new_events(self, routing_key_and_record_dict_pairs):
+        """
+        Add a batch of new (non-blacklist) events to n6 database.
+
+        Args:
+            `routing_key_and_record_dict_pairs`:
+                A list of (<routing key>, <RecordDict instance>) pairs;
+                each routing key should be in the format:
+                `event.filtered.<source provider>.<source channel>`.
+
+        All database rows are inserted in one transaction, with one
+        `executemany()` call per table, without creating any ORM objects
+        (see: `n6lib.record_dict.RecordDict.iter_db_rows()`). If that
+        fails (typically, because some of the events have already been
+        recorded, so an integrity error occurs), the events are recorded
+        one by one, in the standard way; then any failure concerning a
+        particular event is just logged (the event is skipped).
+
+        This method is not used by the standard Recorder machinery; it
+        is intended to be used by tools that pass record dicts directly
+        to the recorder, without AMQP (see, e.g.:
+        `n6datapipeline.aux.fused_pipeline`).
+        """
+        self._clear_event_handling_state()
+        self.ping_connection()
+        modified = datetime.datetime.utcnow().replace(microsecond=0)
+        event_rows = []
+        client_rows = []
+        try:
+            for routing_key, record_dict in routing_key_and_record_dict_pairs:
+                assert self.get_truncated_rk(routing_key, 2) == 'event.filtered'
+                record_dict['modified'] = modified
+                event_rows.extend(record_dict.iter_db_rows())
+                client_rows.extend(record_dict.iter_client_db_rows())
+            LOGGER.debug("insert new events (batch), count.: %a",
+                         len(event_rows) + len(client_rows))
+            with transact:
+                self.insert_new_event_db_rows(event_rows, client_rows)
+        except Exception as exc:
+            self._exit_if_fatal_db_api_error(exc)
+            LOGGER.warning("could not insert a batch of %a events at once (%s), "
+                           "so they will be recorded one by one",
+                           len(routing_key_and_record_dict_pairs), make_exc_ascii_str(exc))
+            self._record_new_events_one_by_one(routing_key_and_record_dict_pairs)
+        else:
+            if not self.cmdline_args.n6recovery:
+                for routing_key, record_dict in routing_key_and_record_dict_pairs:
+                    self.routing_key = routing_key
+                    self.record_dict = record_dict
+                    self.publish_as_recorded()
+        finally:
+            self._clear_event_handling_state()
+
+    def _record_new_events_one_by_one(self, routing_key_and_record_dict_pairs):
+        for routing_key, record_dict in routing_key_and_record_dict_pairs:
+            self._clear_event_handling_state()
+            try:
+                self._handle_record_dict(routing_key, 'event.filtered', record_dict)
+            except Exception as exc:
+                self._exit_if_fatal_db_api_error(exc)
+                LOGGER.error("could not record event %a: %s",
+                             record_dict.get('id'), make_exc_ascii_str(exc),
+                             exc_info=True)
 
     @staticmethod
     def _get_db_api_error_code(exc):
@@ -539,6 +623,13 @@ class Recorder(LegacyQueuedBase):
         self.session_db.add_all(items)
         self.inserting = True
 
+    def insert_new_event_db_rows(self, event_rows, client_rows):
+        assert transact.is_entered
+        connection = self.session_db.connection()
+        EVENT_BULK_INSERT.execute(connection, event_rows)
+        CLIENT_TO_EVENT_BULK_INSERT.execute(connection, client_rows)
+        self.inserting = True
+
     def publish_as_recorded(self):
         assert self.record_dict is not None
         rk = replace_segment(self.routing_key, 1, 'recorded')
@@ -556,7 +647,7 @@ class Recorder(LegacyQueuedBase):
             `data`: data from recorddict
             `rk`  : routing key
         """
-        body = data.get_ready_json()
+        body = self.serialize_record_dict(data)
         self.publish_output(routing_key=rk, body=body)
 
     def new_event(self, _is_blacklist=False):
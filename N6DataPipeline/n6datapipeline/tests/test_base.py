@@ -0,0 +1,1112 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import collections
+import signal
+import unittest
+from unittest.mock import (
+    MagicMock,
+    call,
+    sentinel as sen,
+)
+
+import pika.spec
+
+from n6datapipeline.base import (
+    InputBatchInterrupted,
+    InputMessage,
+    LegacyQueuedBase,
+    n6AMQPCommunicationError,
+)
+from n6lib.auth_api import AuthAPICommunicationError
+from n6lib.config import ConfigError
+from n6lib.record_dict import (
+    MSGPACK_CONTENT_TYPE,
+    RECORD_DICT_WIRE_FORMATS,
+    TRUST_TAG_HEADER,
+    RecordDictTrust,
+)
+from n6lib.unit_test_helpers import (
+    AnyCallableNamed,
+    TestCaseMixin,
+)
+
+
+class _ExampleComponent(LegacyQueuedBase):
+
+    input_queue = {
+        'exchange': 'event',
+        'exchange_type': 'topic',
+        'queue_name': 'example',
+        'binding_keys': ['*.*.*.*'],
+    }
+    output_queue = {
+        'exchange': 'event',
+        'exchange_type': 'topic',
+    }
+
+    def input_callback(self, routing_key, body, properties):
+        if body.startswith(b'ERR'):
+            raise ValueError(body)
+        if body.startswith(b'AUTH-ERR'):
+            raise AuthAPICommunicationError(body)
+        if body.startswith(b'INTERRUPT'):
+            raise KeyboardInterrupt
+        self.handled.append((routing_key, body, properties))
+
+
+class _ExampleMultiInstanceComponent(_ExampleComponent):
+
+    single_instance = False
+
+
+class _ExamplePublishingComponent(_ExampleComponent):
+
+    def input_callback(self, routing_key, body, properties):
+        super().input_callback(routing_key, body, properties)
+        for _ in range(body.count(b'+')):
+            self.publish_output(routing_key, body)
+
+
+class _ExampleAdaptiveComponent(_ExampleComponent):
+
+    adaptive_flow_control = True
+
+
+class _ExampleIterativelyPublishingComponent(_ExampleComponent):
+
+    input_queue = None
+    iterative_publishing_backpressure_aware = True
+    iterative_publishing_backpressure_buffer_size_threshold = 1000
+
+    def publish_iteratively(self):
+        for body in self.to_publish:
+            self.publish_output('foo.bar', body)
+            yield
+
+
+class _ComponentTestMixin(TestCaseMixin):
+
+    def setUp(self):
+        self.patch_argparse_stuff()
+        self.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict',
+                   return_value={'heartbeat_interval': 30})
+        self.component = self.make_component()
+
+    def make_component(self, component_class=_ExampleComponent, **attrs):
+        component = component_class()
+        component.handled = []
+        component._connection = MagicMock()
+        component._channel_in = MagicMock(is_open=True)
+        component._channel_out = MagicMock()
+        component.output_ready = True
+        vars(component).update(attrs)
+        return component
+
+    @staticmethod
+    def deliver(component, delivery_tag, body, routing_key='event.parsed.foo.bar'):
+        basic_deliver = MagicMock(delivery_tag=delivery_tag, routing_key=routing_key)
+        component.on_message(sen.channel, basic_deliver, sen.properties, body)
+
+
+class TestLegacyQueuedBase__on_message(_ComponentTestMixin, unittest.TestCase):
+
+    def test_message_processed_and_acked(self):
+        self.deliver(self.component, 1, b'foo')
+
+        self.assertEqual(self.component.handled, [
+            ('event.parsed.foo.bar', b'foo', sen.properties),
+        ])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1),
+        ])
+
+    def test_failed_message_nacked(self):
+        self.deliver(self.component, 1, b'ERR')
+
+        self.assertEqual(self.component.handled, [])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(1, multiple=False, requeue=False),
+        ])
+
+
+class TestLegacyQueuedBase__micro_batched_consumption(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.component.input_batch_size = 3
+
+    def test_batch_processed_when_full_and_acked_at_once(self):
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'bar')
+
+        self.assertEqual(self.component.handled, [])
+        self.assertEqual(self.component._channel_in.mock_calls, [])
+        self.assertEqual(self.component._connection.add_timeout.call_count, 1)
+
+        self.deliver(self.component, 3, b'baz')
+
+        self.assertEqual([body for _, body, _ in self.component.handled],
+                         [b'foo', b'bar', b'baz'])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(3, multiple=True),
+        ])
+        self.component._connection.remove_timeout.assert_called_once_with(
+            self.component._connection.add_timeout.return_value)
+        self.assertEqual(self.component._input_batch, [])
+
+    def test_incomplete_batch_processed_when_max_wait_expired(self):
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'bar')
+        [(delay, timeout_callback), _] = self.component._connection.add_timeout.call_args
+
+        self.assertEqual(delay, self.component.input_batch_max_wait)
+
+        timeout_callback()
+
+        self.assertEqual([body for _, body, _ in self.component.handled],
+                         [b'foo', b'bar'])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(2, multiple=True),
+        ])
+        self.component._connection.remove_timeout.assert_not_called()
+
+    def test_failed_messages_nacked_individually_before_batch_ack(self):
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'ERR')
+        self.deliver(self.component, 3, b'bar')
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(2, multiple=False, requeue=False),
+            call.basic_ack(3, multiple=True),
+        ])
+
+    def test_failed_last_message(self):
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'bar')
+        self.deliver(self.component, 3, b'ERR')
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(3, multiple=False, requeue=False),
+            call.basic_ack(2, multiple=True),
+        ])
+
+    def test_whole_batch_failed(self):
+        self.component.input_batch_callback = MagicMock(side_effect=ValueError)
+
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'bar')
+        self.deliver(self.component, 3, b'baz')
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(1, multiple=False, requeue=False),
+            call.basic_nack(2, multiple=False, requeue=False),
+            call.basic_nack(3, multiple=False, requeue=False),
+        ])
+
+    def test_batch_requeued_on_base_exception(self):
+        self.component.input_batch_callback = MagicMock(side_effect=KeyboardInterrupt)
+
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'bar')
+        with self.assertRaises(KeyboardInterrupt):
+            self.deliver(self.component, 3, b'baz')
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(1, multiple=False, requeue=True),
+            call.basic_nack(2, multiple=False, requeue=True),
+            call.basic_nack(3, multiple=False, requeue=True),
+        ])
+
+    def test_batch_interrupted_by_auth_api_error(self):
+        self.deliver(self.component, 1, b'ERR')
+        self.deliver(self.component, 2, b'foo')
+        with self.assertRaises(SystemExit) as exc_context:
+            self.deliver(self.component, 3, b'AUTH-ERR')
+
+        self.assertIsInstance(exc_context.exception.code, AuthAPICommunicationError)
+        self.assertEqual([body for _, body, _ in self.component.handled], [b'foo'])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(1, multiple=False, requeue=False),
+            call.basic_ack(2, multiple=True),
+            call.basic_nack(3, multiple=False, requeue=True),
+        ])
+
+    def test_batch_interrupted_by_base_exception_in_midst(self):
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'INTERRUPT')
+        with self.assertRaises(KeyboardInterrupt):
+            self.deliver(self.component, 3, b'bar')
+
+        self.assertEqual([body for _, body, _ in self.component.handled], [b'foo'])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1, multiple=True),
+            call.basic_nack(2, multiple=False, requeue=True),
+            call.basic_nack(3, multiple=False, requeue=True),
+        ])
+
+    def test_batch_interrupted_before_first_message_processed(self):
+        self.deliver(self.component, 1, b'AUTH-ERR')
+        self.deliver(self.component, 2, b'foo')
+        with self.assertRaises(SystemExit):
+            self.deliver(self.component, 3, b'bar')
+
+        self.assertEqual(self.component.handled, [])
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_nack(1, multiple=False, requeue=True),
+            call.basic_nack(2, multiple=False, requeue=True),
+            call.basic_nack(3, multiple=False, requeue=True),
+        ])
+
+    def test_input_batch_callback_raises_input_batch_interrupted(self):
+        batch = [
+            InputMessage(1, 'event.parsed.foo.bar', b'ERR', sen.properties),
+            InputMessage(2, 'event.parsed.foo.bar', b'AUTH-ERR', sen.properties),
+            InputMessage(3, 'event.parsed.foo.bar', b'foo', sen.properties),
+        ]
+
+        with self.assertRaises(InputBatchInterrupted) as exc_context:
+            self.component.input_batch_callback(batch)
+
+        interrupted = exc_context.exception
+        self.assertIsInstance(interrupted.cause, AuthAPICommunicationError)
+        self.assertIs(interrupted.__cause__, interrupted.cause)
+        self.assertEqual(interrupted.processed_count, 1)
+        self.assertEqual(list(interrupted.failures), [1])
+        self.assertIsInstance(interrupted.failures[1], ValueError)
+
+    def test_custom_input_batch_callback_gets_input_messages(self):
+        self.component.input_batch_callback = MagicMock(return_value={})
+
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'bar')
+        self.deliver(self.component, 3, b'baz')
+
+        [batch], _ = self.component.input_batch_callback.call_args
+        self.assertEqual(batch, [
+            InputMessage(1, 'event.parsed.foo.bar', b'foo', sen.properties),
+            InputMessage(2, 'event.parsed.foo.bar', b'bar', sen.properties),
+            InputMessage(3, 'event.parsed.foo.bar', b'baz', sen.properties),
+        ])
+
+    def test_pending_batch_discarded_on_inner_stop(self):
+        self.deliver(self.component, 1, b'foo')
+
+        self.component.inner_stop()
+
+        self.assertEqual(self.component.handled, [])
+        self.assertEqual(self.component._input_batch, [])
+        self.assertNotIn(call.basic_ack(1, multiple=True),
+                         self.component._channel_in.mock_calls)
+        self.component._connection.remove_timeout.assert_called_once_with(
+            self.component._connection.add_timeout.return_value)
+
+
+class TestLegacyQueuedBase__publisher_confirms(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.component = self.make_component(_ExamplePublishingComponent,
+                                             publisher_confirms=True)
+        self.component._declared_output_exchanges.add('event')
+        self.component.enable_publisher_confirms()
+        self.component._channel_out.reset_mock()
+
+    def confirm(self, seq_no, multiple=False, method_class=pika.spec.Basic.Ack):
+        method_frame = MagicMock()
+        method_frame.method = method_class(delivery_tag=seq_no, multiple=multiple)
+        self.component.on_delivery_confirmation(method_frame)
+
+    def test_confirm_delivery_enabled(self):
+        component = self.make_component(_ExamplePublishingComponent, publisher_confirms=True)
+
+        component.enable_publisher_confirms()
+
+        component._channel_out.confirm_delivery.assert_called_once_with(
+            component.on_delivery_confirmation)
+
+    def test_message_without_output_acked_immediately(self):
+        self.deliver(self.component, 1, b'foo')
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1),
+        ])
+
+    def test_ack_deferred_until_output_confirmed(self):
+        self.deliver(self.component, 1, b'foo++')
+
+        self.assertEqual(self.component._channel_out.basic_publish.call_count, 2)
+        self.assertEqual(self.component._channel_in.mock_calls, [])
+
+        self.confirm(1)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [])
+
+        self.confirm(2)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1),
+        ])
+        self.assertEqual(self.component._unconfirmed_publish_seq_nos, {})
+
+    def test_acks_released_in_delivery_order(self):
+        self.deliver(self.component, 1, b'foo+')
+        self.deliver(self.component, 2, b'bar+')
+        self.deliver(self.component, 3, b'baz')
+
+        self.confirm(2)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [])
+
+        self.confirm(1)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1),
+            call.basic_ack(2),
+            call.basic_ack(3),
+        ])
+
+    def test_multiple_confirmation(self):
+        self.deliver(self.component, 1, b'foo+')
+        self.deliver(self.component, 2, b'bar++')
+        self.deliver(self.component, 3, b'baz+')
+
+        self.confirm(3, multiple=True)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1),
+            call.basic_ack(2),
+        ])
+        self.assertEqual(list(self.component._unconfirmed_publish_seq_nos), [4])
+
+    def test_nacked_output_causes_requeue(self):
+        self.deliver(self.component, 1, b'foo+')
+        self.deliver(self.component, 2, b'bar+')
+
+        self.confirm(1)
+        self.confirm(2, method_class=pika.spec.Basic.Nack)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(1),
+            call.basic_nack(2, multiple=False, requeue=True),
+        ])
+        self.assertTrue(self.component._publish_nacked_by_broker)
+
+    def test_batch_ack_deferred_until_output_confirmed(self):
+        self.component.input_batch_size = 2
+
+        self.deliver(self.component, 1, b'foo+')
+        self.deliver(self.component, 2, b'bar+')
+
+        self.assertEqual(self.component._channel_in.mock_calls, [])
+
+        self.confirm(2, multiple=True)
+
+        self.assertEqual(self.component._channel_in.mock_calls, [
+            call.basic_ack(2, multiple=True),
+        ])
+
+    def test_pending_acks_dropped_on_connection_closed(self):
+        self.deliver(self.component, 1, b'foo+')
+
+        self.component.on_connection_closed(sen.connection, 200, 'Normal shutdown')
+
+        self.assertEqual(list(self.component._pending_acks), [])
+
+    def test_iter_until_publishes_confirmed(self):
+        self.deliver(self.component, 1, b'foo++')
+        waiting = self.component._iter_until_publishes_confirmed(max_unconfirmed=1)
+
+        next(waiting)
+        self.confirm(1)
+
+        with self.assertRaises(StopIteration):
+            next(waiting)
+
+    def test_iter_until_publishes_confirmed_raises_if_nacked(self):
+        self.deliver(self.component, 1, b'foo+')
+        waiting = self.component._iter_until_publishes_confirmed()
+
+        next(waiting)
+        self.confirm(1, method_class=pika.spec.Basic.Nack)
+
+        with self.assertRaises(n6AMQPCommunicationError):
+            next(waiting)
+
+        self.assertFalse(self.component._publish_nacked_by_broker)
+        self.deliver(self.component, 2, b'bar+')
+        waiting = self.component._iter_until_publishes_confirmed()
+        next(waiting)
+        self.confirm(2)
+
+        with self.assertRaises(StopIteration):
+            next(waiting)
+
+    def test_consuming_paused_while_confirms_window_full(self):
+        self.component.publisher_confirms_window = 4
+        self.component._consumer_tag = sen.consumer_tag
+
+        self.deliver(self.component, 1, b'foo++')
+        self.deliver(self.component, 2, b'bar+')
+
+        self.assertFalse(self.component._consuming_paused)
+        self.component._channel_in.basic_cancel.assert_not_called()
+
+        self.deliver(self.component, 3, b'baz+')
+
+        self.assertTrue(self.component._consuming_paused)
+        self.component._channel_in.basic_cancel.assert_called_once_with(
+            self.component._on_consuming_paused, sen.consumer_tag)
+
+        self.deliver(self.component, 4, b'spam+')
+        self.confirm(1)
+
+        self.assertTrue(self.component._consuming_paused)
+        self.assertEqual(self.component._channel_in.basic_cancel.call_count, 1)
+        self.component._channel_in.basic_consume.assert_not_called()
+
+        self.confirm(3, multiple=True)
+
+        self.assertFalse(self.component._consuming_paused)
+        self.component._channel_in.basic_consume.assert_called_once_with(
+            self.component.on_message, 'example', exclusive=True)
+        self.assertEqual(self.component._channel_in.basic_ack.mock_calls, [
+            call(1),
+            call(2),
+        ])
+
+    def test_consuming_not_paused_when_no_consumer(self):
+        self.component.publisher_confirms_window = 1
+
+        self.deliver(self.component, 1, b'foo+')
+
+        self.assertTrue(self.component._publisher_confirms_window_full)
+        self.assertFalse(self.component._consuming_paused)
+        self.component._channel_in.basic_cancel.assert_not_called()
+
+        self.confirm(1)
+
+        self.assertFalse(self.component._publisher_confirms_window_full)
+        self.component._channel_in.basic_consume.assert_not_called()
+
+
+class TestLegacyQueuedBase__worker_pool(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.signal_handlers = {}
+        self.patch('n6datapipeline.base.signal.signal',
+                   side_effect=lambda signum, handler: self.signal_handlers.setdefault(
+                       signum, handler))
+        self.fork = self.patch('n6datapipeline.base.os.fork')
+        self.wait = self.patch('n6datapipeline.base.os.wait')
+        self.kill = self.patch('n6datapipeline.base.os.kill')
+        self.exit = self.patch('n6datapipeline.base.os._exit')
+        self.sleep = self.patch('n6datapipeline.base.time.sleep')
+        self.restart_amqp_logging = self.patch(
+            'n6datapipeline.base.restart_amqp_logging_after_fork')
+        self.patch('n6datapipeline.base.logging.shutdown')
+
+    def make_multi_instance_component(self, *cmdline_args):
+        self.patch_argparse_stuff(cmdline_args)
+        component = self.make_component(_ExampleMultiInstanceComponent)
+        component.run = MagicMock()
+        component.stop = MagicMock()
+        return component
+
+    def test_n6workers_option_not_available_for_single_instance_component(self):
+        self.patch_argparse_stuff(['--n6workers', '4'])
+        with self.assertRaises(SystemExit):
+            self.make_component()
+
+    def test_run_with_optional_workers__no_workers(self):
+        component = self.make_multi_instance_component()
+        component.run.side_effect = KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            component.run_with_optional_workers()
+
+        component.run.assert_called_once_with()
+        component.stop.assert_called_once_with()
+        self.fork.assert_not_called()
+
+    def test_workers_supervised_and_restarted(self):
+        component = self.make_multi_instance_component('--n6workers', '2')
+        component.prepare_for_forking_workers = MagicMock()
+        self.fork.side_effect = [101, 102, 103]
+
+        def stop_signal_received():
+            self.signal_handlers[signal.SIGTERM](signal.SIGTERM, None)
+            return 102, 0
+
+        wait_results = iter([
+            (101, 1 << 8),      # <- worker exited unexpectedly with code 1
+            stop_signal_received,
+            (103, 0),
+        ])
+        self.wait.side_effect = lambda: (
+            res() if callable(res := next(wait_results)) else res)
+
+        component.run_with_optional_workers()
+
+        component.prepare_for_forking_workers.assert_called_once_with()
+        self.assertEqual(self.fork.call_count, 3)
+        self.sleep.assert_called_once_with(component.worker_restart_delay)
+        self.assertCountEqual(self.kill.mock_calls, [
+            call(102, signal.SIGTERM),
+            call(103, signal.SIGTERM),
+        ])
+        component.run.assert_not_called()
+
+    def test_worker_process_runs_component(self):
+        component = self.make_multi_instance_component('--n6workers', '2')
+        self.fork.return_value = 0
+
+        component._fork_worker()
+
+        self.restart_amqp_logging.assert_called_once_with()
+        component.run.assert_called_once_with()
+        component.stop.assert_not_called()
+        self.exit.assert_called_once_with(0)
+
+    def test_main_process_does_not_restart_amqp_logging(self):
+        component = self.make_multi_instance_component('--n6workers', '2')
+        self.fork.return_value = 101
+
+        pid = component._fork_worker()
+
+        self.assertEqual(pid, 101)
+        self.restart_amqp_logging.assert_not_called()
+        component.run.assert_not_called()
+        self.exit.assert_not_called()
+
+    def test_worker_process_stops_component_on_stop_signal(self):
+        component = self.make_multi_instance_component('--n6workers', '2')
+        self.fork.return_value = 0
+        component.run.side_effect = KeyboardInterrupt
+
+        component._fork_worker()
+
+        component.stop.assert_called_once_with()
+        self.exit.assert_called_once_with(0)
+
+    def test_worker_process_exits_with_error_code_on_crash(self):
+        component = self.make_multi_instance_component('--n6workers', '2')
+        self.fork.return_value = 0
+        component.run.side_effect = ValueError
+
+        component._fork_worker()
+
+        self.exit.assert_called_once_with(1)
+
+
+class TestLegacyQueuedBase__stats(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.patch_argparse_stuff(['--n6stats-file', '/some/stats.json'])
+        self.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict',
+                   return_value={'heartbeat_interval': 30})
+        self.component = self.make_component(_ExamplePublishingComponent)
+        self.component._declared_output_exchanges.add('event')
+        self.save_report = self.patch('n6lib.stats_helpers.ComponentStats.save_report')
+
+    def get_input_report(self):
+        return self.component._stats.make_report()['input']
+
+    def test_no_stats_by_default(self):
+        self.patch_argparse_stuff()
+        component = self.make_component()
+
+        self.deliver(component, 1, b'foo')
+
+        self.assertIsNone(component._stats)
+
+    def test_processing_outcomes_recorded(self):
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'ERR')
+        self.deliver(self.component, 3, b'bar', routing_key='event.parsed.spam.ham')
+
+        report = self.get_input_report()
+        self.assertEqual(report['event.parsed.foo.bar']['acked'], 1)
+        self.assertEqual(report['event.parsed.foo.bar']['nacked'], 1)
+        self.assertEqual(report['event.parsed.foo.bar']['nack_rate'], 0.5)
+        self.assertEqual(report['event.parsed.spam.ham']['acked'], 1)
+
+    def test_requeued_message_recorded(self):
+        self.component.input_callback = MagicMock(side_effect=KeyboardInterrupt)
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.deliver(self.component, 1, b'foo')
+
+        self.assertEqual(self.get_input_report()['event.parsed.foo.bar']['requeued'], 1)
+
+    def test_batch_processing_outcomes_recorded(self):
+        self.component.input_batch_size = 3
+
+        self.deliver(self.component, 1, b'foo')
+        self.deliver(self.component, 2, b'ERR')
+        self.deliver(self.component, 3, b'bar')
+
+        report = self.get_input_report()['event.parsed.foo.bar']
+        self.assertEqual(report['acked'], 2)
+        self.assertEqual(report['nacked'], 1)
+        self.assertEqual(report['processing_time']['count'], 3)
+
+    def test_publishing_recorded(self):
+        self.deliver(self.component, 1, b'foo++')
+
+        report = self.component._stats.make_report()['output']
+        self.assertEqual(report['event.parsed.foo.bar']['published'], 2)
+
+    def test_stats_file_saved_periodically(self):
+        self.component._closing = False
+
+        self.component.on_connection_open(sen.connection)
+        [(interval, callback), _] = self.component._connection.add_timeout.call_args
+        callback()
+
+        self.assertEqual(interval, self.component.stats_file_interval)
+        self.save_report.assert_called_once_with('/some/stats.json')
+        self.assertEqual(self.component._connection.add_timeout.call_count, 2)
+
+    def test_failure_to_save_stats_file_does_not_break_component(self):
+        self.save_report.side_effect = OSError
+
+        self.component._save_stats_file()
+
+
+class TestLegacyQueuedBase__tracing(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.component = self.make_component(_ExamplePublishingComponent)
+        self.component._declared_output_exchanges.add('event')
+        self.patch('n6lib.stats_helpers.time.time', return_value=1700000000.5)
+
+    def get_published_headers(self):
+        return [kwargs['properties'].headers
+                for _, kwargs in self.component._channel_out.basic_publish.call_args_list]
+
+    def test_trace_extended_on_publish(self):
+        properties = pika.BasicProperties(headers={
+            'n6trace': ['SomeCollector@1700000000000'],
+            'meta': {'foo': 'bar'},
+        })
+        basic_deliver = MagicMock(delivery_tag=1, routing_key='event.parsed.foo.bar')
+
+        self.component.on_message(sen.channel, basic_deliver, properties, b'foo++')
+
+        expected_trace = ['SomeCollector@1700000000000', '_ExamplePublishingComponent@1700000000500']
+        self.assertEqual(self.get_published_headers(), [
+            {'n6trace': expected_trace},
+            {'n6trace': expected_trace},
+        ])
+        self.assertIsNone(self.component._current_trace)
+        self.assertEqual(properties.headers['n6trace'], ['SomeCollector@1700000000000'])
+
+    def test_trace_extended_in_batch_mode(self):
+        self.component.input_batch_size = 2
+        properties = pika.BasicProperties(headers={'n6trace': ['SomeCollector@1700000000000']})
+        basic_deliver = MagicMock(delivery_tag=1, routing_key='event.parsed.foo.bar')
+
+        self.component.on_message(sen.channel, basic_deliver, properties, b'foo+')
+        self.deliver(self.component, 2, b'bar+')
+
+        self.assertEqual(self.get_published_headers(), [
+            {'n6trace': ['SomeCollector@1700000000000', '_ExamplePublishingComponent@1700000000500']},
+            None,
+        ])
+
+    def test_no_trace_header_if_input_message_not_traced(self):
+        self.deliver(self.component, 1, b'foo+')
+
+        self.assertEqual(self.get_published_headers(), [None])
+
+    def test_trace_started_if_n6trace_given(self):
+        self.patch_argparse_stuff(['--n6trace'])
+        component = self.make_component(_ExamplePublishingComponent)
+        component._declared_output_exchanges.add('event')
+
+        component.publish_output('foo.bar', b'foo', prop_kwargs={'headers': {'meta': {}}})
+
+        [(_, kwargs)] = component._channel_out.basic_publish.call_args_list
+        self.assertEqual(kwargs['properties'].headers, {
+            'meta': {},
+            'n6trace': ['_ExamplePublishingComponent@1700000000500'],
+        })
+
+    def test_record_trace_latency(self):
+        self.patch_argparse_stuff(['--n6stats-file', '/some/stats.json'])
+        component = self.make_component()
+        component._current_trace = ['SomeCollector@1700000000000', 'SomeParser@1700000000200']
+
+        component.record_trace_latency('foo.bar')
+
+        report = component._stats.make_report()['trace_latency']
+        self.assertEqual(sorted(report['foo.bar']), [
+            'SomeCollector -> SomeParser',
+            'SomeParser -> _ExampleComponent',
+            'total',
+        ])
+        self.assertAlmostEqual(report['foo.bar']['total']['max'], 0.5)
+
+
+class TestLegacyQueuedBase__adaptive_flow_control(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.component = self.make_component(
+            _ExampleAdaptiveComponent,
+            output_buffer_pause_threshold=1000,
+            output_buffer_resume_threshold=100)
+        self.component._connection.outbound_buffer = collections.deque()
+        self.component._consumer_tag = sen.consumer_tag
+
+    def expire_interval(self):
+        [(interval, callback), _] = self.component._connection.add_timeout.call_args
+        self.assertEqual(interval, self.component.flow_control_interval)
+        callback()
+
+    def test_global_prefetch_count_set_and_timer_started(self):
+        self.component._num_queues_bound = 1
+
+        self.component.on_bindok(sen.frame)
+
+        self.assertEqual(self.component._channel_in.basic_qos.mock_calls, [
+            call(prefetch_count=20, all_channels=True),
+        ])
+        self.component._channel_in.basic_consume.assert_called_once_with(
+            self.component.on_message, 'example', exclusive=True)
+        self.assertEqual(self.component._connection.add_timeout.call_count, 1)
+
+    def test_prefetch_count_adjusted(self):
+        self.component.start_consuming()
+        self.component._prefetch_controller.record_processing(0.001)
+
+        self.expire_interval()
+
+        self.component._channel_in.basic_qos.assert_called_once_with(
+            prefetch_count=40, all_channels=True)
+        self.assertEqual(self.component._connection.add_timeout.call_count, 2)
+
+    def test_prefetch_count_not_increased_when_output_lagging(self):
+        self.component.start_consuming()
+        self.component._prefetch_controller.record_processing(0.001)
+        self.component._connection.outbound_buffer.append(b'x' * 500)
+
+        self.expire_interval()
+
+        self.component._channel_in.basic_qos.assert_not_called()
+
+    def test_processing_times_fed_to_controller(self):
+        self.deliver(self.component, 1, b'foo')
+
+        self.assertEqual(self.component._prefetch_controller._processed_count, 1)
+
+    def test_consuming_paused_and_resumed(self):
+        self.component.start_consuming()
+        consumer_tag = self.component._consumer_tag
+        self.component._channel_in.basic_consume.reset_mock()
+        self.component._connection.outbound_buffer.append(b'x' * 1001)
+
+        self.expire_interval()
+
+        self.assertTrue(self.component._consuming_paused)
+        self.component._channel_in.basic_cancel.assert_called_once_with(
+            self.component._on_consuming_paused, consumer_tag)
+
+        self.component._connection.outbound_buffer.popleft()
+        self.component._connection.outbound_buffer.append(b'x' * 200)
+        self.expire_interval()
+
+        self.assertTrue(self.component._consuming_paused)
+
+        self.component._connection.outbound_buffer.clear()
+        self.expire_interval()
+
+        self.assertFalse(self.component._consuming_paused)
+        self.component._channel_in.basic_consume.assert_called_once_with(
+            self.component.on_message, 'example', exclusive=True)
+
+    def test_consuming_paused_and_resumed_with_confirms_window(self):
+        self.component.start_consuming()
+        self.component._channel_in.basic_consume.reset_mock()
+        self.component._consuming_paused = True
+        self.component._publisher_confirms_window_full = True
+
+        self.expire_interval()
+
+        self.assertTrue(self.component._consuming_paused)
+        self.component._channel_in.basic_consume.assert_not_called()
+
+        self.component._connection.outbound_buffer.append(b'x' * 200)
+        self.component._resume_consuming_as_confirms_window_freed()
+
+        self.assertFalse(self.component._publisher_confirms_window_full)
+        self.assertTrue(self.component._consuming_paused)
+        self.component._channel_in.basic_consume.assert_not_called()
+
+        self.component._connection.outbound_buffer.clear()
+        self.expire_interval()
+
+        self.assertFalse(self.component._consuming_paused)
+        self.component._channel_in.basic_consume.assert_called_once_with(
+            self.component.on_message, 'example', exclusive=True)
+
+    def test_stop_consuming_when_paused(self):
+        self.component._consuming_paused = True
+
+        self.component.stop_consuming()
+
+        self.component._channel_in.basic_cancel.assert_not_called()
+        self.component._channel_in.close.assert_called_once_with()
+
+    def test_timer_not_restarted_when_closing(self):
+        self.component.start_consuming()
+        self.component._closing = True
+
+        self.expire_interval()
+
+        self.assertEqual(self.component._connection.add_timeout.call_count, 1)
+
+
+class TestLegacyQueuedBase__backpressure_aware_iterative_publishing(_ComponentTestMixin,
+                                                                unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.component = self.make_component(_ExampleIterativelyPublishingComponent)
+        self.component._declared_output_exchanges.add('event')
+        self.component._connection.outbound_buffer = self.outbound_buffer = collections.deque()
+        self.component._channel_out.basic_publish.side_effect = (
+            lambda exchange, routing_key, body, **kw: self.outbound_buffer.append(body))
+
+    def iterate(self):
+        [(delay, callback), _] = self.component._connection.add_timeout.call_args
+        self.component._connection.add_timeout.reset_mock()
+        callback()
+        return delay
+
+    def finish(self):
+        self.component._connection_blocked = False
+        self.outbound_buffer.clear()
+        while True:
+            [(_, callback), _] = self.component._connection.add_timeout.call_args
+            if callback.__name__ == 'inner_stop':
+                break
+            self.iterate()
+
+    def test_blocked_and_unblocked_callbacks_registered(self):
+        self.component.on_connection_open(sen.connection)
+
+        self.component._connection.add_on_connection_blocked_callback.assert_called_once_with(
+            self.component.on_connection_blocked)
+        self.component._connection.add_on_connection_unblocked_callback.assert_called_once_with(
+            self.component.on_connection_unblocked)
+
+    def test_blocked_and_unblocked(self):
+        self.component.on_connection_blocked(MagicMock())
+
+        self.assertTrue(self.component._connection_blocked)
+
+        self.component.on_connection_unblocked(MagicMock())
+
+        self.assertFalse(self.component._connection_blocked)
+
+    def test_publishing_suspended_while_blocked(self):
+        self.component.to_publish = [b'a', b'b', b'c']
+        self.component._connection_blocked = True
+        self.component.start_iterative_publishing()
+
+        delays = [self.iterate() for _ in range(4)]
+
+        self.assertEqual(delays, [0.0, 0.001, 0.002, 0.004])
+        self.assertEqual(list(self.outbound_buffer), [b'a'])
+
+        self.component._connection_blocked = False
+        self.outbound_buffer.clear()
+        self.iterate()
+
+        self.assertEqual(list(self.outbound_buffer), [b'b', b'c'])
+
+        self.outbound_buffer.clear()
+        self.iterate()
+
+        self.assertEqual(self.iterate(), 0.0)
+        self.component._connection.add_timeout.assert_called_once_with(
+            0.0, AnyCallableNamed('inner_stop'))
+
+    def test_buffer_flushed_at_lower_threshold(self):
+        self.component.to_publish = [b'x' * 600, b'y' * 600, b'z']
+        self.component.start_iterative_publishing()
+
+        delays = [self.iterate() for _ in range(2)]
+
+        self.assertEqual(delays, [0.0, 0.001])
+        self.assertEqual(len(self.outbound_buffer), 2)
+
+        self.outbound_buffer.clear()
+        delays = [self.iterate() for _ in range(2)]
+
+        self.assertEqual(delays, [0.002, 0.0])
+        self.assertEqual(list(self.outbound_buffer), [b'z'])
+        self.finish()
+
+    def test_delay_capped(self):
+        self.component.to_publish = [b'a']
+        self.component._connection_blocked = True
+        self.component.start_iterative_publishing()
+
+        delays = [self.iterate() for _ in range(12)]
+        self.finish()
+
+        self.assertEqual(max(delays), self.component.iterative_publishing_schedule_next_delay)
+
+    def test_delay_fixed_if_not_backpressure_aware(self):
+        self.component.iterative_publishing_backpressure_aware = False
+        self.component.to_publish = [b'a', b'b']
+        self.component.start_iterative_publishing()
+
+        self.assertEqual(self.iterate(), 0.1)
+        self.assertEqual(self.iterate(), 0.1)
+        self.finish()
+        self.assertIsNone(self.component._publishing_iteration_delay)
+
+
+class TestLegacyQueuedBase__trusted_record_dicts(_ComponentTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.trust = RecordDictTrust(32 * b'k')
+        self.component = self.make_component(_ExamplePublishingComponent,
+                                             tags_output_as_trusted_record_dicts=True,
+                                             _record_dict_trust=self.trust)
+        self.component._declared_output_exchanges.add('event')
+
+    def get_published_headers(self):
+        [(_, kwargs)] = self.component._channel_out.basic_publish.call_args_list
+        return kwargs['properties'].headers
+
+    def test_output_tagged(self):
+        self.component.publish_output('event.parsed.foo.bar', '{"foo": "bar"}')
+
+        headers = self.get_published_headers()
+        self.assertTrue(self.trust.verify_tag(b'{"foo": "bar"}', headers[TRUST_TAG_HEADER]))
+
+    def test_output_not_tagged_if_not_enabled(self):
+        self.component.tags_output_as_trusted_record_dicts = False
+
+        self.component.publish_output('event.parsed.foo.bar', '{"foo": "bar"}')
+
+        self.assertIsNone(self.get_published_headers())
+
+    def test_output_not_tagged_if_no_key(self):
+        self.component._record_dict_trust = None
+
+        self.component.publish_output('event.parsed.foo.bar', '{"foo": "bar"}')
+
+        self.assertIsNone(self.get_published_headers())
+
+    def test_get_record_dict_from_json_kwargs(self):
+        properties = pika.BasicProperties(headers={TRUST_TAG_HEADER: 'some-tag'})
+
+        self.assertEqual(self.component.get_record_dict_from_json_kwargs(properties), {
+            'trust': self.trust,
+            'trust_tag': 'some-tag',
+        })
+        self.assertEqual(self.component.get_record_dict_from_json_kwargs(pika.BasicProperties()), {
+            'trust': self.trust,
+            'trust_tag': None,
+        })
+
+        self.component._record_dict_trust = None
+
+        self.assertEqual(self.component.get_record_dict_from_json_kwargs(properties), {})
+
+    def test_get_record_dict_from_json_kwargs_with_content_type(self):
+        properties = pika.BasicProperties(content_type=MSGPACK_CONTENT_TYPE,
+                                          headers={TRUST_TAG_HEADER: 'some-tag'})
+
+        self.assertEqual(self.component.get_record_dict_from_json_kwargs(properties), {
+            'content_type': MSGPACK_CONTENT_TYPE,
+            'trust': self.trust,
+            'trust_tag': 'some-tag',
+        })
+
+        self.component._record_dict_trust = None
+
+        self.assertEqual(self.component.get_record_dict_from_json_kwargs(properties), {
+            'content_type': MSGPACK_CONTENT_TYPE,
+        })
+
+    def test_serialize_record_dict(self):
+        record_dict = MagicMock(**{
+            'get_ready_json.return_value': '{"foo": "bar"}',
+            'get_ready_msgpack.return_value': b'\x81\xa3foo\xa3bar',
+        })
+
+        self.assertEqual(self.component.serialize_record_dict(record_dict),
+                         b'{"foo": "bar"}')
+
+        self.component._record_dict_wire_format = 'msgpack'
+
+        self.assertEqual(self.component.serialize_record_dict(record_dict),
+                         b'\x81\xa3foo\xa3bar')
+
+    def test_output_content_type(self):
+        self.patch_dict(RECORD_DICT_WIRE_FORMATS, {'msgpack': MSGPACK_CONTENT_TYPE})
+        self.component.publish_output('event.parsed.foo.bar', b'\x81\xa3foo\xa3bar')
+        self.component._record_dict_wire_format = 'msgpack'
+        self.component.publish_output('event.parsed.foo.bar', b'\x81\xa3foo\xa3bar')
+
+        [(_, json_kwargs),
+         (_, msgpack_kwargs)] = self.component._channel_out.basic_publish.call_args_list
+        self.assertIsNone(json_kwargs['properties'].content_type)
+        self.assertEqual(msgpack_kwargs['properties'].content_type, MSGPACK_CONTENT_TYPE)
+
+    def test_get_record_dict_wire_format(self):
+        self.patch_dict(RECORD_DICT_WIRE_FORMATS, {'msgpack': MSGPACK_CONTENT_TYPE})
+        get_wire_format_mock = self.patch('n6datapipeline.base.get_record_dict_wire_format')
+
+        get_wire_format_mock.return_value = 'msgpack'
+        self.assertEqual(self.component.get_record_dict_wire_format(), 'msgpack')
+
+        get_wire_format_mock.return_value = 'no-such-format'
+        with self.assertRaises(ConfigError):
+            self.component.get_record_dict_wire_format()
+
+    def test_get_record_dict_trust(self):
+        self.patch('n6datapipeline.base.get_record_dict_trust_key', return_value=32 * b'k')
+        trust = self.component.get_record_dict_trust()
+        self.assertIsInstance(trust, RecordDictTrust)
+
+        self.patch('n6datapipeline.base.get_record_dict_trust_key', return_value=None)
+        self.assertIsNone(self.component.get_record_dict_trust())
+
+        self.patch('n6datapipeline.base.get_record_dict_trust_key', return_value=b'too short')
+        with self.assertRaises(ConfigError):
+            self.component.get_record_dict_trust()
+
+
+class TestLegacyQueuedBase__on_demand_profiling(_ComponentTestMixin, unittest.TestCase):
+
+    def test_profiler_installed_if_n6profiling_dir_given(self):
+        profiler_class_mock = self.patch('n6datapipeline.base.OnDemandProfiler')
+        self.patch_argparse_stuff(['--n6profiling-dir', '/some/dir'])
+
+        self.make_component()
+
+        self.assertEqual(profiler_class_mock.mock_calls, [
+            call('/some/dir', file_name_prefix='_ExampleComponent'),
+            call().install(),
+        ])
+
+    def test_profiler_not_installed_by_default(self):
+        profiler_class_mock = self.patch('n6datapipeline.base.OnDemandProfiler')
+
+        self.make_component()
+
+        profiler_class_mock.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import os.path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import geoip2.database
+import maxminddb.const
+from geoip2.errors import AddressNotFoundError
+
+from n6datapipeline.benchmarks import enricher as enricher_benchmark
+from n6datapipeline.benchmarks import record_dict as record_dict_benchmark
+from n6datapipeline.benchmarks.pipeline import run_benchmark
+from n6datapipeline.benchmarks.stand_ins import (
+    InMemoryChannel,
+    StubAuthAPI,
+    StubDNSResolver,
+    write_geoip_database,
+)
+from n6lib.auth_api import InsideCriteriaResolver
+from n6lib.context_helpers import NoContextToExitFrom
+
+
+class TestInMemoryChannel(unittest.TestCase):
+
+    def test_publish_ack_nack(self):
+        channel = InMemoryChannel()
+        channel.basic_publish('event', 'event.enriched.foo.bar', b'{}')
+        channel.basic_ack(delivery_tag=1)
+        channel.basic_ack(delivery_tag=4, multiple=True)
+        channel.basic_nack(delivery_tag=5, requeue=False)
+        channel.basic_nack(delivery_tag=6)
+
+        self.assertEqual(channel.acked, 4)
+        self.assertEqual(channel.nacked, 1)
+        self.assertEqual(channel.requeued, 1)
+        published = channel.pop_published()
+        self.assertEqual([(m.exchange, m.routing_key, m.body) for m in published],
+                         [('event', 'event.enriched.foo.bar', b'{}')])
+        self.assertEqual(channel.published, [])
+
+
+class TestStubs(unittest.TestCase):
+
+    def test_dns_resolver_is_deterministic(self):
+        resolver = StubDNSResolver(nxdomain_fraction=0.0)
+        first = resolver.resolve('www.example.com')
+        second = resolver.resolve('WWW.EXAMPLE.COM')
+
+        self.assertEqual(first, second)
+        self.assertIn(len(first), (1, 2))
+        self.assertEqual(resolver.query_count, 2)
+
+    def test_auth_api_context(self):
+        auth_api = StubAuthAPI([{'org_id': 'o1', 'fqdn_seq': ['example.com']}])
+        with auth_api:
+            resolver = auth_api.get_inside_criteria_resolver()
+        with self.assertRaises(NoContextToExitFrom):
+            auth_api.__exit__(None, None, None)
+
+        self.assertIsInstance(resolver, InsideCriteriaResolver)
+
+    def test_geoip_database(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test.mmdb')
+            write_geoip_database(path, 'GeoLite2-City', {
+                '10.0.0.0/8': {'country': {'iso_code': 'PL', 'names': {'en': 'Poland'}}},
+                '192.168.1.128/25': {'country': {'iso_code': 'DE'}},
+            })
+            for mode in (maxminddb.const.MODE_AUTO,
+                         maxminddb.const.MODE_MEMORY,
+                         maxminddb.const.MODE_MMAP):
+                with geoip2.database.Reader(path, mode=mode) as reader:
+                    city = reader.city('10.20.30.40')
+                    self.assertEqual(city.country.iso_code, 'PL')
+                    self.assertEqual(city.country.name, 'Poland')
+                    self.assertEqual(str(city.traits.network), '10.0.0.0/8')
+                    self.assertEqual(reader.city('192.168.1.200').country.iso_code, 'DE')
+                    with self.assertRaises(AddressNotFoundError):
+                        reader.city('192.168.1.100')
+                    self.assertEqual(reader.metadata().database_type, 'GeoLite2-City')
+
+    def test_geoip_database_with_overlapping_networks(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             self.assertRaises(ValueError):
+            write_geoip_database(os.path.join(tmp_dir, 'test.mmdb'), 'GeoLite2-ASN', {
+                '10.0.0.0/8': {'autonomous_system_number': 1},
+                '10.1.0.0/16': {'autonomous_system_number': 2},
+            })
+
+
+class TestRunBenchmark(unittest.TestCase):
+
+    def test_run(self):
+        document = run_benchmark(
+            stages=['aggregator', 'enricher', 'comparator', 'filter', 'anonymizer'],
+            event_count=60,
+            memory_event_count=20)
+
+        self.assertEqual(document['benchmark'], 'pipeline')
+        self.assertEqual(document['params']['event_count'], 60)
+        results = document['results']
+        self.assertEqual(set(results['stages']),
+                         {'aggregator', 'enricher', 'comparator', 'filter', 'anonymizer'})
+        for stage_results in results['stages'].values():
+            self.assertEqual(stage_results['nacked'], 0)
+            self.assertIn('transient_bytes_per_event', stage_results)
+            self.assertIn('retained_bytes_per_event', stage_results)
+        # (all ordinary/blacklist events and the aggregated ones go through the Enricher)
+        self.assertLessEqual(results['stages']['enricher']['count'], 60)
+        self.assertEqual(results['stages']['filter']['count'],
+                         results['stages']['enricher']['published'])
+        self.assertEqual(results['total']['events'], 60)
+
+    def test_illegal_stage(self):
+        with self.assertRaises(ValueError):
+            run_benchmark(stages=['enricher', 'foo'], event_count=1)
+
+
+class TestEnricherBenchmark(unittest.TestCase):
+
+    def test_run(self):
+        document = enricher_benchmark.run_benchmark(
+            event_count=200,
+            fqdn_count=20,
+            ip_count=50,
+            geoip_network_count=100)
+
+        self.assertEqual(document['benchmark'], 'enricher')
+        results = document['results']
+        self.assertEqual(results['enricher']['count'], 200)
+        self.assertEqual(results['enricher']['published'], 200)
+        self.assertEqual(results['enricher']['nacked'], 0)
+        self.assertEqual(set(results['phases']), set(enricher_benchmark.PHASES) | {'other'})
+        self.assertEqual(results['phases']['url_parsing']['calls'], 200)
+        self.assertGreater(results['phases']['asn_lookups']['calls'], 0)
+        self.assertEqual(results['phases']['resolving']['calls'], results['dns_queries'])
+        self.assertLessEqual(results['dns_queries'], 200)
+        self.assertEqual(results['caches'], {})
+
+    def test_run_with_batching_and_caches(self):
+        document = enricher_benchmark.run_benchmark(
+            event_count=200,
+            fqdn_count=20,
+            ip_count=50,
+            geoip_network_count=100,
+            input_batch_size=20,
+            dns_concurrency=4,
+            dns_cache_size=100,
+            geoip_prefix_cache_size=100,
+            geoip_mmap=True)
+
+        results = document['results']
+        self.assertEqual(results['enricher']['published'], 200)
+        self.assertEqual(results['phases']['resolving']['calls'], 10)
+        self.assertLessEqual(results['dns_queries'], 20)
+        self.assertEqual(set(results['caches']),
+                         {'dns_cache', 'asn_prefix_cache', 'cc_prefix_cache'})
+        self.assertGreater(results['caches']['asn_prefix_cache']['hits'], 0)
+
+
+class TestRecordDictBenchmark(unittest.TestCase):
+
+    def test_run(self):
+        document = record_dict_benchmark.run_benchmark(
+            record_count=10,
+            memory_record_count=3,
+            rounds=2)
+
+        self.assertEqual(document['benchmark'], 'record_dict')
+        results = document['results']
+        self.assertEqual(set(results), set(record_dict_benchmark.SCENARIOS))
+        for scenario_results in results.values():
+            self.assertEqual(set(scenario_results), set(record_dict_benchmark.OPERATIONS))
+            for operation_results in scenario_results.values():
+                self.assertEqual(operation_results['count'], 10)
+                self.assertGreater(operation_results['ops_per_second'], 0)
+                self.assertIn('transient_bytes_per_op', operation_results)
+
+    def test_records_are_valid_and_complete(self):
+        generator = record_dict_benchmark.RawDataGenerator()
+        for scenario in record_dict_benchmark.SCENARIOS:
+            scenario_input = record_dict_benchmark.ScenarioInput(scenario, 5, generator)
+            for record_dict, data in zip(scenario_input.make_record_dicts(),
+                                         scenario_input.raw_data):
+                # (no items dropped by adjusters)
+                self.assertEqual(record_dict.keys(), data.keys())
+                record_dict.verify_ready()
+
+    def test_illegal_scenario_or_operation(self):
+        with self.assertRaises(ValueError):
+            record_dict_benchmark.run_benchmark(scenarios=['foo'], record_count=1)
+        with self.assertRaises(ValueError):
+            record_dict_benchmark.run_benchmark(operations=['construct', 'foo'], record_count=1)
+
+    def test_tracked_baseline(self):
+        baseline_path = record_dict_benchmark.DEFAULT_BASELINE_PATH
+        self.assertTrue(os.path.exists(baseline_path))
+        document = record_dict_benchmark.run_benchmark(
+            record_count=5,
+            memory_record_count=0,
+            rounds=1)
+
+        with patch.dict(document['results']['url_heavy']['serialize'], ops_per_second=1.0):
+            regressions = record_dict_benchmark.check_against_baseline(
+                document, baseline_path, max_slowdown=0.9999)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('url_heavy.serialize.ops_per_second: 1 '))
@@ -2,14 +2,30 @@
 
 import datetime
 import hashlib
+import ipaddress
 import os
+import tempfile
+import time
 import unittest
 import unittest.mock
 
-from geoip2.errors import GeoIP2Error
-from dns.exception import DNSException
-
-from n6datapipeline.enrich import Enricher
+import geoip2.models
+import maxminddb.const
+from geoip2.errors import AddressNotFoundError, GeoIP2Error
+from dns.exception import DNSException, Timeout
+from dns.resolver import NXDOMAIN, NoNameservers
+from unittest_expander import expand, foreach, param
+
+from n6datapipeline.base import (
+    InputBatchInterrupted,
+    InputMessage,
+)
+from n6datapipeline.benchmarks.stand_ins import StubDNSResolver
+from n6datapipeline.enrich import (
+    DNSCache,
+    Enricher,
+    GeoIPPrefixCache,
+)
 from n6lib.record_dict import RecordDict
 from n6lib.unit_test_helpers import TestCaseMixin
 from n6sdk.addr_helpers import IPv4Container
@@ -272,6 +288,15 @@ class TestEnricherWithFullConfig(_BaseTestEnricher, unittest.TestCase):
         'asndatabasefilename': DEFAULT_ASN_DB_FILENAME,
         'citydatabasefilename': DEFAULT_CC_DB_FILENAME,
         'excluded_ips': [],
+        'input_batch_size': 1,
+        'dns_concurrency': 1,
+        'dns_cache_size': 0,
+        'dns_cache_min_ttl': 30,
+        'dns_cache_max_ttl': 3600,
+        'dns_cache_negative_ttl': 30,
+        'geoip_prefix_cache_size': 0,
+        'geoip_mmap': False,
+        'geoip_reload_check_interval': 0,
     }
 
     def test__ip_to_asn__called_or_not(self):
@@ -865,6 +890,15 @@ class TestEnricherNoASNDatabase(_BaseTestEnricher, unittest.TestCase):
         'asndatabasefilename': '',
         'citydatabasefilename': DEFAULT_CC_DB_FILENAME,
         'excluded_ips': [],
+        'input_batch_size': 1,
+        'dns_concurrency': 1,
+        'dns_cache_size': 0,
+        'dns_cache_min_ttl': 30,
+        'dns_cache_max_ttl': 3600,
+        'dns_cache_negative_ttl': 30,
+        'geoip_prefix_cache_size': 0,
+        'geoip_mmap': False,
+        'geoip_reload_check_interval': 0,
     }
 
     def test__ip_to_asn__called_or_not(self):
@@ -1079,6 +1113,15 @@ class TestEnricherNoCCDatabase(_BaseTestEnricher, unittest.TestCase):
         'asndatabasefilename': DEFAULT_ASN_DB_FILENAME,
         'citydatabasefilename': '',
         'excluded_ips': [],
+        'input_batch_size': 1,
+        'dns_concurrency': 1,
+        'dns_cache_size': 0,
+        'dns_cache_min_ttl': 30,
+        'dns_cache_max_ttl': 3600,
+        'dns_cache_negative_ttl': 30,
+        'geoip_prefix_cache_size': 0,
+        'geoip_mmap': False,
+        'geoip_reload_check_interval': 0,
     }
 
     def test__ip_to_asn__called_or_not(self):
@@ -1292,6 +1335,15 @@ class TestEnricherNoGeoIPDatabase(_BaseTestEnricher, unittest.TestCase):
         'asndatabasefilename': '',
         'citydatabasefilename': '',
         'excluded_ips': [],
+        'input_batch_size': 1,
+        'dns_concurrency': 1,
+        'dns_cache_size': 0,
+        'dns_cache_min_ttl': 30,
+        'dns_cache_max_ttl': 3600,
+        'dns_cache_negative_ttl': 30,
+        'geoip_prefix_cache_size': 0,
+        'geoip_mmap': False,
+        'geoip_reload_check_interval': 0,
     }
 
     def test__ip_to_asn__called_or_not(self):
@@ -1438,3 +1490,568 @@ class TestEnricherNoGeoIPDatabase(_BaseTestEnricher, unittest.TestCase):
             "url": "http://www.nask.pl/asd",
             "fqdn": "www.nask.pl",
             "address": [{"ip": '127.0.0.1'}]}))
+
+
+class TestEnricherBatchProcessing(TestCaseMixin, unittest.TestCase):
+
+    MOCK_CONFIG = dict(TestEnricherNoGeoIPDatabase.MOCK_CONFIG,
+                       input_batch_size=10,
+                       dns_concurrency=10)
+
+    @unittest.mock.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict')
+    @unittest.mock.patch('n6datapipeline.enrich.ConfigMixin.get_config_section')
+    def setUp(self, config_mock, *args):
+        config_mock.return_value = self.MOCK_CONFIG
+        self.patch_object(Enricher, '_setup_dnsresolver')
+        self.enricher = Enricher()
+        self.enricher._resolver = StubDNSResolver(latency=0.2, nxdomain_fraction=0.0)
+        self.enricher.publish_output = unittest.mock.MagicMock()
+        self.addCleanup(lambda: self.enricher._dns_executor and
+                                self.enricher._dns_executor.shutdown())
+
+    def _make_message(self, delivery_tag, data):
+        return InputMessage(
+            delivery_tag=delivery_tag,
+            routing_key='event.filtered.test.test',
+            body=RecordDict(dict(_BaseTestEnricher.COMMON_DATA, **data)).get_ready_json(),
+            properties=unittest.mock.MagicMock(headers=None, content_type=None))
+
+    def _get_published_record_dicts(self):
+        return [
+            (kwargs['routing_key'], RecordDict.from_json(kwargs['body']))
+            for _, _, kwargs in self.enricher.publish_output.mock_calls]
+
+    def test_batch_settings_from_config(self):
+        self.assertEqual(self.enricher.input_batch_size, 10)
+        self.assertEqual(self.enricher.dns_concurrency, 10)
+
+    def test_fqdns_resolved_concurrently_and_order_kept(self):
+        fqdns = [f'host{i}.example.com' for i in range(8)]
+        batch = [self._make_message(i, {'fqdn': fqdn}) for i, fqdn in enumerate(fqdns, 1)]
+        batch.append(self._make_message(9, {'url': 'http://host0.example.com/foo'}))
+        batch.append(self._make_message(10, {'fqdn': 'host1.example.com',
+                                             'address': [{'ip': '10.20.30.40'}]}))
+
+        started = time.monotonic()
+        failures = self.enricher.input_batch_callback(batch)
+        duration = time.monotonic() - started
+
+        self.assertEqual(failures, {})
+        # (resolving the 8 distinct FQDNs one by one would take 1.6 s)
+        self.assertLess(duration, 1.0)
+        self.assertEqual(self.enricher._resolver.query_count, 8)
+        published = self._get_published_record_dicts()
+        self.assertEqual([rk for rk, _ in published], 10 * ['event.enriched.test.test'])
+        self.assertEqual([rd['fqdn'] for _, rd in published], fqdns + fqdns[:2])
+        for (_, rd), fqdn in zip(published, fqdns + fqdns[:1]):
+            expected_ips = sorted(set(StubDNSResolver(nxdomain_fraction=0.0).resolve(fqdn)))
+            self.assertEqual([addr['ip'] for addr in rd['address']], expected_ips)
+        self.assertEqual(published[-1][1]['address'], [{'ip': '10.20.30.40'}])
+        self.assertEqual(published[-1][1]['enriched'], ([], {}))
+
+    def test_results_same_as_without_batching(self):
+        self.enricher._resolver.latency = 0
+        batch = [
+            self._make_message(1, {'fqdn': 'cert.pl'}),
+            self._make_message(2, {'url': 'http://www.nask.pl/asd'}),
+            self._make_message(3, {'url': 'http://192.168.0.1/asd'}),
+            self._make_message(4, {'fqdn': 'cert.pl', '_do_not_resolve_fqdn_to_ip': True}),
+            self._make_message(5, {}),
+        ]
+        self.enricher.input_batch_callback(batch)
+        published_batched = self._get_published_record_dicts()
+        self.enricher.publish_output.reset_mock()
+
+        for message in batch:
+            self.enricher.input_callback(message.routing_key, message.body, message.properties)
+
+        self.assertEqual(published_batched, self._get_published_record_dicts())
+
+    def test_per_event_failures(self):
+        self.enricher._resolver.latency = 0
+        original_fqdn_to_ip = self.enricher.fqdn_to_ip
+        error = ZeroDivisionError('unexpected')
+        def fqdn_to_ip(fqdn):
+            if fqdn == 'bad.example.com':
+                raise error
+            return original_fqdn_to_ip(fqdn)
+        self.enricher.fqdn_to_ip = fqdn_to_ip
+        batch = [
+            self._make_message(1, {'fqdn': 'good.example.com'}),
+            self._make_message(2, {'fqdn': 'bad.example.com'}),
+            InputMessage(3, 'event.filtered.test.test', b'{not json',
+                         unittest.mock.MagicMock(headers=None, content_type=None)),
+            self._make_message(4, {'fqdn': 'other.example.com'}),
+        ]
+
+        failures = self.enricher.input_batch_callback(batch)
+
+        self.assertEqual(set(failures), {2, 3})
+        self.assertIs(failures[2], error)
+        self.assertEqual([rd['fqdn'] for _, rd in self._get_published_record_dicts()],
+                         ['good.example.com', 'other.example.com'])
+
+    def test_interrupted_while_publishing(self):
+        self.enricher._resolver.latency = 0
+        self.enricher.publish_output.side_effect = [None, KeyboardInterrupt]
+        batch = [
+            InputMessage(1, 'event.filtered.test.test', b'{not json',
+                         unittest.mock.MagicMock(headers=None, content_type=None)),
+            self._make_message(2, {'fqdn': 'first.example.com'}),
+            self._make_message(3, {'fqdn': 'second.example.com'}),
+            self._make_message(4, {'fqdn': 'third.example.com'}),
+        ]
+
+        with self.assertRaises(InputBatchInterrupted) as exc_context:
+            self.enricher.input_batch_callback(batch)
+
+        interrupted = exc_context.exception
+        self.assertIsInstance(interrupted.cause, KeyboardInterrupt)
+        # (the message whose publishing was interrupted is the third
+        # one in the batch -- even though it is the second one among
+        # those that have been successfully deserialized)
+        self.assertEqual(interrupted.processed_count, 2)
+        self.assertEqual(set(interrupted.failures), {1})
+        self.assertEqual(self.enricher.publish_output.call_count, 2)
+
+    def test_resolve_fqdns_sequentially(self):
+        self.enricher.dns_concurrency = 1
+        self.enricher._resolver.latency = 0
+        self.enricher._resolver.resolve = unittest.mock.MagicMock(
+            side_effect=[DNSException, ['1.2.3.4']])
+
+        result = self.enricher.resolve_fqdns({'b.example.com', 'a.example.com'})
+
+        self.assertEqual(result, {'a.example.com': [], 'b.example.com': ['1.2.3.4']})
+        self.assertIsNone(self.enricher._dns_executor)
+
+
+class TestDNSCache(TestCaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.patch('n6datapipeline.enrich.time.monotonic', lambda: self.now)
+        self.cache = DNSCache(maxsize=3, min_ttl=10, max_ttl=100, negative_ttl=5)
+
+    def test_ttl_clamped_to_min_and_max(self):
+        self.cache.put('short.example.com', ['1.1.1.1'], ttl=1)
+        self.cache.put('long.example.com', ['2.2.2.2'], ttl=100000)
+        self.cache.put('no-ttl.example.com', ['3.3.3.3'])
+
+        self.now += 9.9
+        self.assertEqual(self.cache.get('short.example.com'), ['1.1.1.1'])
+        self.assertEqual(self.cache.get('no-ttl.example.com'), ['3.3.3.3'])
+        self.now += 0.1
+        self.assertIsNone(self.cache.get('short.example.com'))
+        self.assertIsNone(self.cache.get('no-ttl.example.com'))
+        self.now += 89.9
+        self.assertEqual(self.cache.get('long.example.com'), ['2.2.2.2'])
+        self.now += 0.1
+        self.assertIsNone(self.cache.get('long.example.com'))
+        self.assertEqual(self.cache.get_stats()['size'], 0)
+
+    def test_negative_results(self):
+        self.cache.put_negative('nx.example.com')
+
+        self.now += 4.9
+        self.assertEqual(self.cache.get('nx.example.com'), [])
+        self.now += 0.1
+        self.assertIsNone(self.cache.get('nx.example.com'))
+
+    def test_least_recently_used_evicted(self):
+        for name in ['a', 'b', 'c']:
+            self.cache.put(f'{name}.example.com', ['1.2.3.4'], ttl=50)
+        self.cache.get('a.example.com')
+        self.cache.put('d.example.com', ['1.2.3.4'], ttl=50)
+
+        self.assertIsNone(self.cache.get('b.example.com'))
+        for name in ['a', 'c', 'd']:
+            self.assertEqual(self.cache.get(f'{name}.example.com'), ['1.2.3.4'])
+
+    def test_stats(self):
+        self.assertEqual(self.cache.get_stats(), {
+            'hits': 0, 'negative_hits': 0, 'misses': 0, 'hit_rate': None,
+            'size': 0, 'maxsize': 3})
+        self.cache.put('a.example.com', ['1.2.3.4'], ttl=50)
+        self.cache.put_negative('nx.example.com')
+        self.cache.get('a.example.com')
+        self.cache.get('a.example.com')
+        self.cache.get('nx.example.com')
+        self.cache.get('b.example.com')
+
+        self.assertEqual(self.cache.get_stats(), {
+            'hits': 3, 'negative_hits': 1, 'misses': 1, 'hit_rate': 0.75,
+            'size': 2, 'maxsize': 3})
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            DNSCache(maxsize=0, min_ttl=10, max_ttl=100, negative_ttl=5)
+        with self.assertRaises(ValueError):
+            DNSCache(maxsize=3, min_ttl=100, max_ttl=10, negative_ttl=5)
+
+
+@expand
+class TestEnricherDNSCache(TestCaseMixin, unittest.TestCase):
+
+    MOCK_CONFIG = dict(TestEnricherNoGeoIPDatabase.MOCK_CONFIG,
+                       dns_cache_size=100,
+                       dns_cache_min_ttl=30,
+                       dns_cache_max_ttl=3600,
+                       dns_cache_negative_ttl=60)
+
+    @unittest.mock.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict')
+    @unittest.mock.patch('n6datapipeline.enrich.ConfigMixin.get_config_section')
+    def setUp(self, config_mock, *args):
+        config_mock.return_value = self.MOCK_CONFIG
+        self.patch_object(Enricher, '_setup_dnsresolver')
+        self.enricher = Enricher()
+        self.enricher._resolver = unittest.mock.MagicMock()
+
+    def _set_resolve_result(self, ips, ttl):
+        dns_result = unittest.mock.MagicMock()
+        dns_result.__iter__.return_value = ips
+        dns_result.rrset.ttl = ttl
+        self.enricher._resolver.resolve.return_value = dns_result
+
+    def test_cache_disabled_by_default(self):
+        with unittest.mock.patch('n6datapipeline.enrich.ConfigMixin.get_config_section',
+                                 return_value=TestEnricherNoGeoIPDatabase.MOCK_CONFIG), \
+             unittest.mock.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict'):
+            enricher = Enricher()
+        self.assertIsNone(enricher.dns_cache)
+
+    def test_positive_result_cached_with_record_ttl(self):
+        self._set_resolve_result(['10.0.0.2', '10.0.0.1'], ttl=300)
+        with unittest.mock.patch('n6datapipeline.enrich.time.monotonic', return_value=0):
+            self.assertEqual(self.enricher.fqdn_to_ip('example.com'), ['10.0.0.1', '10.0.0.2'])
+        with unittest.mock.patch('n6datapipeline.enrich.time.monotonic', return_value=299):
+            self.assertEqual(self.enricher.fqdn_to_ip('example.com'), ['10.0.0.1', '10.0.0.2'])
+        self.assertEqual(self.enricher._resolver.resolve.call_count, 1)
+        with unittest.mock.patch('n6datapipeline.enrich.time.monotonic', return_value=300):
+            self.enricher.fqdn_to_ip('example.com')
+        self.assertEqual(self.enricher._resolver.resolve.call_count, 2)
+
+    @foreach(
+        param(exc=NXDOMAIN()),
+        param(exc=NoNameservers()),
+    )
+    def test_negative_result_cached(self, exc):
+        self.enricher._resolver.resolve.side_effect = exc
+        self.assertEqual(self.enricher.fqdn_to_ip('nx.example.com'), [])
+        self.assertEqual(self.enricher.fqdn_to_ip('nx.example.com'), [])
+        self.assertEqual(self.enricher._resolver.resolve.call_count, 1)
+        self.assertEqual(self.enricher.dns_cache.get_stats()['negative_hits'], 1)
+
+    def test_timeout_not_cached(self):
+        self.enricher._resolver.resolve.side_effect = Timeout()
+        self.assertEqual(self.enricher.fqdn_to_ip('slow.example.com'), [])
+        self.assertEqual(self.enricher.fqdn_to_ip('slow.example.com'), [])
+        self.assertEqual(self.enricher._resolver.resolve.call_count, 2)
+
+
+class TestGeoIPPrefixCache(unittest.TestCase):
+
+    def setUp(self):
+        self.reader = object()
+        self.cache = GeoIPPrefixCache(maxsize=3)
+
+    def test_results_per_prefix(self):
+        self.cache.put(self.reader, ipaddress.IPv4Network('10.20.30.0/24'), 'a')
+        self.cache.put(self.reader, ipaddress.IPv4Network('10.0.0.0/12'), 'b')
+        self.cache.put(self.reader, ipaddress.IPv4Network('192.168.0.0/16'), None)
+
+        self.assertEqual(self.cache.get(self.reader, '10.20.30.255'), (True, 'a'))
+        self.assertEqual(self.cache.get(self.reader, '10.15.255.255'), (True, 'b'))
+        self.assertEqual(self.cache.get(self.reader, '192.168.1.1'), (True, None))
+        self.assertEqual(self.cache.get(self.reader, '10.20.31.0'), (False, None))
+        self.assertEqual(self.cache.get(self.reader, '192.169.0.1'), (False, None))
+
+    def test_no_network(self):
+        self.cache.put(self.reader, None, 'a')
+        self.assertEqual(self.cache.get(self.reader, '10.20.30.40'), (False, None))
+
+    def test_emptied_when_full(self):
+        for i in range(3):
+            self.cache.put(self.reader, ipaddress.IPv4Network(f'10.0.{i}.0/24'), i)
+        self.cache.put(self.reader, ipaddress.IPv4Network('10.0.3.0/24'), 3)
+
+        self.assertEqual(self.cache.get(self.reader, '10.0.3.1'), (True, 3))
+        self.assertEqual(self.cache.get(self.reader, '10.0.0.1'), (False, None))
+        self.assertEqual(self.cache.get_stats()['size'], 1)
+
+    def test_emptied_for_another_reader(self):
+        self.cache.put(self.reader, ipaddress.IPv4Network('10.20.30.0/24'), 'a')
+        new_reader = object()
+
+        self.assertEqual(self.cache.get(new_reader, '10.20.30.40'), (False, None))
+        self.cache.put(new_reader, ipaddress.IPv4Network('10.20.30.0/24'), 'b')
+        self.assertEqual(self.cache.get(new_reader, '10.20.30.40'), (True, 'b'))
+        self.assertEqual(self.cache.get_stats(), {
+            'hits': 1, 'misses': 1, 'hit_rate': 0.5,
+            'size': 1, 'maxsize': 3, 'invalidations': 1})
+
+
+class TestEnricherGeoIPPrefixCache(TestCaseMixin, unittest.TestCase):
+
+    MOCK_CONFIG = dict(TestEnricherWithFullConfig.MOCK_CONFIG,
+                       geoip_prefix_cache_size=100)
+
+    @unittest.mock.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict')
+    @unittest.mock.patch('n6datapipeline.enrich.database.Reader', MockReader)
+    @unittest.mock.patch('n6datapipeline.enrich.ConfigMixin.get_config_section')
+    def setUp(self, config_mock, *args):
+        config_mock.return_value = self.MOCK_CONFIG
+        self.patch_object(Enricher, '_setup_dnsresolver')
+        self.enricher = Enricher()
+        self.enricher.gi_asn = unittest.mock.MagicMock()
+        self.enricher.gi_asn.asn.side_effect = self._asn
+        self.enricher.gi_cc = unittest.mock.MagicMock()
+        self.enricher.gi_cc.city.side_effect = self._city
+
+    @staticmethod
+    def _asn(ip):
+        if ip.startswith('10.'):
+            return geoip2.models.ASN(ip, prefix_len=16, autonomous_system_number=1234)
+        raise AddressNotFoundError('not found', ip, 8)
+
+    @staticmethod
+    def _city(ip):
+        if ip.startswith('10.'):
+            return geoip2.models.City(['en'], country={'iso_code': 'PL'},
+                                      traits={'ip_address': ip, 'prefix_len': 20})
+        raise AddressNotFoundError('not found', ip, 8)
+
+    def test_caches_created(self):
+        self.assertIsInstance(self.enricher.asn_prefix_cache, GeoIPPrefixCache)
+        self.assertIsInstance(self.enricher.cc_prefix_cache, GeoIPPrefixCache)
+
+    def test_ip_to_asn(self):
+        self.assertEqual(self.enricher.ip_to_asn('10.1.2.3'), 1234)
+        self.assertEqual(self.enricher.ip_to_asn('10.1.255.255'), 1234)
+        self.assertEqual(self.enricher.ip_to_asn('10.2.0.1'), 1234)
+        self.assertIsNone(self.enricher.ip_to_asn('11.1.2.3'))
+        self.assertIsNone(self.enricher.ip_to_asn('11.200.0.1'))
+
+        self.assertEqual(self.enricher.gi_asn.asn.mock_calls, [
+            unittest.mock.call('10.1.2.3'),
+            unittest.mock.call('10.2.0.1'),
+            unittest.mock.call('11.1.2.3'),
+        ])
+
+    def test_ip_to_cc(self):
+        self.assertEqual(self.enricher.ip_to_cc('10.1.2.3'), 'PL')
+        self.assertEqual(self.enricher.ip_to_cc('10.1.15.255'), 'PL')
+        self.assertEqual(self.enricher.ip_to_cc('10.1.16.0'), 'PL')
+        self.assertIsNone(self.enricher.ip_to_cc('11.1.2.3'))
+        self.assertIsNone(self.enricher.ip_to_cc('11.200.0.1'))
+
+        self.assertEqual(self.enricher.gi_cc.city.mock_calls, [
+            unittest.mock.call('10.1.2.3'),
+            unittest.mock.call('10.1.16.0'),
+            unittest.mock.call('11.1.2.3'),
+        ])
+
+    def test_other_errors_not_cached(self):
+        self.enricher.gi_asn.asn.side_effect = GeoIP2Error
+        self.assertIsNone(self.enricher.ip_to_asn('10.1.2.3'))
+        self.assertIsNone(self.enricher.ip_to_asn('10.1.2.3'))
+        self.assertEqual(self.enricher.gi_asn.asn.call_count, 2)
+
+
+class TestEnricherGeoIPDatabaseReload(TestCaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.geoip_path = tmp_dir.name
+        self._write_db_file(DEFAULT_ASN_DB_FILENAME, b'asn v1')
+        self._write_db_file(DEFAULT_CC_DB_FILENAME, b'city v1')
+        self.now = 1000.0
+        self.patch('n6datapipeline.enrich.time.monotonic', lambda: self.now)
+        self.reader_mock = self.patch('n6datapipeline.enrich.database.Reader',
+                                      side_effect=self._make_reader)
+        self.mock_config = dict(TestEnricherWithFullConfig.MOCK_CONFIG,
+                                geoippath=self.geoip_path,
+                                geoip_mmap=True,
+                                geoip_reload_check_interval=60)
+
+    def _write_db_file(self, filename, content):
+        # (as `geoipupdate` does: the new file replaces the old one atomically)
+        path = os.path.join(self.geoip_path, filename)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+
+    @staticmethod
+    def _make_reader(fileish, mode):
+        with open(fileish, 'rb') as f:
+            return unittest.mock.MagicMock(content=f.read(), mode=mode)
+
+    def _make_enricher(self):
+        with unittest.mock.patch('n6datapipeline.enrich.ConfigMixin.get_config_section',
+                                 return_value=self.mock_config), \
+             unittest.mock.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict'):
+            self.patch_object(Enricher, '_setup_dnsresolver')
+            return Enricher()
+
+    def test_mmap_mode(self):
+        enricher = self._make_enricher()
+        self.assertEqual(enricher.gi_asn.mode, maxminddb.const.MODE_MMAP)
+        self.assertEqual(enricher.gi_cc.mode, maxminddb.const.MODE_MMAP)
+
+    def test_memory_mode(self):
+        self.mock_config['geoip_mmap'] = False
+        enricher = self._make_enricher()
+        self.assertEqual(enricher.gi_asn.mode, maxminddb.const.MODE_MEMORY)
+        self.assertEqual(enricher.gi_cc.mode, maxminddb.const.MODE_MEMORY)
+
+    def test_reload(self):
+        enricher = self._make_enricher()
+        old_asn_reader = enricher.gi_asn
+        old_cc_reader = enricher.gi_cc
+        self._write_db_file(DEFAULT_ASN_DB_FILENAME, b'asn v2')
+
+        self.now += 59
+        enricher.maybe_reload_geodb()
+        self.assertIs(enricher.gi_asn, old_asn_reader)
+
+        self.now += 1
+        enricher.maybe_reload_geodb()
+        self.assertEqual(enricher.gi_asn.content, b'asn v2')
+        self.assertIs(enricher.gi_cc, old_cc_reader)
+        old_asn_reader.close.assert_called_once_with()
+        old_cc_reader.close.assert_not_called()
+
+        self.now += 60
+        enricher.maybe_reload_geodb()
+        self.assertEqual(self.reader_mock.call_count, 3)
+
+    def test_reload_when_processing_message(self):
+        enricher = self._make_enricher()
+        enricher.enrich = unittest.mock.MagicMock(side_effect=lambda data: data)
+        enricher.publish_output = unittest.mock.MagicMock()
+        self._write_db_file(DEFAULT_CC_DB_FILENAME, b'city v2')
+        self.now += 60
+
+        enricher.input_callback(
+            'event.filtered.test.test',
+            RecordDict(_BaseTestEnricher.COMMON_DATA).get_ready_json(),
+            unittest.mock.MagicMock(headers=None, content_type=None))
+
+        self.assertEqual(enricher.gi_cc.content, b'city v2')
+
+    def test_failed_reload_keeps_old_reader(self):
+        enricher = self._make_enricher()
+        old_asn_reader = enricher.gi_asn
+        self._write_db_file(DEFAULT_ASN_DB_FILENAME, b'asn v2')
+        self.reader_mock.side_effect = ValueError('corrupted database')
+        self.now += 60
+
+        enricher.maybe_reload_geodb()
+
+        self.assertIs(enricher.gi_asn, old_asn_reader)
+        old_asn_reader.close.assert_not_called()
+
+        # the reload is retried on the next check (though the file has
+        # not been changed since the failed attempt)
+        self.reader_mock.side_effect = self._make_reader
+        self.now += 60
+
+        enricher.maybe_reload_geodb()
+
+        self.assertEqual(enricher.gi_asn.content, b'asn v2')
+        old_asn_reader.close.assert_called_once_with()
+
+    def test_no_reload_checks_by_default(self):
+        self.mock_config['geoip_reload_check_interval'] = 0
+        enricher = self._make_enricher()
+        old_asn_reader = enricher.gi_asn
+        self._write_db_file(DEFAULT_ASN_DB_FILENAME, b'asn v2')
+        self.now += 3600
+
+        enricher.maybe_reload_geodb()
+
+        self.assertIs(enricher.gi_asn, old_asn_reader)
+
+
+class TestEnricherEnrichBatch(TestCaseMixin, unittest.TestCase):
+
+    MOCK_CONFIG = dict(TestEnricherWithFullConfig.MOCK_CONFIG,
+                       excluded_ips=['10.0.0.1'])
+
+    @unittest.mock.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict')
+    @unittest.mock.patch('n6datapipeline.enrich.database.Reader', MockReader)
+    @unittest.mock.patch('n6datapipeline.enrich.ConfigMixin.get_config_section')
+    def setUp(self, config_mock, *args):
+        config_mock.return_value = self.MOCK_CONFIG
+        self.patch_object(Enricher, '_setup_dnsresolver')
+        self.enricher = Enricher()
+        self.enricher._resolver = unittest.mock.MagicMock()
+        self.enricher._resolver.resolve.side_effect = self._resolve
+        self.enricher.ip_to_asn = unittest.mock.MagicMock(side_effect=lambda ip: ip.split('.')[1])
+        self.enricher.ip_to_cc = unittest.mock.MagicMock(side_effect=lambda ip: 'PL')
+
+    @staticmethod
+    def _resolve(fqdn, *args, **kwargs):
+        if fqdn == 'nx.example.com':
+            raise DNSException
+        if fqdn == 'excluded.example.com':
+            return ['10.0.0.1']
+        return ['10.1.1.1', '10.2.2.2']
+
+    def _make_data_list(self):
+        return [
+            RecordDict(dict(_BaseTestEnricher.COMMON_DATA, **data))
+            for data in [
+                {'fqdn': 'a.example.com'},
+                {'url': 'http://a.example.com/foo'},
+                {'url': 'http://b.example.com/foo'},
+                {'url': 'http://10.3.3.3/foo'},
+                {'fqdn': 'nx.example.com'},
+                {'fqdn': 'excluded.example.com'},
+                {'fqdn': 'c.example.com', 'address': [{'ip': '10.2.2.2'}]},
+                {'fqdn': 'd.example.com', '_do_not_resolve_fqdn_to_ip': True},
+                {},
+            ]]
+
+    def test_same_results_as_enrich(self):
+        expected = [self.enricher.enrich(data) for data in self._make_data_list()]
+
+        results = self.enricher.enrich_batch(self._make_data_list())
+
+        self.assertEqual(results, expected)
+
+    def test_each_value_resolved_or_looked_up_once(self):
+        self.enricher.enrich_batch(self._make_data_list())
+
+        self.assertCountEqual(
+            [c.args[0] for c in self.enricher._resolver.resolve.mock_calls],
+            ['a.example.com', 'b.example.com', 'nx.example.com', 'excluded.example.com'])
+        self.assertCountEqual(
+            [c.args[0] for c in self.enricher.ip_to_asn.mock_calls],
+            ['10.1.1.1', '10.2.2.2', '10.3.3.3'])
+        self.assertCountEqual(
+            [c.args[0] for c in self.enricher.ip_to_cc.mock_calls],
+            ['10.1.1.1', '10.2.2.2', '10.3.3.3'])
+
+    def test_per_record_failures(self):
+        error = ZeroDivisionError('unexpected')
+        def ip_to_asn(ip):
+            if ip == '10.3.3.3':
+                raise error
+            return '42'
+        self.enricher.ip_to_asn.side_effect = ip_to_asn
+        data_list = self._make_data_list()
+
+        results = self.enricher.enrich_batch(data_list)
+
+        self.assertIs(results[3], error)
+        self.assertEqual(error._n6_event_rid, data_list[3]['rid'])
+        for i, result in enumerate(results):
+            if i != 3:
+                self.assertIs(result, data_list[i])
+                self.assertIn('enriched', result)
+
+    def test_empty(self):
+        self.assertEqual(self.enricher.enrich_batch([]), [])
+        self.enricher._resolver.resolve.assert_not_called()
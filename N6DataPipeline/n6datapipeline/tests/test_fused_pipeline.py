@@ -0,0 +1,151 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import unittest
+from unittest.mock import (
+    MagicMock,
+    sentinel as sen,
+)
+
+from n6datapipeline.aux.fused_pipeline import (
+    FusedPipelineParserMixin,
+    make_fused_pipeline_parser_class,
+)
+from n6datapipeline.base import LegacyQueuedBase
+from n6lib.auth_api import AuthAPICommunicationError
+from n6lib.unit_test_helpers import TestCaseMixin
+
+
+class ExampleParser(LegacyQueuedBase):
+
+    input_queue = {
+        'exchange': 'raw',
+        'exchange_type': 'topic',
+    }
+    output_queue = {
+        'exchange': 'event',
+        'exchange_type': 'topic',
+    }
+
+    event_type = 'event'
+
+    def prepare_data(self, routing_key, body, properties):
+        return {
+            'source': routing_key,
+            'raw': body,
+            'properties.message_id': '0123456789abcdef0123456789abcdef',
+        }
+
+    def get_output_rk(self, data):
+        return 'event.parsed.{}'.format(data['source'])
+
+    def get_output_record_dicts(self, data, working_seq):
+        for event_id in data['raw'].split():
+            working_seq.append({'id': event_id.decode()})
+        return working_seq
+
+
+class ExampleBlacklistParser(ExampleParser):
+
+    event_type = 'bl'
+
+
+class TestMakeFusedPipelineParserClass(unittest.TestCase):
+
+    def test_class_made(self):
+        fused_parser_class = make_fused_pipeline_parser_class(ExampleParser)
+
+        self.assertTrue(issubclass(fused_parser_class, FusedPipelineParserMixin))
+        self.assertTrue(issubclass(fused_parser_class, ExampleParser))
+        self.assertEqual(fused_parser_class.__name__, 'ExampleParser')
+        self.assertEqual(fused_parser_class.__qualname__, 'ExampleParser')
+
+    def test_non_event_parser_rejected(self):
+        with self.assertRaises(ValueError):
+            make_fused_pipeline_parser_class(ExampleBlacklistParser)
+
+    def test_non_parser_rejected(self):
+        with self.assertRaises(TypeError):
+            make_fused_pipeline_parser_class(dict)
+
+
+class TestFusedPipelineParserMixin(TestCaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.patch_argparse_stuff()
+        self.patch('n6datapipeline.base.LegacyQueuedBase.get_connection_params_dict',
+                   return_value={'heartbeat_interval': 30})
+        self.enricher = MagicMock()
+        self.enricher.enrich.side_effect = self._fake_enrich
+        self.event_filter = MagicMock()
+        self.event_filter.filter_record_dict.side_effect = self._fake_filter_record_dict
+        self.recorder = MagicMock()
+        self.recorded_batches = []
+        self.recorder.record_new_events.side_effect = (
+            lambda batch: self.recorded_batches.append(list(batch)))
+        fused_parser_class = make_fused_pipeline_parser_class(ExampleParser)
+        self.fused_parser = fused_parser_class(
+            enricher=self.enricher,
+            event_filter=self.event_filter,
+            recorder=self.recorder)
+
+    @staticmethod
+    def _fake_enrich(record_dict):
+        if record_dict['id'] == 'enrich-error':
+            raise ValueError('some error')
+        record_dict['enriched'] = True
+        return record_dict
+
+    @staticmethod
+    def _fake_filter_record_dict(record_dict):
+        if record_dict['id'] == 'auth-api-error':
+            raise AuthAPICommunicationError('some error')
+        record_dict['client'] = ['o1']
+        return record_dict
+
+    def test_recorder_publishes_through_fused_parser(self):
+        self.assertEqual(self.recorder.publish_output, self.fused_parser.publish_output)
+
+    def test_events_passed_through_all_stages_and_recorded_in_batches(self):
+        self.fused_parser.recorder_batch_size = 2
+
+        self.fused_parser.input_callback('foo.bar', b'a b c', sen.properties)
+
+        expected_record_dicts = [
+            {'id': event_id, 'enriched': True, 'client': ['o1']}
+            for event_id in 'abc']
+        self.assertEqual(self.recorded_batches, [
+            [('event.filtered.foo.bar', expected_record_dicts[0]),
+             ('event.filtered.foo.bar', expected_record_dicts[1])],
+            [('event.filtered.foo.bar', expected_record_dicts[2])],
+        ])
+        self.assertEqual(self.enricher.enrich.call_count, 3)
+        self.assertEqual(self.event_filter.filter_record_dict.call_count, 3)
+
+    def test_event_skipped_if_its_processing_failed(self):
+        self.fused_parser.input_callback('foo.bar', b'a enrich-error b', sen.properties)
+
+        [batch] = self.recorded_batches
+        self.assertEqual([record_dict['id'] for _, record_dict in batch], ['a', 'b'])
+        self.assertEqual(self.event_filter.filter_record_dict.call_count, 2)
+
+    def test_nothing_recorded_if_no_events(self):
+        self.fused_parser.input_callback('foo.bar', b'', sen.properties)
+
+        self.assertEqual(self.recorder.record_new_events.mock_calls, [])
+
+    def test_auth_api_communication_error_propagated(self):
+        with self.assertRaises(AuthAPICommunicationError):
+            self.fused_parser.input_callback('foo.bar', b'a auth-api-error', sen.properties)
+
+        self.assertEqual(self.recorder.record_new_events.mock_calls, [])
+
+    def test_error_event_info_set_for_each_stage(self):
+        self.fused_parser.input_callback('foo.bar', b'a', sen.properties)
+
+        [recorded] = [record_dict for _, record_dict in self.recorded_batches[0]]
+        self.enricher.setting_error_event_info.assert_called_once_with(recorded)
+        self.event_filter.setting_error_event_info.assert_called_once_with(recorded)
+
+
+if __name__ == '__main__':
+    unittest.main()
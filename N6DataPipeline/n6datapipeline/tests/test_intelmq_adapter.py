@@ -0,0 +1,80 @@
+# Copyright (c) 2025 NASK. All rights reserved.
+
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from unittest_expander import (
+    expand,
+    foreach,
+    param,
+)
+
+from n6datapipeline.intelmq.utils.intelmq_adapter import N6ToIntel
+from n6lib.record_dict import (
+    MSGPACK_CONTENT_TYPE,
+    RECORD_DICT_WIRE_FORMATS,
+)
+from n6lib.unit_test_helpers import (
+    MethodProxy,
+    TestCaseMixin,
+)
+
+
+@expand
+class TestN6ToIntel_input_callback(TestCaseMixin, unittest.TestCase):
+
+    INPUT_RK = 'event.filtered.test.channel'
+    OUTPUT_RK = 'event.n6-to-intelmq-adapter.test.channel'
+
+    INPUT_DATA = {
+        'id': '0123456789abcdef0123456789abcdef',
+        'rid': 'fedcba9876543210fedcba9876543210',
+        'source': 'test.channel',
+        'restriction': 'public',
+        'confidence': 'high',
+        'category': 'phish',
+        'time': '2025-01-02 03:04:05',
+        'address': [{'ip': '1.2.3.4', 'cc': 'PL', 'asn': 12345}],
+        'fqdn': 'example.com',
+    }
+
+    EXPECTED_OUTPUT_DATA = {
+        'source.ip': '1.2.3.4',
+        'source.geolocation.cc': 'PL',
+        'source.asn': 12345,
+        'source.fqdn': 'example.com',
+        'feed.accuracy': 100.0,
+        'classification.taxonomy': 'Fraud',
+        'classification.identifier': 'phishing',
+        'classification.type': 'phishing',
+    }
+
+    def setUp(self):
+        self.mock = MagicMock(__class__=N6ToIntel)
+        self.meth = MethodProxy(N6ToIntel, self.mock, 'converter components_id get_output_rk')
+
+    @foreach(
+        param(content_type=None).label('json'),
+        param(content_type=MSGPACK_CONTENT_TYPE).label('msgpack'),
+    )
+    def test(self, content_type):
+        if content_type == MSGPACK_CONTENT_TYPE:
+            if 'msgpack' not in RECORD_DICT_WIRE_FORMATS:
+                raise unittest.SkipTest('msgpack is not installed')
+            import msgpack
+            body = msgpack.packb(self.INPUT_DATA, use_bin_type=True)
+        else:
+            body = json.dumps(self.INPUT_DATA).encode('utf-8')
+        properties = MagicMock(content_type=content_type)
+
+        self.meth.input_callback(self.INPUT_RK, body, properties)
+
+        self.assertEqual(len(self.mock.publish_output.mock_calls), 1)
+        [(_, _, call_kwargs)] = self.mock.publish_output.mock_calls
+        self.assertEqual(call_kwargs.keys(), {'routing_key', 'body'})
+        self.assertEqual(call_kwargs['routing_key'], self.OUTPUT_RK)
+        output_data = json.loads(call_kwargs['body'])
+        self.assertEqual(
+            {key: output_data.get(key) for key in self.EXPECTED_OUTPUT_DATA},
+            self.EXPECTED_OUTPUT_DATA)
@@ -0,0 +1,103 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import datetime
+import unittest
+from unittest.mock import (
+    MagicMock,
+    call,
+    sentinel as sen,
+)
+
+from n6datapipeline.recorder import Recorder
+from n6lib.unit_test_helpers import (
+    MethodProxy,
+    TestCaseMixin,
+)
+
+
+class TestRecorder_record_new_events(TestCaseMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.event_bulk_insert = self.patch('n6datapipeline.recorder.EVENT_BULK_INSERT')
+        self.client_bulk_insert = self.patch('n6datapipeline.recorder.CLIENT_TO_EVENT_BULK_INSERT')
+        self.transact = self.patch('n6datapipeline.recorder.transact')
+        self.mock = MagicMock(__class__=Recorder)
+        self.mock.cmdline_args.n6recovery = False
+        self.mock._fatal_db_api_error_codes = frozenset()
+        self.meth = MethodProxy(Recorder, self.mock, [
+            'get_truncated_rk',
+            'insert_new_event_db_rows',
+            '_exit_if_fatal_db_api_error',
+            '_get_db_api_error_code',
+            '_record_new_events_one_by_one',
+        ])
+        self.record_dict_1 = MagicMock(**{
+            'iter_db_rows.return_value': iter([sen.event_row_1a, sen.event_row_1b]),
+            'iter_client_db_rows.return_value': iter([sen.client_row_1]),
+        })
+        self.record_dict_2 = MagicMock(**{
+            'iter_db_rows.return_value': iter([sen.event_row_2]),
+            'iter_client_db_rows.return_value': iter([]),
+        })
+        self.pairs = [
+            ('event.filtered.foo.bar', self.record_dict_1),
+            ('event.filtered.spam.ham', self.record_dict_2),
+        ]
+
+    def test_rows_inserted_at_once(self):
+        self.meth.record_new_events(self.pairs)
+
+        connection = self.mock.session_db.connection.return_value
+        self.assertEqual(self.event_bulk_insert.mock_calls, [
+            call.execute(connection, [sen.event_row_1a, sen.event_row_1b, sen.event_row_2]),
+        ])
+        self.assertEqual(self.client_bulk_insert.mock_calls, [
+            call.execute(connection, [sen.client_row_1]),
+        ])
+        [(_, (key_1, modified_1), _)] = self.record_dict_1.__setitem__.mock_calls
+        [(_, (key_2, modified_2), _)] = self.record_dict_2.__setitem__.mock_calls
+        self.assertEqual(key_1, 'modified')
+        self.assertEqual(key_2, 'modified')
+        self.assertIsInstance(modified_1, datetime.datetime)
+        self.assertEqual(modified_1.microsecond, 0)
+        self.assertIs(modified_2, modified_1)
+        self.transact.__enter__.assert_called_once_with()
+        self.mock._handle_record_dict.assert_not_called()
+        self.assertEqual(self.mock.publish_as_recorded.call_count, 2)
+
+    def test_no_publishing_in_recovery_mode(self):
+        self.mock.cmdline_args.n6recovery = True
+
+        self.meth.record_new_events(self.pairs)
+
+        self.assertEqual(len(self.event_bulk_insert.execute.mock_calls), 1)
+        self.mock.publish_as_recorded.assert_not_called()
+
+    def test_events_recorded_one_by_one_if_bulk_insert_failed(self):
+        self.event_bulk_insert.execute.side_effect = ValueError('duplicate entry')
+        self.mock._handle_record_dict.side_effect = [
+            RuntimeError('event-specific failure'),
+            None,
+        ]
+
+        self.meth.record_new_events(self.pairs)
+
+        self.assertEqual(len(self.event_bulk_insert.execute.mock_calls), 1)
+        self.client_bulk_insert.execute.assert_not_called()
+        self.assertEqual(self.mock._handle_record_dict.mock_calls, [
+            call('event.filtered.foo.bar', 'event.filtered', self.record_dict_1),
+            call('event.filtered.spam.ham', 'event.filtered', self.record_dict_2),
+        ])
+        self.mock.publish_as_recorded.assert_not_called()
+
+    def test_fatal_db_api_error_causes_exit(self):
+        exc = ValueError('fatal')
+        self.event_bulk_insert.execute.side_effect = exc
+        self.mock._fatal_db_api_error_codes = frozenset({1234})
+        self.mock._get_db_api_error_code = MagicMock(return_value=1234)
+
+        with self.assertRaises(SystemExit):
+            self.meth.record_new_events(self.pairs)
+
+        self.mock._handle_record_dict.assert_not_called()
+        self.mock.publish_as_recorded.assert_not_called()
@@ -80,6 +80,11 @@ class MispCollector(StatefulCollectorMixin, BaseDownloadingCollector, BaseCollec
         },
     ]
 
+    # (malware samples may be numerous and large, so let's publish them
+    # as fast as the broker accepts them, but without building up a large
+    # outbound buffer -- see `LegacyQueuedBase`'s attribute with this name)
+    iterative_publishing_backpressure_aware = True
+
 
     #
     # Config-related stuff
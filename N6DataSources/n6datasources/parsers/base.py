@@ -44,6 +44,7 @@ from n6lib.record_dict import (
     RecordDict,
     BLRecordDict,
 )
+from n6lib.stats_helpers import TRACE_HEADER
 from n6lib.typing_helpers import KwargsDict
 
 
@@ -115,6 +116,10 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
     # see also: the 'type' item of a n6lib.record_dict.RecordDict)
     event_type = 'event'
 
+    # (the output bodies are serialized record dicts made by the parser,
+    # so they can be tagged as trusted; see: `LegacyQueuedBase`)
+    tags_output_as_trusted_record_dicts = True
+
     # whether a parsed file that results in no events should raise an error
     # (see: get_output_bodies())
     allow_empty_results = False
@@ -122,6 +127,13 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
     # prefixes of rows to be filtered out by `CsvRawRows` while reading CSV-like data
     ignored_csv_raw_row_prefixes: Union[str, tuple[str, ...], None] = None
 
+    # if positive: the max size of each of the LRU memos of the results
+    # of adjusting the values of `record_dict_class.memoizable_keys` (see:
+    # `n6lib.record_dict.RecordDict.enable_adjuster_memoization()`); the
+    # hit/miss stats of the memos are included in the stats reports (if
+    # the `--n6stats-file` option is given); 0 means: no memoization
+    adjuster_memo_maxsize: int = 0
+
 
     #
     # Auxiliary classes
@@ -207,6 +219,12 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
         # a `LegacyQueuedBase`'s class attribute) is overridden here --
         # with the value from the parser-specific config.
         self.prefetch_count = self.config['prefetch_count']
+        if self.adjuster_memo_maxsize > 0:
+            self.record_dict_class.enable_adjuster_memoization(self.adjuster_memo_maxsize)
+            if self._stats is not None:
+                self._stats.add_report_section(
+                    'adjuster_memos',
+                    self.record_dict_class.get_adjuster_memo_stats)
 
     # * Configurable-pipeline-related hooks:
 
@@ -400,9 +418,11 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
         """
         assert isinstance(body, bytes)
 
-        # custom AMQP headers (if any)
+        # custom AMQP headers (if any) -- except the trace (it is
+        # handled by the `LegacyQueuedBase` machinery)
         data = (properties.headers.copy() if properties.headers is not None
                 else {})
+        data.pop(TRACE_HEADER, None)
 
         # basic AMQP properties -- each key prefixed with 'properties.'
         properties.timestamp = str(datetime.utcfromtimestamp(properties.timestamp))
@@ -460,7 +480,9 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
 
         Yields:
             The sequence passed in as the `working_seq` argument -- filled
-            with bytes instances, each being JSON-serialized event data dict.
+            with bytes instances, each being serialized event data dict
+            (JSON, unless another wire format is configured; see:
+            `LegacyQueuedBase.serialize_record_dict()`).
 
         This method calls the following parser-specific methods:
 
@@ -471,12 +493,52 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
         It also does some operations on record dicts yielded by parse()
         and returned by postprocess_parsed(), especially:
 
-        * setting the 'id' item.
-        * getting a ready JSON string (containing serialized event data).
+        * setting the 'id' item,
+        * serializing the record dict (see:
+          `LegacyQueuedBase.serialize_record_dict()`), which includes
+          checking whether it is ready.
 
         Typically, this method is used indirectly -- being called in
         input_callback().
         """
+        self._make_output_items(data, working_seq, self.serialize_record_dict)
+        # we have parsed and postprocessed all data so now
+        # we can start publishing without fear of breaking
+        # publishing in the midst by a data error
+        return working_seq
+
+    def get_output_record_dicts(self, data, working_seq):
+        """
+        Process given data and make a list of ready record dicts.
+
+        Args/kwargs:
+            `data` (dict):
+                As returned by prepare_data() (especially, its 'raw' item
+                contains the raw input data body).
+            `working_seq` (a sequence...):
+                An empty list-like sequence to be used for processing.
+                It must support at least the following operations:
+                .append, .__setitem__, iter, len (and bool).
+
+        Returns:
+            The sequence passed in as the `working_seq` argument -- filled
+            with postprocessed record dicts (each checked for containing
+            all required items, see: `RecordDict.verify_ready()`).
+
+        The processing is the same as in get_output_bodies(), except
+        that the record dicts are not serialized.
+
+        This method is *not* used by input_callback(); it is intended
+        to be used by tools that pass record dicts directly to other
+        components, without AMQP (see, e.g.:
+        `n6datapipeline.aux.fused_pipeline`).
+        """
+        return self._make_output_items(data, working_seq, self._get_verified_record_dict)
+
+    def _make_output_items(self, data, working_seq, make_output_item):
+        # (the common part of get_output_bodies() and get_output_record_dicts();
+        # `make_output_item` is called for each postprocessed record dict, and
+        # its result is stored in `working_seq` in place of the record dict)
         for parsed in self.parse(data):
             assert isinstance(parsed, RecordDict)
             if not parsed.used_as_context_manager:
@@ -490,17 +552,19 @@ class BaseParser(ConfigMixin, LegacyQueuedBase):
             with self.setting_error_event_info(parsed):
                 parsed = self.postprocess_parsed(data, parsed, total,
                                                  item_no=(i + 1))
-                working_seq[i] = parsed.get_ready_json().encode('utf-8')
+                working_seq[i] = make_output_item(parsed)
         if not working_seq and not self.allow_empty_results:
             raise ValueError('no output data to publish; either all data '
                              'items caused AdjusterError (you can look '
                              'for apropriate warnings in logs) or input '
                              'data contained no actual data items')
-        # we have parsed and postprocessed all data so now
-        # we can start publishing without fear of breaking
-        # publishing in the midst by a data error
         return working_seq
 
+    @staticmethod
+    def _get_verified_record_dict(parsed):
+        parsed.verify_ready()
+        return parsed
+
     def delete_too_long_address(self, parsed):
         # XXX: shouldn't this behavior be changed to some less destructive one? See #8525...
         _address = parsed.get('address')
@@ -554,6 +554,30 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
             SomeParser()
 
 
+    def test_instantiation_with_adjuster_memoization(self):
+        class SomeRecordDict(RecordDict):
+            pass
+        stats_mock = Mock()
+        class SomeParser(BaseParser):  # noqa
+            default_binding_key = 'foo.bar'
+            record_dict_class = SomeRecordDict
+            adjuster_memo_maxsize = 42
+            _stats = stats_mock
+        self.super_obj_stub.__init__ = Mock()
+        self.config_files_mocked_data = {}
+        with patch('n6lib.config.LOGGER'), \
+             self.super_patcher, \
+             self.config_patcher:
+
+            SomeParser()
+
+        self.assertEqual(SomeRecordDict.get_adjuster_memo_stats()['source']['maxsize'], 42)
+        self.assertEqual(RecordDict.get_adjuster_memo_stats(), {})
+        self.assertEqual(stats_mock.mock_calls, [
+            call.add_report_section('adjuster_memos', SomeRecordDict.get_adjuster_memo_stats),
+        ])
+
+
     @foreach(
         param(binding_key='foo.bar'),
         param(binding_key='foo.bar.202208'),
@@ -1063,6 +1087,21 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
         })
 
 
+    def test__prepare_data__trace_header_omitted(self):
+        self.mock.CsvRawRows = BaseParser.CsvRawRows
+        self.mock.ignored_csv_raw_row_prefixes = None
+
+        data = self.meth.prepare_data(
+            routing_key='provider.channel',
+            body=b'<some body>',
+            properties=PlainNamespace(timestamp=1389348840,
+                                      headers={'a': sentinel.a,
+                                               'n6trace': ['SomeCollector@1389348840000']}))
+
+        self.assertEqual(data['a'], sentinel.a)
+        self.assertNotIn('n6trace', data)
+
+
     def test__get_output_rk(self):
         self.mock.event_type = 'foobar'
         data = {'source': 'provider.channel'}
@@ -1072,6 +1111,13 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
         self.assertEqual(output_rk, 'foobar.parsed.provider.channel')
 
 
+    def _get_meth_with_real_output_items_making(self):
+        return MethodProxy(BaseParser, self.mock, [
+            '_make_output_items',
+            '_get_verified_record_dict',
+        ])
+
+
     def test__get_output_bodies(self):
         parsed = [
             MagicMock(**{
@@ -1091,16 +1137,21 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
             'postprocess_parsed.side_effect': (
                 lambda data, parsed, total, item_no: parsed
             ),
+            'serialize_record_dict.side_effect': (
+                lambda parsed: parsed.get_ready_json().encode('utf-8')
+            ),
         })
         seq_mock = FilePagedSequence._instance_mock()
+        meth = self._get_meth_with_real_output_items_making()
 
-        output_bodies = self.meth.get_output_bodies(sentinel.data, seq_mock)
+        output_bodies = meth.get_output_bodies(sentinel.data, seq_mock)
 
         self.assertIs(output_bodies, seq_mock)
         self.assertEqual(seq_mock._as_list(), [
             b'<here first json...>',
             b'<here second json...>',
         ])
+        # (readiness is checked only within serialization)
         self.assertEqual(parsed[0].mock_calls, [
             call.__setitem__('id', sentinel.msg_A),
             call.get_ready_json(),
@@ -1122,6 +1173,7 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
                                     parsed[0],
                                     2,
                                     item_no=1),
+            call.serialize_record_dict(parsed[0]),
             call.setting_error_event_info().__exit__(None, None, None),
 
             call.setting_error_event_info(parsed[1]),
@@ -1130,11 +1182,94 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
                                     parsed[1],
                                     2,
                                     item_no=2),
+            call.serialize_record_dict(parsed[1]),
             call.setting_error_event_info().__exit__(None, None, None),
         ])
 
 
-    def test__get_output_bodies__with_record_dict_not_used_as_context_manager_raises_error(self):
+    def test__get_output_bodies__with_serialize_record_dict_raising_error(self):
+        self.mock.configure_mock(**{
+            'parse.return_value': iter([
+                MagicMock(**{
+                    '__class__': RecordDict,
+                    'used_as_context_manager': True,
+                })
+            ]),
+            'setting_error_event_info': MagicMock(),
+            'postprocess_parsed.side_effect': (
+                lambda data, parsed, total, item_no: parsed
+            ),
+            'serialize_record_dict.side_effect': ValueError,
+        })
+        seq_mock = FilePagedSequence._instance_mock()
+        meth = self._get_meth_with_real_output_items_making()
+
+        with self.assertRaises(ValueError):
+            meth.get_output_bodies(sentinel.data, seq_mock)
+
+        self.assertEqual(len(self.mock.serialize_record_dict.mock_calls), 1)
+
+
+    def test__get_output_record_dicts(self):
+        parsed = [
+            MagicMock(**{
+                '__class__': RecordDict,
+                'used_as_context_manager': True,
+            })
+            for _ in ('first', 'second')
+        ]
+        self.mock.configure_mock(**{
+            'parse.return_value': iter(parsed),
+            'get_output_message_id.side_effect': [
+                sentinel.msg_A,
+                sentinel.msg_B,
+            ],
+            'setting_error_event_info': MagicMock(),
+            'postprocess_parsed.side_effect': (
+                lambda data, parsed, total, item_no: parsed
+            ),
+        })
+        seq_mock = FilePagedSequence._instance_mock()
+        meth = self._get_meth_with_real_output_items_making()
+
+        output_record_dicts = meth.get_output_record_dicts(sentinel.data, seq_mock)
+
+        self.assertIs(output_record_dicts, seq_mock)
+        self.assertEqual(seq_mock._as_list(), parsed)
+        self.assertEqual(parsed[0].mock_calls, [
+            call.__setitem__('id', sentinel.msg_A),
+            call.verify_ready(),
+        ])
+        self.assertEqual(parsed[1].mock_calls, [
+            call.__setitem__('id', sentinel.msg_B),
+            call.verify_ready(),
+        ])
+        self.assertEqual(self.mock.mock_calls, [
+            call.parse(sentinel.data),
+            call.get_output_message_id(parsed[0]),
+            call.delete_too_long_address(parsed[0]),
+            call.get_output_message_id(parsed[1]),
+            call.delete_too_long_address(parsed[1]),
+
+            call.setting_error_event_info(parsed[0]),
+            call.setting_error_event_info().__enter__(),
+            call.postprocess_parsed(sentinel.data,
+                                    parsed[0],
+                                    2,
+                                    item_no=1),
+            call.setting_error_event_info().__exit__(None, None, None),
+
+            call.setting_error_event_info(parsed[1]),
+            call.setting_error_event_info().__enter__(),
+            call.postprocess_parsed(sentinel.data,
+                                    parsed[1],
+                                    2,
+                                    item_no=2),
+            call.setting_error_event_info().__exit__(None, None, None),
+        ])
+
+
+    def test__get_output_record_dicts__with_record_dict_not_used_as_context_manager_raises_error(self):
         self.mock.parse.return_value = iter([
             MagicMock(**{
                 '__class__': RecordDict,
@@ -1142,9 +1277,10 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
             })
         ])
         seq_mock = FilePagedSequence._instance_mock()
+        meth = self._get_meth_with_real_output_items_making()
 
         with self.assertRaises(AssertionError):
-            self.meth.get_output_bodies(sentinel.data, seq_mock)
+            meth.get_output_record_dicts(sentinel.data, seq_mock)
 
         self.assertEqual(seq_mock._as_list(), [])
         self.assertEqual(self.mock.method_calls, [
@@ -1152,12 +1288,13 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
         ])
 
 
-    def test__get_output_bodies__with_parse_yielding_no_items_raises_error(self):
+    def test__get_output_record_dicts__with_parse_yielding_no_items_raises_error(self):
         self.mock.parse.return_value = iter([])
         seq_mock = FilePagedSequence._instance_mock()
+        meth = self._get_meth_with_real_output_items_making()
 
         with self.assertRaises(ValueError):
-            self.meth.get_output_bodies(sentinel.data, seq_mock)
+            meth.get_output_record_dicts(sentinel.data, seq_mock)
 
         self.assertEqual(seq_mock._as_list(), [])
         self.assertEqual(self.mock.method_calls, [
@@ -1165,14 +1302,15 @@ class TestBaseParser(TestCaseMixin, unittest.TestCase):
         ])
 
 
-    def test__get_output_bodies__with_parse_yielding_no_items_and_with_allow_empty_results(self):
+    def test__get_output_record_dicts__with_parse_yielding_no_items_and_with_allow_empty_results(self):
         self.mock.parse.return_value = iter([])
         self.mock.allow_empty_results = True
         seq_mock = FilePagedSequence._instance_mock()
+        meth = self._get_meth_with_real_output_items_making()
 
-        output_bodies = self.meth.get_output_bodies(sentinel.data, seq_mock)
+        output_record_dicts = meth.get_output_record_dicts(sentinel.data, seq_mock)
 
-        self.assertIs(output_bodies, seq_mock)
+        self.assertIs(output_record_dicts, seq_mock)
         self.assertEqual(seq_mock._as_list(), [])  # just empty
         self.assertEqual(self.mock.mock_calls, [
             call.parse(sentinel.data),
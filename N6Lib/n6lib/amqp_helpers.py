@@ -64,6 +64,20 @@ RABBITMQ_CONFIG_SPEC_PATTERN = '''
     # value other than guest, `password` needs to be set to a secret password
     # being at least 16 characters long.
 
+    # Secret key (at least 32 characters long) shared by pipeline components
+    # to tag record dicts' JSON they send to each other, so that receiving
+    # components can skip re-adjusting the data (see the `RecordDictTrust`
+    # class in `n6lib.record_dict`); empty means that nothing is tagged
+    # and nothing is trusted.
+    record_dict_trust_key = :: str
+
+    # Wire format of record dicts sent by pipeline components to each other:
+    # `json` (the default) or `msgpack` (MessagePack -- more compact and
+    # faster to (de)serialize; available only if the `msgpack` library is
+    # installed). Note that the components receiving the messages need to
+    # support it (they recognize it by the `content_type` AMQP property).
+    record_dict_wire_format = json :: str
+
     ...
 '''
 
@@ -183,6 +197,38 @@ def get_pipeline_binding_states(pipeline_group,
         return None
 
 
+def get_record_dict_trust_key(rabbitmq_config_section='rabbitmq'):
+    """
+    Get the secret key for tagging record dicts' JSON sent between
+    pipeline components (see: `n6lib.record_dict.RecordDictTrust`).
+
+    Returns:
+        The key (as `bytes`) or None if it is not configured.
+
+    Raises:
+        n6lib.config.ConfigError if some config options are invalid.
+    """
+    config_spec = RABBITMQ_CONFIG_SPEC_PATTERN.format(
+        rabbitmq_config_section=rabbitmq_config_section)
+    config = n6lib.config.Config.section(config_spec)
+    key = config['record_dict_trust_key']
+    return (key.encode('utf-8') if key else None)
+
+
+def get_record_dict_wire_format(rabbitmq_config_section='rabbitmq'):
+    """
+    Get the name of the wire format of record dicts sent between pipeline
+    components (see: `n6lib.record_dict.RECORD_DICT_WIRE_FORMATS`).
+
+    Raises:
+        n6lib.config.ConfigError if some config options are invalid.
+    """
+    config_spec = RABBITMQ_CONFIG_SPEC_PATTERN.format(
+        rabbitmq_config_section=rabbitmq_config_section)
+    config = n6lib.config.Config.section(config_spec)
+    return config['record_dict_wire_format']
+
+
 def get_amqp_connection_params_dict(rabbitmq_config_section='rabbitmq'):
     """
     Prepare AMQP connection parameters (as a dict) based on config.
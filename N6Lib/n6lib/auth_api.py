@@ -9,12 +9,14 @@ import fcntl
 import fnmatch
 import functools
 import ipaddress
+import itertools
 import json
 import math
 import os
 import pathlib
 import pickle
 import re
+import sys
 import time
 import traceback
 import threading
@@ -27,6 +29,11 @@ from typing import (
     Union,
 )
 
+try:
+    from re import _parser as _sre_parse         # Python >= 3.11
+except ImportError:
+    import sre_parse as _sre_parse               # Python < 3.11
+
 from authlib.common.errors import AuthlibBaseError
 from requests import RequestException
 from sqlalchemy.exc import SQLAlchemyError
@@ -265,6 +272,14 @@ class AuthAPI(ConfigMixin):
             root_node = self._get_root_node()
         return root_node
 
+    def dispose_db_connection_pool(self):
+        """
+        Close all pooled Auth DB connections (new ones will be opened
+        when needed). Useful, e.g., just before forking processes that
+        must not share the connections.
+        """
+        self._ldap_api.dispose_engine()
+
     def is_api_key_authentication_enabled(self):
         return self._api_key_auth_helper.is_api_key_authentication_enabled()
 
@@ -1557,14 +1572,20 @@ class InsideCriteriaResolver:
             self._IP_HI_GUARD: [],
         })
 
-        # mappings that map values of `n6fqdn`/`n6asn`/`n6cc` (coerced
-        # or normalized if applicable...) to lists of org ids
-        self._fqdn_suffix_to_ids = collections.defaultdict(list)
+        # a trie of `n6fqdn` values (FQDN suffixes), split into labels,
+        # starting from the last label -- that is, a nested dict whose
+        # each node maps labels to child nodes, and (if the suffix
+        # represented by the node belongs to any orgs) `None` to a list
+        # of org ids
+        self._fqdn_label_trie = {}
+
+        # mappings that map values of `n6asn`/`n6cc` (coerced or
+        # normalized if applicable...) to lists of org ids
         self._asn_to_ids = collections.defaultdict(list)
         self._cc_to_ids = collections.defaultdict(list)
 
-        # a list of pairs: (<org id>, <tuple of `n6url` values>)
-        self._ids_and_urls = []
+        # a mapping that maps `n6url` values to lists of org ids
+        url_to_ids = collections.defaultdict(list)
 
         _seen_ids = set()  # <- for sanity assertions only
         for cri in inside_criteria:
@@ -1582,9 +1603,15 @@ class InsideCriteriaResolver:
                 ip_to_id_endpoints[min_ip].append((org_id, True))
                 ip_to_id_endpoints[max_ip + 1].append((org_id, False))
 
-            # FQDN suffixes, ASNs, CCs
+            # FQDN suffixes
+            for fqdn_suffix in cri.get('fqdn_seq', ()):
+                node = self._fqdn_label_trie
+                for label in reversed(fqdn_suffix.split('.')):
+                    node = node.setdefault(sys.intern(label), {})
+                node.setdefault(None, []).append(org_id)
+
+            # ASNs, CCs
             for mapping, which_seq in [
-                (self._fqdn_suffix_to_ids, 'fqdn_seq'),
                 (self._asn_to_ids, 'asn_seq'),
                 (self._cc_to_ids, 'cc_seq'),
             ]:
@@ -1592,9 +1619,8 @@ class InsideCriteriaResolver:
                     mapping[key].append(org_id)
 
             # URLs
-            url_seq = cri.get('url_seq')
-            if url_seq:
-                self._ids_and_urls.append((org_id, tuple(url_seq)))
+            for url in dict.fromkeys(cri.get('url_seq', ())):
+                url_to_ids[url].append(org_id)
 
         # [related to IPs]
         # a pair (2-tuple) consisting of:
@@ -1614,6 +1640,21 @@ class InsideCriteriaResolver:
         self._border_ips_and_corresponding_id_sets = (
             self._get_border_ips_and_corresponding_id_sets(ip_to_id_endpoints))
 
+        # [related to URLs]
+        # * a dict that maps distinct `n6url` values to tuples of org
+        #   ids (so that each URL is checked only once per event),
+        # * the tuple of all those distinct URLs (in the order of
+        #   appearance),
+        # * all those URLs joined with newlines (see the
+        #   _get_candidate_urls() method), and a list of the offsets
+        #   at which they start in the joined string
+        self._url_to_ids = {url: tuple(org_ids) for url, org_ids in url_to_ids.items()}
+        self._urls = tuple(self._url_to_ids)
+        self._urls_joined = '\n'.join(self._urls)
+        self._url_offsets = list(itertools.accumulate(
+            (len(url) + 1 for url in self._urls[:-1]),
+            initial=0)) if self._urls else []
+
 
     def _get_border_ips_and_corresponding_id_sets(self, ip_to_id_endpoints):
         border_ips = []
@@ -1672,11 +1713,12 @@ class InsideCriteriaResolver:
         # FQDN
         fqdn = record_dict.get('fqdn')
         if fqdn is not None:
-            fqdn_suffix_to_ids = self._fqdn_suffix_to_ids
-            fqdn_parts = fqdn.split('.')
-            for i in range(len(fqdn_parts)):
-                suffix = '.'.join(fqdn_parts[i:])
-                id_seq = fqdn_suffix_to_ids.get(suffix)
+            node = self._fqdn_label_trie
+            for label in reversed(fqdn.split('.')):
+                node = node.get(label)
+                if node is None:
+                    break
+                id_seq = node.get(None)
                 if id_seq is not None:
                     client_org_ids.update(id_seq)
 
@@ -1721,36 +1763,120 @@ class InsideCriteriaResolver:
             if url_pattern is not None:
                 assert url_pattern  # (already assured by RecordDict machinery)
                 try:
-                    try:
-                        ### XXX: don't we want to use the re.ASCII flag here???
-                        match1 = re.compile(url_pattern).search
-                    except re.error:
-                        match1 = re.compile(fnmatch.translate(url_pattern)).match
-                        match2 = None
-                    else:
-                        try:
-                            match2 = re.compile(fnmatch.translate(url_pattern)).match
-                        except re.error:
-                            match2 = None
+                    match1, match2, required_substrings = _get_url_pattern_matchers(url_pattern)
                 except Exception as exc:
                     LOGGER.warning(
                         'Exception occurred when trying to process `url_pattern` (%a) '
                         '-- %s', url_pattern, make_exc_ascii_str(exc))
                 else:
-                    for org_id, urls in self._ids_and_urls:
-                        org_matching_urls = set()
-                        for url in urls:
-                            if match1(url) is not None or (
-                                    match2 is not None and
-                                    match2(url) is not None):
+                    url_to_ids = self._url_to_ids
+                    for url in self._get_candidate_urls(required_substrings):
+                        if match1(url) is not None or (
+                                match2 is not None and
+                                match2(url) is not None):
+                            for org_id in url_to_ids[url]:
                                 client_org_ids.add(org_id)
-                                org_matching_urls.add(url)
-                        if org_matching_urls:
-                            urls_matched[org_id] = sorted(org_matching_urls)
+                                urls_matched.setdefault(org_id, []).append(url)
+                    for org_matching_urls in urls_matched.values():
+                        org_matching_urls.sort()
 
         return client_org_ids, urls_matched
 
 
+    def _get_candidate_urls(self, required_substrings):
+        # Get those of the URLs which contain at least one of the given
+        # substrings (or all URLs, if `required_substrings` is None).
+        # All URLs are searched at once, as one (joined) string; note
+        # that an occurrence of a substring spanning two URLs may cause
+        # that a URL which does not contain it is included -- that is
+        # harmless, as the URLs are then checked with the actual regex.
+        if required_substrings is None:
+            return self._urls
+        urls_joined = self._urls_joined
+        url_offsets = self._url_offsets
+        last_index = len(url_offsets) - 1
+        bisect_right = bisect.bisect_right
+        found_indexes = set()
+        for substring in required_substrings:
+            pos = urls_joined.find(substring)
+            while pos >= 0:
+                index = bisect_right(url_offsets, pos) - 1
+                found_indexes.add(index)
+                if index == last_index:
+                    break
+                pos = urls_joined.find(substring, url_offsets[index + 1])
+        urls = self._urls
+        return [urls[index] for index in sorted(found_indexes)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_url_pattern_matchers(url_pattern):
+    # Get a triple: (<match1>, <match2 or None>, <required substrings
+    # or None>) -- where the matchers are the bound `search`/`match`
+    # methods of the regexes compiled from the given `url_pattern`
+    # (interpreted as a regex and/or as a glob pattern), and the
+    # *required substrings* are strings such that any URL matched by
+    # any of the matchers must contain at least one of them (None
+    # means that no such strings could be determined).
+    try:
+        ### XXX: don't we want to use the re.ASCII flag here???
+        regex1 = re.compile(url_pattern)
+    except re.error:
+        regex1 = re.compile(fnmatch.translate(url_pattern))
+        match1 = regex1.match
+        regex2 = match2 = None
+    else:
+        match1 = regex1.search
+        try:
+            regex2 = re.compile(fnmatch.translate(url_pattern))
+        except re.error:
+            regex2 = match2 = None
+        else:
+            match2 = regex2.match
+    required_substrings = []
+    for regex in (regex1, regex2):
+        if regex is not None:
+            substring = _get_required_substring(regex)
+            if substring is None:
+                required_substrings = None
+                break
+            required_substrings.append(substring)
+    return match1, match2, required_substrings
+
+
+def _get_required_substring(regex, min_length=3):
+    # Get the longest literal string that is known to be a part of
+    # any text matched by the given compiled regex -- i.e., the
+    # longest sequence of literal characters in the regex's
+    # top-level (neither optional nor repeated, nor alternative)
+    # part; or None if there is no such string with at least
+    # `min_length` characters (or if the regex is case-insensitive).
+    if regex.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = _sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+    literal_runs = ['']
+
+    def visit(items):
+        for op, av in items:
+            if op == _sre_parse.LITERAL:
+                literal_runs[-1] += chr(av)
+            elif op == _sre_parse.SUBPATTERN and not av[1] & re.IGNORECASE:
+                # (a group which is neither optional nor repeated
+                # -- its items are a part of the enclosing sequence)
+                visit(av[3])
+            else:
+                literal_runs.append('')
+
+    visit(parsed)
+    longest = max(literal_runs, key=len)
+    return (longest if len(longest) >= min_length else None)
+
+
 
 class _IgnoreListsCriteriaResolver:
 
@@ -0,0 +1,203 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+Helpers for benchmarks of *n6* code: measuring the time and the memory
+allocations of operations, and saving the results in a machine-readable
+form (JSON documents which include the commit id, the Python version
+etc., so that results obtained for different commits can be compared).
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Optional
+
+from n6lib.common_helpers import AtomicallySavedFile
+
+
+__all__ = [
+    'Measurement',
+    'find_regressions',
+    'load_results_document',
+    'make_results_document',
+    'save_results_document',
+]
+
+
+class Measurement:
+
+    """
+    Accumulated measurements of a certain kind of operation (e.g., the
+    processing of messages by a certain pipeline component).
+
+    Use the `measuring()` context manager around each execution of the
+    operation (or around a series of executions -- then specify their
+    number as the `count` argument).
+
+    If -- during an execution -- `tracemalloc` is tracing, also memory
+    allocations are measured: the *transient* memory (the peak of the
+    traced memory above the level from the start of the execution) and
+    the *retained* one (the difference between the levels at the end
+    and at the start of the execution). Note that tracing slows down
+    the execution significantly, so the time measured then should not
+    be compared with the time measured without tracing.
+
+    >>> m = Measurement('foo')
+    >>> for _ in range(3):
+    ...     with m.measuring():
+    ...         pass
+    >>> m.count
+    3
+    >>> d = m.as_dict(unit='event')
+    >>> sorted(d)
+    ['count', 'events_per_second', 'seconds']
+    >>> d['count'] == 3 and d['seconds'] == m.seconds
+    True
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.seconds = 0.0
+        self.memory_traced = False
+        self.transient_bytes = 0
+        self.retained_bytes = 0
+
+    @contextlib.contextmanager
+    def measuring(self, count: int = 1) -> Iterator[None]:
+        memory_traced = tracemalloc.is_tracing()
+        if memory_traced:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds += time.perf_counter() - start_time
+            self.count += count
+            if memory_traced:
+                current_memory, peak_memory = tracemalloc.get_traced_memory()
+                self.memory_traced = True
+                self.transient_bytes += peak_memory - start_memory
+                self.retained_bytes += current_memory - start_memory
+
+    def as_dict(self, unit: str = 'op') -> dict:
+        """
+        Get the results (the keys of the dict include `unit`, e.g.:
+        `'ops_per_second'`, `'transient_bytes_per_op'`).
+        """
+        result = {
+            'count': self.count,
+            'seconds': self.seconds,
+            f'{unit}s_per_second': _safe_div(self.count, self.seconds),
+        }
+        if self.memory_traced:
+            result[f'transient_bytes_per_{unit}'] = _safe_div(self.transient_bytes, self.count)
+            result[f'retained_bytes_per_{unit}'] = _safe_div(self.retained_bytes, self.count)
+        return result
+
+
+def make_results_document(benchmark: str, params: dict, results: dict) -> dict:
+    """
+    Make a JSON-serializable document containing the given benchmark
+    results, together with some information about the environment.
+    """
+    return {
+        'benchmark': benchmark,
+        'time': datetime.datetime.utcnow().replace(microsecond=0).isoformat() + 'Z',
+        'commit': _get_git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+
+
+def save_results_document(document: dict, path: Optional[str] = None) -> None:
+    """
+    Save the given results document (see: `make_results_document()`)
+    -- atomically, as JSON -- to the file at the given path, or print
+    it to the standard output if `path` is None or `'-'`.
+    """
+    if path is None or path == '-':
+        json.dump(document, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with AtomicallySavedFile(path, 'w') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results_document(path: str) -> dict:
+    """
+    Load a results document (see: `make_results_document()`) from the
+    file at the given path.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_regressions(results: dict,
+                     baseline_results: dict,
+                     max_slowdown: float) -> list[str]:
+    """
+    Compare the given results with the baseline ones (both being the
+    `'results'` items of results documents of the same benchmark) and
+    return a list of descriptions of the rates (items whose keys end
+    with `'_per_second'`, at any level of nesting) which are lower than
+    the baseline ones by more than `max_slowdown` (a fraction of the
+    baseline rate). Rates missing in any of the results are ignored.
+
+    >>> baseline = {'foo': {'ops_per_second': 1000.0, 'count': 5}, 'bar': {'ops_per_second': 10}}
+    >>> find_regressions({'foo': {'ops_per_second': 850.0, 'count': 9}}, baseline, 0.2)
+    []
+    >>> find_regressions({'foo': {'ops_per_second': 750.0}}, baseline, 0.2)
+    ['foo.ops_per_second: 750 (baseline: 1000, -25.0%)']
+    """
+    regressions = []
+    for path, value, baseline_value in _iter_common_rates(results, baseline_results):
+        if value is None or not baseline_value:
+            continue
+        change = (value - baseline_value) / baseline_value
+        if change < -max_slowdown:
+            regressions.append(
+                f'{path}: {value:.0f} (baseline: {baseline_value:.0f}, {change:+.1%})')
+    return regressions
+
+
+def _iter_common_rates(results, baseline_results, path_prefix=''):
+    for key, value in results.items():
+        if key not in baseline_results:
+            continue
+        path = f'{path_prefix}{key}'
+        baseline_value = baseline_results[key]
+        if isinstance(value, dict) and isinstance(baseline_value, dict):
+            yield from _iter_common_rates(value, baseline_value, path_prefix=f'{path}.')
+        elif key.endswith('_per_second'):
+            yield path, value, baseline_value
+
+
+def _get_git_commit():
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.strip() or None
+
+
+def _safe_div(a, b):
+    return (a / b if b > 0 else None)
@@ -449,6 +449,105 @@ def make_raw_result_dict(column_values_source_object,  # getattr() will be used
     return result_dict
 
 
+#
+# Stuff related to bulk inserts which skip the ORM layer
+
+class BulkInsert:
+
+    """
+    A helper to insert rows -- i.e., tuples of column values, ready to
+    be passed to the DB API (see: `make_row()`) -- into an Event DB
+    table, using just one `executemany()` call, *without* creating any
+    ORM objects (see: `n6lib.record_dict.RecordDict.iter_db_rows()`).
+
+    The values are converted in the same way as they would be when
+    passed to the constructor of the respective model class (see:
+    `n6NormalizedData`, `n6ClientToEvent`) and then flushed by the
+    ORM machinery.
+
+    Use the `EVENT_BULK_INSERT` and `CLIENT_TO_EVENT_BULK_INSERT`
+    instances.
+    """
+
+    PARAMSTYLE_TO_PLACEHOLDER = {
+        'format': '%s',
+        'qmark': '?',
+    }
+
+    def __init__(self, table, column_names):
+        self.table_name = table.name
+        self.column_names = tuple(column_names)
+        self.column_indexes = {name: i for i, name in enumerate(self.column_names)}
+        self.converters = tuple(_make_db_value_converter(table.columns[name])
+                                for name in self.column_names)
+
+    def make_row(self, item):
+        """
+        Make a row (a list of DB-API-ready column values, in the order
+        of `column_names`) from the given dict (e.g., a *DB item*, as
+        generated by `n6lib.record_dict.RecordDict.iter_db_items()`;
+        note that any keys not being column names are ignored).
+        """
+        item_get = item.get
+        return [(item_get(name) if convert is None else convert(item_get(name)))
+                for name, convert in zip(self.column_names, self.converters)]
+
+    def make_query(self, paramstyle='format'):
+        placeholder = self.PARAMSTYLE_TO_PLACEHOLDER[paramstyle]
+        return 'INSERT INTO `{}` ({}) VALUES ({})'.format(
+            self.table_name,
+            ', '.join(f'`{name}`' for name in self.column_names),
+            ', '.join(placeholder for _ in self.column_names))
+
+    def execute(self, connection, rows):
+        """
+        Insert the given rows using the given SQLAlchemy connection
+        (typically, obtained within a `transact` block with the
+        `connection()` method of the Event DB session).
+        """
+        if rows:
+            connection.execute(self.make_query(connection.dialect.paramstyle), rows)
+
+
+def _make_db_value_converter(column):
+    col_type = column.type
+    if isinstance(col_type, (IPAddress, _HashTypeMixIn)):
+        # (for these types the dialect does not matter)
+        process_bind_param = col_type.process_bind_param
+        return lambda value: process_bind_param(value, None)
+    if isinstance(col_type, JSONMediumText):
+        return _to_json_db_value
+    if _is_dt_column(column):
+        return _to_dt_db_value
+    if _is_flag_column(column):
+        return _to_flag_db_value
+    return None
+
+def _to_json_db_value(value):
+    if value is None:
+        return None
+    return json.dumps(value)
+
+def _to_dt_db_value(value):
+    if value is None:
+        return None
+    return _to_utc_datetime(value)
+
+def _to_flag_db_value(value):
+    if value is None or isinstance(value, bool):
+        return value
+    raise TypeError(f'{value=!a} is neither None nor an instance of bool')
+
+
+EVENT_BULK_INSERT = BulkInsert(
+    n6NormalizedData.__table__,
+    n6NormalizedData._n6columns)                                                             # noqa
+
+CLIENT_TO_EVENT_BULK_INSERT = BulkInsert(
+    n6ClientToEvent.__table__,
+    ['id', 'time', 'client'])
+
+
 # Below we work around a strange behavior of SQLAlchemy 1.3: the
 # `n6ClientToEvent.events` attribute is not present *until* any
 # model class is instantiated (it does not matter which one!).
@@ -15,6 +15,7 @@ import reprlib
 import sys
 import threading
 import traceback
+import weakref
 
 from pika.exceptions import AMQPConnectionError
 
@@ -210,16 +211,34 @@ class AMQPHandler(logging.Handler):
         self._rk_template = rk_template
         self._msg_count_window = msg_count_window
         self._msg_count_max = msg_count_max
-
-        # error logging tools
-        self._error_fifo = error_fifo = queue.Queue()
         self._error_logger_name = error_logger_name
+        self._closing = False
+
+        self._prepare_error_logging()
+
+        if isinstance(connection_params_dict, dict):
+            connection_params_dict = self._get_actual_conn_params_dict(connection_params_dict)
+
+        self._pusher_kwargs = dict(
+            connection_params_dict=connection_params_dict,
+            exchange=dict(exchange_declare_kwargs,
+                          exchange=exchange),
+            prop_kwargs=prop_kwargs,
+            **other_pusher_kwargs)
+
+        self._start_pushing()
+        _amqp_handlers.add(self)
+
+    def _prepare_error_logging(self):
+        self._error_fifo = queue.Queue()
         self._error_logging_thread = threading.Thread(
             target=self._error_logging_loop,
             kwargs=dict(error_fifo=self._error_fifo,
-                        error_logger=logging.getLogger(error_logger_name)))
+                        error_logger=logging.getLogger(self._error_logger_name)))
         self._error_logging_thread.daemon = True
-        self._closing = False
+
+    def _start_pushing(self):
+        error_fifo = self._error_fifo
 
         def error_callback(exc):
             try:
@@ -231,22 +250,25 @@ class AMQPHandler(logging.Handler):
                 # (to break any traceback-related reference cycle)
                 exc_info = exc = None  # noqa
 
-        if isinstance(connection_params_dict, dict):
-            connection_params_dict = self._get_actual_conn_params_dict(connection_params_dict)
-
         # pusher instance
         self._pusher = AMQPThreadedPusher(
-            connection_params_dict=connection_params_dict,
-            exchange=dict(exchange_declare_kwargs,
-                          exchange=exchange),
-            prop_kwargs=prop_kwargs,
             serialize=self._make_record_serializer(),
             error_callback=error_callback,
-            **other_pusher_kwargs)
+            **self._pusher_kwargs)
 
         # start error logging co-thread
         self._error_logging_thread.start()
 
+    def _restart_pushing_after_fork(self):
+        # Called in a child process just after `os.fork()`. The threads
+        # of the pusher inherited from the parent process do not exist
+        # here, and its AMQP connection's socket is still used by the
+        # parent -- so that pusher is just abandoned (*not* shut down!)
+        # and a new one (with a new connection) is created.
+        if not self._closing:
+            self._prepare_error_logging()
+            self._start_pushing()
+
     def _get_actual_conn_params_dict(self, given_dict):
         # (avoiding error related to circular imports...)
         from n6lib.amqp_helpers import get_amqp_connection_params_dict_from_args
@@ -487,6 +509,27 @@ class AMQPHandler(logging.Handler):
             exc = self = None  # noqa
 
 
+_amqp_handlers = weakref.WeakSet()
+
+def restart_amqp_logging_after_fork():
+    """
+    Restart pushing of all existing `AMQPHandler` instances -- to be
+    called in a child process just after `os.fork()` (if the child is
+    going to log anything), e.g., in a worker process forked by
+    `n6datapipeline.base.LegacyQueuedBase.run_with_optional_workers()`.
+
+    Note: it is *not* called automatically for *every* fork (e.g., by
+    `subprocess` or `multiprocessing` machinery); only the code which
+    forks long-running processes that log should call it explicitly.
+    """
+    for handler in list(_amqp_handlers):
+        try:
+            handler._restart_pushing_after_fork()
+        except Exception:
+            dump_condensed_debug_msg(
+                'EXCEPTION WHEN RESTARTING THE AMQP LOGGING HANDLER AFTER FORK!')
+
+
 class N6SysLogHandler(logging.handlers.SysLogHandler):
 
     def emit(self, record):
@@ -0,0 +1,235 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+On-demand (signal-triggered) profiling of running processes.
+
+See: `OnDemandProfiler`.
+"""
+
+import collections
+import itertools
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Optional
+
+from n6lib.common_helpers import (
+    AtomicallySavedFile,
+    make_exc_ascii_str,
+)
+from n6lib.log_helpers import get_logger
+
+
+__all__ = [
+    'OnDemandProfiler',
+]
+
+
+LOGGER = get_logger(__name__)
+
+
+class OnDemandProfiler:
+
+    """
+    A signal-triggered profiler, intended to be installed in long-running
+    processes (pipeline components, web apps...), so that they can be
+    profiled in production -- without restarting them.
+
+    When installed (see: `install()`), it handles two signals:
+
+    * `sampling_signal` (by default, `SIGUSR1`) -- it starts *stack
+      sampling*: for `sampling_duration` seconds, every
+      `sampling_interval` seconds, the current stacks of all threads
+      are taken (using `sys._current_frames()`); then the results are
+      written to a `*.collapsed` file, in the *collapsed stack* format
+      (one line per distinct stack: `<thread>;<outermost frame>;...;
+      <innermost frame> <number of samples>`), ready to be visualized
+      with tools such as *flamegraph.pl* or *speedscope*;
+
+    * `tracemalloc_signal` (by default, `SIGUSR2`) -- the first such
+      signal starts tracing memory allocations (with `tracemalloc`);
+      each subsequent one takes a snapshot, which is dumped to a
+      `*.tracemalloc` file (loadable with `tracemalloc.Snapshot.load()`);
+      additionally, a `*.tracemalloc.txt` file, containing the top
+      differences between the snapshot and the previous one (or, for
+      the first snapshot, the top allocation sites), is written -- so
+      that the sources of memory growth can be identified by sending
+      the signal a few times at some intervals.
+
+    All the files are written to `output_dir`; their names consist of
+    `file_name_prefix`, the process id, the current time and a sequence
+    number.
+
+    The work is done in background (daemon) threads, so that signal
+    handlers return immediately. While sampling is not in progress and
+    tracemalloc is not started, the overhead is none.
+    """
+
+    def __init__(self,
+                 output_dir: str,
+                 *,
+                 file_name_prefix: str = 'n6',
+                 sampling_duration: float = 30.0,
+                 sampling_interval: float = 0.01,
+                 tracemalloc_frames: int = 25,
+                 tracemalloc_top_limit: int = 50,
+                 sampling_signal: int = signal.SIGUSR1,
+                 tracemalloc_signal: int = signal.SIGUSR2):
+        self._output_dir = output_dir
+        self._file_name_prefix = file_name_prefix
+        self._sampling_duration = sampling_duration
+        self._sampling_interval = sampling_interval
+        self._tracemalloc_frames = tracemalloc_frames
+        self._tracemalloc_top_limit = tracemalloc_top_limit
+        self._sampling_signal = sampling_signal
+        self._tracemalloc_signal = tracemalloc_signal
+        self._sampling_lock = threading.Lock()
+        self._tracemalloc_lock = threading.Lock()
+        self._prev_tracemalloc_snapshot = None
+        self._file_numbers = itertools.count(1)
+
+    def install(self) -> bool:
+        """
+        Install the signal handlers.
+
+        Returns:
+            True if the handlers have been installed; False if that
+            was not possible (because the method has not been called
+            in the main thread -- then a warning is logged).
+        """
+        try:
+            signal.signal(self._sampling_signal, self._on_sampling_signal)
+            signal.signal(self._tracemalloc_signal, self._on_tracemalloc_signal)
+        except ValueError as exc:
+            LOGGER.warning('Could not install the on-demand profiler (%s)',
+                           make_exc_ascii_str(exc))
+            return False
+        LOGGER.info('On-demand profiler installed (send signal %s to sample '
+                    'stacks, signal %s to start tracemalloc/take its snapshot; '
+                    'output directory: %a)',
+                    signal.Signals(self._sampling_signal).name,
+                    signal.Signals(self._tracemalloc_signal).name,
+                    self._output_dir)
+        return True
+
+    # (note: the signal handlers just start threads -- in particular,
+    # they do not log anything, as the main thread might have been
+    # interrupted while holding a lock of the logging machinery)
+
+    def _on_sampling_signal(self, signum, frame):
+        self._start_thread(self.sample_stacks)
+
+    def _on_tracemalloc_signal(self, signum, frame):
+        self._start_thread(self.handle_tracemalloc_request)
+
+    def sample_stacks(self) -> Optional[str]:
+        """
+        Sample the stacks of all other threads (for `sampling_duration`
+        seconds) and write the results to a file. Return the file path
+        (or None if sampling was already in progress or the file could
+        not be written -- then a warning/error is logged).
+        """
+        if not self._sampling_lock.acquire(blocking=False):
+            LOGGER.warning('Stack sampling is already in progress')
+            return None
+        try:
+            return self._sample_stacks()
+        finally:
+            self._sampling_lock.release()
+
+    def _sample_stacks(self):
+        LOGGER.info('Stack sampling started (for %s seconds)', self._sampling_duration)
+        own_thread_id = threading.get_ident()
+        stack_counts = collections.Counter()
+        deadline = time.monotonic() + self._sampling_duration
+        while time.monotonic() < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread_id:
+                    thread_name = thread_names.get(thread_id, str(thread_id))
+                    stack_counts[self._get_collapsed_stack(thread_name, frame)] += 1
+            frame = None  # (<- to not keep any frame alive while sleeping)
+            time.sleep(self._sampling_interval)
+        lines = [f'{stack} {count}\n' for stack, count in stack_counts.most_common()]
+        return self._write_file('collapsed', ''.join(lines))
+
+    @staticmethod
+    def _get_collapsed_stack(thread_name, frame):
+        frame_descriptions = []
+        while frame is not None:
+            code = frame.f_code
+            frame_descriptions.append(
+                f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+            frame = frame.f_back
+        frame_descriptions.append(thread_name)
+        frame_descriptions.reverse()
+        return ';'.join(desc.replace(';', ':') for desc in frame_descriptions)
+
+    def handle_tracemalloc_request(self) -> Optional[str]:
+        """
+        If tracemalloc is not tracing yet, start it (and return None);
+        otherwise, take a snapshot, write it (and the top statistics)
+        to files and return the path of the text file with the top
+        statistics (or None if the files could not be written -- then
+        an error is logged).
+        """
+        with self._tracemalloc_lock:
+            return self._handle_tracemalloc_request()
+
+    def _handle_tracemalloc_request(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self._tracemalloc_frames)
+            LOGGER.info('Tracemalloc started (%d frames); send the signal '
+                        'again to take a snapshot', self._tracemalloc_frames)
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        prev_snapshot = self._prev_tracemalloc_snapshot
+        self._prev_tracemalloc_snapshot = snapshot
+        if prev_snapshot is None:
+            header = 'Top allocation sites'
+            stats = snapshot.statistics('traceback')
+        else:
+            header = 'Top differences since the previous snapshot'
+            stats = snapshot.compare_to(prev_snapshot, 'traceback')
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f'{header} (traced memory: current={current} B, peak={peak} B):\n']
+        for stat in stats[:self._tracemalloc_top_limit]:
+            lines.append(f'\n{stat}\n')
+            lines.extend(f'    {line}\n' for line in stat.traceback.format())
+        snapshot_path = self._write_file('tracemalloc', snapshot.dump)
+        if snapshot_path is None:
+            return None
+        return self._write_file_at(f'{snapshot_path}.txt', ''.join(lines))
+
+    def _write_file(self, extension, content):
+        file_name = '{}-{}-{}-{}.{}'.format(
+            self._file_name_prefix,
+            os.getpid(),
+            time.strftime('%Y%m%d%H%M%S'),
+            next(self._file_numbers),
+            extension)
+        return self._write_file_at(os.path.join(self._output_dir, file_name), content)
+
+    @staticmethod
+    def _write_file_at(path, content):
+        try:
+            if callable(content):
+                content(path)
+            else:
+                with AtomicallySavedFile(path, 'w') as f:
+                    f.write(content)
+        except Exception as exc:
+            LOGGER.error('Could not write the profiling file %a (%s)',
+                         path, make_exc_ascii_str(exc))
+            return None
+        LOGGER.info('Profiling file written: %a', path)
+        return path
+
+    @staticmethod
+    def _start_thread(target):
+        threading.Thread(target=target, name='OnDemandProfiler', daemon=True).start()
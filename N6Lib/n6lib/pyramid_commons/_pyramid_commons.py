@@ -65,6 +65,7 @@ from n6lib.oidc_provider_api import (
     StateValidationError,
     TokenValidationError,
 )
+from n6lib.profiling_helpers import OnDemandProfiler
 from n6lib.pyramid_commons import mfa_helpers
 from n6lib.pyramid_commons import web_token_helpers
 from n6lib.pyramid_commons._config_converters import (
@@ -1876,8 +1877,19 @@ class N6ConfigHelper(ConfigHelper):
         pyramid_configurator.registry.mail_notices_api = self.mail_notices_api
         pyramid_configurator.registry.oidc_provider_api = self.oidc_provider_api
         pyramid_configurator.registry.rt_client_api = self.rt_client_api
+        self._install_on_demand_profiler_if_enabled()
         return super().prepare_pyramid_configurator(pyramid_configurator)
 
+    def _install_on_demand_profiler_if_enabled(self):
+        # (see: `n6lib.profiling_helpers.OnDemandProfiler`; note that the
+        # profiler can be installed only if the app is being configured
+        # in the main thread of the process -- otherwise just a warning
+        # is logged)
+        profiling_dir = self.settings.get('on_demand_profiling_dir', '').strip()
+        if profiling_dir:
+            OnDemandProfiler(profiling_dir,
+                             file_name_prefix=self.component_module_name).install()
+
     @classmethod
     def exception_view(cls, exc, request):
         http_exc = exc_to_http_exc(exc)
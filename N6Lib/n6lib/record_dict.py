@@ -5,18 +5,28 @@
 #
 
 import base64
+import collections
 import collections.abc as collections_abc
 import copy
 import functools
+import hashlib
+import hmac
+import inspect
 import json
 import re
 import sys
+import types
 
 try:
-    from bson.json_util import dumps
+    from bson.json_util import default as bson_json_default
 except ImportError:
     print('Warning: bson is required to run parsers', file=sys.stderr)
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 from n6lib.class_helpers import (
     AsciiMixIn,
     attr_repr,
@@ -364,6 +374,75 @@ def trim_domain_seq(value, max_length):
     return [trim_domain(v, max_length) for v in value]
 
 
+#
+# Memoization of adjusters' results
+
+class AdjusterMemo:
+
+    """
+    A bounded LRU memo of the results of an adjuster (see:
+    `RecordDict.enable_adjuster_memoization()`).
+
+    An instance is to be called instead of the adjuster (with the same
+    arguments). The adjuster is expected to be *pure*, i.e., its result
+    should depend only on the value (and on the record dict class, not
+    on the instance), and the results are expected to be immutable.
+    Values which are not hashable are just passed to the adjuster;
+    exceptions are not memoized.
+
+    >>> calls = []
+    >>> def adjuster(self, value):
+    ...     calls.append(value)
+    ...     return value.upper()
+    >>> memo = AdjusterMemo(adjuster, maxsize=2)
+    >>> memo(None, 'a'), memo(None, 'b'), memo(None, 'a'), memo(None, 'c'), memo(None, 'b')
+    ('A', 'B', 'A', 'C', 'B')
+    >>> calls   # ('b' has been evicted by 'c', as 'a' was used more recently)
+    ['a', 'b', 'c', 'b']
+    >>> memo(None, bytearray(b'x'))  # (not hashable)
+    bytearray(b'X')
+    >>> memo.get_stats() == {'hits': 1, 'misses': 4, 'unhashable': 1, 'size': 2, 'maxsize': 2}
+    True
+    """
+
+    def __init__(self, adjuster, maxsize):
+        if maxsize < 1:
+            raise ValueError(f'maxsize should be a positive integer (got: {maxsize!a})')
+        self.adjuster = adjuster
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.unhashable = 0
+        self._results = collections.OrderedDict()
+
+    def __call__(self, rd, value):
+        # (the type is included, because, e.g., `1 == True`)
+        memo_key = (value.__class__, value)
+        try:
+            result = self._results[memo_key]
+        except KeyError:
+            self.misses += 1
+            result = self._results[memo_key] = self.adjuster(rd, value)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+            return result
+        except TypeError:
+            self.unhashable += 1
+            return self.adjuster(rd, value)
+        self.hits += 1
+        self._results.move_to_end(memo_key)
+        return result
+
+    def get_stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'unhashable': self.unhashable,
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+        }
+
+
 #
 # Pipeline-specific data spec class (almost identical to `N6DataSpec`)
 
@@ -373,18 +452,51 @@ class N6DataSpecWithOptionalModified(N6DataSpec):
         in_result=('optional', 'unrestricted'),  # <- here it is *optional*
     )
 
+
+#
+# Helpers related to pickling/copying record dicts
+
+@functools.lru_cache(maxsize=None)
+def _get_all_slot_names(cls):
+    # Get the names of the instance attributes declared (with
+    # `__slots__`) by the given class and all its base classes --
+    # as the names of the respective slot descriptors (so the
+    # names of *private* attributes are already mangled).
+    slot_names = []
+    for klass in reversed(cls.__mro__):
+        if '__slots__' in vars(klass):
+            for name, obj in vars(klass).items():
+                if isinstance(obj, types.MemberDescriptorType) and name not in slot_names:
+                    slot_names.append(name)
+    return tuple(slot_names)
+
+
 #
 # The actual record dict classes
 
 ### CR: TODO: docstrings for public methods
 ### (especially get_ready_dict et consortes...)
 
+
 class RecordDict(collections_abc.MutableMapping):
 
     """
     Record dict class for non-blacklist events.
+
+    The adjusters (`adjust_<key without hyphens>` attributes, or None
+    for keys whose values are to be stored unchanged) are looked up
+    only once per class -- when the class is created -- so they cannot
+    be replaced later (neither on the class nor on its instances).
     """
 
+    __slots__ = (
+        '_dict',
+        'log_nonstandard_names',
+        'context_manager_error_callback',
+        'used_as_context_manager',
+        '_name_before_main_adjustments',
+    )
+
     _ADJUSTER_PREFIX = 'adjust_'
     _APPENDER_PREFIX = 'append_'
 
@@ -442,35 +554,71 @@ class RecordDict(collections_abc.MutableMapping):
         'url_pattern',
     })
 
+    # keys whose values tend to repeat across many records and whose
+    # adjusters are *pure* (see: `AdjusterMemo`), so that -- if enabled
+    # with `enable_adjuster_memoization()` -- the results of adjusting
+    # them are memoized (note: 'name' is a special case, as its adjuster
+    # depends on 'category' and has side effects -- so only its pure
+    # part is memoized; see: `adjust_name()`)
+    memoizable_keys = frozenset({
+        'category',
+        'confidence',
+        'fqdn',
+        'name',
+        'origin',
+        'proto',
+        'restriction',
+        'source',
+    })
+
     #
     # Instantiation-related methods
 
+    # keys whose adjusted values are not preserved by the JSON
+    # serialization (e.g., tuples become lists), so that their
+    # adjusters need to be run also when the JSON is trusted
+    trusted_json_readjusted_keys = frozenset({'enriched'})
+
     @classmethod
-    def from_json(cls, json_string, **kwargs):
-        return cls(json.loads(json_string), **kwargs)
+    def from_json(cls, json_string, trust=None, trust_tag=None,
+                  content_type=None, **kwargs):
+        """
+        Make a record dict from the given JSON.
+
+        If `content_type` is `MSGPACK_CONTENT_TYPE`, the given data are
+        expected to be MessagePack (see: `get_ready_msgpack()`) rather
+        than JSON (see: `load_record_dict_data()`).
+
+        If `trust` (a `RecordDictTrust`) is given and `trust_tag` is a
+        valid tag of the JSON, the data are trusted to be already
+        adjusted (by the component which published them), so the
+        record dict is populated *without* running the adjusters (apart
+        from those for `trusted_json_readjusted_keys`). Any items set
+        later are adjusted as usual.
+        """
+        data = load_record_dict_data(json_string, content_type)
+        if trust is not None and trust.verify_tag(json_string, trust_tag):
+            return cls._from_trusted_data(data, **kwargs)
+        return cls(data, **kwargs)
+
+    @classmethod
+    def _from_trusted_data(cls, data, **kwargs):
+        self = cls(**kwargs)
+        illegal_keys = data.keys() - self._settable_keys
+        if illegal_keys:
+            raise RuntimeError('for {!a}, keys {} are illegal'
+                               .format(self, ', '.join(map(ascii, sorted(illegal_keys)))))
+        readjusted_keys = self.trusted_json_readjusted_keys
+        self._dict = {
+            key: (self._get_adjusted_value(key, value) if key in readjusted_keys
+                  else value)
+            for key, value in data.items()}
+        return self
 
     def __init__(self, iterable_or_mapping=(),
                  log_nonstandard_names=False,
                  context_manager_error_callback=None):
         self._dict = {}
-        self._settable_keys = (self.required_keys |
-                               self.optional_keys)
-
-        # to catch some kinds of bugs early...
-        duplicated = self.required_keys & self.optional_keys
-        if duplicated:
-            raise ValueError('{} has keys declared both '
-                             'as required and optional: {}'
-                             .format(self.__class__.__qualname__,
-                                     ', '.join(sorted(duplicated))))
-
-        missing_adjusters = [key for key in self._settable_keys
-                             if not hasattr(self, self._adjuster_name(key))]
-        if missing_adjusters:
-            raise TypeError('{!a} has no adjusters for keys: {}'
-                             .format(self,
-                                     ', '.join(sorted(missing_adjusters))))
-
         self.log_nonstandard_names = log_nonstandard_names
 
         # context-manager (__enter__/__exit__) -related stuff
@@ -483,24 +631,143 @@ class RecordDict(collections_abc.MutableMapping):
     def _adjuster_name(cls, key):
         return cls._ADJUSTER_PREFIX + key.replace('-', '')
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._prepare_adjuster_table()
+
+    @classmethod
+    def _prepare_adjuster_table(cls):
+        # (called once per class, at its creation -- so that nothing
+        # of this needs to be done when record dicts are instantiated)
+        duplicated = cls.required_keys & cls.optional_keys
+        if duplicated:
+            raise ValueError('{} has keys declared both '
+                             'as required and optional: {}'
+                             .format(cls.__qualname__,
+                                     ', '.join(sorted(duplicated))))
+        cls._settable_keys = cls.required_keys | cls.optional_keys
+        illegal_memoizable_keys = cls.memoizable_keys - cls._settable_keys
+        if illegal_memoizable_keys:
+            raise ValueError('{} has memoizable keys which are not '
+                             'settable: {}'
+                             .format(cls.__qualname__,
+                                     ', '.join(sorted(illegal_memoizable_keys))))
+        missing_adjusters = [key for key in cls._settable_keys
+                             if not hasattr(cls, cls._adjuster_name(key))]
+        if missing_adjusters:
+            raise TypeError('{} has no adjusters for keys: {}'
+                            .format(cls.__qualname__,
+                                    ', '.join(sorted(missing_adjusters))))
+        # (key -> (adjuster name, adjuster function being called with
+        # the record dict instance as the first argument, or None))
+        key_to_adjuster = {}
+        for key in sorted(cls._settable_keys):
+            name = cls._adjuster_name(key)
+            key_to_adjuster[key] = (name, cls._get_unbound_adjuster(name))
+        cls._key_to_adjuster = types.MappingProxyType(key_to_adjuster)
+        # (key -> `AdjusterMemo`; empty unless memoization is enabled;
+        # note: each class has its own memos)
+        cls._adjuster_memos = types.MappingProxyType({})
+
+    @classmethod
+    def enable_adjuster_memoization(cls, maxsize=1024):
+        """
+        Enable memoization of the results of adjusting the values of
+        `memoizable_keys` -- for this class (*not* for its subclasses),
+        each key having its own LRU memo of at most `maxsize` results.
+
+        The memos (and their stats) are reset if memoization is already
+        enabled.
+        """
+        if cls.__dict__['_adjuster_memos']:
+            cls.disable_adjuster_memoization()
+        memos = {}
+        key_to_adjuster = dict(cls._key_to_adjuster)
+        for key in sorted(cls.memoizable_keys):
+            adjuster_name, adjuster = cls._key_to_adjuster[key]
+            if key == 'name':
+                # (see: `adjust_name()`)
+                memos[key] = AdjusterMemo(
+                    cls._get_unbound_adjuster('_get_pure_adjusted_name'),
+                    maxsize)
+            elif adjuster is not None:
+                memos[key] = AdjusterMemo(adjuster, maxsize)
+                key_to_adjuster[key] = adjuster_name, memos[key]
+        cls._adjuster_memos = types.MappingProxyType(memos)
+        cls._key_to_adjuster = types.MappingProxyType(key_to_adjuster)
+
+    @classmethod
+    def disable_adjuster_memoization(cls):
+        memos = cls.__dict__['_adjuster_memos']
+        cls._key_to_adjuster = types.MappingProxyType({
+            key: ((adjuster_name, memos[key].adjuster)
+                  if key in memos and key != 'name'
+                  else (adjuster_name, adjuster))
+            for key, (adjuster_name, adjuster) in cls._key_to_adjuster.items()})
+        cls._adjuster_memos = types.MappingProxyType({})
+
+    @classmethod
+    def get_adjuster_memo_stats(cls):
+        """
+        Get a dict that maps the memoized keys to dicts of stats of
+        their memos (empty if memoization is not enabled).
+        """
+        return {key: memo.get_stats()
+                for key, memo in sorted(cls.__dict__['_adjuster_memos'].items())}
+
+    @classmethod
+    def _get_unbound_adjuster(cls, name):
+        adjuster = inspect.getattr_static(cls, name)
+        if adjuster is None or isinstance(adjuster, types.FunctionType):
+            return adjuster
+        # (not a plain function, e.g., a `staticmethod` -- so let
+        # the descriptor machinery do its job at each call)
+        return lambda self, value: getattr(self, name)(value)
+
     #
     # Output-related methods
 
     def get_ready_dict(self):
+        self.verify_ready()
+        ready_dict = copy.deepcopy(self._dict)
+        return ready_dict
+
+    def verify_ready(self):
         current_keys = set(self._dict)
         assert self._settable_keys >= current_keys
         missing_keys = self.required_keys - current_keys
         if missing_keys:
             raise ValueError('missing keys: ' +
                              ', '.join(sorted(missing_keys)))
-        ready_dict = copy.deepcopy(self._dict)
-        return ready_dict
 
     def get_ready_json(self):
         # changed from json.dumps on bson.dumps
         ### XXX: why? bson.json_utils.dumps() pre-converts some values, but is it necessary???
         ###      See #3243 (in particular, #note-7)
-        return dumps(self.get_ready_dict())
+        # (the data are *not* deep-copied, as serializing them does
+        # not modify them; the output of the default encoder is the
+        # same as of `bson.json_util.dumps()` -- see the "JSON encoding
+        # of record dicts" section below)
+        self.verify_ready()
+        return _json_encoder(self._dict)
+
+    def get_ready_msgpack(self):
+        """
+        Get the data serialized to MessagePack (as `bytes`).
+
+        The data model is the same as of `get_ready_json()` (values
+        not natively serializable are converted in the same way), so
+        the result of `from_json(..., content_type=MSGPACK_CONTENT_TYPE)`
+        is equal to the result of `from_json()` applied to the JSON.
+
+        The `msgpack` library needs to be installed.
+        """
+        self.verify_ready()
+        if msgpack is None:
+            raise RuntimeError('the msgpack library is not installed')
+        return msgpack.packb(self._dict,
+                             default=_bson_compatible_json_default,
+                             use_bin_type=True)
 
     def iter_db_items(self):
         # to be cloned later (see below)
@@ -541,6 +808,79 @@ class RecordDict(collections_abc.MutableMapping):
             # -> only one db item *without* `address`, `ip` etc.
             yield item_prototype
 
+    def iter_db_rows(self):
+        """
+        A faster counterpart of `iter_db_items()`: generate rows (tuples
+        of DB-API-ready values) of the `event` table's columns, in the
+        order of `n6lib.db_events.EVENT_BULK_INSERT.column_names`, ready
+        to be inserted with `EVENT_BULK_INSERT.execute()` (no ORM objects
+        are needed; see also: `iter_client_db_rows()`).
+
+        The data are *not* deep-copied, and all values (in particular,
+        `address` and `custom`, encoded as JSON) are converted only once
+        per record dict -- except `ip`, `cc` and `asn`, converted for
+        each item of `address`.
+        """
+        from n6lib.db_events import EVENT_BULK_INSERT
+
+        self.verify_ready()
+        # (the values are shared with `self._dict`, so they must
+        # *not* be modified -- and they are not)
+        item_prototype = {key: value
+                          for key, value in self._dict.items()
+                          if not key.startswith('_')}  # no internal keys
+
+        # (see the analogous fragment of `iter_db_items()`)
+        all_custom_keys = self.data_spec.custom_field_keys
+        custom_items = {key: item_prototype.pop(key)
+                        for key in all_custom_keys
+                        if key in item_prototype}
+        self._prepare_url_data_items(item_prototype, custom_items)
+        client = item_prototype.get('client')
+        if client:
+            custom_items['client'] = sorted(client)
+        if custom_items:
+            item_prototype['custom'] = custom_items
+
+        address_list = item_prototype.get('address')
+        if not address_list:
+            item_prototype.pop('address', None)  # (no empty `address` in the DB)
+        row = EVENT_BULK_INSERT.make_row(item_prototype)
+        if address_list:
+            # one row for each `address` list item (each row containing
+            # `ip`[/`cc`/`asn`] of the list item + the whole `address`)
+            column_indexes = EVENT_BULK_INSERT.column_indexes
+            ip_index = column_indexes['ip']
+            cc_index = column_indexes['cc']
+            asn_index = column_indexes['asn']
+            convert_ip = EVENT_BULK_INSERT.converters[ip_index]
+            for addr in address_list:
+                row[ip_index] = convert_ip(addr['ip'])
+                row[cc_index] = addr.get('cc')
+                row[asn_index] = addr.get('asn')
+                yield tuple(row)
+        else:
+            # only one row *without* `address`, `ip` etc.
+            yield tuple(row)
+
+    def iter_client_db_rows(self):
+        """
+        Generate rows (tuples of DB-API-ready values) of the
+        `client_to_event` table's columns (one row for each item of
+        `client`), in the order of `n6lib.db_events.\
+        CLIENT_TO_EVENT_BULK_INSERT.column_names`.
+        """
+        from n6lib.db_events import CLIENT_TO_EVENT_BULK_INSERT
+
+        self.verify_ready()
+        client_list = self._dict.get('client')
+        if client_list:
+            row = CLIENT_TO_EVENT_BULK_INSERT.make_row(self._dict)
+            client_index = CLIENT_TO_EVENT_BULK_INSERT.column_indexes['client']
+            for client in client_list:
+                row[client_index] = client
+                yield tuple(row)
+
     # *EXPERIMENTAL* (likely to be changed or removed in the future
     # without any warning/deprecation/etc.)
     def _prepare_url_data_items(self, item_prototype, custom_items):
@@ -602,22 +942,17 @@ class RecordDict(collections_abc.MutableMapping):
                 raise
 
     def _get_adjusted_value(self, key, value):
-        if key not in self._settable_keys:
-            raise RuntimeError('for {!a}, key {!a} is illegal'
-                               .format(self, key))
-
-        adjuster_method_name = self._adjuster_name(key)
         try:
-            adjuster = getattr(self, adjuster_method_name)
-        except AttributeError:
-            raise RuntimeError('{!a} has no adjuster for key {!a}'
-                               .format(self, key))
+            adjuster_method_name, adjuster = self._key_to_adjuster[key]
+        except KeyError:
+            raise RuntimeError('for {!a}, key {!a} is illegal'
+                               .format(self, key)) from None
         if adjuster is None:
             # adjuster explicitly set to None -> passing value unchanged
             return value
 
         try:
-            return adjuster(value)
+            return adjuster(self, value)
         except Exception as exc:
             if getattr(exc, 'propagate_it_anyway', False):
                 raise
@@ -805,6 +1140,21 @@ class RecordDict(collections_abc.MutableMapping):
 
     __copy__ = copy
 
+    # (needed because of `__slots__` -- to support all pickle protocols)
+
+    def __getstate__(self):
+        state = dict(getattr(self, '__dict__', ()))
+        for name in _get_all_slot_names(type(self)):
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
     #
     # Context manager interface
 
@@ -1221,14 +1571,12 @@ class RecordDict(collections_abc.MutableMapping):
         if not value:
             raise ValueError('empty value')
 
-        shall_normalize_and_check_for_nonstandard = (category in CATEGORY_TO_NORMALIZED_NAME)
-        if shall_normalize_and_check_for_nonstandard:
-            value = self._get_normalized_name(value, category)
-        # TODO later: move the following to-ASCII coercion to the data spec field...
-        #             (see ticket #8898)
-        value = value.encode('ascii', 'replace').decode('ascii')  # each non-ASCII char -> '?' char
-        value = self._adjust_name_according_to_data_spec(value)
-        if shall_normalize_and_check_for_nonstandard:
+        memo = self._adjuster_memos.get('name')
+        if memo is not None:
+            value = memo(self, (value, category))
+        else:
+            value = self._get_pure_adjusted_name((value, category))
+        if category in CATEGORY_TO_NORMALIZED_NAME:
             self._check_and_handle_nonstandard_name(value, category)
         self._name_before_main_adjustments = value_before_main_adjustments
         assert (isinstance(value, str)
@@ -1237,6 +1585,17 @@ class RecordDict(collections_abc.MutableMapping):
 
         return value
 
+    # (the part of `adjust_name()` which depends only on the
+    # given value and category -- so that it can be memoized)
+    def _get_pure_adjusted_name(self, value_and_category):
+        value, category = value_and_category
+        if category in CATEGORY_TO_NORMALIZED_NAME:
+            value = self._get_normalized_name(value, category)
+        # TODO later: move the following to-ASCII coercion to the data spec field...
+        #             (see ticket #8898)
+        value = value.encode('ascii', 'replace').decode('ascii')  # each non-ASCII char -> '?' char
+        return self._adjust_name_according_to_data_spec(value)
+
     _adjust_name_according_to_data_spec = make_adjuster_using_data_spec(
         'name', on_too_long=trim)
 
@@ -1310,8 +1669,7 @@ class RecordDict(collections_abc.MutableMapping):
     def __getattr__(self, name):
         if name.startswith(self._APPENDER_PREFIX):
             key = name[len(self._APPENDER_PREFIX):]
-            adjuster_method_name = self._adjuster_name(key)
-            adjuster = getattr(self, adjuster_method_name, None)
+            _, adjuster = self._key_to_adjuster.get(key, (None, None))
             if self._is_multiadjuster(adjuster):
                 def appender(singular_value):
                     value_seq = list(self.get(key, []))
@@ -1327,17 +1685,131 @@ class RecordDict(collections_abc.MutableMapping):
         return ('make_multiadjuster' in factory_names)
 
 
+# (for subclasses, it is done by `RecordDict.__init_subclass__()`)
+RecordDict._prepare_adjuster_table()
+
+
 class BLRecordDict(RecordDict):
 
     """
     Record dict class for blacklist events (slightly harder restricted).
     """
 
+    __slots__ = ()
+
     required_keys = RecordDict.required_keys | {'expires'}
     optional_keys = RecordDict.optional_keys - {'expires'}
 
 
 
+#
+# JSON encoding of record dicts
+
+def _bson_compatible_json_default(obj):
+    # Convert values in the same way as `bson.json_util.dumps()`
+    # does it (*before* serializing anything) -- but only for those
+    # values which are not natively serializable by the encoder.
+    if hasattr(obj, 'items'):
+        return dict(obj.items())
+    if hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    return bson_json_default(obj)
+
+
+def stdlib_json_encoder(obj) -> str:
+    """
+    The default JSON encoder of record dicts.
+
+    It is based on the standard library's `json` module. Its output is
+    the same (byte by byte) as of `bson.json_util.dumps()`, only that
+    values which are natively serializable to JSON are not pre-walked.
+
+    >>> stdlib_json_encoder({'foo': ['bar', 42, ('ąę', None)], 'baz': {'spam': 1.5}})
+    '{"foo": ["bar", 42, ["\\\\u0105\\\\u0119", null]], "baz": {"spam": 1.5}}'
+    >>> stdlib_json_encoder({'foo': {'bar'}})
+    '{"foo": ["bar"]}'
+    """
+    return _stdlib_json_encode(obj)
+
+_stdlib_json_encode = json.JSONEncoder(default=_bson_compatible_json_default).encode
+
+
+# names of JSON encoders available to be set with `set_json_encoder()`
+JSON_ENCODERS = {
+    'stdlib': stdlib_json_encoder,
+}
+
+_json_encoder = stdlib_json_encoder
+
+
+def set_json_encoder(encoder):
+    """
+    Set the JSON encoder used by `RecordDict.get_ready_json()`.
+
+    Args:
+        `encoder`:
+            Either a key in `JSON_ENCODERS` (i.e., 'stdlib', which is
+            the default) or any callable that takes a dict and returns
+            its JSON as a `str`.
+
+    Note: the output of `get_ready_json()` is expected to be the same
+    (byte by byte) as of `stdlib_json_encoder()` -- and, consequently,
+    as of `bson.json_util.dumps()`. Setting a custom encoder is a
+    deliberate exception to that rule: it is up to the caller to
+    ensure that whatever consumes the output can handle it (this is
+    why custom encoders are not selectable by any config option).
+
+    Raises:
+        `ValueError` if `encoder` is an unknown name.
+    """
+    global _json_encoder
+    if isinstance(encoder, str):
+        try:
+            encoder = JSON_ENCODERS[encoder]
+        except KeyError:
+            raise ValueError(
+                f'unknown (or unavailable) JSON encoder: {encoder!a} '
+                f'(available ones: {", ".join(map(ascii, sorted(JSON_ENCODERS)))})'
+            ) from None
+    _json_encoder = encoder
+
+
+#
+# Binary (MessagePack) wire format of record dicts
+
+# The value of the AMQP `content_type` property of messages whose
+# bodies are record dicts serialized to MessagePack (messages without
+# that property are expected to be JSON).
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+
+# names of the wire formats of record dicts that can be produced by
+# pipeline components (see: `n6datapipeline.base.LegacyQueuedBase`)
+# -> the values of the `content_type` AMQP property
+RECORD_DICT_WIRE_FORMATS = {
+    'json': None,
+}
+if msgpack is not None:
+    RECORD_DICT_WIRE_FORMATS['msgpack'] = MSGPACK_CONTENT_TYPE
+
+
+def load_record_dict_data(body, content_type=None):
+    """
+    Deserialize the data of a record dict (to a `dict`), from MessagePack
+    if `content_type` is `MSGPACK_CONTENT_TYPE`, otherwise from JSON.
+
+    >>> load_record_dict_data(b'{"source": "foo.bar", "dip": "127.0.0.3"}')
+    {'source': 'foo.bar', 'dip': '127.0.0.3'}
+    >>> load_record_dict_data('{"source": "foo.bar"}', 'application/json')
+    {'source': 'foo.bar'}
+    """
+    if content_type == MSGPACK_CONTENT_TYPE:
+        if msgpack is None:
+            raise RuntimeError(f'cannot deserialize {content_type!a} '
+                               f'data: the msgpack library is not installed')
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
 _data_spec = RecordDict.data_spec
 assert _data_spec is BLRecordDict.data_spec
 
@@ -1349,3 +1821,83 @@ assert _data_spec.all_result_keys == {
     key for key in _all_keys
     if key not in ('type', 'enriched') and not key.startswith('_')}
 # ^ TODO later? assert _data_spec.all_result_keys - {'url_orig_ascii', 'url_orig_b64'} == {
+
+
+#
+# Trusted JSON (fast-path deserialization between pipeline components)
+
+# The name of the AMQP header carrying the *trust tag* of a message
+# body being a record dict's JSON (see: `RecordDictTrust`).
+TRUST_TAG_HEADER = 'n6rd-trust'
+
+# To be incremented whenever the semantics of any adjuster change (so
+# that record dicts adjusted by the old code are no longer trusted).
+TRUSTED_JSON_FORMAT_REVISION = 1
+
+
+class RecordDictTrust:
+
+    """
+    Tagging and verification of record dicts' JSON (produced with
+    `RecordDict.get_ready_json()`) sent between pipeline components
+    which share the secret `key`.
+
+    A *trust tag* consists of the *format version* (which includes
+    `TRUSTED_JSON_FORMAT_REVISION` and a fingerprint of the set of
+    record dict keys) and of the HMAC-SHA256 (computed with `key`)
+    of the version and the JSON. A record dict whose JSON has a valid
+    tag has been adjusted by a component running compatible code, so
+    the adjusters do not need to be run again (see:
+    `RecordDict.from_json()`).
+
+    >>> trust = RecordDictTrust(b'0123456789abcdef0123456789abcdef')
+    >>> tag = trust.make_tag(b'{"foo": "bar"}')
+    >>> tag.startswith(trust.format_version + ':')
+    True
+    >>> trust.verify_tag(b'{"foo": "bar"}', tag)
+    True
+    >>> trust.verify_tag('{"foo": "bar"}', tag)   # (str is OK too)
+    True
+    >>> trust.verify_tag(b'{"foo": "baz"}', tag)
+    False
+    >>> RecordDictTrust(b'another key, another key, again!').verify_tag(b'{"foo": "bar"}', tag)
+    False
+    >>> trust.verify_tag(b'{"foo": "bar"}', 'x' + tag)
+    False
+    >>> trust.verify_tag(b'{"foo": "bar"}', None)
+    False
+    """
+
+    MIN_KEY_LENGTH = 32
+
+    def __init__(self, key: bytes):
+        if len(key) < self.MIN_KEY_LENGTH:
+            raise ValueError(f'the key is too short (its length should be '
+                             f'at least {self.MIN_KEY_LENGTH})')
+        self._key = key
+        self.format_version = self._get_format_version()
+        self._format_version_bytes = self.format_version.encode('ascii')
+
+    @staticmethod
+    def _get_format_version():
+        all_keys = RecordDict.required_keys | RecordDict.optional_keys
+        fingerprint = hashlib.sha256(','.join(sorted(all_keys)).encode('ascii')).hexdigest()
+        return f'{TRUSTED_JSON_FORMAT_REVISION}.{fingerprint[:16]}'
+
+    def make_tag(self, json_body) -> str:
+        return f'{self.format_version}:{self._compute_mac(json_body)}'
+
+    def verify_tag(self, json_body, tag) -> bool:
+        if not isinstance(tag, (str, bytes)):
+            return False
+        if isinstance(tag, bytes):
+            tag = tag.decode('ascii', 'replace')
+        format_version, _, mac = tag.rpartition(':')
+        return (format_version == self.format_version
+                and hmac.compare_digest(mac, self._compute_mac(json_body)))
+
+    def _compute_mac(self, json_body):
+        mac = hmac.new(self._key, self._format_version_bytes, hashlib.sha256)
+        mac.update(b'\n')
+        mac.update(as_bytes(json_body))
+        return mac.hexdigest()
@@ -0,0 +1,356 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+"""
+Lightweight, in-process statistics of n6 pipeline components' work.
+
+Recording a measurement is cheap (a few arithmetic operations and one
+binary search in a precomputed tuple of bucket bounds); all the more
+expensive computations (percentiles, rates) are performed only when a
+report is being made (see: `ComponentStats.make_report()`).
+
+This module also provides helpers related to *latency tracing*: the
+trace of a message is a list of `'<stage>@<epoch milliseconds>'` strings
+carried in the `TRACE_HEADER` AMQP header; each pipeline component that
+publishes a message derived from a traced input message appends its own
+entry to (a copy of) that list.
+"""
+
+import bisect
+import json
+import os
+import time
+from collections.abc import (
+    Callable,
+    Iterator,
+    Sequence,
+)
+from typing import Optional
+
+from n6lib.common_helpers import AtomicallySavedFile
+
+
+__all__ = [
+    'TRACE_HEADER',
+    'make_trace_entry',
+    'parse_trace_entry',
+    'iter_trace_hops',
+    'LatencyHistogram',
+    'RoutingKeyStats',
+    'ComponentStats',
+]
+
+
+TRACE_HEADER = 'n6trace'
+
+
+def make_trace_entry(stage: str, timestamp: Optional[float] = None) -> str:
+    """
+    Make a trace entry (`timestamp` defaults to the current time).
+
+    >>> make_trace_entry('FooCollector', 1700000000.1234)
+    'FooCollector@1700000000123'
+    """
+    if timestamp is None:
+        timestamp = time.time()
+    return f'{stage}@{int(timestamp * 1000)}'
+
+
+def parse_trace_entry(entry: str) -> tuple[str, float]:
+    """
+    Get the stage and timestamp (in seconds) from the given trace entry.
+
+    >>> parse_trace_entry('FooCollector@1700000000123')
+    ('FooCollector', 1700000000.123)
+    >>> parse_trace_entry(b'FooCollector@1700000000123')
+    ('FooCollector', 1700000000.123)
+    """
+    if isinstance(entry, bytes):
+        entry = entry.decode('utf-8')
+    stage, _, millis = entry.rpartition('@')
+    return stage, int(millis) / 1000
+
+
+def iter_trace_hops(trace: Sequence[str],
+                    end_entry: Optional[str] = None,
+                    ) -> Iterator[tuple[str, float]]:
+    """
+    From the given trace (optionally, extended with `end_entry`),
+    generate pairs: (`'<stage> -> <next stage>'`, <time delta>).
+
+    >>> list(iter_trace_hops(['A@1000', 'B@1250', 'C@2000']))
+    [('A -> B', 0.25), ('B -> C', 0.75)]
+    >>> list(iter_trace_hops(['A@1000'], end_entry='B@1500'))
+    [('A -> B', 0.5)]
+    """
+    entries = [parse_trace_entry(entry) for entry in trace]
+    if end_entry is not None:
+        entries.append(parse_trace_entry(end_entry))
+    for (stage, timestamp), (next_stage, next_timestamp) in zip(entries, entries[1:]):
+        yield f'{stage} -> {next_stage}', next_timestamp - timestamp
+
+
+class LatencyHistogram:
+
+    """
+    A histogram of durations (in seconds), with logarithmic buckets.
+
+    The relative resolution of the histogram is ~19% (each bucket's
+    upper bound is 2**(1/4) times the previous one); the range of the
+    buckets is from 1 microsecond to ~2 minutes (greater durations are
+    counted in the last bucket).
+
+    >>> h = LatencyHistogram()
+    >>> for ms in range(1, 101):
+    ...     h.add(ms / 1000)
+    >>> h.count
+    100
+    >>> 0.045 < h.get_percentile(0.5) < 0.06
+    True
+    >>> 0.099 < h.get_percentile(0.99) <= 0.1
+    True
+    >>> h.get_percentile(1.0) == h.max == 0.1
+    True
+    >>> LatencyHistogram().get_percentile(0.5) is None
+    True
+    """
+
+    BUCKET_UPPER_BOUNDS = tuple(1e-6 * 2 ** (i / 4) for i in range(108))
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKET_UPPER_BOUNDS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float) -> None:
+        bounds = self.BUCKET_UPPER_BOUNDS
+        i = bisect.bisect_left(bounds, duration)
+        self.counts[min(i, len(bounds) - 1)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def get_percentile(self, fraction: float) -> Optional[float]:
+        """
+        Get the (approximate) value below which the given fraction of
+        durations falls -- or None if there are no durations.
+
+        The result is the upper bound of the appropriate bucket, but
+        never greater than the maximum duration added so far.
+        """
+        if not self.count:
+            return None
+        threshold = fraction * self.count
+        cumulative = 0
+        # (note: the last bucket is omitted, as it has no actual upper bound)
+        for bound, bucket_count in zip(self.BUCKET_UPPER_BOUNDS, self.counts[:-1]):
+            cumulative += bucket_count
+            if cumulative >= threshold and cumulative:
+                return min(bound, self.max)
+        return self.max
+
+    def get_summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': (self.total / self.count if self.count else None),
+            'p50': self.get_percentile(0.50),
+            'p99': self.get_percentile(0.99),
+            'max': (self.max if self.count else None),
+        }
+
+
+class RoutingKeyStats:
+
+    """
+    Counters and histograms concerning messages with a certain routing key.
+    """
+
+    __slots__ = (
+        'acked',
+        'nacked',
+        'requeued',
+        'published',
+        'processing_times',
+        'publishing_times',
+        '_processed_at_last_report',
+    )
+
+    def __init__(self):
+        self.acked = 0
+        self.nacked = 0
+        self.requeued = 0
+        self.published = 0
+        self.processing_times = LatencyHistogram()
+        self.publishing_times = LatencyHistogram()
+        self._processed_at_last_report = 0
+
+    @property
+    def processed(self) -> int:
+        return self.acked + self.nacked + self.requeued
+
+
+class ComponentStats:
+
+    """
+    Per-routing-key statistics of a pipeline component's work.
+
+    The component is expected to call:
+
+    * `record_processing()` -- for each processed input message,
+      specifying the time of processing and the *outcome* (one of:
+      `'acked'`, `'nacked'`, `'requeued'`);
+
+    * `record_publishing()` -- for each published output message,
+      specifying the time of the publishing operation;
+
+    * `record_trace()` -- (optionally, typically only in the final
+      component of the pipeline) for each processed input message
+      carrying a trace (see: `TRACE_HEADER`).
+
+    Reports (see: `make_report()`, `save_report()`) contain, for each
+    routing key: the numbers of messages, the rates of processed
+    messages per second (both the average since the start and the one
+    since the previous report), the nack rate and the summaries of
+    processing/publishing time histograms (including p50 and p99);
+    plus, for each source (if any traces have been recorded), the
+    summaries of latency histograms of the consecutive hops and of
+    the whole path.
+
+    Additional, component-specific, report sections can be registered
+    with `add_report_section()`.
+    """
+
+    OUTCOMES = frozenset({'acked', 'nacked', 'requeued'})
+
+    _STANDARD_REPORT_KEYS = frozenset({
+        'component', 'pid', 'time', 'uptime', 'input', 'output', 'trace_latency',
+    })
+
+    def __init__(self, component_name: str):
+        self._component_name = component_name
+        self._start_time = time.monotonic()
+        self._last_report_time = self._start_time
+        self._input_rk_to_stats: dict[str, RoutingKeyStats] = {}
+        self._output_rk_to_stats: dict[str, RoutingKeyStats] = {}
+        self._source_to_trace_hop_times: dict[str, dict[str, LatencyHistogram]] = {}
+        self._extra_section_makers: dict[str, Callable[[], dict]] = {}
+
+    def add_report_section(self, name: str, make_section: Callable[[], dict]) -> None:
+        """
+        Register an additional report section: `make_section` will be
+        called (with no arguments) each time a report is being made,
+        and its result will be included in the report as the value of
+        the `name` key (which must not be one of the standard keys).
+        """
+        if name in self._STANDARD_REPORT_KEYS:
+            raise ValueError(f'{name!a} is a standard report key')
+        self._extra_section_makers[name] = make_section
+
+    def record_processing(self, routing_key: str, duration: float, outcome: str) -> None:
+        if outcome not in self.OUTCOMES:
+            raise ValueError(f'unknown outcome: {outcome!a}')
+        try:
+            rk_stats = self._input_rk_to_stats[routing_key]
+        except KeyError:
+            rk_stats = self._input_rk_to_stats[routing_key] = RoutingKeyStats()
+        setattr(rk_stats, outcome, getattr(rk_stats, outcome) + 1)
+        rk_stats.processing_times.add(duration)
+
+    def record_publishing(self, routing_key: str, duration: float) -> None:
+        try:
+            rk_stats = self._output_rk_to_stats[routing_key]
+        except KeyError:
+            rk_stats = self._output_rk_to_stats[routing_key] = RoutingKeyStats()
+        rk_stats.published += 1
+        rk_stats.publishing_times.add(duration)
+
+    def record_trace(self, source: str, trace: Sequence[str], end_stage: str) -> None:
+        end_entry = make_trace_entry(end_stage)
+        try:
+            hop_times = self._source_to_trace_hop_times[source]
+        except KeyError:
+            hop_times = self._source_to_trace_hop_times[source] = {}
+        total = 0.0
+        for hop, delta in iter_trace_hops(trace, end_entry):
+            total += delta
+            self._get_histogram(hop_times, hop).add(delta)
+        self._get_histogram(hop_times, 'total').add(total)
+
+    @staticmethod
+    def _get_histogram(histograms: dict[str, LatencyHistogram], key: str) -> LatencyHistogram:
+        try:
+            return histograms[key]
+        except KeyError:
+            histogram = histograms[key] = LatencyHistogram()
+            return histogram
+
+    def make_report(self) -> dict:
+        now = time.monotonic()
+        uptime = now - self._start_time
+        since_last_report = now - self._last_report_time
+        self._last_report_time = now
+        report = {
+            'component': self._component_name,
+            'pid': os.getpid(),
+            'time': time.time(),
+            'uptime': uptime,
+            'input': {
+                rk: self._make_input_rk_report(rk_stats, uptime, since_last_report)
+                for rk, rk_stats in sorted(self._input_rk_to_stats.items())},
+            'output': {
+                rk: self._make_output_rk_report(rk_stats, uptime)
+                for rk, rk_stats in sorted(self._output_rk_to_stats.items())},
+            'trace_latency': {
+                source: {
+                    hop: histogram.get_summary()
+                    for hop, histogram in sorted(hop_times.items())}
+                for source, hop_times in sorted(self._source_to_trace_hop_times.items())},
+        }
+        for name, make_section in self._extra_section_makers.items():
+            report[name] = make_section()
+        return report
+
+    def save_report(self, path: str) -> None:
+        """
+        Make a report and save it -- atomically, as JSON -- to the file
+        at the given path (if it contains `'{pid}'`, that placeholder is
+        replaced with the current process id, so that each process of a
+        multi-process component can have its own file).
+        """
+        report = self.make_report()
+        with AtomicallySavedFile(path.replace('{pid}', str(os.getpid())), 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    @staticmethod
+    def _make_input_rk_report(rk_stats: RoutingKeyStats,
+                              uptime: float,
+                              since_last_report: float) -> dict:
+        processed = rk_stats.processed
+        processed_since_last_report = processed - rk_stats._processed_at_last_report
+        rk_stats._processed_at_last_report = processed
+        return {
+            'processed': processed,
+            'acked': rk_stats.acked,
+            'nacked': rk_stats.nacked,
+            'requeued': rk_stats.requeued,
+            'nack_rate': (rk_stats.nacked / processed if processed else None),
+            'events_per_second': _safe_rate(processed, uptime),
+            'recent_events_per_second': _safe_rate(processed_since_last_report,
+                                                   since_last_report),
+            'processing_time': rk_stats.processing_times.get_summary(),
+        }
+
+    @staticmethod
+    def _make_output_rk_report(rk_stats: RoutingKeyStats, uptime: float) -> dict:
+        return {
+            'published': rk_stats.published,
+            'events_per_second': _safe_rate(rk_stats.published, uptime),
+            'publishing_time': rk_stats.publishing_times.get_summary(),
+        }
+
+
+def _safe_rate(count, seconds):
+    return (count / seconds if seconds > 0 else None)
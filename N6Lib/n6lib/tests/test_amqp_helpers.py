@@ -31,6 +31,8 @@ from n6lib.amqp_helpers import (
     SimpleAMQPExchangeTool,
     get_amqp_connection_params_dict,
     get_amqp_connection_params_dict_from_args,
+    get_record_dict_trust_key,
+    get_record_dict_wire_format,
 )
 from n6lib.config import (
     ConfigError,
@@ -50,6 +52,8 @@ CONF_SECTION_DEFAULTS = dict(
     password_auth=False,
     username='',
     password='',
+    record_dict_trust_key='',
+    record_dict_wire_format='json',
 )
 
 CONN_PARAM_CLIENT_PROP_INFORMATION = AnyMatchingRegex(re.compile(
@@ -439,6 +443,63 @@ class Test_get_amqp_connection_params_dict(unittest.TestCase, TestCaseMixin):
         ])
 
 
+@expand
+class Test_get_record_dict_trust_key(unittest.TestCase, TestCaseMixin):
+
+    def setUp(self):
+        self.ConfigMock = self.patch('n6lib.config.Config')
+
+    @foreach([
+        param(configured_key='', expected_result=None),
+        param(configured_key=32 * 'k', expected_result=32 * b'k'),
+    ])
+    @foreach([
+        param(given_args=[], expected_rabbitmq_config_section='rabbitmq'),
+        param(given_args=['particular_section'],
+              expected_rabbitmq_config_section='particular_section'),
+    ])
+    def test(self, given_args, expected_rabbitmq_config_section,
+             configured_key, expected_result):
+        self.ConfigMock.section.return_value = ConfigSection(
+            '<irrelevant for these tests>',
+            CONF_SECTION_DEFAULTS | {'record_dict_trust_key': configured_key})
+        expected_rabbitmq_config_spec = RABBITMQ_CONFIG_SPEC_PATTERN.format(
+            rabbitmq_config_section=expected_rabbitmq_config_section)
+
+        result = get_record_dict_trust_key(*given_args)
+
+        self.assertEqual(self.ConfigMock.mock_calls, [
+            call.section(expected_rabbitmq_config_spec),
+        ])
+        self.assertEqual(result, expected_result)
+
+
+@expand
+class Test_get_record_dict_wire_format(unittest.TestCase, TestCaseMixin):
+
+    def setUp(self):
+        self.ConfigMock = self.patch('n6lib.config.Config')
+
+    @foreach([
+        param(given_args=[], expected_rabbitmq_config_section='rabbitmq'),
+        param(given_args=['particular_section'],
+              expected_rabbitmq_config_section='particular_section'),
+    ])
+    def test(self, given_args, expected_rabbitmq_config_section):
+        self.ConfigMock.section.return_value = ConfigSection(
+            '<irrelevant for these tests>',
+            CONF_SECTION_DEFAULTS | {'record_dict_wire_format': 'msgpack'})
+        expected_rabbitmq_config_spec = RABBITMQ_CONFIG_SPEC_PATTERN.format(
+            rabbitmq_config_section=expected_rabbitmq_config_section)
+
+        result = get_record_dict_wire_format(*given_args)
+
+        self.assertEqual(self.ConfigMock.mock_calls, [
+            call.section(expected_rabbitmq_config_spec),
+        ])
+        self.assertEqual(result, 'msgpack')
+
+
 @expand
 class Test_get_amqp_connection_params_dict_from_args(unittest.TestCase, TestCaseMixin):
 
@@ -36,6 +36,8 @@ from n6lib.auth_api import (
     _DataPreparer,
     _IgnoreListsCriteriaResolver,
     InsideCriteriaResolver,
+    _get_required_substring,
+    _get_url_pattern_matchers,
     cached_basing_on_ldap_root_node,
 )
 from n6lib.auth_related_test_helpers import (
@@ -3258,16 +3260,57 @@ class TestInsideCriteriaResolver__init(TestCaseMixin, unittest.TestCase):
                 },
             ],
             expected_content={
-                'www.xn--exampl-14a.com': ['o9', 'o10'],
-                'xn--exampl-14a.org': ['o9', 'o8'],
-                'foobar.info': ['o10'],
+                'com': {
+                    'xn--exampl-14a': {
+                        'www': {
+                            None: ['o9', 'o10'],
+                        },
+                    },
+                },
+                'org': {
+                    'xn--exampl-14a': {
+                        None: ['o9', 'o8'],
+                    },
+                },
+                'info': {
+                    'foobar': {
+                        None: ['o10'],
+                    },
+                },
+            },
+        ),
+        param(
+            inside_criteria=[
+                {
+                    'org_id': 'o1',
+                    'fqdn_seq': [u'example.com', u'com'],
+                },
+                {
+                    'org_id': 'o2',
+                    'fqdn_seq': [u'www.example.com'],
+                },
+                {
+                    'org_id': 'o3',
+                    'fqdn_seq': [u'example.com'],
+                },
+            ],
+            expected_content={
+                'com': {
+                    None: ['o1'],
+                    'example': {
+                        None: ['o1', 'o3'],
+                        'www': {
+                            None: ['o2'],
+                        },
+                    },
+                },
             },
         ),
     )
-    def test__fqdn_suffix_to_ids(self, inside_criteria, expected_content):
+    def test__fqdn_label_trie(self, inside_criteria, expected_content):
         with self.assertStateUnchanged(inside_criteria):
             r = InsideCriteriaResolver(inside_criteria)
-            self.assertEqual(r._fqdn_suffix_to_ids, expected_content)
+            self.assertEqual(r._fqdn_label_trie, expected_content)
 
 
     @foreach(
@@ -3353,11 +3396,17 @@ class TestInsideCriteriaResolver__init(TestCaseMixin, unittest.TestCase):
     @foreach(
         param(
             inside_criteria=[],
-            expected_content=[],
+            expected_url_to_ids={},
+            expected_urls=(),
+            expected_urls_joined='',
+            expected_url_offsets=[],
         ),
         param(
             inside_criteria=[{'org_id': 'o42', 'url_seq': []}],
-            expected_content=[],
+            expected_url_to_ids={},
+            expected_urls=(),
+            expected_urls_joined='',
+            expected_url_offsets=[],
         ),
         param(
             inside_criteria=[
@@ -3370,24 +3419,42 @@ class TestInsideCriteriaResolver__init(TestCaseMixin, unittest.TestCase):
                 },
                 {
                     'org_id': 'o8',
-                    'url_seq': [u'https://examplę.pl/?foo'],
+                    'url_seq': [u'https://examplę.pl/?foo', u'https://examplę.pl/?foo'],
                 },
                 {
                     'org_id': 'o10',
                     'url_seq': [u'http://1.2.3.4/.../', u'http://foo.bar'],
                 },
             ],
-            expected_content=[
-                ('o9', (u'http://foo.bar', u'https://examplę.pl/?foo')),
-                ('o8', (u'https://examplę.pl/?foo',)),
-                ('o10', (u'http://1.2.3.4/.../', u'http://foo.bar')),
-            ],
+            expected_url_to_ids={
+                u'http://foo.bar': ('o9', 'o10'),
+                u'https://examplę.pl/?foo': ('o9', 'o8'),
+                u'http://1.2.3.4/.../': ('o10',),
+            },
+            expected_urls=(
+                u'http://foo.bar',
+                u'https://examplę.pl/?foo',
+                u'http://1.2.3.4/.../',
+            ),
+            expected_urls_joined=(
+                u'http://foo.bar\n'
+                u'https://examplę.pl/?foo\n'
+                u'http://1.2.3.4/.../'
+            ),
+            expected_url_offsets=[0, 15, 39],
         ),
     )
-    def test__ids_and_urls(self, inside_criteria, expected_content):
+    def test__url_related_attrs(self, inside_criteria,
+                                expected_url_to_ids,
+                                expected_urls,
+                                expected_urls_joined,
+                                expected_url_offsets):
         with self.assertStateUnchanged(inside_criteria):
             r = InsideCriteriaResolver(inside_criteria)
-            self.assertEqual(r._ids_and_urls, expected_content)
+            self.assertEqual(r._url_to_ids, expected_url_to_ids)
+            self.assertEqual(r._urls, expected_urls)
+            self.assertEqual(r._urls_joined, expected_urls_joined)
+            self.assertEqual(r._url_offsets, expected_url_offsets)
 
 
     @foreach(
@@ -3782,6 +3849,91 @@ class TestInsideCriteriaResolver_get_client_org_ids_and_urls_matched(TestCaseMix
         return opt_args, opt_kwargs
 
 
+@expand
+class TestInsideCriteriaResolver_url_prefiltering(unittest.TestCase):
+
+    @foreach(
+        param(regex=r'http://example\.com/', expected='http://example.com/'),
+        param(regex=r'https?://(www\.)?foo\.bar/\d+', expected='foo.bar/'),
+        param(regex=r'^https://(?:x\.com)/spam', expected='https://x.com/spam'),
+        param(regex=r'^https://(x\.com|y\.com)/spam', expected='https://'),
+        param(regex=r'^ht(x\.com|y\.com)/spam', expected='/spam'),
+        param(regex=r'(abc|abd)ef', expected=None),
+        param(regex=r'ab.cd', expected=None),
+        param(regex=r'(?i)http://example\.com/', expected=None),
+        param(regex=r'http://(?i:EXAMPLE)\.com/', expected='http://'),
+        param(regex=r'x+', expected=None),
+        param(regex=r'.*', expected=None),
+    )
+    def test__get_required_substring(self, regex, expected):
+        actual = _get_required_substring(re.compile(regex))
+        self.assertEqual(actual, expected)
+
+    def test__get_required_substring__ignorecase_flag(self):
+        actual = _get_required_substring(re.compile(r'http://example\.com/', re.IGNORECASE))
+        self.assertIsNone(actual)
+
+
+    @foreach(
+        param(url_pattern=r'\.pl/', expected_required_substrings=[
+            '.pl/',
+            '\\.pl/',
+        ]),
+        param(url_pattern=r'\.p', expected_required_substrings=None),
+        param(url_pattern=r'https://example\.', expected_required_substrings=[
+            'https://example.',
+            'https://example\\.',
+        ]),
+        param(url_pattern='http://*.example.com/', expected_required_substrings=[
+            'example',
+            '.example.com/',
+        ]),
+        param(url_pattern='*.com[', expected_required_substrings=[
+            '.com[',
+        ]),
+        param(url_pattern='*c[', expected_required_substrings=None),
+    )
+    def test__get_url_pattern_matchers(self, url_pattern, expected_required_substrings):
+        (match1,
+         match2,
+         required_substrings) = _get_url_pattern_matchers(url_pattern)
+        self.assertEqual(required_substrings, expected_required_substrings)
+        self.assertIs(_get_url_pattern_matchers(url_pattern)[0], match1)
+
+
+    @foreach(
+        param(url_pattern=r'\.pl/'),
+        param(url_pattern=r'https://example\.'),
+        param(url_pattern=r'https://example\.pl/\?'),
+        param(url_pattern=r'/\.\.\./$'),
+        param(url_pattern=r'bar\nhttps'),
+        param(url_pattern='http://*.example.com/*'),
+        param(url_pattern='http://foo.bar'),
+        param(url_pattern='*.com['),
+    )
+    def test_prefiltering_gives_same_results_as_checking_all_urls(self, url_pattern):
+        url_seq = [
+            'http://foo.bar',
+            'https://example.pl/?foo',
+            'http://www.example.com/?foo',
+            'https://example.com/abc',
+            'http://1.2.3.4/.../',
+            'http://foo.bar.com[',
+        ]
+        resolver = InsideCriteriaResolver([{'org_id': 'o1', 'url_seq': url_seq}])
+        match1, match2, required_substrings = _get_url_pattern_matchers(url_pattern)
+
+        candidate_urls = resolver._get_candidate_urls(required_substrings)
+
+        def matches(url):
+            return (match1(url) is not None
+                    or (match2 is not None and match2(url) is not None))
+        self.assertTrue(set(candidate_urls).issubset(url_seq))
+        self.assertEqual(
+            [url for url in candidate_urls if matches(url)],
+            [url for url in url_seq if matches(url)])
+
+
 #
 # `_IgnoreListsCriteriaResolver` tests
 #
@@ -0,0 +1,106 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from n6lib.benchmark_helpers import (
+    Measurement,
+    find_regressions,
+    load_results_document,
+    make_results_document,
+    save_results_document,
+)
+
+
+class TestMeasurement(unittest.TestCase):
+
+    def test_without_tracemalloc(self):
+        m = Measurement('foo')
+        with m.measuring(count=10):
+            sum(range(1000))
+        with m.measuring():
+            pass
+
+        self.assertEqual(m.count, 11)
+        self.assertGreater(m.seconds, 0)
+        self.assertFalse(m.memory_traced)
+        self.assertEqual(m.as_dict(unit='event'), {
+            'count': 11,
+            'seconds': m.seconds,
+            'events_per_second': 11 / m.seconds,
+        })
+
+    def test_with_tracemalloc(self):
+        m = Measurement('foo')
+        retained = []
+        tracemalloc.start()
+        try:
+            with m.measuring(count=2):
+                transient = [object() for _ in range(10000)]
+                retained.append(bytearray(100000))
+                del transient
+        finally:
+            tracemalloc.stop()
+
+        self.assertTrue(m.memory_traced)
+        self.assertGreaterEqual(m.retained_bytes, 100000)
+        self.assertGreater(m.transient_bytes, m.retained_bytes)
+        d = m.as_dict()
+        self.assertEqual(d['transient_bytes_per_op'], m.transient_bytes / 2)
+        self.assertEqual(d['retained_bytes_per_op'], m.retained_bytes / 2)
+
+    def test_nothing_measured(self):
+        self.assertEqual(Measurement('foo').as_dict(), {
+            'count': 0,
+            'seconds': 0.0,
+            'ops_per_second': None,
+        })
+
+
+class TestResultsDocument(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+    @patch('n6lib.benchmark_helpers._get_git_commit', return_value='0123abcd')
+    def test_make_and_save(self, _):
+        document = make_results_document('foo', {'x': 1}, {'y': 2.5})
+        path = os.path.join(self.tmp_dir, 'results.json')
+
+        save_results_document(document, path)
+
+        loaded = load_results_document(path)
+        self.assertEqual(loaded, document)
+        self.assertEqual(loaded['benchmark'], 'foo')
+        self.assertEqual(loaded['commit'], '0123abcd')
+        self.assertEqual(loaded['params'], {'x': 1})
+        self.assertEqual(loaded['results'], {'y': 2.5})
+        self.assertIn('python', loaded)
+        self.assertIn('time', loaded)
+
+
+class TestFindRegressions(unittest.TestCase):
+
+    def test(self):
+        baseline = {
+            'foo': {'construct': {'ops_per_second': 1000.0, 'seconds': 1.0},
+                    'serialize': {'ops_per_second': 2000.0}},
+            'bar': {'update': {'ops_per_second': 100.0}},
+            'spam': {'events_per_second': 0},
+        }
+        results = {
+            'foo': {'construct': {'ops_per_second': 699.0, 'seconds': 9.0},
+                    'serialize': {'ops_per_second': 2500.0}},
+            'baz': {'update': {'ops_per_second': 1.0}},
+            'spam': {'events_per_second': 10},
+        }
+
+        self.assertEqual(find_regressions(results, baseline, 0.3), [
+            'foo.construct.ops_per_second: 699 (baseline: 1000, -30.1%)',
+        ])
+        self.assertEqual(find_regressions(results, baseline, 0.31), [])
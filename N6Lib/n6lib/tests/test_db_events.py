@@ -24,6 +24,8 @@ from n6lib.common_helpers import PlainNamespace
 from n6lib.db_events import (
     _IP_COLUMN_NAMES,
     _NO_IP_PLACEHOLDERS,
+    CLIENT_TO_EVENT_BULK_INSERT,
+    EVENT_BULK_INSERT,
     n6ClientToEvent,
     n6NormalizedData,
     make_raw_result_dict,
@@ -637,5 +639,67 @@ class Test_make_raw_result_dict(TestCaseMixin, unittest.TestCase):
         return row
 
 
+@expand
+class TestBulkInsert(unittest.TestCase):
+
+    def test_column_names(self):
+        self.assertEqual(EVENT_BULK_INSERT.table_name, 'event')
+        self.assertEqual(EVENT_BULK_INSERT.column_names, tuple(sorted(n6NormalizedData._n6columns)))
+        self.assertEqual(CLIENT_TO_EVENT_BULK_INSERT.table_name, 'client_to_event')
+        self.assertEqual(CLIENT_TO_EVENT_BULK_INSERT.column_names, ('id', 'time', 'client'))
+
+    def test_make_row(self):
+        item = dict(
+            id='0123456789abcdef0123456789abcdef',
+            time='2024-01-02T03:04:05+01:00',
+            modified=datetime.datetime(2024, 1, 2, 5, 0, 0),
+            source='foo.bar',
+            address=[{'ip': '1.2.3.4', 'cc': 'PL'}],
+            ip='1.2.3.4',
+            cc='PL',
+            custom={'client': ['o1']},
+            ignored=False,
+            client=['o1'],  # (not a column -> ignored)
+            type='event',   # (not a column -> ignored)
+        )
+
+        row = EVENT_BULK_INSERT.make_row(item)
+
+        self.assertEqual(dict(zip(EVENT_BULK_INSERT.column_names, row)), dict.fromkeys(
+            EVENT_BULK_INSERT.column_names) | dict(
+            id=bytes.fromhex('0123456789abcdef0123456789abcdef'),
+            time=datetime.datetime(2024, 1, 2, 2, 4, 5),
+            modified=datetime.datetime(2024, 1, 2, 5, 0, 0),
+            source='foo.bar',
+            address='[{"ip": "1.2.3.4", "cc": "PL"}]',
+            ip=0x01020304,
+            dip=0,  # (the "no IP" placeholder)
+            cc='PL',
+            custom='{"client": ["o1"]}',
+            ignored=False,
+        ))
+
+    def test_make_row_with_illegal_flag(self):
+        with self.assertRaises(TypeError):
+            EVENT_BULK_INSERT.make_row({'ignored': 1})
+
+    @foreach(
+        param(paramstyle='format', placeholder='%s'),
+        param(paramstyle='qmark', placeholder='?'),
+    )
+    def test_execute(self, paramstyle, placeholder):
+        connection = MagicMock()
+        connection.dialect.paramstyle = paramstyle
+
+        CLIENT_TO_EVENT_BULK_INSERT.execute(connection, [sen.row1, sen.row2])
+        CLIENT_TO_EVENT_BULK_INSERT.execute(connection, [])  # (no rows -> nothing executed)
+
+        self.assertEqual(connection.execute.mock_calls, [
+            call(f'INSERT INTO `client_to_event` (`id`, `time`, `client`) '
+                 f'VALUES ({placeholder}, {placeholder}, {placeholder})',
+                 [sen.row1, sen.row2]),
+        ])
+
+
 ### TODO:
 #class Test_...
@@ -32,6 +32,7 @@ from n6lib.log_helpers import (
     AMQPHandler,
     configure_logging,
     get_logger,
+    restart_amqp_logging_after_fork,
 )
 
 
@@ -324,6 +325,22 @@ class Test___LOGGER(unittest.TestCase):
         self.assertIs(_LOGGER, logging.getLogger('n6lib.log_helpers'))
 
 
+class Test__restart_amqp_logging_after_fork(TestCaseMixin, unittest.TestCase):
+
+    def test(self):
+        handlers = [MagicMock(), MagicMock(), MagicMock()]
+        handlers[1]._restart_pushing_after_fork.side_effect = ValueError
+        self.patch('n6lib.log_helpers._amqp_handlers', handlers)
+        dump_condensed_debug_msg = self.patch('n6lib.log_helpers.dump_condensed_debug_msg')
+
+        restart_amqp_logging_after_fork()
+
+        for handler in handlers:
+            handler._restart_pushing_after_fork.assert_called_once_with()
+        dump_condensed_debug_msg.assert_called_once_with(
+            'EXCEPTION WHEN RESTARTING THE AMQP LOGGING HANDLER AFTER FORK!')
+
+
 @expand
 class TestAMQPHandler__init__interactions_with_other_stuff(TestCaseMixin, unittest.TestCase):
 
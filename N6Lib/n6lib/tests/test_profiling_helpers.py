@@ -0,0 +1,97 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from unittest.mock import (
+    call,
+    patch,
+)
+
+from n6lib.profiling_helpers import OnDemandProfiler
+
+
+class TestOnDemandProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.profiler = OnDemandProfiler(self.tmp_dir,
+                                         file_name_prefix='SomeComponent',
+                                         sampling_duration=0.05,
+                                         sampling_interval=0.001)
+
+    def test_install(self):
+        with patch('n6lib.profiling_helpers.signal.signal') as signal_mock:
+            installed = self.profiler.install()
+
+        self.assertTrue(installed)
+        self.assertEqual(signal_mock.mock_calls, [
+            call(signal.SIGUSR1, self.profiler._on_sampling_signal),
+            call(signal.SIGUSR2, self.profiler._on_tracemalloc_signal),
+        ])
+
+    def test_install_outside_main_thread(self):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(self.profiler.install()))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(results, [False])
+
+    def test_sample_stacks(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=stop.wait, name='SomeBusyThread')
+        thread.start()
+        try:
+            path = self.profiler.sample_stacks()
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertTrue(os.path.basename(path).startswith(f'SomeComponent-{os.getpid()}-'))
+        self.assertTrue(path.endswith('.collapsed'))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any(line.startswith('SomeBusyThread;') for line in lines))
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+
+    def test_sample_stacks_when_already_in_progress(self):
+        with self.profiler._sampling_lock:
+            path = self.profiler.sample_stacks()
+
+        self.assertIsNone(path)
+
+    def test_tracemalloc_request(self):
+        if tracemalloc.is_tracing():
+            self.skipTest('tracemalloc already started by someone else')
+        self.addCleanup(tracemalloc.stop)
+
+        result_of_first = self.profiler.handle_tracemalloc_request()
+        some_data = [bytearray(1000) for _ in range(100)]
+        result_of_second = self.profiler.handle_tracemalloc_request()
+        some_data.extend(bytearray(1000) for _ in range(100))
+        result_of_third = self.profiler.handle_tracemalloc_request()
+
+        self.assertIsNone(result_of_first)
+        self.assertTrue(tracemalloc.is_tracing())
+        for path in [result_of_second, result_of_third]:
+            self.assertTrue(path.endswith('.tracemalloc.txt'))
+            self.assertTrue(os.path.exists(path[:-len('.txt')]))
+        with open(result_of_second) as f:
+            self.assertTrue(f.readline().startswith('Top allocation sites'))
+        with open(result_of_third) as f:
+            self.assertTrue(f.readline().startswith('Top differences'))
+        snapshot = tracemalloc.Snapshot.load(result_of_third[:-len('.txt')])
+        self.assertTrue(snapshot.traces)
+
+
+if __name__ == '__main__':
+    unittest.main()
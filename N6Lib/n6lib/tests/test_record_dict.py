@@ -6,6 +6,7 @@ import copy
 import pickle
 import datetime
 import itertools
+import json
 import operator
 import random
 import re
@@ -20,6 +21,8 @@ from unittest.mock import (
     sentinel as sen,
 )
 
+from bson.json_util import dumps as bson_dumps
+
 from n6lib.class_helpers import AsciiMixIn
 from n6lib.common_helpers import (
     CIDict,
@@ -39,6 +42,7 @@ from n6lib.const import (
 )
 from n6lib.data_spec import FieldValueTooLongError
 from n6lib.datetime_helpers import FixedOffsetTimezone
+from n6lib.db_events import EVENT_BULK_INSERT
 from n6lib.record_dict import (
     # exception classes:
     AdjusterError,
@@ -70,6 +74,22 @@ from n6lib.record_dict import (
     # record dict classes
     RecordDict,
     BLRecordDict,
+
+    # adjuster memoization stuff:
+    AdjusterMemo,
+
+    # JSON encoding stuff:
+    JSON_ENCODERS,
+    set_json_encoder,
+    stdlib_json_encoder,
+
+    # binary wire format stuff:
+    MSGPACK_CONTENT_TYPE,
+    RECORD_DICT_WIRE_FORMATS,
+    load_record_dict_data,
+
+    # trusted JSON stuff:
+    RecordDictTrust,
 )
 from n6lib.unit_test_helpers import TestCaseMixin
 
@@ -757,6 +777,101 @@ class TestRecordDict(TestCaseMixin, unittest.TestCase):
         self.assertEqual(rd, self.with_address1)
         self.assertIs(rd.context_manager_error_callback, sen.cm_error_callback)
 
+    def test__instances_have_no_dict(self):
+        rd = self.rd_class(self.with_address1_singular)
+        self.assertFalse(hasattr(rd, '__dict__'))
+        with self.assertRaises(AttributeError):
+            rd.some_attr = 42
+
+    def test__subclass__adjuster_table(self):
+        class Subclass(self.rd_class):
+            optional_keys = self.rd_class.optional_keys | {'key1', 'key2', 'key-3'}
+            adjust_key1 = None
+            adjust_key2 = staticmethod(lambda value: value.upper())
+            def adjust_key3(self, value):
+                return value * 2
+        rd = Subclass({'key1': 'x', 'key2': 'y', 'key-3': 'z', 'source': 'foo.bar'})
+        self.assertEqual(rd, {'key1': 'x', 'key2': 'Y', 'key-3': 'zz', 'source': 'foo.bar'})
+        self.assertEqual(Subclass._settable_keys,
+                         self.rd_class._settable_keys | {'key1', 'key2', 'key-3'})
+        self.assertTrue(hasattr(rd, '__dict__'))  # (no `__slots__` in the subclass)
+        with self.assertRaises(RuntimeError):
+            rd['key4'] = 'x'
+
+    def test__subclass__missing_adjusters(self):
+        with self.assertRaisesRegex(TypeError, r'no adjusters for keys: key1, key2$'):
+            class Subclass(self.rd_class):
+                optional_keys = self.rd_class.optional_keys | {'key1', 'key2'}
+
+    def test__subclass__keys_both_required_and_optional(self):
+        with self.assertRaisesRegex(ValueError, r'both as required and optional: source$'):
+            class Subclass(self.rd_class):
+                optional_keys = self.rd_class.optional_keys | {'source'}
+
+    def test__from_json(self):
+        rd = self.rd_class(self.with_address2)
+        rd['enriched'] = (['fqdn'], {'127.0.0.2': ['asn', 'cc']})
+        json_body = rd.get_ready_json().encode('utf-8')
+        trust = RecordDictTrust(32 * b'k')
+        for kwargs in [
+            {},
+            dict(trust=trust),
+            dict(trust=trust, trust_tag=None),
+            dict(trust=trust, trust_tag=RecordDictTrust(32 * b'K').make_tag(json_body)),
+            dict(trust=trust, trust_tag=trust.make_tag(json_body)),
+        ]:
+            with patch.object(self.rd_class, '_from_trusted_data',
+                              wraps=self.rd_class._from_trusted_data) as from_trusted_data:
+                rd2 = self.rd_class.from_json(json_body, log_nonstandard_names=True, **kwargs)
+            self.assertIs(type(rd2), self.rd_class)
+            self.assertEqual(rd2, rd)
+            self.assertEqual(rd2['enriched'], (['fqdn'], {'127.0.0.2': ['asn', 'cc']}))
+            self.assertTrue(rd2.log_nonstandard_names)
+            self.assertEqual(from_trusted_data.called, 'trust_tag' in kwargs and
+                             trust.verify_tag(json_body, kwargs['trust_tag']))
+
+    def test__from_json__msgpack(self):
+        if 'msgpack' not in RECORD_DICT_WIRE_FORMATS:
+            raise unittest.SkipTest('msgpack is not installed')
+        rd = self.rd_class(self.with_address2)
+        rd['enriched'] = (['fqdn'], {'127.0.0.2': ['asn', 'cc']})
+        msgpack_body = rd.get_ready_msgpack()
+        trust = RecordDictTrust(32 * b'k')
+        for kwargs in [
+            {},
+            dict(trust=trust, trust_tag=trust.make_tag(msgpack_body)),
+        ]:
+            rd2 = self.rd_class.from_json(msgpack_body,
+                                          content_type=MSGPACK_CONTENT_TYPE,
+                                          **kwargs)
+            self.assertIs(type(rd2), self.rd_class)
+            self.assertEqual(rd2, rd)
+            self.assertEqual(rd2['enriched'], (['fqdn'], {'127.0.0.2': ['asn', 'cc']}))
+        self.assertIs(type(msgpack_body), bytes)
+        self.assertLess(len(msgpack_body), len(rd.get_ready_json()))
+        self.assertEqual(load_record_dict_data(msgpack_body, MSGPACK_CONTENT_TYPE),
+                         json.loads(rd.get_ready_json()))
+
+    def test__from_json__trusted_data_not_adjusted(self):
+        json_body = b'{"source": "NOT VALID BUT TRUSTED", "dip": "127.0.0.3"}'
+        trust = RecordDictTrust(32 * b'k')
+
+        rd = self.rd_class.from_json(json_body, trust=trust, trust_tag=trust.make_tag(json_body))
+
+        self.assertEqual(rd, {'source': 'NOT VALID BUT TRUSTED', 'dip': '127.0.0.3'})
+        # (but any items set later are adjusted as usual)
+        with self.assertRaises(AdjusterError):
+            rd['source'] = 'NOT VALID'
+        with self.assertRaises(AdjusterError):
+            self.rd_class.from_json(json_body)
+
+    def test__from_json__trusted_data_with_illegal_key(self):
+        json_body = b'{"source": "foo.bar", "illegal": 42}'
+        trust = RecordDictTrust(32 * b'k')
+
+        with self.assertRaises(RuntimeError):
+            self.rd_class.from_json(json_body, trust=trust, trust_tag=trust.make_tag(json_body))
+
     def test_copying(self):
         class Subclass(self.rd_class):
             pass
@@ -815,6 +930,39 @@ class TestRecordDict(TestCaseMixin, unittest.TestCase):
                             rd2.context_manager_error_callback,
                             callback)
 
+    def test_copying_and_picklability_with_subclass_slots(self):
+        @picklable
+        class SubclassWithSlots(self.rd_class):
+            __slots__ = ('extra', '__private')
+            def get_private(self):
+                return self.__private
+            def set_private(self, value):
+                self.__private = value
+        @picklable
+        class SubSubclassWithSlots(SubclassWithSlots):
+            __slots__ = 'another'
+        copy_ops = [operator.methodcaller('copy'), copy.copy, copy.deepcopy] + [
+            (lambda rd, proto=pickle_proto: pickle.loads(pickle.dumps(rd, proto)))
+            for pickle_proto in range(0, pickle.HIGHEST_PROTOCOL + 1)]
+        for copy_op in copy_ops:
+            rd = SubSubclassWithSlots(self.with_address2, log_nonstandard_names=True)
+            rd.extra = ['foo']
+            rd.set_private('bar')
+            rd.another = 42
+            rd2 = copy_op(rd)
+            self.assertIs(type(rd2), SubSubclassWithSlots)
+            self.assertEqual(rd, rd2)
+            self.assertTrue(rd2.log_nonstandard_names)
+            self.assertEqual(rd2.extra, ['foo'])
+            self.assertEqual(rd2.get_private(), 'bar')
+            self.assertEqual(rd2.another, 42)
+
+            rd = SubSubclassWithSlots(self.with_address2)   # (slots not set)
+            rd2 = copy_op(rd)
+            self.assertEqual(rd, rd2)
+            self.assertFalse(hasattr(rd2, 'extra'))
+            self.assertFalse(hasattr(rd2, 'another'))
+
     def test__get_ready_dict(self):
         rd = self.rd_class(self.with_address1_singular)
         assert rd == self.with_address1
@@ -849,6 +997,43 @@ class TestRecordDict(TestCaseMixin, unittest.TestCase):
             with self.assertRaises(ValueError):
                 rd.get_ready_dict()
 
+    def test__get_ready_json(self):
+        rd = self.rd_class(self.with_address2)
+        rd['enriched'] = (['fqdn'], {'127.0.0.2': ['asn', 'cc']})
+        rd['name'] = 'Żółć'
+        rd['client'] = ['o2', 'o1']
+
+        ready_json = rd.get_ready_json()
+
+        self.assertIs(type(ready_json), str)
+        self.assertEqual(ready_json, bson_dumps(rd.get_ready_dict()))
+
+    def test__get_ready_json__missing_keys(self):
+        rd = self.rd_class({'source': 'foo.bar'})
+        with self.assertRaises(ValueError):
+            rd.get_ready_json()
+
+    def test__get_ready_json__data_not_deep_copied(self):
+        rd = self.rd_class(self.with_address2)
+        with patch('copy.deepcopy') as deepcopy_mock:
+            rd.get_ready_json()
+        self.assertEqual(deepcopy_mock.mock_calls, [])
+
+    def test__get_ready_json__custom_encoder(self):
+        rd = self.rd_class(self.only_required)
+        encoder = Mock(return_value='{"fake": "json"}')
+        self.addCleanup(set_json_encoder, 'stdlib')
+        set_json_encoder(encoder)
+
+        ready_json = rd.get_ready_json()
+
+        self.assertEqual(ready_json, '{"fake": "json"}')
+        self.assertEqual(encoder.mock_calls, [call(self.only_required)])
+
+    def test__set_json_encoder__unknown(self):
+        with self.assertRaisesRegex(ValueError, r'unknown .*JSON encoder'):
+            set_json_encoder('no-such-encoder')
+
     def test__iter_db_items(self):
         expected_db_item_lists = dict(
             only_required=[
@@ -1010,6 +1195,37 @@ class TestRecordDict(TestCaseMixin, unittest.TestCase):
             else:
                 self.assertEqual(len(db_items), 1)
 
+    def test__iter_db_rows_and_iter_client_db_rows(self):
+        for fixture_key in [
+            'only_required',
+            'with_optional',
+            'with_custom',
+            'with_address_empty',
+            'with_address2',
+            'with_client',
+            'with_client_and_address',
+            'with_url_data_1',
+            'with_url_data_ready',
+        ]:
+            rd = self.rd_class(dict(getattr(self, fixture_key), time='2024-01-02T03:04:05+01:00'))
+            dict_before = copy.deepcopy(rd._dict)
+            expected_rows = [tuple(EVENT_BULK_INSERT.make_row(item))
+                             for item in rd.iter_db_items()]
+            expected_client_rows = [
+                (bytes.fromhex(rd['id']), datetime.datetime(2024, 1, 2, 2, 4, 5), client)
+                for client in rd.get('client', ())]
+
+            rows = list(rd.iter_db_rows())
+            client_rows = list(rd.iter_client_db_rows())
+
+            self.assertEqual(rows, expected_rows, fixture_key)
+            self.assertEqual(client_rows, expected_client_rows, fixture_key)
+            self.assertEqual(rd._dict, dict_before, fixture_key)
+            for row in rows:
+                self.assertEqual(row[EVENT_BULK_INSERT.column_indexes['time']],
+                                 datetime.datetime(2024, 1, 2, 2, 4, 5))
+                self.assertIsInstance(row[EVENT_BULK_INSERT.column_indexes['ip']], int)
+
     def _test_setitem_valid(self, key, values):
         # `values` can be:
         # * S(<expected result value>, <tuple of input values>)
@@ -2862,6 +3078,194 @@ class TestRecordDict(TestCaseMixin, unittest.TestCase):
     # test other methods...
 
 
+class TestRecordDictTrust(unittest.TestCase):
+
+    def test_key_too_short(self):
+        with self.assertRaises(ValueError):
+            RecordDictTrust(31 * b'k')
+
+    def test_format_version(self):
+        trust = RecordDictTrust(32 * b'k')
+
+        self.assertRegex(trust.format_version, r'\A1\.[0-9a-f]{16}\Z')
+        with patch('n6lib.record_dict.TRUSTED_JSON_FORMAT_REVISION', 2):
+            trust2 = RecordDictTrust(32 * b'k')
+        self.assertNotEqual(trust2.format_version, trust.format_version)
+        self.assertFalse(trust.verify_tag(b'{}', trust2.make_tag(b'{}')))
+
+    def test_verify_tag(self):
+        trust = RecordDictTrust(32 * b'k')
+        tag = trust.make_tag(b'{}')
+
+        self.assertTrue(trust.verify_tag(b'{}', tag))
+        self.assertTrue(trust.verify_tag('{}', tag.encode('ascii')))
+        self.assertFalse(trust.verify_tag(b'{ }', tag))
+        self.assertFalse(trust.verify_tag(b'{}', tag[:-1]))
+        self.assertFalse(trust.verify_tag(b'{}', tag.split(':')[1]))
+        self.assertFalse(trust.verify_tag(b'{}', 42))
+
+
+class TestAdjusterMemo(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def _adjuster(self, rd, value):
+        self.calls.append(value)
+        if value == 'bad':
+            raise ValueError('bad value')
+        return value.upper()
+
+    def test_lru_eviction(self):
+        memo = AdjusterMemo(self._adjuster, maxsize=2)
+
+        results = [memo(sen.rd, value) for value in ['a', 'b', 'a', 'c', 'a', 'b']]
+
+        self.assertEqual(results, ['A', 'B', 'A', 'C', 'A', 'B'])
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'b'])
+        self.assertEqual(memo.get_stats(), {
+            'hits': 2,
+            'misses': 4,
+            'unhashable': 0,
+            'size': 2,
+            'maxsize': 2,
+        })
+
+    def test_values_of_different_types_are_not_confused(self):
+        memo = AdjusterMemo(lambda rd, value: repr(value), maxsize=10)
+
+        self.assertEqual(memo(sen.rd, 1), '1')
+        self.assertEqual(memo(sen.rd, True), 'True')
+        self.assertEqual(memo(sen.rd, 1.0), '1.0')
+
+    def test_unhashable_values_bypass_memo(self):
+        memo = AdjusterMemo(lambda rd, value: sorted(value), maxsize=10)
+
+        self.assertEqual(memo(sen.rd, [3, 1, 2]), [1, 2, 3])
+        self.assertEqual(memo(sen.rd, [3, 1, 2]), [1, 2, 3])
+        self.assertEqual(memo.get_stats()['unhashable'], 2)
+        self.assertEqual(memo.get_stats()['size'], 0)
+
+    def test_errors_are_not_memoized(self):
+        memo = AdjusterMemo(self._adjuster, maxsize=10)
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                memo(sen.rd, 'bad')
+
+        self.assertEqual(self.calls, ['bad', 'bad'])
+        self.assertEqual(memo.get_stats()['size'], 0)
+
+    def test_invalid_maxsize(self):
+        with self.assertRaises(ValueError):
+            AdjusterMemo(self._adjuster, maxsize=0)
+
+
+class TestRecordDictAdjusterMemoization(unittest.TestCase):
+
+    def setUp(self):
+        class MemoizingRecordDict(RecordDict):
+            pass
+        self.rd_class = MemoizingRecordDict
+
+    def _make_rd(self, **kwargs):
+        return self.rd_class(dict(
+            category='bots',
+            source='foo.bar',
+            restriction='public',
+            confidence='low',
+            name='VIRUT',
+            fqdn='Example.COM',
+            **kwargs))
+
+    def test_results_and_stats(self):
+        self.rd_class.enable_adjuster_memoization(maxsize=8)
+
+        rd1 = self._make_rd()
+        rd2 = self._make_rd()
+
+        expected = {
+            'category': 'bots',
+            'source': 'foo.bar',
+            'restriction': 'public',
+            'confidence': 'low',
+            'name': 'virut',
+            'fqdn': 'example.com',
+        }
+        self.assertEqual(rd1, expected)
+        self.assertEqual(rd2, expected)
+        self.assertEqual(rd2._name_before_main_adjustments, 'VIRUT')
+        stats = self.rd_class.get_adjuster_memo_stats()
+        self.assertEqual(sorted(stats), sorted(RecordDict.memoizable_keys))
+        for key in expected:
+            self.assertEqual(stats[key]['hits'], 1, key)
+            self.assertEqual(stats[key]['misses'], 1, key)
+
+    def test_name_memo_depends_on_category(self):
+        self.rd_class.enable_adjuster_memoization()
+
+        rd1 = self.rd_class(dict(category='bots', name='Foo Ä'))
+        rd2 = self.rd_class(dict(category='other', name='Foo Ä'))
+
+        self.assertEqual(rd1['name'], 'foo ?')
+        self.assertEqual(rd2['name'], 'Foo ?')
+        self.assertEqual(self.rd_class.get_adjuster_memo_stats()['name']['misses'], 2)
+
+    def test_name_memo_wraps_unbound_pure_name_adjuster(self):
+        self.rd_class.enable_adjuster_memoization()
+
+        memo = self.rd_class._adjuster_memos['name']
+
+        self.assertIs(memo.adjuster, RecordDict._get_pure_adjusted_name)
+        self.assertEqual(memo(self.rd_class(), ('VIRUT', 'bots')), 'virut')
+
+    def test_nonstandard_name_still_checked_on_memo_hit(self):
+        self.rd_class.enable_adjuster_memoization()
+        self.rd_class(dict(category='bots', name='some nonstandard name'))
+        with patch.object(self.rd_class, '_check_and_handle_nonstandard_name') as check_mock:
+            self.rd_class(dict(category='bots', name='some nonstandard name'))
+        check_mock.assert_called_once_with('some nonstandard name', 'bots')
+
+    def test_adjuster_errors_are_still_wrapped(self):
+        self.rd_class.enable_adjuster_memoization()
+        rd = self.rd_class()
+
+        for _ in range(2):
+            with self.assertRaises(AdjusterError):
+                rd['restriction'] = 'illegal'
+
+    def test_disabled_by_default_and_per_class(self):
+        self.assertEqual(self.rd_class.get_adjuster_memo_stats(), {})
+
+        self.rd_class.enable_adjuster_memoization()
+
+        self.assertEqual(RecordDict.get_adjuster_memo_stats(), {})
+        self.assertIs(RecordDict._adjuster_memos, RecordDict.__dict__['_adjuster_memos'])
+        self.assertFalse(RecordDict._adjuster_memos)
+        self.assertNotEqual(self.rd_class._key_to_adjuster, RecordDict._key_to_adjuster)
+
+    def test_disable_and_reenable(self):
+        original_key_to_adjuster = dict(self.rd_class._key_to_adjuster)
+        self.rd_class.enable_adjuster_memoization()
+        self._make_rd()
+        self.rd_class.enable_adjuster_memoization()
+
+        self.assertEqual(self.rd_class.get_adjuster_memo_stats()['source']['misses'], 0)
+        self.assertIsInstance(self.rd_class._key_to_adjuster['source'][1], AdjusterMemo)
+        self.assertNotIsInstance(self.rd_class._key_to_adjuster['source'][1].adjuster,
+                                 AdjusterMemo)
+
+        self.rd_class.disable_adjuster_memoization()
+
+        self.assertEqual(self.rd_class.get_adjuster_memo_stats(), {})
+        self.assertEqual(dict(self.rd_class._key_to_adjuster), original_key_to_adjuster)
+
+    def test_memoizable_keys_must_be_settable(self):
+        with self.assertRaisesRegex(ValueError, 'not settable: spam'):
+            class _WrongRecordDict(RecordDict):
+                memoizable_keys = RecordDict.memoizable_keys | {'spam'}
+
+
 class TestBLRecordDict(TestRecordDict):
 
     rd_class = BLRecordDict
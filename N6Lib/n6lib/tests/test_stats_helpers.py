@@ -0,0 +1,150 @@
+# Copyright (c) 2026 NASK. All rights reserved.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from n6lib.stats_helpers import (
+    ComponentStats,
+    LatencyHistogram,
+)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_of_uniform_durations(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.add(ms / 1000)
+
+        p50 = histogram.get_percentile(0.5)
+        p99 = histogram.get_percentile(0.99)
+
+        self.assertAlmostEqual(p50, 0.5, delta=0.5 * 0.19)
+        self.assertAlmostEqual(p99, 0.99, delta=0.99 * 0.19)
+        self.assertLessEqual(p99, histogram.max)
+
+    def test_durations_out_of_range(self):
+        histogram = LatencyHistogram()
+        histogram.add(0.0)
+        histogram.add(1000.0)
+
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.get_percentile(1.0), 1000.0)
+
+    def test_summary_of_empty_histogram(self):
+        self.assertEqual(LatencyHistogram().get_summary(), {
+            'count': 0,
+            'mean': None,
+            'p50': None,
+            'p99': None,
+            'max': None,
+        })
+
+
+class TestComponentStats(unittest.TestCase):
+
+    def setUp(self):
+        self.monotonic = patch('n6lib.stats_helpers.time.monotonic', return_value=100.0).start()
+        self.addCleanup(patch.stopall)
+        self.stats = ComponentStats('SomeComponent')
+
+    def test_make_report(self):
+        self.stats.record_processing('event.parsed.foo.bar', 0.002, 'acked')
+        self.stats.record_processing('event.parsed.foo.bar', 0.004, 'acked')
+        self.stats.record_processing('event.parsed.foo.bar', 0.001, 'nacked')
+        self.stats.record_processing('event.parsed.foo.bar', 0.001, 'requeued')
+        self.stats.record_processing('event.parsed.spam.ham', 0.003, 'acked')
+        self.stats.record_publishing('event.enriched.foo.bar', 0.0001)
+        self.monotonic.return_value = 102.0
+
+        report = self.stats.make_report()
+
+        self.assertEqual(report['component'], 'SomeComponent')
+        self.assertEqual(report['pid'], os.getpid())
+        self.assertEqual(report['uptime'], 2.0)
+        self.assertEqual(list(report['input']), ['event.parsed.foo.bar', 'event.parsed.spam.ham'])
+        foo_bar = report['input']['event.parsed.foo.bar']
+        self.assertEqual(foo_bar['processed'], 4)
+        self.assertEqual(foo_bar['acked'], 2)
+        self.assertEqual(foo_bar['nacked'], 1)
+        self.assertEqual(foo_bar['requeued'], 1)
+        self.assertEqual(foo_bar['nack_rate'], 0.25)
+        self.assertEqual(foo_bar['events_per_second'], 2.0)
+        self.assertEqual(foo_bar['recent_events_per_second'], 2.0)
+        self.assertEqual(foo_bar['processing_time']['count'], 4)
+        self.assertEqual(foo_bar['processing_time']['max'], 0.004)
+        self.assertEqual(report['output'], {
+            'event.enriched.foo.bar': {
+                'published': 1,
+                'events_per_second': 0.5,
+                'publishing_time': LatencyHistogram.get_summary(
+                    self.stats._output_rk_to_stats['event.enriched.foo.bar'].publishing_times),
+            },
+        })
+
+    def test_recent_rate_concerns_time_since_previous_report(self):
+        self.stats.record_processing('event.parsed.foo.bar', 0.002, 'acked')
+        self.monotonic.return_value = 110.0
+        self.stats.make_report()
+        self.stats.record_processing('event.parsed.foo.bar', 0.002, 'acked')
+        self.stats.record_processing('event.parsed.foo.bar', 0.002, 'acked')
+        self.monotonic.return_value = 111.0
+
+        report = self.stats.make_report()
+
+        foo_bar = report['input']['event.parsed.foo.bar']
+        self.assertAlmostEqual(foo_bar['events_per_second'], 3 / 11)
+        self.assertEqual(foo_bar['recent_events_per_second'], 2.0)
+
+    def test_record_trace(self):
+        patch('n6lib.stats_helpers.time.time', return_value=1700000001.0).start()
+        self.stats.record_trace('foo.bar', ['FooCollector@1700000000000',
+                                            'FooParser@1700000000250'], 'Recorder')
+        self.stats.record_trace('foo.bar', ['FooCollector@1700000000500'], 'Recorder')
+
+        report = self.stats.make_report()['trace_latency']
+
+        self.assertEqual(list(report), ['foo.bar'])
+        self.assertEqual({hop: summary['count'] for hop, summary in report['foo.bar'].items()}, {
+            'FooCollector -> FooParser': 1,
+            'FooParser -> Recorder': 1,
+            'FooCollector -> Recorder': 1,
+            'total': 2,
+        })
+        self.assertEqual(report['foo.bar']['FooParser -> Recorder']['max'], 0.75)
+        self.assertEqual(report['foo.bar']['total']['max'], 1.0)
+
+    def test_additional_report_section(self):
+        counter = iter(range(1, 10))
+        self.stats.add_report_section('spam', lambda: {'calls': next(counter)})
+
+        self.assertEqual(self.stats.make_report()['spam'], {'calls': 1})
+        self.assertEqual(self.stats.make_report()['spam'], {'calls': 2})
+
+    def test_additional_report_section_with_standard_name(self):
+        with self.assertRaises(ValueError):
+            self.stats.add_report_section('input', dict)
+
+    def test_unknown_outcome(self):
+        with self.assertRaises(ValueError):
+            self.stats.record_processing('event.parsed.foo.bar', 0.002, 'lost')
+
+    def test_save_report(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.stats.record_processing('event.parsed.foo.bar', 0.002, 'acked')
+
+        self.stats.save_report(os.path.join(tmp_dir, 'stats-{pid}.json'))
+
+        with open(os.path.join(tmp_dir, f'stats-{os.getpid()}.json')) as f:
+            report = json.load(f)
+        self.assertEqual(report['input']['event.parsed.foo.bar']['acked'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()